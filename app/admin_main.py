@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, date
 from typing import Any
 from fastapi import FastAPI, HTTPException, Depends
@@ -8,9 +9,26 @@ from fastapi.staticfiles import StaticFiles
 from app.core.config import STATIC_DIR
 from app.core.security import require_admin  # JWT bearer-token admin guard for /api/admin/* routes
 from app.db import fetch_all, fetch_one, execute, parse_json_field, insert_and_get_id
+from app.db.cache import invalidate_after_write
+from app.db import totals
+from app.db import names as name_index
+from app.db import rollups
+from app.db import search as search_index
+from app.db import stations
+from app.db import activity
+from app.db import workload
+from app.db import versions
 
 
-app = FastAPI(title="My Safety App API")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Admin writes queue activity events too; flush them like app.main does.
+    activity.writer.start(lambda: async_engine)
+    yield
+    await activity.writer.stop(lambda: async_engine)
+
+
+app = FastAPI(title="My Safety App API", lifespan=lifespan)
 
 # CORS (allow local dev)
 origins = [
@@ -330,7 +348,8 @@ def get_user_sessions(_user: dict = Depends(require_admin)):
 @app.get("/api/admin/active-cases")
 def get_active_cases_view(_user: dict = Depends(require_admin)):
     sql = (
-        "SELECT crime_id, reporter_id, reporter_name, crime_type, city, area, status, priority_level, incident_date, created_at "
+        "SELECT crime_id, reporter_id, reporter_name, crime_type, city, area, status, priority_level, incident_date,"
+        " assigned_to, created_at "
         "FROM active_cases ORDER BY created_at DESC LIMIT 200"
     )
     return {"success": True, "active_cases": fetch_all(sql)}
@@ -339,7 +358,7 @@ def get_active_cases_view(_user: dict = Depends(require_admin)):
 @app.get("/api/admin/officer-workload")
 def get_officer_workload_view(_user: dict = Depends(require_admin)):
     sql = (
-        "SELECT user_id, full_name, role_hint, station_name, active_assignments "
+        "SELECT user_id, full_name, role_hint, station_name, active_assignments, updated_at "
         "FROM officer_workload ORDER BY active_assignments DESC, full_name LIMIT 200"
     )
     return {"success": True, "officer_workload": fetch_all(sql)}
@@ -347,8 +366,8 @@ def get_officer_workload_view(_user: dict = Depends(require_admin)):
 
 from fastapi import FastAPI, HTTPException, Depends
 from pydantic import BaseModel
-from sqlalchemy import create_engine, MetaData, Column, Integer, String, Enum, DateTime, Text, Date, Time, JSON
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import MetaData, Column, Integer, String, Enum, DateTime, Text, Date, Time, JSON, text
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import pymysql
@@ -390,15 +409,14 @@ class CrimeCreate(BaseModel):
     status: str = "Pending"
     priority_level: str = "Medium"
 
-# Database Configuration
-DATABASE_URL = "mysql+pymysql://root:@localhost/mysafetydb"  # Modify as per your database credentials
-
 # FastAPI App Initialization
 # Reuse the previously created FastAPI app instance above
 
-# SQLAlchemy Database Setup
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# SQLAlchemy Database Setup — the shared process-wide engine/session factory
+# (see app.db.engine), so the ORM, the helpers above and app.main use one pool.
+from app.db.engine import engine, SessionLocal  # noqa: E402
+from app.db.aio import AsyncEngine  # noqa: E402
+async_engine = AsyncEngine(engine)
 Base = declarative_base()
 
 # Dependency to get the database session
@@ -715,13 +733,26 @@ def read_case_assignment(
 
 @app.post("/case_assignments/")
 def create_case_assignment(data: CaseAssignmentCreate, _user: dict = Depends(require_admin)):
-    assignment_id = insert_and_get_id(
-        """
-        INSERT INTO case_assignments (user_id, crime_id, duty_role)
-        VALUES (%s, %s, %s)
-        """,
-        (data.user_id, data.crime_id, data.duty_role),
-    )
+    # The insert, its counter and the workload projection commit together.
+    with engine.begin() as conn:
+        assignment_id = conn.execute(
+            text(
+                """
+                INSERT INTO case_assignments (user_id, crime_id, duty_role)
+                VALUES (:user_id, :crime_id, :duty_role)
+                """
+            ),
+            {"user_id": data.user_id, "crime_id": data.crime_id, "duty_role": data.duty_role},
+        ).lastrowid
+        totals.assignments_changed(conn, 1)
+        # The insert above failed if the crime already had an assignment,
+        # so before it the crime counted towards no one.
+        workload.crime_changed(conn, data.crime_id)
+    activity.record(activity.CRIME, data.crime_id, activity.ASSIGNED, actor_id=_user.get("user_id"),
+                    title=activity.crime_title(data.crime_id),
+                    summary=f"Assigned to officer #{data.user_id}",
+                    details={"officer_id": data.user_id, "duty_role": data.duty_role,
+                             "assignment_id": assignment_id})
     return {"success": True, "assignment_id": assignment_id}
 
 @app.put("/case_assignments/{assignment_id}")
@@ -736,8 +767,11 @@ def update_case_assignment(
     if db_assignment is None:
         raise HTTPException(status_code=404, detail="Case assignment not found")
     
+    officer = workload.officer_for(db.connection(), db_assignment.crime_id)
     db_assignment.status = status
     db_assignment.notes = notes
+    db.flush()
+    workload.crime_changed(db.connection(), db_assignment.crime_id, officer)
     db.commit()
     db.refresh(db_assignment)
     return db_assignment
@@ -752,7 +786,11 @@ def delete_case_assignment(
     if db_assignment is None:
         raise HTTPException(status_code=404, detail="Case assignment not found")
     
+    officer = workload.officer_for(db.connection(), db_assignment.crime_id)
     db.delete(db_assignment)
+    db.flush()
+    totals.assignments_changed(db.connection(), -1)
+    workload.crime_changed(db.connection(), db_assignment.crime_id, officer)
     db.commit()
     return {"message": "Case assignment deleted successfully"}
 
@@ -870,25 +908,40 @@ def read_crime(crime_id: int, db: Session = Depends(get_db), _user: dict = Depen
         raise HTTPException(status_code=404, detail="Crime not found")
     return db_crime
 
-@app.post("/crime/")
+@app.post("/crime/", dependencies=[Depends(invalidate_after_write)])
 def create_crime(data: CrimeCreate, _user: dict = Depends(require_admin)):
-    crime_id = insert_and_get_id(
-        """
-        INSERT INTO crime (reporter_id, crime_data, location_data, status, priority_level)
-        VALUES (%s, %s, %s, %s, %s)
-        """,
-        (
-            data.reporter_id,
-            data.crime_data,
-            data.location_data,
-            data.status,
-            data.priority_level,
-        ),
-    )
+    with engine.begin() as conn:
+        crime_id = conn.execute(
+            text(
+                """
+                INSERT INTO crime (reporter_id, crime_data, location_data, status, priority_level)
+                VALUES (:reporter_id, :crime_data, :location_data, :status, :priority_level)
+                """
+            ),
+            {
+                "reporter_id": data.reporter_id,
+                "crime_data": data.crime_data,
+                "location_data": data.location_data,
+                "status": data.status,
+                "priority_level": data.priority_level,
+            },
+        ).lastrowid
+        totals.crime_inserted(conn, data.status)
+        search_index.index_crime(conn, crime_id, data.crime_data, data.location_data)
+        rollups.changed(conn, rollups.CRIMES, crime_id)
+        workload.crime_changed(conn, crime_id)
+    crime_fields = parse_json_field(data.crime_data)
+    location_fields = parse_json_field(data.location_data)
+    crime_fields = crime_fields if isinstance(crime_fields, dict) else {}
+    location_fields = location_fields if isinstance(location_fields, dict) else {}
+    activity.record(activity.CRIME, crime_id, activity.CREATED, status=data.status,
+                    actor_id=_user.get("user_id"), title=activity.crime_title(crime_id),
+                    summary=activity.crime_summary(crime_fields.get("type"), crime_fields.get("description"),
+                                                   location_fields.get("area_name")))
     return {"success": True, "crime_id": crime_id}
 
 
-@app.put("/crime/{crime_id}")
+@app.put("/crime/{crime_id}", dependencies=[Depends(invalidate_after_write)])
 def update_crime(
     crime_id: int,
     status: str,
@@ -900,19 +953,36 @@ def update_crime(
     if db_crime is None:
         raise HTTPException(status_code=404, detail="Crime not found")
     
+    counted = rollups.keys_for(db.connection(), rollups.CRIMES, crime_id)
+    officer = workload.officer_for(db.connection(), crime_id)
+    old_status = db_crime.status
     db_crime.status = status
     db_crime.priority_level = priority_level
+    db.flush()
+    totals.crime_status_changed(db.connection(), old_status, status)
+    rollups.changed(db.connection(), rollups.CRIMES, crime_id, counted)
+    workload.crime_changed(db.connection(), crime_id, officer)
     db.commit()
     db.refresh(db_crime)
+    activity.record(activity.CRIME, crime_id,
+                    activity.STATUS_CHANGED if status != old_status else activity.UPDATED,
+                    status=status, actor_id=_user.get("user_id"), title=activity.crime_title(crime_id),
+                    details={"from": old_status, "priority_level": priority_level})
     return db_crime
 
-@app.delete("/crime/{crime_id}")
+@app.delete("/crime/{crime_id}", dependencies=[Depends(invalidate_after_write)])
 def delete_crime(crime_id: int, db: Session = Depends(get_db), _user: dict = Depends(require_admin)):
     db_crime = db.query(Crime).filter(Crime.crime_id == crime_id).first()
     if db_crime is None:
         raise HTTPException(status_code=404, detail="Crime not found")
     
+    counted = rollups.keys_for(db.connection(), rollups.CRIMES, crime_id)
+    officer = workload.officer_for(db.connection(), crime_id)
     db.delete(db_crime)
+    db.flush()  # the DELETE runs before the hooks, in the same transaction
+    totals.crime_deleted(db.connection(), db_crime.status)
+    rollups.removed(db.connection(), counted)
+    workload.crime_removed(db.connection(), crime_id, officer)
     db.commit()
     return {"message": "Crime deleted successfully"}
 
@@ -929,7 +999,7 @@ def read_criminal_sighting(
     return db_row
 
 
-@app.post("/criminal_sightings/")
+@app.post("/criminal_sightings/", dependencies=[Depends(versions.after_write(versions.WANTED))])
 def create_criminal_sighting(
     criminal_id: int,
     last_seen_time: datetime,
@@ -951,10 +1021,14 @@ def create_criminal_sighting(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    activity.record(activity.WANTED, criminal_id, activity.SIGHTED, actor_id=_user.get("user_id"),
+                    summary=f"Seen at {last_seen_location}",
+                    details={"sighting_id": db_obj.sighting_id, "last_seen_time": last_seen_time,
+                             "verified": verified})
     return db_obj
 
 
-@app.put("/criminal_sightings/{sighting_id}")
+@app.put("/criminal_sightings/{sighting_id}", dependencies=[Depends(versions.after_write(versions.WANTED))])
 def update_criminal_sighting(
     sighting_id: int,
     last_seen_location: str | None = None,
@@ -977,7 +1051,7 @@ def update_criminal_sighting(
     return db_row
 
 
-@app.delete("/criminal_sightings/{sighting_id}")
+@app.delete("/criminal_sightings/{sighting_id}", dependencies=[Depends(versions.after_write(versions.WANTED))])
 def delete_criminal_sighting(
     sighting_id: int,
     db: Session = Depends(get_db),
@@ -1142,7 +1216,7 @@ def read_missing_person(missing_id: int, db: Session = Depends(get_db), _user: d
     return db_row
 
 
-@app.post("/missing_person/")
+@app.post("/missing_person/", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 def create_missing_person(
     name: str,
     reporter_id: int | None = None,
@@ -1168,12 +1242,18 @@ def create_missing_person(
         status=status,
     )
     db.add(db_obj)
+    db.flush()
+    name_index.index_person(db.connection(), name_index.MISSING, db_obj.missing_id, name)
+    rollups.changed(db.connection(), rollups.MISSING, db_obj.missing_id)
     db.commit()
     db.refresh(db_obj)
+    activity.record(activity.MISSING, db_obj.missing_id, activity.CREATED, status=status,
+                    actor_id=_user.get("user_id"), title=name,
+                    summary=activity.missing_summary(last_seen_location))
     return db_obj
 
 
-@app.put("/missing_person/{missing_id}")
+@app.put("/missing_person/{missing_id}", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 def update_missing_person(
     missing_id: int,
     status: str | None = None,
@@ -1185,6 +1265,7 @@ def update_missing_person(
     db_row = db.query(MissingPerson).filter(MissingPerson.missing_id == missing_id).first()
     if db_row is None:
         raise HTTPException(status_code=404, detail="Missing person not found")
+    old_status = db_row.status
     if status is not None:
         db_row.status = status
     if contact_phone is not None:
@@ -1193,10 +1274,15 @@ def update_missing_person(
         db_row.last_seen_location = last_seen_location
     db.commit()
     db.refresh(db_row)
+    activity.record(activity.MISSING, missing_id,
+                    activity.STATUS_CHANGED if db_row.status != old_status else activity.UPDATED,
+                    status=db_row.status, actor_id=_user.get("user_id"), title=db_row.name,
+                    summary=activity.missing_summary(db_row.last_seen_location),
+                    details={"from": old_status})
     return db_row
 
 
-@app.delete("/missing_person/{missing_id}")
+@app.delete("/missing_person/{missing_id}", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 def delete_missing_person(
     missing_id: int,
     db: Session = Depends(get_db),
@@ -1205,14 +1291,18 @@ def delete_missing_person(
     db_row = db.query(MissingPerson).filter(MissingPerson.missing_id == missing_id).first()
     if db_row is None:
         raise HTTPException(status_code=404, detail="Missing person not found")
+    counted = rollups.keys_for(db.connection(), rollups.MISSING, missing_id)
     db.delete(db_row)
+    db.flush()
+    name_index.unindex_person(db.connection(), name_index.MISSING, missing_id)
+    rollups.removed(db.connection(), counted)
     db.commit()
     return {"message": "Missing person deleted successfully"}
 
 
 # --- Minimal create endpoints for PoliceStation and WantedCriminal ---
 
-@app.post("/police_stations/")
+@app.post("/police_stations/", dependencies=[Depends(versions.after_write(versions.STATIONS))])
 def create_police_station(data: PoliceStationCreate, _user: dict = Depends(require_admin)):
     station_id = insert_and_get_id(
         """
@@ -1230,31 +1320,28 @@ def create_police_station(data: PoliceStationCreate, _user: dict = Depends(requi
             data.jurisdiction_area,
         ),
     )
+    with engine.connect() as conn:
+        stations.reload(conn)
     return {"success": True, "station_id": station_id}
 
 
-@app.post("/wanted_criminals/")
+@app.post("/wanted_criminals/", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.WANTED))])
 def create_wanted_criminal(data: WantedCriminalCreate, _user: dict = Depends(require_admin)):
-    criminal_id = insert_and_get_id(
-        """
-        INSERT INTO wanted_criminal (name, alias, age_range, gender, description, crimes_committed, danger_level, reward_amount, last_known_location, photo_url, added_by, status)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            data.name,
-            data.alias,
-            data.age_range,
-            data.gender,
-            data.description,
-            data.crimes_committed,
-            data.danger_level,
-            data.reward_amount,
-            data.last_known_location,
-            data.photo_url,
-            data.added_by,
-            data.status,
-        ),
-    )
+    with engine.begin() as conn:
+        criminal_id = conn.execute(
+            text(
+                """
+                INSERT INTO wanted_criminal (name, alias, age_range, gender, description, crimes_committed, danger_level, reward_amount, last_known_location, photo_url, added_by, status)
+                VALUES (:name, :alias, :age_range, :gender, :description, :crimes_committed, :danger_level, :reward_amount, :last_known_location, :photo_url, :added_by, :status)
+                """
+            ),
+            data.dict(),
+        ).lastrowid
+        name_index.index_person(conn, name_index.WANTED, criminal_id, data.name, data.alias)
+        rollups.changed(conn, rollups.WANTED, criminal_id)
+    activity.record(activity.WANTED, criminal_id, activity.CREATED, status=data.status,
+                    actor_id=_user.get("user_id"), title=data.name,
+                    summary=activity.wanted_summary(data.last_known_location, data.danger_level))
     return {"success": True, "criminal_id": criminal_id}
 
 
@@ -0,0 +1,113 @@
+"""Conditional GET support: ETag / Last-Modified headers and 304 replies.
+
+Handlers take a version stamp from `app.db.versions` before reading data,
+then let `not_modified()` decide:
+
+    async def list_things(request: Request, response: Response):
+        async with async_engine.connect() as conn:
+            stamp = await conn.run_sync(versions.stamp, versions.WANTED)
+            cached = not_modified(request, response, stamp)
+            if cached is not None:
+                return cached
+            ...  # the normal query; `response` already carries the validators
+
+Responses are sent with `Cache-Control: no-cache`, so browsers keep them and
+revalidate on every use (templates fetch with `cache: 'no-cache'`). Admin
+endpoints pass `private=True`, which keeps shared caches out and varies the
+entry on the Authorization header.
+
+If-None-Match takes precedence over If-Modified-Since (RFC 9110 §13.2.2).
+Last-Modified has one-second resolution, so the ETag is the validator that
+counts. Bump `REPRESENTATION` when a response shape changes, so clients do
+not keep revalidating an old shape against unchanged data.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+
+REPRESENTATION = "1"
+
+Stamp = Tuple[str, Optional[datetime]]
+
+
+def make_etag(token: str) -> str:
+    digest = hashlib.blake2b(f"{REPRESENTATION}:{token}".encode(), digest_size=10).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, so W/ prefixes are ignored on both sides)."""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:  # weak comparison
+            return True
+    return False
+
+
+def _as_utc(value: datetime) -> datetime:
+    # The app stores naive UTC.
+    value = value.replace(microsecond=0)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def not_modified(request: Request, response: Response, stamp: Optional[Stamp],
+                 private: bool = False, max_age: int = 0) -> Optional[Response]:
+    """Set validators on `response`; return a 304 if the client's copy is current.
+
+    With no stamp (version table unavailable), the response goes out as
+    before, without validators, and is never a 304. `max_age` lets clients
+    reuse their copy for that many seconds before revalidating.
+    """
+    if stamp is None:
+        return None
+    token, changed_at = stamp
+    freshness = f"max-age={max_age}" if max_age > 0 else "no-cache"
+    headers = {
+        "ETag": make_etag(token),
+        "Cache-Control": f"private, {freshness}" if private else freshness,
+    }
+    last_modified = _as_utc(changed_at) if isinstance(changed_at, datetime) else None
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if private:
+        headers["Vary"] = "Authorization"
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, headers["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and last_modified
+                     and _not_modified_since(if_modified_since, last_modified))
+    return Response(status_code=304, headers=headers) if fresh else None
+
+
+def drop_validators(response: Response) -> None:
+    """Undo `not_modified()`'s headers, e.g. when falling back to a placeholder body."""
+    for name in ("ETag", "Last-Modified", "Vary"):
+        if name in response.headers:
+            del response.headers[name]
+    response.headers["Cache-Control"] = "no-store"
@@ -4,8 +4,8 @@
 HTML page handlers under `app/api/routers/pages.py` to read templates
 without depending on the current working directory.
 
-JWT secret / TTL live here too so they can be imported by both the
-security helpers and tests that need to read or override them.
+JWT secret / TTL and the bcrypt cost live here too so they can be imported
+by both the security helpers and tests that need to read or override them.
 """
 from __future__ import annotations
 
@@ -22,3 +22,7 @@ ASSETS_DIR: Path = STATIC_DIR / "assets"
 JWT_SECRET: str = os.getenv("JWT_SECRET", "dev-only-change-me-please-32bytes")
 JWT_ALGORITHM: str = "HS256"
 JWT_EXPIRES_MINUTES: int = int(os.getenv("JWT_EXPIRES_MINUTES", "120"))
+
+# bcrypt cost factor for new hashes. Existing hashes with another cost are
+# rehashed on the user's next successful login.
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
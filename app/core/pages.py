@@ -0,0 +1,214 @@
+"""In-memory store for the HTML page routes.
+
+Each template is read once, normalised to UTF-8 (undecodable bytes become
+U+FFFD, as `_read_html` used to do) and kept together with its gzip and,
+when the optional `brotli` package is installed, brotli encodings:
+
+    page                    identity   gzip     br
+    admin_dashboard21.html  ~200 KB    ~40 KB   ~32 KB
+
+`respond()` picks the encoding from Accept-Encoding (q-values honoured,
+ties go to br, then gzip, then identity) and answers If-None-Match with a
+304. ETags are strong and differ per encoding, since the bytes differ.
+The response carries `Cache-Control: no-cache` and
+`Vary: Accept-Encoding`.
+
+Set TEMPLATE_WATCH=1 in development. Every request then stats the file
+and reloads it when its mtime or size has changed. Otherwise a page is
+only re-read when the process restarts. Compression then runs at a lower
+brotli quality, so editing the 5,000-line dashboard does not stall the
+first reload.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from fastapi import Request, Response
+
+from app.core.conditional import etag_matches
+from app.core.config import BASE_DIR, TEMPLATES_DIR
+
+try:  # optional: pip install .[compression]
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "text/html; charset=utf-8"
+# Smaller bodies are served as-is; the encoding overhead is not worth it.
+MIN_COMPRESS_BYTES = 1024
+PREFERENCE = ("br", "gzip", "identity")
+_SUFFIX = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class Page:
+    path: Path
+    mtime_ns: int
+    size: int
+    last_modified: str
+    bodies: Dict[str, bytes] = field(default_factory=dict)  # encoding -> bytes
+    etags: Dict[str, str] = field(default_factory=dict)
+
+
+def _compress(raw: bytes, watch: bool) -> Dict[str, bytes]:
+    bodies = {"identity": raw}
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return bodies
+    # mtime=0 keeps the gzip bytes (and so the ETag) stable across restarts.
+    bodies["gzip"] = gzip.compress(raw, compresslevel=6 if watch else 9, mtime=0)
+    if brotli is not None:
+        bodies["br"] = brotli.compress(raw, quality=5 if watch else 11, mode=brotli.MODE_TEXT)
+    return bodies
+
+
+def negotiate(accept_encoding: Optional[str], available) -> str:
+    """Best of `available` for an Accept-Encoding header; identity if nothing fits."""
+    if not accept_encoding:
+        return "identity"
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*")
+
+    def weight(encoding: str) -> float:
+        if encoding in weights:
+            return weights[encoding]
+        if wildcard is not None:
+            return wildcard
+        # identity is acceptable unless explicitly refused (RFC 9110 §12.5.3).
+        return 0.001 if encoding == "identity" else 0.0
+
+    candidates = [e for e in PREFERENCE if e in available and weight(e) > 0]
+    if not candidates:
+        return "identity"
+    return max(candidates, key=lambda e: (weight(e), -PREFERENCE.index(e)))
+
+
+class TemplateStore:
+    """Pages keyed by path relative to `root`, loaded on first use."""
+
+    def __init__(self, root: Path = BASE_DIR, watch: bool = False):
+        self.root = Path(root)
+        self.watch = watch
+        self._pages: Dict[str, Page] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+        self._reloads = 0
+
+    def _resolve(self, relpath: Union[str, Path]) -> Path:
+        path = Path(relpath)
+        return path if path.is_absolute() else self.root / path
+
+    def _load(self, path: Path, stat: os.stat_result) -> Page:
+        raw = path.read_bytes().decode("utf-8", errors="replace").encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=12).hexdigest()
+        bodies = _compress(raw, self.watch)
+        return Page(
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+            bodies=bodies,
+            etags={encoding: f'"{digest}{_SUFFIX[encoding]}"' for encoding in bodies},
+        )
+
+    def get(self, relpath: Union[str, Path]) -> Page:
+        """The page at `relpath`; raises FileNotFoundError if it is missing."""
+        key = str(relpath)
+        page = self._pages.get(key)
+        if page is not None and not self.watch:
+            self._hits += 1
+            return page
+        path = self._resolve(relpath)
+        stat = path.stat()
+        if page is not None and (page.mtime_ns, page.size) == (stat.st_mtime_ns, stat.st_size):
+            self._hits += 1
+            return page
+        with self._lock:
+            current = self._pages.get(key)
+            if current is not None and (current.mtime_ns, current.size) == (stat.st_mtime_ns, stat.st_size):
+                return current
+            fresh = self._load(path, stat)
+            self._pages[key] = fresh
+            self._loads += 1
+            if current is not None:
+                self._reloads += 1
+                logger.info("Template %s changed on disk; reloaded", key)
+            return fresh
+
+    def respond(self, request: Request, relpath: Union[str, Path]) -> Response:
+        """The page in the client's preferred encoding, or a 304."""
+        page = self.get(relpath)
+        encoding = negotiate(request.headers.get("accept-encoding"), page.bodies)
+        headers = {
+            "ETag": page.etags[encoding],
+            "Last-Modified": page.last_modified,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=page.bodies[encoding], media_type=MEDIA_TYPE, headers=headers)
+
+    def preload(self, directory: Path = TEMPLATES_DIR) -> int:
+        """Load every `*.html` under `directory`; returns the number loaded."""
+        count = 0
+        for path in sorted(Path(directory).glob("*.html")):
+            try:
+                self.get(path.relative_to(self.root) if path.is_relative_to(self.root) else path)
+                count += 1
+            except OSError as exc:
+                logger.warning("Template %s not preloaded: %s", path, exc)
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self) -> dict:
+        pages = list(self._pages.values())
+        return {
+            "pages": len(pages),
+            "watch": self.watch,
+            "brotli": brotli is not None,
+            "hits": self._hits,
+            "loads": self._loads,
+            "reloads": self._reloads,
+            "bytes": {
+                encoding: sum(len(p.bodies.get(encoding, b"")) for p in pages)
+                for encoding in PREFERENCE
+            },
+        }
+
+
+store = TemplateStore(watch=_env_flag("TEMPLATE_WATCH"))
@@ -0,0 +1,138 @@
+"""Password hashing off the event loop.
+
+`register_user` and `login_user` are `async def`. A bcrypt hash or check
+takes 100-300 ms of CPU at cost 12, so calling `hash_password` /
+`verify_password` inline stalls every other request on the worker,
+panic alerts included, for that long. Here each call runs in a worker
+thread instead:
+
+    password_hash = await passwords.hash(user.password)
+    ok, new_hash = await passwords.verify(user.password, row["password_hash"])
+
+The pyca `bcrypt` backend releases the GIL while it computes, so threads
+run hashes in parallel without the pickling and start-up cost of a
+process pool. At most PASSWORD_MAX_CONCURRENCY hashes run at once
+(default: CPU count, capped at 4), on a limiter separate from the DB one,
+so a login burst cannot take the DB threads. Callers beyond that wait in
+line. Once PASSWORD_MAX_QUEUE (default 64) are already waiting, `PoolBusy`
+is raised instead. The routes turn it into a 503, because a login that
+would wait several seconds is better retried.
+
+`verify()` also returns a fresh hash when the stored one was made with a
+different cost than BCRYPT_ROUNDS. The login route stores it, so raising
+or lowering the cost takes effect as users sign in.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Optional, Tuple
+
+import anyio
+import anyio.to_thread
+
+from app.core.security import hash_password, password_needs_rehash, verify_password
+
+PASSWORD_MAX_CONCURRENCY = int(os.getenv("PASSWORD_MAX_CONCURRENCY", str(min(os.cpu_count() or 1, 4))))
+PASSWORD_MAX_QUEUE = int(os.getenv("PASSWORD_MAX_QUEUE", "64"))
+
+
+class PoolBusy(RuntimeError):
+    """Too many password operations are already waiting."""
+
+
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anyio.CapacityLimiter]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_counters = {"hashes": 0, "verifies": 0, "rehashes": 0, "rejected": 0, "max_waiting": 0,
+             "wait_seconds": 0.0, "work_seconds": 0.0}
+
+
+def _limiter() -> anyio.CapacityLimiter:
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = anyio.CapacityLimiter(PASSWORD_MAX_CONCURRENCY)
+        _limiters[loop] = limiter
+    return limiter
+
+
+def _count(**deltas) -> None:
+    with _lock:
+        for name, delta in deltas.items():
+            _counters[name] += delta
+
+
+async def _run(func, *args):
+    limiter = _limiter()
+    waiting = limiter.statistics().tasks_waiting
+    if limiter.available_tokens == 0 and waiting >= PASSWORD_MAX_QUEUE:
+        _count(rejected=1)
+        raise PoolBusy("Too many password operations in progress")
+    depth = waiting + 1 if limiter.available_tokens == 0 else 0  # including this call
+    with _lock:
+        _counters["max_waiting"] = max(_counters["max_waiting"], depth)
+    queued = time.perf_counter()
+    started = []
+
+    def timed():
+        started.append(time.perf_counter())
+        return func(*args)
+
+    result = await anyio.to_thread.run_sync(timed, limiter=limiter)
+    done = time.perf_counter()
+    _count(wait_seconds=started[0] - queued, work_seconds=done - started[0])
+    return result
+
+
+async def hash(password: str) -> str:  # noqa: A001 - mirrors passlib's naming
+    """`hash_password` in the pool; raises ValueError for an invalid password."""
+    if not isinstance(password, str) or not password:
+        raise ValueError("password must be a non-empty string")
+    result = await _run(hash_password, password)
+    _count(hashes=1)
+    return result
+
+
+def _verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    if not verify_password(password, password_hash):
+        return False, None
+    if password_needs_rehash(password_hash):
+        return True, hash_password(password)
+    return True, None
+
+
+async def verify(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash or None) computed in the pool."""
+    if not password_hash:
+        return False, None
+    ok, new_hash = await _run(_verify_and_update, password, password_hash)
+    _count(verifies=1, rehashes=int(new_hash is not None))
+    return ok, new_hash
+
+
+def stats() -> dict:
+    """Pool size, current queue depth and cumulative counters."""
+    try:
+        current = _limiter().statistics()
+        in_flight, waiting = current.borrowed_tokens, current.tasks_waiting
+    except RuntimeError:
+        in_flight = waiting = 0
+    with _lock:
+        counters = dict(_counters)
+    calls = counters["hashes"] + counters["verifies"]
+    return {
+        "limit": PASSWORD_MAX_CONCURRENCY,
+        "max_queue": PASSWORD_MAX_QUEUE,
+        "in_flight": in_flight,
+        "waiting": waiting,
+        "max_waiting": counters["max_waiting"],
+        "hashes": counters["hashes"],
+        "verifies": counters["verifies"],
+        "rehashes": counters["rehashes"],
+        "rejected": counters["rejected"],
+        "avg_wait_ms": round(counters["wait_seconds"] * 1000 / calls, 2) if calls else None,
+        "avg_work_ms": round(counters["work_seconds"] * 1000 / calls, 2) if calls else None,
+    }
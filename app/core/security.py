@@ -10,10 +10,16 @@ Use:
 Tokens are HS256 with `JWT_SECRET`. `JWT_EXPIRES_MINUTES` controls lifetime.
 
 A token's subject is the `user_id`. On each request, `get_current_user` decodes
-the token and refreshes the user row from MySQL via `app.db.fetch_one`.
+the token and loads the user row. Rows are kept for `USER_CACHE_TTL` seconds
+(default 30) in a bounded LRU of `USER_CACHE_SIZE` entries (default 2048), so
+polling clients do not cost a query per request. Admin routes that change a
+user call `forget_user()` after they commit, so role and status changes apply
+on the next request. Changes made elsewhere (other workers, scripts, manual
+SQL) are picked up within the TTL. `USER_CACHE_TTL=0` disables the cache.
 """
 from __future__ import annotations
 
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -21,17 +27,29 @@ import jwt
 from fastapi import Depends, Header, HTTPException, status
 from passlib.hash import bcrypt
 
-from app.core.config import JWT_ALGORITHM, JWT_EXPIRES_MINUTES, JWT_SECRET
+from app.core.config import BCRYPT_ROUNDS, JWT_ALGORITHM, JWT_EXPIRES_MINUTES, JWT_SECRET
 from app.db import fetch_one
+from app.db.cache import SnapshotCache
+
+USER_COLUMNS = "user_id, username, email, role_hint, status"
+
+user_cache = SnapshotCache(float(os.getenv("USER_CACHE_TTL", "30")),
+                           max_entries=int(os.getenv("USER_CACHE_SIZE", "2048")))
 
 
 # ---------- Passwords ----------
+# These block for the whole bcrypt computation (~100-300 ms at cost 12).
+# Route handlers go through `app.core.passwords`, which runs them in a
+# bounded thread pool.
+
+_bcrypt = bcrypt.using(rounds=BCRYPT_ROUNDS)
+
 
 def hash_password(password: str) -> str:
     """Bcrypt-hash a plaintext password."""
     if not isinstance(password, str) or not password:
         raise ValueError("password must be a non-empty string")
-    return bcrypt.hash(password)
+    return _bcrypt.hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
@@ -44,6 +62,14 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if `password_hash` was made with a cost other than BCRYPT_ROUNDS."""
+    try:
+        return _bcrypt.needs_update(password_hash)
+    except (ValueError, TypeError):
+        return False
+
+
 # ---------- Tokens ----------
 
 def create_access_token(user_id: int, role: Optional[str] = None) -> str:
@@ -67,6 +93,25 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+# ---------- User rows ----------
+
+def load_user(user_id: int) -> Optional[dict]:
+    """The user's auth columns, from `user_cache` when fresh."""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return dict(cached[0])
+    generation = user_cache.generation
+    row = fetch_one(f"SELECT {USER_COLUMNS} FROM appuser WHERE user_id = %s", (user_id,))
+    if row:
+        user_cache.put(user_id, dict(row), generation)
+    return row
+
+
+def forget_user(user_id: int) -> None:
+    """Drop a cached user row; call after committing a change to that user."""
+    user_cache.discard(user_id)
+
+
 # ---------- FastAPI dependencies ----------
 
 def _extract_bearer(authorization: Optional[str]) -> Optional[str]:
@@ -101,10 +146,7 @@ def get_current_user(authorization: Optional[str] = Header(default=None)) -> dic
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Invalid token subject")
 
-    row = fetch_one(
-        "SELECT user_id, username, email, role_hint, status FROM appuser WHERE user_id = %s",
-        (user_id,),
-    )
+    row = load_user(user_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="User no longer exists")
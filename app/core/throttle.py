@@ -0,0 +1,271 @@
+"""Sliding-window login throttling, per client IP and per account.
+
+Every `/login` attempt costs a bcrypt verify (see `app.core.passwords`).
+Without a limit, a credential-stuffing burst turns straight into CPU
+load. `login_throttle.attempt(ip, email)` runs before the user lookup and
+the bcrypt check. It counts the attempt against two windows:
+
+    LOGIN_IP_LIMIT     attempts per LOGIN_IP_WINDOW seconds per client IP (30 / 60 s)
+    LOGIN_EMAIL_LIMIT  attempts per LOGIN_EMAIL_WINDOW seconds per email (10 / 300 s)
+
+Once either budget is spent, it returns the seconds until the oldest
+attempt leaves the window. The route answers 429 with Retry-After and
+does no bcrypt work. Rejected attempts are not recorded, so a client that
+backs off gets its budget back. A successful login clears the email's
+window, so a user who mistyped a few times starts fresh.
+
+Backends (LOGIN_THROTTLE_BACKEND):
+
+    memory  per-process deques (default). With N workers the effective
+            budget is up to N times the limit.
+    sqlite  a small SQLite file at LOGIN_THROTTLE_PATH shared by every
+            worker on the host. Each check-and-record runs in one
+            `BEGIN IMMEDIATE` transaction, so workers cannot overspend.
+
+The limiter fails open: if the backend errors, the attempt is allowed
+and counted under `errors`. Emails are stored as keyed hashes, never in
+clear. The client IP is `request.client.host`. Behind a proxy, run
+uvicorn with `--proxy-headers` so it reflects X-Forwarded-For.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import anyio.to_thread
+
+from app.core.config import JWT_SECRET
+
+logger = logging.getLogger(__name__)
+
+# (key, limit, window seconds)
+Rule = Tuple[str, int, float]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class MemoryBackend:
+    """Per-process sliding logs; each key keeps at most `limit` timestamps."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._hits: Dict[str, Deque[float]] = {}
+        self._windows: Dict[str, float] = {}
+
+    def _prune(self, now: float) -> None:
+        expired = [key for key, hits in self._hits.items()
+                   if not hits or hits[-1] <= now - self._windows[key]]
+        for key in expired:
+            del self._hits[key], self._windows[key]
+        while len(self._hits) >= self.max_keys:  # still full: drop the oldest keys
+            key = next(iter(self._hits))
+            del self._hits[key], self._windows[key]
+
+    def attempt(self, rules: List[Rule], now: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            for key, limit, window in rules:
+                hits = self._hits.get(key)
+                if hits is None:
+                    continue
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                if len(hits) >= limit:
+                    return key, hits[0] + window - now
+            for key, limit, window in rules:
+                hits = self._hits.get(key)
+                if hits is None:
+                    if len(self._hits) >= self.max_keys:
+                        self._prune(now)
+                    hits = self._hits[key] = deque(maxlen=max(limit, 1))
+                self._windows[key] = window
+                hits.append(now)
+            return None
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+            self._windows.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._hits)
+
+
+class SQLiteBackend:
+    """Sliding logs in a SQLite file shared by the workers on one host."""
+
+    blocking = True
+    CLEANUP_EVERY = 500
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._ops = 0
+        self._max_window = 0.0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS throttle_hit (key TEXT NOT NULL, at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_throttle_hit_key_at ON throttle_hit (key, at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def attempt(self, rules: List[Rule], now: float) -> Optional[Tuple[str, float]]:
+        conn = self._connect()
+        self._max_window = max([self._max_window] + [window for _, _, window in rules])
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, limit, window in rules:
+                count, oldest = conn.execute(
+                    "SELECT COUNT(*), MIN(at) FROM throttle_hit WHERE key = ? AND at > ?",
+                    (key, now - window),
+                ).fetchone()
+                if count >= limit:
+                    conn.execute("COMMIT")
+                    return key, oldest + window - now
+            conn.executemany("INSERT INTO throttle_hit (key, at) VALUES (?, ?)",
+                             [(key, now) for key, _, _ in rules])
+            self._ops += 1
+            if self._ops % self.CLEANUP_EVERY == 0:
+                conn.execute("DELETE FROM throttle_hit WHERE at <= ?", (now - self._max_window,))
+            conn.execute("COMMIT")
+            return None
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self, key: str) -> None:
+        self._connect().execute("DELETE FROM throttle_hit WHERE key = ?", (key,))
+
+    def size(self) -> int:
+        return self._connect().execute("SELECT COUNT(DISTINCT key) FROM throttle_hit").fetchone()[0]
+
+
+class LoginThrottle:
+    """Per-IP and per-email budgets on top of a backend."""
+
+    def __init__(self, backend, ip_limit: int = 30, ip_window: float = 60,
+                 email_limit: int = 10, email_window: float = 300, secret: str = "") -> None:
+        self.backend = backend
+        self.ip_limit, self.ip_window = ip_limit, ip_window
+        self.email_limit, self.email_window = email_limit, email_window
+        self._secret = secret.encode()
+        self._lock = threading.Lock()
+        self._counters = {"allowed": 0, "rejected_ip": 0, "rejected_email": 0, "cleared": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _email_key(self, email: str) -> str:
+        normalised = (email or "").strip().lower().encode()
+        return "email:" + hashlib.blake2b(normalised, key=self._secret[:64], digest_size=16).hexdigest()
+
+    def _rules(self, ip: Optional[str], email: str) -> List[Rule]:
+        rules = []
+        if ip and self.ip_limit > 0:
+            rules.append((f"ip:{ip}", self.ip_limit, self.ip_window))
+        if self.email_limit > 0:
+            rules.append((self._email_key(email), self.email_limit, self.email_window))
+        return rules
+
+    def check(self, ip: Optional[str], email: str, now: Optional[float] = None) -> Optional[float]:
+        """Record an attempt; returns seconds to wait if a budget is spent, else None."""
+        rules = self._rules(ip, email)
+        if not rules:
+            return None
+        try:
+            blocked = self.backend.attempt(rules, time.time() if now is None else now)
+        except Exception:
+            logger.exception("Login throttle backend failed; allowing the attempt")
+            self._count("errors")
+            return None
+        if blocked is None:
+            self._count("allowed")
+            return None
+        key, retry_after = blocked
+        self._count("rejected_ip" if key.startswith("ip:") else "rejected_email")
+        return max(retry_after, 0.0)
+
+    async def attempt(self, ip: Optional[str], email: str) -> Optional[float]:
+        """`check()` from a handler; file-backed backends run off the loop."""
+        if self.backend.blocking:
+            return await anyio.to_thread.run_sync(self.check, ip, email)
+        return self.check(ip, email)
+
+    def reset(self, email: str) -> None:
+        """Clear the account's window."""
+        try:
+            self.backend.clear(self._email_key(email))
+            self._count("cleared")
+        except Exception:
+            logger.exception("Login throttle backend failed to clear a key")
+            self._count("errors")
+
+    async def succeeded(self, email: str) -> None:
+        """`reset()` from a handler after a successful login."""
+        if self.backend.blocking:
+            await anyio.to_thread.run_sync(self.reset, email)
+        else:
+            self.reset(email)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        try:
+            keys = self.backend.size()
+        except Exception:
+            keys = None
+        return {
+            "backend": type(self.backend).__name__,
+            "ip_limit": self.ip_limit,
+            "ip_window_seconds": self.ip_window,
+            "email_limit": self.email_limit,
+            "email_window_seconds": self.email_window,
+            "keys": keys,
+            **counters,
+        }
+
+
+def _backend():
+    kind = os.getenv("LOGIN_THROTTLE_BACKEND", "memory").strip().lower()
+    if kind == "sqlite":
+        path = os.getenv("LOGIN_THROTTLE_PATH",
+                         os.path.join(tempfile.gettempdir(), "mysafety-login-throttle.sqlite3"))
+        return SQLiteBackend(path)
+    if kind != "memory":
+        logger.warning("Unknown LOGIN_THROTTLE_BACKEND %r; using memory", kind)
+    return MemoryBackend()
+
+
+def _build() -> LoginThrottle:
+    return LoginThrottle(
+        _backend(),
+        ip_limit=_env_int("LOGIN_IP_LIMIT", 30),
+        ip_window=_env_int("LOGIN_IP_WINDOW", 60),
+        email_limit=_env_int("LOGIN_EMAIL_LIMIT", 10),
+        email_window=_env_int("LOGIN_EMAIL_WINDOW", 300),
+        secret=JWT_SECRET,
+    )
+
+
+login_throttle = _build()
@@ -1,74 +1,77 @@
 """Database helpers — PyMySQL connection + tiny query utilities.
 
 Public surface (do not rename without updating every import):
-    fetch_one, fetch_all, execute, insert_and_get_id, parse_json_field, get_conn
+    fetch_one, fetch_all, execute, insert_and_get_id, parse_json_field, get_conn,
+    pool_stats
 
 Connection config comes from env vars (DB_HOST, DB_PORT, DB_USER, DB_PASSWORD,
 DB_NAME). The application never instantiates connections directly — every query
 goes through one of the helpers above so connection lifecycle stays predictable.
+Connections are borrowed from the shared engine pool (`app.db.engine`), so the
+helpers, the SQLAlchemy handlers and the admin ORM draw from one bounded set.
 """
 from __future__ import annotations
 
-import os
 import json
 from contextlib import contextmanager
 
-import pymysql
 from pymysql.cursors import DictCursor
 
+from app.db.engine import POOL_STATS, engine
+from app.db.pool import checkout
 
-def _get_env(name: str, default: str | None = None) -> str | None:
-    value = os.getenv(name)
-    return value if value is not None else default
 
+def _get_pool():
+    return engine.pool
 
-DB_CONFIG = {
-    "host": _get_env("DB_HOST", "127.0.0.1"),
-    "port": int(_get_env("DB_PORT", "3306")),
-    "user": _get_env("DB_USER", "root"),
-    "password": _get_env("DB_PASSWORD", ""),
-    "database": _get_env("DB_NAME", "mysafetydb"),
-    "charset": "utf8mb4",
-    "cursorclass": DictCursor,
-    "autocommit": True,
-}
+
+def pool_stats() -> dict:
+    """Counters for the shared pool (checkout wait, in-use, overflow, ...)."""
+    return POOL_STATS.snapshot(_get_pool())
 
 
 @contextmanager
 def get_conn():
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
+    """Borrow a raw PyMySQL connection from the shared pool.
+
+    Pooled connections are not autocommit and default to tuple cursors (that
+    is what SQLAlchemy expects); use `conn.cursor(DictCursor)` and commit
+    explicitly. Uncommitted work is rolled back when the connection returns.
+    """
+    with checkout(_get_pool(), POOL_STATS) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
-def fetch_all(sql: str, params: tuple | None = None):
+@contextmanager
+def _cursor():
     with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            return cur.fetchall()
+        with conn.cursor(DictCursor) as cur:
+            yield cur
+        conn.commit()
+
+
+def fetch_all(sql: str, params: tuple | None = None):
+    with _cursor() as cur:
+        cur.execute(sql, params or ())
+        return cur.fetchall()
 
 
 def fetch_one(sql: str, params: tuple | None = None):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            return cur.fetchone()
+    with _cursor() as cur:
+        cur.execute(sql, params or ())
+        return cur.fetchone()
 
 
 def execute(sql: str, params: tuple | None = None) -> int:
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            return cur.rowcount
+    with _cursor() as cur:
+        cur.execute(sql, params or ())
+        return cur.rowcount
 
 
 def insert_and_get_id(sql: str, params: tuple | None = None) -> int:
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            return cur.lastrowid
+    with _cursor() as cur:
+        cur.execute(sql, params or ())
+        return cur.lastrowid
 
 
 def parse_json_field(value):
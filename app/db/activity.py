@@ -0,0 +1,319 @@
+"""Append-only activity feed (`activity_event`, migration 016).
+
+Every create, status change, assignment, sighting and escalation appends
+one event. The admin feeds (`/api/admin/activity-log` and the activity list
+in `/api/admin/analytics`) read them back newest-first with a keyset cursor
+over the (occurred_at, event_id) index, instead of querying crime,
+missing_person and wanted_criminal separately and merge-sorting.
+
+Write paths call `record()` after their transaction has committed:
+
+    activity.record(activity.CRIME, crime_id, activity.STATUS_CHANGED,
+                    status=new_status, actor_id=user["user_id"],
+                    details={"from": old_status})
+
+`record()` only appends to an in-process queue. `writer` flushes the queue
+in batches (`ACTIVITY_BATCH_SIZE`, default 200) from a background task
+started in the app lifespan: every `ACTIVITY_FLUSH_SECONDS` (default 0.5),
+or at once when a full batch is waiting. A failed flush puts the batch back
+and retries with backoff. The queue is capped at `ACTIVITY_QUEUE_MAX`
+(default 10000), after which the oldest events are dropped and counted.
+Events still queued when a worker process dies are lost. The feed is an
+audit trail for people, not a source of truth for any counter.
+
+`scripts/db/backfill_activity.py` seeds `created` events for rows that
+predate the table.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+
+from app.db.pagination import keyset_predicate, page_rows
+
+logger = logging.getLogger(__name__)
+
+# entities
+CRIME = "crime"
+MISSING = "missing_person"
+WANTED = "wanted_criminal"
+EMERGENCY = "emergency_alert"
+SIGHTING = "criminal_sighting"
+ASSIGNMENT = "case_assignment"
+COMPLAINT = "complaint"
+
+# actions
+CREATED = "created"
+UPDATED = "updated"
+STATUS_CHANGED = "status_changed"
+ASSIGNED = "assigned"
+SIGHTED = "sighted"
+ESCALATED = "escalated"
+
+TYPE_LABELS = {
+    CRIME: "Crime Report",
+    MISSING: "Missing Person",
+    WANTED: "Wanted Criminal",
+    EMERGENCY: "Emergency Alert",
+    SIGHTING: "Criminal Sighting",
+    ASSIGNMENT: "Case Assignment",
+    COMPLAINT: "Complaint",
+}
+ENTITY_PATTERN = "^(" + "|".join(TYPE_LABELS) + ")$"
+
+TITLE_CHARS = 255
+SUMMARY_CHARS = 500
+
+INSERT_SQL = """
+    INSERT INTO activity_event (occurred_at, entity, entity_id, action, status, actor_id, title, summary, details)
+    VALUES (:occurred_at, :entity, :entity_id, :action, :status, :actor_id, :title, :summary, :details)
+"""
+
+FEED_SQL = """
+    SELECT event_id, occurred_at, entity, entity_id, action, status, actor_id, title, summary, details
+    FROM activity_event
+"""
+
+
+def _clip(value: Any, width: int) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value[:width] or None
+
+
+def make_event(entity: str, entity_id: Optional[int], action: str, *, status: Optional[str] = None,
+               actor_id: Optional[int] = None, title: Optional[str] = None, summary: Optional[str] = None,
+               details: Optional[Mapping[str, Any]] = None,
+               occurred_at: Optional[datetime] = None) -> Dict[str, Any]:
+    return {
+        "occurred_at": occurred_at or datetime.utcnow(),
+        "entity": entity,
+        "entity_id": int(entity_id) if entity_id is not None else None,
+        "action": action,
+        "status": _clip(status, 50),
+        "actor_id": actor_id,
+        "title": _clip(title, TITLE_CHARS),
+        "summary": _clip(summary, SUMMARY_CHARS),
+        "details": json.dumps(dict(details), default=str) if details else None,
+    }
+
+
+def crime_title(crime_id: Optional[int]) -> str:
+    return f"Case CR-{int(crime_id):03d}" if crime_id is not None else "Crime Report"
+
+
+def crime_summary(crime_type: Any = None, description: Any = None, area_name: Any = None) -> str:
+    summary = str(description or crime_type or "Crime report")
+    return f"{summary} in {area_name}" if area_name else summary
+
+
+def missing_summary(last_seen_location: Any = None) -> str:
+    return f"Last seen at {last_seen_location or 'Location unknown'}"
+
+
+def wanted_summary(last_known_location: Any = None, danger_level: Any = None) -> str:
+    summary = f"Last known at {last_known_location}" if last_known_location else "Location unknown"
+    return f"{summary} - Danger: {danger_level}" if danger_level else summary
+
+
+def insert_events(conn, events: Sequence[Mapping[str, Any]]) -> None:
+    if events:
+        conn.execute(text(INSERT_SQL), list(events))
+
+
+class ActivityWriter:
+    """Thread-safe event queue drained into `activity_event` in batches."""
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_queue: int) -> None:
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._after_flush: List[Callable[[], None]] = []
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.batches = 0
+
+    def after_flush(self, callback: Callable[[], None]) -> None:
+        """Call `callback()` whenever a batch has been committed."""
+        self._after_flush.append(callback)
+
+    def record(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._queue.append(event)
+            self.recorded += 1
+            self._trim()
+            full = len(self._queue) >= self.batch_size
+        if full and self._loop is not None and self._wake is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+    def _trim(self) -> None:
+        while len(self._queue) > self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+
+    def take(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._queue.popleft() for _ in range(min(limit, len(self._queue)))]
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._queue.extendleft(reversed(batch))
+            self._trim()
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _flushed(self, count: int) -> None:
+        self.written += count
+        self.batches += 1
+        for callback in self._after_flush:
+            try:
+                callback()
+            except Exception:
+                logger.exception("activity after_flush callback failed")
+
+    def flush_sync(self, engine) -> int:
+        """Drain the whole queue on the calling thread (scripts, shutdown without a loop)."""
+        written = 0
+        while True:
+            batch = self.take(self.batch_size)
+            if not batch:
+                return written
+            try:
+                with engine.begin() as conn:
+                    insert_events(conn, batch)
+            except Exception:
+                self.failed_flushes += 1
+                self._requeue(batch)
+                raise
+            self._flushed(len(batch))
+            written += len(batch)
+
+    async def flush(self, async_engine) -> bool:
+        """Write every queued batch; False if a batch failed (and was requeued)."""
+        while True:
+            batch = self.take(self.batch_size)
+            if not batch:
+                return True
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.run_sync(insert_events, batch)
+            except Exception:
+                self.failed_flushes += 1
+                self._requeue(batch)
+                logger.exception("Failed to write %d activity events; will retry", len(batch))
+                return False
+            self._flushed(len(batch))
+
+    async def run(self, get_engine: Callable[[], Any]) -> None:
+        delay = self.flush_seconds
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            ok = await self.flush(get_engine())
+            delay = self.flush_seconds if ok else min(max(delay * 2, 1.0), 30.0)
+
+    def start(self, get_engine: Callable[[], Any]) -> None:
+        """Start the background flusher on the running loop.
+
+        `get_engine` is called at every flush, so it follows whatever engine
+        the application is currently using.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self.run(get_engine))
+
+    async def stop(self, get_engine: Callable[[], Any]) -> None:
+        """Stop the flusher and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+        self._wake = None
+        await self.flush(get_engine())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.pending(),
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+writer = ActivityWriter(
+    batch_size=int(os.getenv("ACTIVITY_BATCH_SIZE", "200")),
+    flush_seconds=float(os.getenv("ACTIVITY_FLUSH_SECONDS", "0.5")),
+    max_queue=int(os.getenv("ACTIVITY_QUEUE_MAX", "10000")),
+)
+
+
+def record(entity: str, entity_id: Optional[int], action: str, **fields: Any) -> None:
+    """Queue one event. Never raises; a bad event is logged and skipped."""
+    try:
+        writer.record(make_event(entity, entity_id, action, **fields))
+    except Exception:
+        logger.exception("Failed to queue activity event %s %s %s", entity, entity_id, action)
+
+
+# ---------------------------------------------------------------------------
+# reads
+# ---------------------------------------------------------------------------
+
+def feed(conn, limit: int, position: Optional[Tuple[datetime, int]] = None,
+         entities: Optional[Sequence[str]] = None,
+         entity_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first events and the cursor for the next page."""
+    conditions: List[str] = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    expanding = []
+    if entities:
+        conditions.append("entity IN :entities")
+        params["entities"] = list(entities)
+        expanding.append(bindparam("entities", expanding=True))
+    if entity_id is not None:
+        conditions.append("entity_id = :entity_id")
+        params["entity_id"] = entity_id
+    keyset_sql, keyset_params = keyset_predicate("occurred_at", "event_id", position)
+    if keyset_sql:
+        conditions.append(keyset_sql)
+        params.update(keyset_params)
+    sql = FEED_SQL
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY occurred_at DESC, event_id DESC LIMIT :limit"
+    statement = text(sql)
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    rows = conn.execute(statement, params).mappings().fetchall()
+    rows, next_cursor = page_rows(rows, limit, "occurred_at", "event_id")
+    return [dict(row) for row in rows], next_cursor
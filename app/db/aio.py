@@ -0,0 +1,176 @@
+"""Async access to the synchronous SQLAlchemy engine.
+
+Route handlers are `async def`, so calling `engine.connect()` / `execute()`
+on the event loop stalls every other request on the worker while MySQL
+works. This module offloads each blocking call to a worker thread, bounded
+by a capacity limiter, and exposes the same shape the handlers already use:
+
+    async with db.connect() as conn:
+        rows = (await conn.execute(text("..."), params)).mappings().fetchall()
+        await conn.commit()
+
+    async with db.begin() as conn:          # commits on success
+        await conn.execute(text("..."), params)
+
+PyMySQL buffers result rows during `execute`, so consuming the returned
+`Result` (`.mappings()`, `.fetchall()`, `.scalar()`) on the loop is cheap.
+
+A connection stays checked out across awaits, so pool checkout is not run
+under the limiter: a request waiting for a free connection must not hold
+a token that a connection owner needs for its next query, commit or
+release. Instead each `AsyncEngine` hands out at most pool_size +
+max_overflow connections at a time. A request holds its slot from
+checkout until the connection is back in the pool, and waits for one on
+the loop, holding nothing else.
+
+Env vars:
+    DB_MAX_CONCURRENCY  max DB calls running in threads at once (default 20)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import weakref
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+import anyio
+import anyio.to_thread
+from sqlalchemy.pool import QueuePool
+
+T = TypeVar("T")
+
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "20"))
+
+# One limiter per event loop: TestClient (and reloaders) spin up fresh loops
+# and asyncio primitives must not be shared between them.
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anyio.CapacityLimiter]" = weakref.WeakKeyDictionary()
+
+
+def get_limiter() -> anyio.CapacityLimiter:
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = anyio.CapacityLimiter(DB_MAX_CONCURRENCY)
+        _limiters[loop] = limiter
+    return limiter
+
+
+def limiter_stats() -> dict:
+    """In-flight / waiting DB calls for the current loop's limiter."""
+    try:
+        limiter = get_limiter()
+    except RuntimeError:
+        return {"limit": DB_MAX_CONCURRENCY, "in_flight": 0, "waiting": 0}
+    stats = limiter.statistics()
+    return {
+        "limit": int(limiter.total_tokens),
+        "in_flight": stats.borrowed_tokens,
+        "waiting": stats.tasks_waiting,
+    }
+
+
+def pool_capacity(sync_engine) -> Optional[int]:
+    """Most connections the engine's pool hands out at once; None if unbounded."""
+    pool = getattr(sync_engine, "pool", None)
+    if not isinstance(pool, QueuePool):
+        return None
+    overflow = getattr(pool, "_max_overflow", 0)
+    if overflow < 0:
+        return None
+    return pool.size() + overflow
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking DB callable in a worker thread under the DB limiter."""
+    if kwargs:
+        func = partial(func, **kwargs)
+    return await anyio.to_thread.run_sync(func, *args, limiter=get_limiter())
+
+
+class AsyncConnection:
+    """Awaitable facade over a SQLAlchemy `Connection`."""
+
+    def __init__(self, sync_connection) -> None:
+        self.sync_connection = sync_connection
+
+    async def execute(self, *args: Any, **kwargs: Any):
+        return await run_db(self.sync_connection.execute, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_db(self.sync_connection.commit)
+
+    async def rollback(self) -> None:
+        await run_db(self.sync_connection.rollback)
+
+    async def run_sync(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `func(sync_connection, *args)` in one thread hop."""
+        return await run_db(func, self.sync_connection, *args, **kwargs)
+
+
+class AsyncEngine:
+    """Wraps a sync `Engine`; `connect()` / `begin()` are async context managers.
+
+    The wrapped engine is looked up on every call so tests can monkeypatch
+    `engine.connect` on the shared instance.
+    """
+
+    def __init__(self, sync_engine) -> None:
+        self.sync_engine = sync_engine
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anyio.CapacityLimiter]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _slot_limiter(self) -> Optional[anyio.CapacityLimiter]:
+        capacity = pool_capacity(self.sync_engine)
+        if capacity is None:
+            return None
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = anyio.CapacityLimiter(capacity)
+            self._slots[loop] = slots
+        return slots
+
+    def slot_stats(self) -> dict:
+        """Connections handed out / requests waiting for one on the current loop."""
+        try:
+            slots = self._slot_limiter()
+        except RuntimeError:
+            slots = None
+        if slots is None:
+            return {"limit": None, "in_use": 0, "waiting": 0}
+        stats = slots.statistics()
+        return {"limit": int(slots.total_tokens), "in_use": stats.borrowed_tokens, "waiting": stats.tasks_waiting}
+
+    @asynccontextmanager
+    async def _enter(self, factory: Callable[[], Any]):
+        def _open():
+            cm = factory()
+            return cm, cm.__enter__()
+
+        # Checkout and release run in threads outside the DB limiter; the
+        # slot guarantees the pool has a connection for us.
+        slots = self._slot_limiter()
+        if slots is not None:
+            await slots.acquire()
+        try:
+            cm, conn = await anyio.to_thread.run_sync(_open)
+            try:
+                yield AsyncConnection(conn)
+            except BaseException:
+                if not await anyio.to_thread.run_sync(partial(cm.__exit__, *sys.exc_info())):
+                    raise
+            else:
+                await anyio.to_thread.run_sync(cm.__exit__, None, None, None)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def connect(self):
+        return self._enter(lambda: self.sync_engine.connect())
+
+    def begin(self):
+        return self._enter(lambda: self.sync_engine.begin())
@@ -0,0 +1,120 @@
+"""Summary counts behind `/api/admin/analytics`, computed in one pass per table.
+
+The dashboard cards need, per table, a headline total plus the number of
+rows that were new (or touched) in the last 30 days and in the 30 days
+before that. That used to be ~15 separate `COUNT(*)` queries, several
+wrapped in `LOWER(status)` / `COALESCE(updated_at, created_at)`. Now each
+table is read once with conditional aggregation:
+
+    SELECT COUNT(*) AS total,
+           SUM(CASE WHEN created_at >= :recent_from THEN 1 ELSE 0 END) AS recent,
+           ...
+    FROM crime
+
+Status values are compared as stored. The status columns use a
+case-insensitive collation, so `status IN ('Pending', ...)` matches what
+`LOWER(status) IN ('pending', ...)` did. Missing persons and wanted
+criminals use the generated `last_activity_at` column (migration 008).
+
+The finished response is kept in `cache` (see `app.db.cache`) for
+`ANALYTICS_CACHE_TTL` seconds (default 60; 0 disables it). Write routes that
+touch crimes, missing persons, wanted criminals or users declare
+`Depends(invalidate_after_write)` from `app.db.cache`, which drops the cache
+once the handler has returned and its transaction is committed.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from app.db.cache import SnapshotCache
+
+WINDOW_DAYS = 30
+OPEN_STATUSES = ("Pending", "Under Investigation")
+INACTIVE_WANTED_STATUSES = ("Captured", "Inactive")
+
+cache = SnapshotCache(float(os.getenv("ANALYTICS_CACHE_TTL", "60")), read_model=True)
+
+
+def _windows(now: Optional[datetime]) -> Dict[str, datetime]:
+    now = now or datetime.utcnow()
+    return {
+        "recent_from": now - timedelta(days=WINDOW_DAYS),
+        "previous_from": now - timedelta(days=2 * WINDOW_DAYS),
+    }
+
+
+def _in_recent(column: str) -> str:
+    return f"SUM(CASE WHEN {column} >= :recent_from THEN 1 ELSE 0 END)"
+
+
+def _in_previous(column: str) -> str:
+    return f"SUM(CASE WHEN {column} >= :previous_from AND {column} < :recent_from THEN 1 ELSE 0 END)"
+
+
+def _sql_list(values) -> str:
+    return ", ".join(f"'{v}'" for v in values)
+
+
+# A crime was last touched at updated_at, or at created_at if never updated.
+_CRIME_TOUCHED_RECENT = (
+    "(updated_at >= :recent_from OR (updated_at IS NULL AND created_at >= :recent_from))"
+)
+_CRIME_TOUCHED_PREVIOUS = (
+    "((updated_at >= :previous_from AND updated_at < :recent_from)"
+    " OR (updated_at IS NULL AND created_at >= :previous_from AND created_at < :recent_from))"
+)
+_CRIME_OPEN = f"status IN ({_sql_list(OPEN_STATUSES)})"
+_WANTED_ACTIVE = f"(status IS NULL OR status NOT IN ({_sql_list(INACTIVE_WANTED_STATUSES)}))"
+
+CRIME_SQL = f"""
+    SELECT COUNT(*) AS total,
+           {_in_recent("created_at")} AS recent,
+           {_in_previous("created_at")} AS previous,
+           SUM(CASE WHEN {_CRIME_OPEN} THEN 1 ELSE 0 END) AS open_total,
+           SUM(CASE WHEN {_CRIME_OPEN} AND {_CRIME_TOUCHED_RECENT} THEN 1 ELSE 0 END) AS open_recent,
+           SUM(CASE WHEN {_CRIME_OPEN} AND {_CRIME_TOUCHED_PREVIOUS} THEN 1 ELSE 0 END) AS open_previous
+    FROM crime
+"""
+
+MISSING_SQL = """
+    SELECT SUM(CASE WHEN status = 'Missing' THEN 1 ELSE 0 END) AS active,
+           SUM(CASE WHEN status = 'Missing' AND created_at >= :recent_from THEN 1 ELSE 0 END) AS recent,
+           SUM(CASE WHEN status = 'Missing' AND created_at >= :previous_from
+                     AND created_at < :recent_from THEN 1 ELSE 0 END) AS previous
+    FROM missing_person
+"""
+
+USERS_SQL = f"""
+    SELECT COUNT(*) AS total,
+           {_in_recent("created_at")} AS recent,
+           {_in_previous("created_at")} AS previous
+    FROM appuser
+"""
+
+WANTED_SQL = f"""
+    SELECT SUM(CASE WHEN {_WANTED_ACTIVE} THEN 1 ELSE 0 END) AS active,
+           SUM(CASE WHEN {_WANTED_ACTIVE} AND last_activity_at >= :recent_from THEN 1 ELSE 0 END) AS recent,
+           SUM(CASE WHEN {_WANTED_ACTIVE} AND last_activity_at >= :previous_from
+                     AND last_activity_at < :recent_from THEN 1 ELSE 0 END) AS previous
+    FROM wanted_criminal
+"""
+
+
+def _counts(conn, sql: str, params: Dict[str, datetime]) -> Dict[str, int]:
+    row = conn.execute(text(sql), params).mappings().fetchone() or {}
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+def summary_counts(conn, now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """Totals and 30/60-day window counts for crimes, missing persons, users, wanted."""
+    params = _windows(now)
+    return {
+        "crimes": _counts(conn, CRIME_SQL, params),
+        "missing": _counts(conn, MISSING_SQL, params),
+        "users": _counts(conn, USERS_SQL, params),
+        "wanted": _counts(conn, WANTED_SQL, params),
+    }
@@ -0,0 +1,111 @@
+"""In-process TTL cache for expensive read models (dashboard metrics etc.).
+
+Entries are keyed values with a TTL. Writers invalidate after their
+transaction commits, which drops every entry and bumps a generation
+number. Write routes declare `Depends(invalidate_after_write)`, which does
+that for every cache created with `read_model=True` once the handler has
+returned. A reader records the generation before it starts computing and
+hands it back to `put()`. If a write landed in between, the value may
+already be stale, so it is returned to that caller but not stored.
+
+Invalidation only reaches the current process. With several workers, the
+TTL bounds how long another worker can serve counts from before a write.
+
+`max_entries` turns a cache into a bounded LRU (the least recently read
+entry is evicted first), and `discard(key)` drops a single entry, for
+per-row caches such as the authenticated-user cache in
+`app.core.security`.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+_READ_MODELS: List["SnapshotCache"] = []
+
+
+class SnapshotCache:
+    """Thread-safe keyed TTL cache with generation-checked stores."""
+
+    def __init__(self, ttl_seconds: float, *, read_model: bool = False, max_entries: int = 0) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries  # 0 = unbounded
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if read_model:
+            _READ_MODELS.append(self)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable = None) -> Optional[Tuple[Any, float]]:
+        """(value, age in seconds) for a fresh entry, else None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl > 0 and now - entry[0] >= self.ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1], now - entry[0]
+
+    def put(self, key: Hashable, value: Any, generation: int) -> bool:
+        """Store `value` unless an invalidation happened since `generation`."""
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Drop one entry. Bumps the generation, so in-flight reads are not stored."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl,
+            }
+
+
+def invalidate_read_models() -> None:
+    for cache in _READ_MODELS:
+        cache.invalidate()
+
+
+def invalidate_after_write() -> Iterator[None]:
+    """Route dependency: drop cached read models after the handler succeeds."""
+    yield
+    invalidate_read_models()
@@ -0,0 +1,394 @@
+"""Realtime chat delivery: an in-process broker behind `/api/chat/stream`.
+
+The chat pages used to poll `/api/chat/conversation/{user_id}` every three
+seconds per open tab. Each poll re-read the whole conversation, so database
+load grew with the number of idle tabs. Now a page loads the history once
+and then holds one Server-Sent Events stream open:
+
+    topics = [chat.topic(user_id)]
+    async for chunk in chat.stream(chat.broker, topics, backlog, report_id, after_id=last_seen_id):
+        ...
+
+`/api/chat/send` and `/api/chat/messages` call `broker.publish(event)` after
+their transaction commits. Each event goes to two topics: the
+conversation's own topic, `chat:<user_id>`, and `chat:*`, which the staff
+dashboard watches. Every subscriber has a bounded queue
+(`CHAT_QUEUE_SIZE`, default 256). A subscriber that falls that far behind
+is dropped, and its client reconnects.
+
+Reconnects resume by message id. The SSE `id:` of every event is its
+`message_id`, and the client sends the last one back, either as
+`Last-Event-ID` or as `?after_id=`. The stream subscribes first, then
+reads `message_id > after_id` for that conversation from the database, then
+switches to live events, skipping any it already sent. Nothing committed
+while the client was away is lost. An idle open stream does no database
+work: it waits on its queue and sends a comment line every
+`CHAT_HEARTBEAT_SECONDS` (default 15).
+
+Fan-out between workers is pluggable (CHAT_FANOUT):
+
+    local     publish only reaches streams held by the same process
+              (default; right for a single uvicorn worker).
+    database  one background task per worker tails chat_messages by
+              message_id every CHAT_FANOUT_INTERVAL seconds (default 1),
+              while the worker has at least one subscriber. Messages written
+              by any worker, or any host, reach every stream. DB load is one
+              indexed range read per worker per interval, whatever the
+              number of connected clients.
+
+A fan-out backend needs `publish(event)`, `start(broker, get_engine)`,
+`async stop()` and `stats()`. The broker drops a message id it has
+delivered recently, so a backend may hand back events that were also
+published locally.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "256"))
+HEARTBEAT_SECONDS = float(os.getenv("CHAT_HEARTBEAT_SECONDS", "15"))
+FANOUT_INTERVAL = float(os.getenv("CHAT_FANOUT_INTERVAL", "1"))
+BACKLOG_LIMIT = 500
+RECENT_IDS = 4096
+RETRY_MS = 3000
+
+ALL = "chat:*"
+
+EVENT_COLUMNS = "cm.message_id, cm.user_id, u.username, cm.message, cm.is_admin, cm.created_at, cm.report_id"
+EVENT_FROM = "chat_messages cm LEFT JOIN appuser u ON cm.user_id = u.user_id"
+
+HISTORY_LIMIT = 50
+HISTORY_MAX = 500
+
+
+def topic(user_id: int) -> str:
+    return f"chat:{int(user_id)}"
+
+
+def event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """The stream payload for a message; the same fields the conversation endpoint returns."""
+    return {
+        "message_id": row["message_id"],
+        "user_id": row["user_id"],
+        "username": row.get("username"),
+        "message": row["message"],
+        "is_admin": bool(row["is_admin"]),
+        "created_at": row["created_at"],
+        "report_id": row.get("report_id"),
+    }
+
+
+def _report_matches(report_id: Optional[str], wanted: Optional[str]) -> bool:
+    return wanted is None or str(report_id or "") == wanted
+
+
+def backlog(conn, after_id: int, user_id: Optional[int] = None, report_id: Optional[str] = None,
+            limit: int = BACKLOG_LIMIT) -> List[Dict[str, Any]]:
+    """Messages with message_id > after_id, oldest first (the resume read)."""
+    sql = f"SELECT {EVENT_COLUMNS} FROM {EVENT_FROM} WHERE cm.message_id > :after_id"
+    params: Dict[str, Any] = {"after_id": after_id, "limit": limit}
+    if user_id is not None:
+        sql += " AND cm.user_id = :user_id"
+        params["user_id"] = user_id
+    if report_id is not None:
+        sql += " AND cm.report_id = :report_id"
+        params["report_id"] = report_id
+    sql += " ORDER BY cm.message_id LIMIT :limit"
+    return [event(dict(row)) for row in conn.execute(text(sql), params).mappings().fetchall()]
+
+
+def history(conn, user_id: int, report_id: Optional[str] = None, after_id: Optional[int] = None,
+            before_id: Optional[int] = None, limit: int = HISTORY_LIMIT) -> Tuple[List[Dict[str, Any]], bool]:
+    """One page of a conversation, oldest first, and whether more lie beyond it.
+
+    With `after_id`, the messages after it: the delta a client that already
+    has the tail asks for. `has_more` then means newer messages remain. With
+    `before_id` alone, the page just before it, for scrolling back. With
+    neither, the newest page. In both of those cases `has_more` means older
+    messages remain. Rows also carry `read_by_admin`, `read_by_user` and the
+    sender's `email`. Each read is a range on the
+    (user_id, report_id, message_id) index from migration 020.
+    """
+    sql = (f"SELECT {EVENT_COLUMNS}, u.email, cm.read_by_admin, cm.read_by_user"
+           f" FROM {EVENT_FROM} WHERE cm.user_id = :user_id")
+    params: Dict[str, Any] = {"user_id": user_id, "limit": limit + 1}
+    if report_id is not None:
+        sql += " AND cm.report_id = :report_id"
+        params["report_id"] = report_id
+    if after_id is not None:
+        sql += " AND cm.message_id > :after_id"
+        params["after_id"] = after_id
+    if before_id is not None:
+        sql += " AND cm.message_id < :before_id"
+        params["before_id"] = before_id
+    newest_first = after_id is None
+    sql += f" ORDER BY cm.message_id {'DESC' if newest_first else 'ASC'} LIMIT :limit"
+    rows = [dict(row) for row in conn.execute(text(sql), params).mappings().fetchall()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if newest_first:
+        rows.reverse()
+    return rows, has_more
+
+
+class Subscription:
+    """One open stream: a bounded queue of events for some topics."""
+
+    def __init__(self, broker: "Broker", topics: Iterable[str], report_id: Optional[str], maxsize: int) -> None:
+        self.broker = broker
+        self.topics = tuple(topics)
+        self.report_id = report_id
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, item: Dict[str, Any]) -> None:
+        if self.overflowed or not _report_matches(item.get("report_id"), self.report_id):
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Too far behind: end the stream, the client resumes from the DB.
+            self.overflowed = True
+            self.broker.overflows += 1
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class LocalFanout:
+    """No cross-worker delivery; publish reaches this process only."""
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        pass
+
+    def start(self, broker: "Broker", get_engine: Callable[[], Any]) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "local"}
+
+
+class DatabaseFanout:
+    """Tails chat_messages by id so every worker sees every worker's messages.
+
+    Each poll re-reads the last `lookback` ids as well: AUTO_INCREMENT ids
+    are assigned at insert, so a slower transaction can commit an id below
+    one that was already seen. The broker drops the repeats. Nothing at or
+    below the tip found when tailing (re)started is delivered.
+    """
+
+    def __init__(self, interval: float = FANOUT_INTERVAL, batch: int = BACKLOG_LIMIT, lookback: int = 50) -> None:
+        self.interval = interval
+        self.batch = batch
+        self.lookback = lookback
+        self.cursor: Optional[int] = None
+        self.floor = 0
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.delivered = 0
+        self.failures = 0
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        pass  # the committed row is the message
+
+    def _read(self, conn) -> List[Dict[str, Any]]:
+        if self.cursor is None:
+            self.cursor = conn.execute(text("SELECT COALESCE(MAX(message_id), 0) FROM chat_messages")).scalar() or 0
+            self.floor = self.cursor
+            return []
+        rows = backlog(conn, max(self.cursor - self.lookback, self.floor), limit=self.batch)
+        if rows:
+            self.cursor = max(self.cursor, rows[-1]["message_id"])
+        return rows
+
+    async def poll(self, broker: "Broker", async_engine) -> int:
+        """One tail read; returns how many events reached subscribers."""
+        async with async_engine.connect() as conn:
+            rows = await conn.run_sync(self._read)
+        self.polls += 1
+        delivered = sum(1 for row in rows if broker.deliver(row))
+        self.delivered += delivered
+        return delivered
+
+    async def run(self, broker: "Broker", get_engine: Callable[[], Any]) -> None:
+        delay = self.interval
+        while True:
+            await asyncio.sleep(delay)
+            if not broker.subscribers():
+                self.cursor = None  # nobody listening; start from the tip next time
+                continue
+            try:
+                await self.poll(broker, get_engine())
+                delay = self.interval
+            except Exception:
+                self.failures += 1
+                logger.exception("Chat fan-out poll failed; retrying")
+                delay = min(max(delay * 2, 1.0), 30.0)
+
+    def start(self, broker: "Broker", get_engine: Callable[[], Any]) -> None:
+        self._task = asyncio.get_running_loop().create_task(self.run(broker, get_engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "database",
+            "interval_seconds": self.interval,
+            "cursor": self.cursor,
+            "polls": self.polls,
+            "delivered": self.delivered,
+            "failures": self.failures,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+class Broker:
+    """Topic -> subscriptions, on the event loop that serves the streams."""
+
+    def __init__(self, fanout=None, queue_size: int = QUEUE_SIZE) -> None:
+        self.fanout = fanout or LocalFanout()
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+        self.published = 0
+        self.delivered = 0
+        self.duplicates = 0
+        self.overflows = 0
+
+    def subscribe(self, topics: Iterable[str], report_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(self, topics, report_id, self.queue_size)
+        for name in sub.topics:
+            self._topics.setdefault(name, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        for name in sub.topics:
+            subs = self._topics.get(name)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[name]
+
+    def subscribers(self) -> int:
+        return len({sub for subs in self._topics.values() for sub in subs})
+
+    def deliver(self, item: Dict[str, Any]) -> bool:
+        """Hand an event to local subscribers once; False if already delivered."""
+        message_id = item["message_id"]
+        if message_id in self._recent:
+            self.duplicates += 1
+            return False
+        self._recent[message_id] = None
+        while len(self._recent) > RECENT_IDS:
+            self._recent.popitem(last=False)
+        targets = self._topics.get(topic(item["user_id"]), set()) | self._topics.get(ALL, set())
+        for sub in targets:
+            sub.offer(item)
+        self.delivered += len(targets)
+        return True
+
+    def publish(self, item: Dict[str, Any]) -> None:
+        """Called by the write path after commit."""
+        self.published += 1
+        self.deliver(item)
+        try:
+            self.fanout.publish(item)
+        except Exception:
+            logger.exception("Chat fan-out publish failed")
+
+    def start(self, get_engine: Callable[[], Any]) -> None:
+        self.fanout.start(self, get_engine)
+
+    async def stop(self) -> None:
+        await self.fanout.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers(),
+            "topics": len(self._topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "duplicates": self.duplicates,
+            "overflows": self.overflows,
+            "fanout": self.fanout.stats(),
+        }
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def format_event(item: Dict[str, Any]) -> str:
+    return f"id: {item['message_id']}\nevent: message\ndata: {json.dumps(item, default=_json_default)}\n\n"
+
+
+async def stream(broker: Broker, topics: Iterable[str],
+                 load_backlog: Callable[[int], Awaitable[List[Dict[str, Any]]]],
+                 report_id: Optional[str] = None, after_id: Optional[int] = None,
+                 heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """SSE chunks: the backlog after `after_id`, then live events for `topics`.
+
+    `load_backlog(after_id)` returns up to BACKLOG_LIMIT rows. It is called
+    again until a short page comes back. The subscription is taken before
+    the first backlog read, so nothing committed during it is missed. Ends
+    when the subscription overflows, and always unsubscribes.
+    """
+    sub = broker.subscribe(topics, report_id=report_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        sent: Set[int] = set()
+        if after_id is not None:
+            cursor = after_id
+            while True:
+                rows = await load_backlog(cursor)
+                for row in rows:
+                    sent.add(row["message_id"])
+                    yield format_event(row)
+                if len(rows) < BACKLOG_LIMIT:
+                    break
+                cursor = rows[-1]["message_id"]
+        while not sub.overflowed:
+            try:
+                item = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item["message_id"] in sent:
+                continue
+            yield format_event(item)
+    finally:
+        sub.close()
+
+
+def _fanout():
+    kind = os.getenv("CHAT_FANOUT", "local").strip().lower()
+    if kind == "database":
+        return DatabaseFanout()
+    if kind != "local":
+        logger.warning("Unknown CHAT_FANOUT %r; using local", kind)
+    return LocalFanout()
+
+
+broker = Broker(_fanout())
@@ -1,8 +1,10 @@
-"""SQLAlchemy engine used by FastAPI handlers.
+"""The one SQLAlchemy engine (and connection pool) for the whole process.
 
-`engine` is imported throughout `app.main` (and any future routers) for direct
-SQL execution via `text()`. Connection URL is built from environment variables;
-defaults match the local MariaDB 12.3 install on port 3306.
+`engine` is imported throughout `app.main` for direct SQL via `text()`, the
+`/admin-api` sub-app binds its ORM `SessionLocal` to it, and the `app.db`
+helpers borrow raw PyMySQL connections from `engine.pool`. Connection URL is
+built from environment variables; defaults match the local MariaDB 12.3
+install on port 3306.
 
 Env vars:
     DB_USER (default root)
@@ -10,12 +12,18 @@ Env vars:
     DB_HOST (default localhost)
     DB_PORT (default 3306)
     DB_NAME (default mysafetydb)
+    DB_ECHO (default 0) — log every statement; development only
+    DB_POOL_* / DB_MAX_CONNECTIONS / WEB_CONCURRENCY — pool sizing per
+        worker process, see `app.db.pool`
 """
 from __future__ import annotations
 
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.pool import POOL_CONFIG, PoolStats, _env_bool, instrument_pool
 
 
 def _build_sqlalchemy_url() -> str:
@@ -28,4 +36,21 @@ def _build_sqlalchemy_url() -> str:
 
 
 SQLALCHEMY_DATABASE_URL = _build_sqlalchemy_url()
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"charset": "utf8mb4"})
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"charset": "utf8mb4"},
+    echo=_env_bool("DB_ECHO", False),
+    pool_size=POOL_CONFIG["pool_size"],
+    max_overflow=POOL_CONFIG["max_overflow"],
+    pool_timeout=POOL_CONFIG["timeout"],
+    # Lifetime recycling and pre-ping are done (and counted) by
+    # instrument_pool below.
+    pool_recycle=-1,
+    pool_pre_ping=False,
+)
+
+POOL_STATS = PoolStats()
+instrument_pool(engine.pool, POOL_STATS)
+
+# ORM sessions (used by the /admin-api sub-app) share the same pool.
+SessionLocal = sessionmaker(autoflush=False, bind=engine)
@@ -0,0 +1,125 @@
+"""Shared counters snapshot for the dashboard, overview and statistics endpoints.
+
+`/api/dashboard`, `/api/admin/overview`, `/api/statistics/crimes`,
+`/api/statistics/missing-persons` and `/api/admin/user-stats` all report
+slices of the same numbers: crimes by status and type, missing persons by
+status, users by role and status, and active wanted criminals, plus 24h
+and 30-day arrival counts. `compute_snapshot()` gets all of them in five
+GROUP BY queries. `snapshot()` serves the result from a read-model cache
+(`METRICS_SNAPSHOT_TTL` seconds, default 30; 0 disables) that the write
+routes invalidate through `app.db.cache.invalidate_after_write`.
+
+Concurrent misses share one computation. Each endpoint reports
+`snapshot_age_seconds` so a client can tell how old the counts are.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.db.cache import SnapshotCache
+
+cache = SnapshotCache(float(os.getenv("METRICS_SNAPSHOT_TTL", "30")), read_model=True)
+_refresh_lock = asyncio.Lock()
+
+_ARRIVALS = (
+    "COUNT(*) AS count,"
+    " SUM(CASE WHEN created_at >= :since_24h THEN 1 ELSE 0 END) AS last_24h,"
+    " SUM(CASE WHEN created_at >= :since_30d THEN 1 ELSE 0 END) AS last_30d"
+)
+
+CRIME_STATUS_SQL = f"SELECT status, {_ARRIVALS} FROM crime GROUP BY status"
+CRIME_TYPE_SQL = (
+    "SELECT crime_type, COUNT(*) AS count FROM crime WHERE crime_type IS NOT NULL GROUP BY crime_type"
+)
+MISSING_STATUS_SQL = f"SELECT status, {_ARRIVALS} FROM missing_person GROUP BY status"
+USER_SQL = f"SELECT role_hint, status, {_ARRIVALS} FROM appuser GROUP BY role_hint, status"
+WANTED_STATUS_SQL = "SELECT status, COUNT(*) AS count FROM wanted_criminal GROUP BY status"
+
+
+def _rows(conn, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = conn.execute(text(sql), params).mappings().fetchall()
+    out = []
+    for row in rows:
+        row = dict(row)
+        for key in ("count", "last_24h", "last_30d"):
+            if key in row:
+                row[key] = int(row[key] or 0)
+        out.append(row)
+    return out
+
+
+def _total(rows: List[Dict[str, Any]], key: str = "count") -> int:
+    return sum(row[key] for row in rows)
+
+
+def _with(rows: List[Dict[str, Any]], column: str, value: str) -> int:
+    # Status columns use a case-insensitive collation; match that here.
+    return sum(row["count"] for row in rows if (row.get(column) or "").lower() == value.lower())
+
+
+def _distribution(rows: List[Dict[str, Any]], column: str) -> List[Dict[str, Any]]:
+    counts: Dict[Any, int] = {}
+    for row in rows:
+        counts[row.get(column)] = counts.get(row.get(column), 0) + row["count"]
+    return [{column: value, "count": count} for value, count in counts.items()]
+
+
+def compute_snapshot(conn, now: Optional[datetime] = None) -> Dict[str, Any]:
+    now = now or datetime.utcnow()
+    params = {"since_24h": now - timedelta(hours=24), "since_30d": now - timedelta(days=30)}
+    crimes = _rows(conn, CRIME_STATUS_SQL, params)
+    crime_types = _rows(conn, CRIME_TYPE_SQL, {})
+    missing = _rows(conn, MISSING_STATUS_SQL, params)
+    users = _rows(conn, USER_SQL, params)
+    wanted = _rows(conn, WANTED_STATUS_SQL, {})
+    return {
+        "computed_at": now.isoformat(),
+        "crimes": {
+            "total": _total(crimes),
+            "pending": _with(crimes, "status", "Pending"),
+            "solved": _with(crimes, "status", "Solved"),
+            "emergency": _with(crimes, "status", "Emergency"),
+            "last_24h": _total(crimes, "last_24h"),
+            "last_30d": _total(crimes, "last_30d"),
+            "by_status": _distribution(crimes, "status"),
+            "by_type": _distribution(crime_types, "crime_type"),
+        },
+        "missing": {
+            "total": _total(missing),
+            "active": _with(missing, "status", "Missing"),
+            "last_24h": _total(missing, "last_24h"),
+            "last_30d": _total(missing, "last_30d"),
+            "by_status": _distribution(missing, "status"),
+        },
+        "users": {
+            "total": _total(users),
+            "active": _with(users, "status", "Active"),
+            "last_30d": _total(users, "last_30d"),
+            "by_role": _distribution(users, "role_hint"),
+            "by_status": _distribution(users, "status"),
+        },
+        "wanted": {
+            "active": _with(wanted, "status", "Active"),
+        },
+    }
+
+
+async def snapshot(async_engine) -> Tuple[Dict[str, Any], float]:
+    """(snapshot, age in seconds), recomputing it at most once at a time."""
+    cached = cache.get()
+    if cached is not None:
+        return cached
+    async with _refresh_lock:
+        cached = cache.get()
+        if cached is not None:
+            return cached
+        generation = cache.generation
+        async with async_engine.connect() as conn:
+            value = await conn.run_sync(compute_snapshot)
+        cache.put(None, value, generation)
+        return value, 0.0
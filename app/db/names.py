@@ -0,0 +1,237 @@
+"""Fuzzy name search for missing persons and wanted criminals.
+
+Bangla names reach the database spelled many ways in Latin script
+(Mohammad / Muhammad / Md., Rashida / Rasheda, Chowdhury / Choudhury) and
+sometimes in Bangla script. Every name and alias is broken into word
+tokens, and each token is stored in `person_name_index` (migration 011)
+under three keys:
+
+    tok   the normalised token            "rasheda"
+    ph    its phonetic skeleton           "rsd"
+    tri   its trigrams, ^/$ anchored      "^ra", "ras", ..., "da$"
+
+Bangla script is transliterated first, so "রাশিদা" and "Rashida" share a
+skeleton. Lookups are range scans on the (kind, gram) primary key:
+prefix LIKE on `tok` / `ph`, and IN on `tri` for typos. That yields a
+short candidate list, which `score()` ranks in Python against the
+candidates' actual names.
+
+Rows are written in the same transaction as the person insert/update
+(`index_person`) and removed with it (`unindex_person`).
+`scripts/db/rebuild_name_index.py` builds the index for existing rows.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+MISSING = "missing"
+WANTED = "wanted"
+ENTITIES = (MISSING, WANTED)
+
+MAX_QUERY_TOKENS = 6
+CANDIDATES = 200
+MIN_SCORE = 0.5
+
+# Common Latin-script abbreviations in Bangladeshi names.
+ALIASES = {
+    "md": "mohammad", "mohd": "mohammad", "muhd": "mohammad", "mhd": "mohammad",
+    "mst": "mosammat", "most": "mosammat", "mosst": "mosammat",
+    "sk": "sheikh", "shk": "sheikh",
+    "abd": "abdul",
+}
+
+# Bangla script -> rough Latin. Only the phonetic skeleton has to agree
+# with the Latin spellings, so inherent vowels and nasal marks are dropped.
+_BANGLA = {
+    "ক": "k", "খ": "kh", "গ": "g", "ঘ": "gh", "ঙ": "ng", "চ": "ch", "ছ": "chh", "জ": "j", "ঝ": "jh",
+    "ঞ": "n", "ট": "t", "ঠ": "th", "ড": "d", "ঢ": "dh", "ণ": "n", "ত": "t", "থ": "th", "দ": "d",
+    "ধ": "dh", "ন": "n", "প": "p", "ফ": "ph", "ব": "b", "ভ": "bh", "ম": "m", "য": "j", "র": "r",
+    "ল": "l", "শ": "sh", "ষ": "sh", "স": "s", "হ": "h", "ৎ": "t",
+    "ং": "ng", "ঃ": "h", "ঁ": "",
+    "অ": "o", "আ": "a", "ই": "i", "ঈ": "i", "উ": "u", "ঊ": "u", "ঋ": "ri", "এ": "e", "ঐ": "oi",
+    "ও": "o", "ঔ": "ou",
+    "া": "a", "ি": "i", "ী": "i", "ু": "u", "ূ": "u", "ৃ": "ri", "ে": "e", "ৈ": "oi", "ো": "o",
+    "ৌ": "ou", "্": "", "়": "",
+}
+# ড় ঢ় য় are composition exclusions: after NFC they are letter + nukta.
+_BANGLA_PAIRS = {"\u09a1\u09bc": "r", "\u09a2\u09bc": "rh", "\u09af\u09bc": "y"}
+
+# Digraphs and letters Latin transliterations use interchangeably.
+_FOLDS = [
+    ("chh", "c"), ("ph", "f"), ("kh", "k"), ("gh", "g"), ("bh", "b"), ("dh", "d"), ("th", "t"),
+    ("sh", "s"), ("ch", "c"), ("jh", "j"), ("ck", "k"), ("q", "k"), ("z", "j"), ("v", "b"),
+    ("x", "ks"), ("c", "k"),
+]
+_VOWELS = set("aeiouyw")
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+
+class NameToken(NamedTuple):
+    tok: str
+    ph: str
+    grams: Tuple[str, ...]
+
+
+# ---------------------------------------------------------------------------
+# normalisation
+# ---------------------------------------------------------------------------
+
+def _transliterate(value: str) -> str:
+    value = unicodedata.normalize("NFC", value)
+    for pair, latin in _BANGLA_PAIRS.items():
+        value = value.replace(pair, latin)
+    return "".join(_BANGLA.get(ch, ch) for ch in value)
+
+
+def normalize(name: Optional[str]) -> List[str]:
+    """Lowercase ASCII word tokens of `name`, abbreviations expanded."""
+    if not name:
+        return []
+    value = unicodedata.normalize("NFKD", _transliterate(name))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch)).lower()
+    return [ALIASES.get(tok, tok) for tok in _NON_LETTERS.split(value) if tok]
+
+
+def phonetic(tok: str) -> str:
+    """Consonant skeleton: folds digraphs, drops vowels, collapses repeats.
+
+    A leading vowel becomes "a" (Islam / Eslam); a leading y becomes j
+    (Yasmin / Jasmin).
+    """
+    for src, dst in _FOLDS:
+        tok = tok.replace(src, dst)
+    if not tok:
+        return ""
+    head, rest = tok[0], tok[1:]
+    if head == "y":
+        head = "j"
+    elif head in _VOWELS:
+        head = "a"
+    out = [head]
+    for ch in rest:
+        if ch in _VOWELS or ch == out[-1]:
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+def trigrams(tok: str) -> Tuple[str, ...]:
+    padded = f"^{tok}$"
+    return tuple(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def tokens(name: Optional[str]) -> List[NameToken]:
+    return [NameToken(tok, phonetic(tok), trigrams(tok)) for tok in normalize(name)]
+
+
+# ---------------------------------------------------------------------------
+# index maintenance
+# ---------------------------------------------------------------------------
+
+def _index_rows(entity: str, entity_id: int, names: Iterable[Optional[str]]) -> List[Dict[str, object]]:
+    keys = {}
+    for name in names:
+        for token in tokens(name):
+            keys[("tok", token.tok)] = None
+            keys[("ph", token.ph)] = None
+            for gram in token.grams:
+                keys[("tri", gram)] = None
+    return [{"entity": entity, "entity_id": entity_id, "kind": kind, "gram": gram[:64]}
+            for kind, gram in keys]
+
+
+def unindex_person(conn, entity: str, entity_id: int) -> None:
+    try:
+        conn.execute(
+            text("DELETE FROM person_name_index WHERE entity = :entity AND entity_id = :entity_id"),
+            {"entity": entity, "entity_id": entity_id},
+        )
+    except Exception:
+        logger.exception("Failed to unindex %s %s; rebuild_name_index will correct it", entity, entity_id)
+
+
+def index_person(conn, entity: str, entity_id: Optional[int], *names: Optional[str]) -> None:
+    """Replace the index rows for one person; never fails the caller's write."""
+    if entity_id is None:
+        return
+    try:
+        conn.execute(
+            text("DELETE FROM person_name_index WHERE entity = :entity AND entity_id = :entity_id"),
+            {"entity": entity, "entity_id": entity_id},
+        )
+        rows = _index_rows(entity, int(entity_id), names)
+        if rows:
+            conn.execute(
+                text(
+                    "INSERT INTO person_name_index (entity, entity_id, kind, gram)"
+                    " VALUES (:entity, :entity_id, :kind, :gram)"
+                ),
+                rows,
+            )
+    except Exception:
+        logger.exception("Failed to index %s %s; rebuild_name_index will correct it", entity, entity_id)
+
+
+# ---------------------------------------------------------------------------
+# lookup
+# ---------------------------------------------------------------------------
+
+def candidates(conn, query: Sequence[NameToken], entities: Sequence[str] = ENTITIES,
+               limit: int = CANDIDATES) -> List[Tuple[str, int]]:
+    """(entity, id) pairs sharing a prefix, skeleton prefix or trigram with `query`."""
+    if not query:
+        return []
+    clauses, params = [], {"entities": list(entities), "limit": limit}
+    for i, token in enumerate(query):
+        # One-letter prefixes would match half the index; trigrams cover them.
+        if len(token.tok) >= 2:
+            clauses.append(f"(kind = 'tok' AND gram LIKE :tok_{i})")
+            params[f"tok_{i}"] = f"{token.tok}%"
+        if len(token.ph) >= 2:
+            clauses.append(f"(kind = 'ph' AND gram LIKE :ph_{i})")
+            params[f"ph_{i}"] = f"{token.ph}%"
+    grams = sorted({gram for token in query for gram in token.grams})
+    clauses.append("(kind = 'tri' AND gram IN :grams)")
+    params["grams"] = grams
+    rows = conn.execute(
+        text(
+            "SELECT entity, entity_id,"
+            " SUM(CASE WHEN kind = 'tri' THEN 0 ELSE 1 END) AS strong,"
+            " SUM(CASE WHEN kind = 'tri' THEN 1 ELSE 0 END) AS shared_grams"
+            " FROM person_name_index"
+            " WHERE entity IN :entities AND (" + " OR ".join(clauses) + ")"
+            " GROUP BY entity, entity_id"
+            " ORDER BY strong DESC, shared_grams DESC, entity_id DESC"
+            " LIMIT :limit"
+        ).bindparams(bindparam("entities", expanding=True), bindparam("grams", expanding=True)),
+        params,
+    ).fetchall()
+    return [(row[0], int(row[1])) for row in rows]
+
+
+def _token_similarity(q: NameToken, c: NameToken) -> float:
+    if q.tok == c.tok:
+        return 1.0
+    if q.ph == c.ph:
+        return 0.9
+    if len(q.tok) >= 2 and c.tok.startswith(q.tok):
+        return 0.85
+    if len(q.ph) >= 2 and c.ph.startswith(q.ph):
+        return 0.75
+    shared = len(set(q.grams) & set(c.grams))
+    return 0.8 * (2 * shared / (len(q.grams) + len(c.grams)))
+
+
+def score(query: Sequence[NameToken], name: Optional[str]) -> float:
+    """Mean over query tokens of the best match among `name`'s tokens (0..1)."""
+    target = tokens(name)
+    if not query or not target:
+        return 0.0
+    return sum(max(_token_similarity(q, c) for c in target) for q in query) / len(query)
@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination helpers for newest-first list endpoints.
+
+A cursor is an opaque, URL-safe token encoding the sort key of the last row
+on a page: `(created_at, id)`. The next page is everything strictly "older"
+than that pair, which an index on `(created_at, id)` answers with a range
+scan no matter how deep the client has paged — unlike OFFSET, which reads
+and discards every skipped row.
+
+    where, params = keyset_predicate("c.created_at", "c.crime_id", decode_cursor(token))
+    rows = ...  ORDER BY c.created_at DESC, c.crime_id DESC LIMIT :limit + 1
+    rows, next_token = page_rows(rows, limit, "created_at", "crime_id")
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: Any, row_id: Any) -> str:
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([str(created_at), int(row_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def keyset_predicate(
+    created_col: str,
+    id_col: str,
+    position: Optional[Tuple[datetime, int]],
+    descending: bool = True,
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """SQL condition selecting rows after `position` in the given order.
+
+    Equivalent to `(created, id) < (x, y)`, but MySQL will not range-scan a
+    row comparison, and a bare `a < x OR (a = x AND b < y)` is not sargable
+    either. The leading `created <= x` gives the optimizer its range bound;
+    the OR only trims ties on the boundary timestamp.
+    """
+    if position is None:
+        return None, {}
+    created_at, row_id = position
+    op = "<" if descending else ">"
+    sql = (
+        f"({created_col} {op}= :cursor_created_at"
+        f" AND ({created_col} {op} :cursor_created_at OR {id_col} {op} :cursor_id))"
+    )
+    return sql, {"cursor_created_at": created_at, "cursor_id": row_id}
+
+
+def page_rows(
+    rows: Sequence[Mapping[str, Any]],
+    limit: int,
+    created_key: str,
+    id_key: str,
+) -> Tuple[List[Mapping[str, Any]], Optional[str]]:
+    """Trim a `LIMIT limit + 1` result to `limit` rows and build next_cursor."""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last[created_key], last[id_key])
@@ -0,0 +1,200 @@
+"""Sizing and instrumentation for the process-wide connection pool.
+
+The pool itself is the SQLAlchemy `QueuePool` behind `app.db.engine.engine`
+(a bounded queue with overflow and checkout timeouts); this module layers on
+the bits it does not do by itself:
+
+* pre-ping — every checkout pings the server and transparently replaces a
+  dead connection (the documented "pessimistic disconnect" recipe);
+* idle reaping — a connection that sat unused in the pool longer than
+  `idle_timeout` is discarded on checkout instead of being handed out stale
+  (MySQL drops it after `wait_timeout` anyway);
+* max-lifetime recycling — `recycle` seconds after it was opened;
+* counters — checkouts, checkout wait time, timeouts, in-use, overflow,
+  connects and every kind of recycle, exposed via `PoolStats.snapshot()`.
+
+Env vars (all optional):
+    DB_POOL_SIZE          persistent connections kept open (default 10)
+    DB_POOL_MAX_OVERFLOW  extra short-lived connections under burst (default 10)
+    DB_POOL_TIMEOUT       seconds to wait for a free connection (default 10)
+    DB_POOL_RECYCLE       max connection lifetime in seconds (default 1800)
+    DB_POOL_IDLE_TIMEOUT  discard connections idle longer than this (default 300)
+    DB_POOL_PRE_PING      1/0 — ping on checkout (default 1)
+    DB_MAX_CONNECTIONS    optional connection budget for the whole deployment;
+                          divided by WEB_CONCURRENCY (worker processes) and
+                          used to cap pool size + overflow per worker
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _pool_sizes() -> tuple[int, int]:
+    """Per-worker (pool_size, max_overflow), capped by DB_MAX_CONNECTIONS."""
+    size = _env_int("DB_POOL_SIZE", 10)
+    overflow = _env_int("DB_POOL_MAX_OVERFLOW", 10)
+    budget = _env_int("DB_MAX_CONNECTIONS", 0)
+    if budget > 0:
+        per_worker = max(budget // max(_env_int("WEB_CONCURRENCY", 1), 1), 1)
+        size = min(size, per_worker)
+        overflow = max(min(overflow, per_worker - size), 0)
+    return size, overflow
+
+
+_POOL_SIZE, _MAX_OVERFLOW = _pool_sizes()
+
+POOL_CONFIG: Dict[str, Any] = {
+    "pool_size": _POOL_SIZE,
+    "max_overflow": _MAX_OVERFLOW,
+    "timeout": _env_int("DB_POOL_TIMEOUT", 10),
+    "recycle": _env_int("DB_POOL_RECYCLE", 1800),
+    "idle_timeout": _env_int("DB_POOL_IDLE_TIMEOUT", 300),
+    "pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+}
+
+
+class PoolStats:
+    """Thread-safe counters for one pool. Read them with `snapshot()`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.connects = 0
+            self.ping_failures = 0
+            self.idle_reaped = 0
+            self.lifetime_recycled = 0
+            self.peak_in_use = 0
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_wait(self, seconds: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+            if in_use > self.peak_in_use:
+                self.peak_in_use = in_use
+
+    def snapshot(self, pool: Pool | None = None) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "connects": self.connects,
+                "ping_failures": self.ping_failures,
+                "idle_reaped": self.idle_reaped,
+                "lifetime_recycled": self.lifetime_recycled,
+                "peak_in_use": self.peak_in_use,
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # QueuePool.overflow() starts at -pool_size; clamp to the
+                # number of connections actually opened beyond the pool size.
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+def _ping(dbapi_connection) -> bool:
+    try:
+        dbapi_connection.ping(reconnect=False)
+        return True
+    except Exception:
+        return False
+
+
+def instrument_pool(
+    pool: Pool,
+    stats: PoolStats,
+    *,
+    idle_timeout: int = POOL_CONFIG["idle_timeout"],
+    recycle: int = POOL_CONFIG["recycle"],
+    pre_ping: bool = POOL_CONFIG["pre_ping"],
+) -> Pool:
+    """Attach idle reaping, pre-ping and counters to an existing pool.
+
+    Raising `DisconnectionError` from a checkout listener makes the pool
+    discard that connection and retry with a fresh one, so callers never see
+    the stale handle.
+    """
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, record):
+        record.info["opened_at"] = time.monotonic()
+        stats.incr("connects")
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, record):
+        record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy):
+        now = time.monotonic()
+        idle_since = record.info.pop("idle_since", None)
+        if idle_timeout > 0 and idle_since is not None and now - idle_since > idle_timeout:
+            stats.incr("idle_reaped")
+            raise exc.DisconnectionError("connection idle longer than idle_timeout")
+        opened_at = record.info.get("opened_at")
+        if recycle > 0 and opened_at is not None and now - opened_at > recycle:
+            # QueuePool(recycle=...) also handles this; counting it here
+            # keeps the metric even when the pool itself was built elsewhere.
+            stats.incr("lifetime_recycled")
+            raise exc.DisconnectionError("connection exceeded max lifetime")
+        if pre_ping and idle_since is not None and not _ping(dbapi_connection):
+            stats.incr("ping_failures")
+            raise exc.DisconnectionError("connection failed pre-ping")
+
+    return pool
+
+
+@contextmanager
+def checkout(pool: Pool, stats: PoolStats):
+    """Borrow a connection from `pool`, timing the wait; always returns it."""
+    started = time.perf_counter()
+    try:
+        conn = pool.connect()
+    except exc.TimeoutError:
+        stats.incr("checkout_timeouts")
+        raise
+    in_use = pool.checkedout() if isinstance(pool, QueuePool) else 0
+    stats.record_wait(time.perf_counter() - started, in_use)
+    try:
+        yield conn
+    finally:
+        conn.close()
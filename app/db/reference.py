@@ -0,0 +1,248 @@
+"""Reference data for the report forms (migration 019), cached in process.
+
+Crime types, districts, thanas and areas live in the `ref_*` tables. They
+are small and rarely written, so each worker holds the whole set and only
+checks the `reference` counter in `resource_version` (migration 018):
+
+    bundle, stamp = reference.current(conn)   # at most one PK lookup per RECHECK_SECONDS
+
+`current()` returns the cached bundle while it is younger than
+`REFERENCE_RECHECK_SECONDS` (default 30). After that it reads the stamp,
+and reloads the tables only if the version moved. The stamp is read
+before the tables, so a write landing mid-load leaves the bundle labelled
+with the older version, and the next check reloads it. Admin writes bump
+the counter in their own transaction and call `expire()`, so the writing
+worker sees the change on its next request. Other workers see it within
+the recheck interval.
+
+Until migration 019 is applied, or while the tables cannot be read, the
+lists that used to be hard-coded in app/main.py are served with no stamp.
+Responses then carry no ETag.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.db import versions
+
+logger = logging.getLogger(__name__)
+
+RECHECK_SECONDS = float(os.getenv("REFERENCE_RECHECK_SECONDS", "30"))
+
+# Served when the ref_* tables are unavailable; same as the migration seeds.
+DEFAULT_CRIME_TYPES = [
+    "Theft", "Burglary", "Robbery", "Assault", "Murder", "Kidnapping",
+    "Fraud", "Cybercrime", "Drug Offense", "Vandalism", "Domestic Violence",
+    "Sexual Assault", "Hit and Run", "Arson", "Blackmail", "Emergency", "Other",
+]
+DEFAULT_AREAS = {
+    "Dhaka": ["Dhanmondi", "Gulshan", "Banani", "Uttara", "Mirpur", "Mohammadpur",
+              "Old Dhaka", "Wari", "Ramna", "Tejgaon", "Motijheel", "Shahbagh"],
+    "Chittagong": ["Agrabad", "Nasirabad", "Panchlaish", "Khulshi", "Halishahar", "Bayazid"],
+    "Sylhet": ["Zindabazar", "Amberkhana", "Shahporan", "Bandar Bazar", "Chowhatta"],
+}
+DEFAULT_DISTRICTS = [
+    "Dhaka", "Chittagong", "Sylhet", "Rajshahi", "Khulna", "Barisal",
+    "Rangpur", "Mymensingh", "Comilla", "Gazipur", "Narayanganj",
+]
+
+CRIME_TYPE_SQL = "SELECT name FROM ref_crime_type WHERE is_active = 1 ORDER BY sort_order, name"
+DISTRICT_SQL = "SELECT district_id, name FROM ref_district WHERE is_active = 1 ORDER BY sort_order, name"
+THANA_SQL = ("SELECT thana_id, district_id, name FROM ref_thana WHERE is_active = 1"
+             " ORDER BY district_id, sort_order, name")
+AREA_SQL = ("SELECT district_id, thana_id, name FROM ref_area WHERE is_active = 1"
+            " ORDER BY district_id, sort_order, name")
+
+# Tables an admin can add rows to, keyed by the URL segment.
+KINDS: Dict[str, Dict[str, Any]] = {
+    "crime-types": {"table": "ref_crime_type", "id": "crime_type_id", "parent": None},
+    "districts": {"table": "ref_district", "id": "district_id", "parent": None},
+    "thanas": {"table": "ref_thana", "id": "thana_id", "parent": "district_id"},
+    "areas": {"table": "ref_area", "id": "area_id", "parent": "district_id"},
+}
+
+
+def _bundle(crime_types: List[str], districts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "crime_types": crime_types,
+        "districts": districts,
+        "_areas": {d["name"].casefold(): d["areas"] for d in districts},
+    }
+
+
+def default_bundle() -> Dict[str, Any]:
+    return _bundle(list(DEFAULT_CRIME_TYPES), [
+        {"name": name, "thanas": [], "areas": list(DEFAULT_AREAS.get(name, [])), "area_thanas": {}}
+        for name in DEFAULT_DISTRICTS
+    ])
+
+
+def _load(conn) -> Dict[str, Any]:
+    crime_types = [row["name"] for row in conn.execute(text(CRIME_TYPE_SQL)).mappings().fetchall()]
+    districts = {
+        row["district_id"]: {"name": row["name"], "thanas": [], "areas": [], "area_thanas": {}}
+        for row in conn.execute(text(DISTRICT_SQL)).mappings().fetchall()
+    }
+    thanas = {}
+    for row in conn.execute(text(THANA_SQL)).mappings().fetchall():
+        if row["district_id"] in districts:
+            thanas[row["thana_id"]] = row["name"]
+            districts[row["district_id"]]["thanas"].append(row["name"])
+    for row in conn.execute(text(AREA_SQL)).mappings().fetchall():
+        district = districts.get(row["district_id"])
+        if district is not None:
+            district["areas"].append(row["name"])
+            if row["thana_id"] in thanas:
+                district["area_thanas"][row["name"]] = thanas[row["thana_id"]]
+    return _bundle(crime_types, list(districts.values()))
+
+
+class ReferenceCache:
+    """The bundle plus its stamp, rechecked against resource_version."""
+
+    def __init__(self, recheck_seconds: float = RECHECK_SECONDS) -> None:
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._bundle: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[versions.Stamp] = None
+        self._checked_at = 0.0
+        self.loads = 0
+        self.checks = 0
+        self.hits = 0
+        self.failures = 0
+
+    def expire(self) -> None:
+        """Check the version on the next call (after a local write)."""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def peek(self) -> Optional[Tuple[Dict[str, Any], Optional[versions.Stamp]]]:
+        """(bundle, stamp) while no recheck is due, else None; never touches the DB."""
+        with self._lock:
+            if self._bundle is not None and time.monotonic() - self._checked_at < self.recheck_seconds:
+                self.hits += 1
+                return self._bundle, self._stamp
+            return None
+
+    def current(self, conn) -> Tuple[Dict[str, Any], Optional[versions.Stamp]]:
+        """(bundle, stamp); the stamp is None when serving the built-in defaults."""
+        with self._lock:
+            now = time.monotonic()
+            if self._bundle is not None and now - self._checked_at < self.recheck_seconds:
+                self.hits += 1
+                return self._bundle, self._stamp
+            self.checks += 1
+            stamp = versions.stamp(conn, versions.REFERENCE)
+            if stamp is not None and self._bundle is not None and self._stamp == stamp:
+                self._checked_at = now
+                return self._bundle, self._stamp
+            try:
+                bundle = _load(conn) if stamp is not None else None
+            except Exception:
+                logger.exception("Reference tables unavailable; serving built-in lists")
+                bundle = None
+            if bundle is None:
+                return self._fallback(now)
+            self.loads += 1
+            self._bundle, self._stamp, self._checked_at = bundle, stamp, now
+            return bundle, stamp
+
+    def _fallback(self, now: float) -> Tuple[Dict[str, Any], Optional[versions.Stamp]]:
+        # Keep the last good copy if there is one; retry on the next check.
+        self.failures += 1
+        if self._bundle is None or self._stamp is None:
+            self._bundle, self._stamp = default_bundle(), None
+        self._checked_at = now
+        return self._bundle, self._stamp
+
+    def unavailable(self) -> Tuple[Dict[str, Any], Optional[versions.Stamp]]:
+        """What to serve when no connection could be opened."""
+        with self._lock:
+            return self._fallback(time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._stamp is not None,
+                "version": self._stamp[0] if self._stamp else None,
+                "crime_types": len(self._bundle["crime_types"]) if self._bundle else 0,
+                "districts": len(self._bundle["districts"]) if self._bundle else 0,
+                "loads": self.loads,
+                "checks": self.checks,
+                "hits": self.hits,
+                "failures": self.failures,
+                "recheck_seconds": self.recheck_seconds,
+            }
+
+
+cache = ReferenceCache()
+
+
+def current(conn) -> Tuple[Dict[str, Any], Optional[versions.Stamp]]:
+    return cache.current(conn)
+
+
+def areas(bundle: Dict[str, Any], district: str) -> List[str]:
+    return bundle["_areas"].get((district or "").strip().casefold(), [])
+
+
+def public(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """The bundle as `/api/reference` sends it."""
+    return {"crime_types": bundle["crime_types"], "districts": bundle["districts"]}
+
+
+def add(conn, kind: str, name: str, district: Optional[str] = None, thana: Optional[str] = None,
+        sort_order: int = 0) -> int:
+    """Insert a row of `kind` (see KINDS) and bump the version; returns the new id.
+
+    Raises LookupError for an unknown district/thana and ValueError for a
+    missing one. IntegrityError (duplicate name) propagates to the caller.
+    """
+    spec = KINDS[kind]
+    params: Dict[str, Any] = {"name": name.strip(), "sort_order": sort_order}
+    columns = ["name", "sort_order"]
+    if spec["parent"]:
+        if not district:
+            raise ValueError("district is required")
+        row = conn.execute(text("SELECT district_id FROM ref_district WHERE name = :name"),
+                           {"name": district.strip()}).mappings().fetchone()
+        if row is None:
+            raise LookupError(f"Unknown district: {district}")
+        params["district_id"] = row["district_id"]
+        columns.append("district_id")
+    if kind == "areas" and thana:
+        row = conn.execute(text("SELECT thana_id FROM ref_thana WHERE district_id = :district_id AND name = :name"),
+                           {"district_id": params["district_id"], "name": thana.strip()}).mappings().fetchone()
+        if row is None:
+            raise LookupError(f"Unknown thana: {thana}")
+        params["thana_id"] = row["thana_id"]
+        columns.append("thana_id")
+    result = conn.execute(
+        text(f"INSERT INTO {spec['table']} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+        params,
+    )
+    versions.bump(conn, versions.REFERENCE)
+    return result.lastrowid
+
+
+def update(conn, kind: str, row_id: int, fields: Dict[str, Any]) -> bool:
+    """Rename, reorder or (de)activate a row and bump the version; False if no such row."""
+    spec = KINDS[kind]
+    fields = {k: v for k, v in fields.items() if k in ("name", "sort_order", "is_active") and v is not None}
+    if not fields:
+        return True
+    assignments = ", ".join(f"{column} = :{column}" for column in fields)
+    result = conn.execute(
+        text(f"UPDATE {spec['table']} SET {assignments} WHERE {spec['id']} = :row_id"),
+        {**fields, "row_id": row_id},
+    )
+    if not result.rowcount:
+        return False
+    versions.bump(conn, versions.REFERENCE)
+    return True
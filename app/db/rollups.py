@@ -0,0 +1,301 @@
+"""Daily rollups for trend charts (`/api/statistics/timeseries`).
+
+`daily_rollup` (migration 012) holds one counter per local day and series:
+
+    day         metric   dimension  value        count
+    2025-03-01  crimes   ""         ""           41     all crimes reported that day
+    2025-03-01  crimes   type       Theft        12
+    2025-03-01  crimes   area       Mirpur       5
+    2025-03-01  crimes   status     Pending      9      ...of which still Pending
+    2025-03-01  crimes   priority   High         3
+    2025-03-01  missing  ""         ""           2
+    2025-03-01  wanted   ""         ""           1
+    2025-03-01  users    ""         ""           17     registrations
+
+A row is counted on the Asia/Dhaka calendar day of its `created_at`, which
+the app writes in UTC. Dhaka has no DST, so the shift is a fixed
+`LOCAL_OFFSET`. Status and priority describe a crime's current value, so
+an update moves the count between series on the day the crime was
+reported, and a delete takes it out of every series.
+
+Write paths keep the counters current inside their own transaction:
+
+    before = rollups.keys_for(conn, rollups.CRIMES, crime_id)   # before an UPDATE/DELETE
+    ... write ...
+    rollups.changed(conn, rollups.CRIMES, crime_id, before)     # after INSERT/UPDATE
+    rollups.removed(conn, before)                               # after DELETE
+
+Hooks never fail the caller's write. `rebuild()` recounts a day range from
+the source tables; `scripts/db/backfill_rollups.py` runs it.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+TIMEZONE = "Asia/Dhaka"
+LOCAL_OFFSET = timedelta(hours=6)  # UTC+06:00 all year
+
+CRIMES = "crimes"
+MISSING = "missing"
+WANTED = "wanted"
+USERS = "users"
+TOTAL = ""  # dimension (and value) of a metric's overall series
+
+# metric -> (table, id column, {dimension: column})
+SOURCES: Dict[str, Tuple[str, str, Dict[str, str]]] = {
+    CRIMES: ("crime", "crime_id", {
+        "type": "crime_type", "area": "area_name", "status": "status", "priority": "priority_level",
+    }),
+    MISSING: ("missing_person", "missing_id", {}),
+    WANTED: ("wanted_criminal", "criminal_id", {}),
+    USERS: ("appuser", "user_id", {}),
+}
+METRIC_PATTERN = "^(crimes|missing|wanted|users)$"
+DIMENSION_PATTERN = "^(type|area|status|priority)$"
+VALUE_CHARS = 150
+
+# (day, metric, dimension, value)
+Key = Tuple[date, str, str, str]
+
+
+def local_day(ts: Any) -> Optional[date]:
+    """Asia/Dhaka calendar day of a UTC timestamp."""
+    if ts is None:
+        return None
+    if not isinstance(ts, datetime):
+        try:
+            ts = datetime.fromisoformat(str(ts))
+        except ValueError:
+            return None
+    return (ts + LOCAL_OFFSET).date()
+
+
+def today() -> date:
+    return local_day(datetime.utcnow())
+
+
+def day_start_utc(day: date) -> datetime:
+    """UTC instant at which the local `day` begins."""
+    return datetime.combine(day, datetime.min.time()) - LOCAL_OFFSET
+
+
+def _value(raw: Any) -> str:
+    return ("" if raw is None else str(raw).strip())[:VALUE_CHARS]
+
+
+def row_keys(metric: str, row: Mapping[str, Any]) -> List[Key]:
+    day = local_day(row.get("created_at"))
+    if day is None:
+        return []
+    keys = [(day, metric, TOTAL, TOTAL)]
+    for dimension, column in SOURCES[metric][2].items():
+        keys.append((day, metric, dimension, _value(row.get(column))))
+    return keys
+
+
+def _select_sql(metric: str, where: str) -> str:
+    table, id_column, dimensions = SOURCES[metric]
+    columns = ", ".join(["created_at", *dimensions.values()])
+    return f"SELECT {columns} FROM {table} WHERE {where}"
+
+
+# ---------------------------------------------------------------------------
+# counter storage
+# ---------------------------------------------------------------------------
+
+def _apply(conn, deltas: Mapping[Key, int]) -> None:
+    for (day, metric, dimension, value), delta in deltas.items():
+        if not delta:
+            continue
+        params = {"day": day, "metric": metric, "dimension": dimension, "value": value, "delta": int(delta)}
+        updated = conn.execute(
+            text(
+                "UPDATE daily_rollup SET count = count + :delta"
+                " WHERE metric = :metric AND dimension = :dimension AND value = :value AND day = :day"
+            ),
+            params,
+        ).rowcount
+        if updated or delta < 0:
+            continue
+        try:
+            conn.execute(
+                text(
+                    "INSERT INTO daily_rollup (day, metric, dimension, value, count)"
+                    " VALUES (:day, :metric, :dimension, :value, :delta)"
+                ),
+                params,
+            )
+        except IntegrityError:
+            # A concurrent writer created the row between our UPDATE and INSERT.
+            conn.execute(
+                text(
+                    "UPDATE daily_rollup SET count = count + :delta"
+                    " WHERE metric = :metric AND dimension = :dimension AND value = :value AND day = :day"
+                ),
+                params,
+            )
+
+
+def _diff(before: Iterable[Key], after: Iterable[Key]) -> Dict[Key, int]:
+    deltas: Counter = Counter()
+    for key in before:
+        deltas[key] -= 1
+    for key in after:
+        deltas[key] += 1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+# ---------------------------------------------------------------------------
+# write-path hooks
+# ---------------------------------------------------------------------------
+
+def keys_for(conn, metric: str, entity_id: Optional[int]) -> List[Key]:
+    """Series the row currently counts towards; [] if it does not exist."""
+    if entity_id is None:
+        return []
+    try:
+        id_column = SOURCES[metric][1]
+        row = conn.execute(
+            text(_select_sql(metric, f"{id_column} = :id")), {"id": entity_id}
+        ).mappings().fetchone()
+        return row_keys(metric, row) if row else []
+    except Exception:
+        logger.exception("Failed to read %s %s for rollups", metric, entity_id)
+        return []
+
+
+def changed(conn, metric: str, entity_id: Optional[int], before: Sequence[Key] = ()) -> None:
+    """Count the row as it is now, minus what it counted as `before`."""
+    try:
+        _apply(conn, _diff(before, keys_for(conn, metric, entity_id)))
+    except Exception:
+        logger.exception("Failed to update daily_rollup for %s %s; backfill_rollups will correct it",
+                         metric, entity_id)
+
+
+def removed(conn, before: Sequence[Key]) -> None:
+    try:
+        _apply(conn, _diff(before, ()))
+    except Exception:
+        logger.exception("Failed to update daily_rollup; backfill_rollups will correct it")
+
+
+# ---------------------------------------------------------------------------
+# backfill
+# ---------------------------------------------------------------------------
+
+def rebuild(conn, metric: str, first_day: date, last_day: date) -> int:
+    """Recount `metric` for local days first_day..last_day; returns rows scanned."""
+    start, end = day_start_utc(first_day), day_start_utc(last_day + timedelta(days=1))
+    counts: Counter = Counter()
+    spelling: Dict[Key, str] = {}
+    scanned = 0
+    result = conn.execute(
+        text(_select_sql(metric, "created_at >= :start AND created_at < :end")),
+        {"start": start, "end": end},
+    ).mappings()
+    for row in result:
+        scanned += 1
+        for day, m, dimension, value in row_keys(metric, row):
+            # Values compare case-insensitively in MySQL; count them that way.
+            folded = (day, m, dimension, value.lower())
+            spelling.setdefault(folded, value)
+            counts[folded] += 1
+    conn.execute(
+        text("DELETE FROM daily_rollup WHERE metric = :metric AND day >= :first AND day <= :last"),
+        {"metric": metric, "first": first_day, "last": last_day},
+    )
+    rows = [
+        {"day": day, "metric": m, "dimension": dimension, "value": spelling[(day, m, dimension, folded)],
+         "count": count}
+        for (day, m, dimension, folded), count in counts.items()
+    ]
+    if rows:
+        conn.execute(
+            text(
+                "INSERT INTO daily_rollup (day, metric, dimension, value, count)"
+                " VALUES (:day, :metric, :dimension, :value, :count)"
+            ),
+            rows,
+        )
+    return scanned
+
+
+def earliest_day(conn, metric: str) -> Optional[date]:
+    table = SOURCES[metric][0]
+    return local_day(conn.execute(text(f"SELECT MIN(created_at) FROM {table}")).scalar())
+
+
+# ---------------------------------------------------------------------------
+# reads
+# ---------------------------------------------------------------------------
+
+GRANULARITIES = ("day", "week", "month")
+GRANULARITY_PATTERN = "^(day|week|month)$"
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def buckets(first: date, last: date, granularity: str) -> List[date]:
+    out, current = [], bucket_start(first, granularity)
+    while current <= last:
+        out.append(current)
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return out
+
+
+def series(conn, metric: str, first: date, last: date, granularity: str = "day",
+           dimension: str = TOTAL, values: Optional[Sequence[str]] = None,
+           top: int = 10) -> Dict[str, Any]:
+    """Counts per bucket for one metric, optionally split by a dimension.
+
+    When split, the `top` values by total over the range get their own
+    series and the rest are summed into "other".
+    """
+    params: Dict[str, Any] = {"metric": metric, "dimension": dimension, "first": first, "last": last}
+    sql = (
+        "SELECT day, value, SUM(count) AS count FROM daily_rollup"
+        " WHERE metric = :metric AND dimension = :dimension AND day >= :first AND day <= :last"
+    )
+    statement = text(sql + " GROUP BY day, value")
+    if values:
+        statement = text(sql + " AND value IN :values GROUP BY day, value").bindparams(
+            bindparam("values", expanding=True)
+        )
+        params["values"] = list(values)
+    rows = conn.execute(statement, params).fetchall()
+
+    labels = buckets(first, last, granularity)
+    index = {label: i for i, label in enumerate(labels)}
+    per_value: Dict[str, List[int]] = {}
+    for day, value, count in rows:
+        day = day if isinstance(day, date) else date.fromisoformat(str(day))
+        points = per_value.setdefault(value, [0] * len(labels))
+        points[index[bucket_start(day, granularity)]] += int(count or 0)
+
+    ranked = sorted(per_value.items(), key=lambda item: (-sum(item[1]), item[0]))
+    out = [{"value": value if dimension else None, "total": sum(points), "points": points}
+           for value, points in ranked[:top]]
+    if len(ranked) > top:
+        rest = [sum(column) for column in zip(*(points for _, points in ranked[top:]))]
+        out.append({"value": "other", "total": sum(rest), "points": rest})
+    if not dimension and not out:
+        out = [{"value": None, "total": 0, "points": [0] * len(labels)}]
+    return {"buckets": [label.isoformat() for label in labels], "series": out}
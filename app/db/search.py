@@ -0,0 +1,188 @@
+"""Full-text search over crime reports.
+
+Each crime has one document row in `crime_search` (migration 010) holding
+the searchable values only (type, area, city, full description), with
+InnoDB FULLTEXT indexes over them. Queries join back to `crime` for the
+row and any structured filters:
+
+    SELECT c.*, {RANK_SQL} AS score
+    FROM crime_search s JOIN crime c ON c.crime_id = s.crime_id
+    WHERE {MATCH_SQL} ...
+    ORDER BY score DESC, c.crime_id DESC
+
+Documents are written by `index_crime()` in the same transaction as the
+crime insert (report, admin create, panic alert, complaint escalation).
+Deletes cascade through the FK. `scripts/db/rebuild_search_index.py`
+rewrites every document, for repairs or after changing `build_document`.
+
+Keywords are split into word terms. Every term must match, as a prefix,
+so "knif dhan" finds "knife" in Dhanmondi. Terms shorter than InnoDB's
+`innodb_ft_min_token_size` are not in the index. When a keyword has no
+usable terms, callers fall back to `short_prefix_sql()` over the indexed
+type/area columns.
+"""
+from __future__ import annotations
+
+import html
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+
+from app.db import parse_json_field
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_CHARS = 3  # innodb_ft_min_token_size default
+MAX_TERMS = 8
+SNIPPET_CHARS = 160
+# Hits in the short type/area/city fields outrank hits in the description.
+META_WEIGHT = 3
+
+MATCH_SQL = "MATCH(s.crime_type, s.area_name, s.city, s.description) AGAINST(:fts_query IN BOOLEAN MODE)"
+RANK_SQL = (
+    f"(MATCH(s.crime_type, s.area_name, s.city) AGAINST(:fts_query IN BOOLEAN MODE) * {META_WEIGHT}"
+    f" + {MATCH_SQL})"
+)
+
+# \w alone splits Bangla words at every vowel sign (combining marks are not
+# \w), so the Bengali block and combining diacritics count as word chars.
+_WORD_CHARS = r"\w\u0300-\u036f\u0980-\u09ff"
+_TERM_RE = re.compile(rf"[{_WORD_CHARS}]+")
+
+
+# ---------------------------------------------------------------------------
+# documents
+# ---------------------------------------------------------------------------
+
+def _clip(value: Any, width: int) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value[:width] or None
+
+
+def build_document(crime_data: Any, location_data: Any) -> Dict[str, Optional[str]]:
+    """Searchable fields of one crime; accepts the JSON text or parsed dicts."""
+    crime = parse_json_field(crime_data) or {}
+    location = parse_json_field(location_data) or {}
+    if not isinstance(crime, dict):
+        crime = {}
+    if not isinstance(location, dict):
+        location = {}
+    return {
+        "crime_type": _clip(crime.get("type"), 100),
+        "area_name": _clip(location.get("area_name"), 150),
+        "city": _clip(location.get("city"), 100),
+        "description": _clip(crime.get("description"), 65535),
+    }
+
+
+def index_crimes(conn, rows: Iterable[Tuple[int, Any, Any]]) -> int:
+    """(Re)write documents for `(crime_id, crime_data, location_data)` rows."""
+    docs = [{"crime_id": int(crime_id), **build_document(crime_data, location_data)}
+            for crime_id, crime_data, location_data in rows]
+    if not docs:
+        return 0
+    conn.execute(
+        text("DELETE FROM crime_search WHERE crime_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+        {"ids": [doc["crime_id"] for doc in docs]},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO crime_search (crime_id, crime_type, area_name, city, description)"
+            " VALUES (:crime_id, :crime_type, :area_name, :city, :description)"
+        ),
+        docs,
+    )
+    return len(docs)
+
+
+def index_crime(conn, crime_id: int, crime_data: Any, location_data: Any) -> None:
+    """Index one crime; a failure is logged, never raised into the write path."""
+    try:
+        index_crimes(conn, [(crime_id, crime_data, location_data)])
+    except Exception:
+        logger.exception("Failed to index crime %s for search; rebuild_search_index will pick it up", crime_id)
+
+
+# ---------------------------------------------------------------------------
+# queries
+# ---------------------------------------------------------------------------
+
+def parse_terms(keyword: Optional[str]) -> List[str]:
+    """Lowercased, de-duplicated word terms of a keyword, at most MAX_TERMS."""
+    terms = [t.lower() for t in _TERM_RE.findall(keyword or "")]
+    return list(dict.fromkeys(terms))[:MAX_TERMS]
+
+
+def fulltext_query(terms: Sequence[str]) -> Optional[str]:
+    """BOOLEAN MODE query requiring every indexable term as a prefix."""
+    usable = [t for t in terms if len(t) >= MIN_TERM_CHARS]
+    if not usable:
+        return None
+    # Terms are word characters only, so no boolean operator can sneak in.
+    return " ".join(f"+{t}*" for t in usable)
+
+
+def short_prefix_sql(terms: Sequence[str]) -> Tuple[str, Dict[str, str]]:
+    """Fallback for keywords too short for the FULLTEXT index."""
+    clauses, params = [], {}
+    for i, term in enumerate(terms):
+        clauses.append(f"(c.crime_type LIKE :short_{i} OR c.area_name LIKE :short_{i})")
+        params[f"short_{i}"] = f"{term}%"
+    return "(" + " AND ".join(clauses) + ")", params
+
+
+# ---------------------------------------------------------------------------
+# highlighting
+# ---------------------------------------------------------------------------
+
+def _term_pattern(terms: Sequence[str]) -> Optional[re.Pattern]:
+    if not terms:
+        return None
+    alternatives = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<![{_WORD_CHARS}])(?:{alternatives})[{_WORD_CHARS}]*", re.IGNORECASE)
+
+
+def highlight(value: Optional[str], terms: Sequence[str], max_chars: Optional[int] = None) -> Optional[str]:
+    """HTML-escaped `value` with term matches wrapped in <mark>.
+
+    With `max_chars`, returns a window of about that size that starts a
+    little before the first match, with ellipses where text was cut.
+    """
+    if not value:
+        return None
+    pattern = _term_pattern(terms)
+    start, end = 0, len(value)
+    if max_chars and len(value) > max_chars:
+        first = pattern.search(value) if pattern else None
+        centre = first.start() if first else 0
+        start = max(0, centre - max_chars // 3)
+        end = min(len(value), start + max_chars)
+        start = max(0, end - max_chars)
+    window = value[start:end]
+
+    parts: List[str] = []
+    cursor = 0
+    for match in (pattern.finditer(window) if pattern else ()):
+        parts.append(html.escape(window[cursor:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        cursor = match.end()
+    parts.append(html.escape(window[cursor:]))
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(value):
+        snippet += "…"
+    return snippet
+
+
+def highlights_for(doc: Dict[str, Any], terms: Sequence[str]) -> Dict[str, Optional[str]]:
+    return {
+        "crime_type": highlight(doc.get("crime_type"), terms),
+        "area_name": highlight(doc.get("area_name"), terms),
+        "city": highlight(doc.get("city"), terms),
+        "description": highlight(doc.get("description"), terms, SNIPPET_CHARS),
+    }
@@ -0,0 +1,189 @@
+"""Nearest police stations for panic alerts, from an in-memory k-d tree.
+
+`police_station` is small and rarely written, so the whole table is held
+in memory and rebuilt from scratch whenever it changes:
+
+    stations.load(conn)                        # app startup, and after a station write
+    stations.nearest(lat, lng, n)              # panic path; no DB access
+
+Stations are indexed as points on the unit sphere (x, y, z). Straight-line
+distance between those points increases with great-circle distance, so a
+plain 3-d k-d tree returns the true nearest stations anywhere on the globe
+without any lat/lng wrap-around special cases. The reported `distance_km`
+is the haversine distance.
+
+`load()` builds the new tree before swapping it in, so readers always see
+a complete index. Stations without coordinates are skipped. If the load at
+startup fails (database down), the panic path calls `ensure_loaded()`,
+which retries at most once per `RETRY_SECONDS`; until a load succeeds,
+alerts are stored without nearby stations.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+NEAREST_STATIONS = int(os.getenv("NEAREST_STATIONS", "3"))
+RETRY_SECONDS = 30.0
+
+STATION_SQL = """
+    SELECT station_id, station_name, station_code, phone, latitude, longitude
+    FROM police_station
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+Point = Tuple[float, float, float]
+
+
+def _unit_vector(lat: float, lng: float) -> Point:
+    phi, lam = math.radians(lat), math.radians(lng)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlam = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _Node:
+    __slots__ = ("point", "station", "order", "axis", "left", "right")
+
+    def __init__(self, point: Point, station: Dict[str, Any], order: int, axis: int) -> None:
+        self.point = point
+        self.station = station
+        self.order = order  # heap tie-breaker
+        self.axis = axis
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+
+
+def _build(items: List[Tuple[Point, Dict[str, Any], int]], depth: int = 0) -> Optional[_Node]:
+    if not items:
+        return None
+    axis = depth % 3
+    items.sort(key=lambda item: item[0][axis])
+    middle = len(items) // 2
+    node = _Node(*items[middle], axis)
+    node.left = _build(items[:middle], depth + 1)
+    node.right = _build(items[middle + 1:], depth + 1)
+    return node
+
+
+class StationIndex:
+    """Immutable k-d tree over stations that have coordinates."""
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]] = ()) -> None:
+        items = []
+        for row in rows:
+            try:
+                lat, lng = float(row["latitude"]), float(row["longitude"])
+            except (TypeError, ValueError, KeyError):
+                continue
+            if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+                continue
+            station = {
+                "station_id": row.get("station_id"),
+                "station_name": row.get("station_name"),
+                "station_code": row.get("station_code"),
+                "phone": row.get("phone"),
+                "latitude": lat,
+                "longitude": lng,
+            }
+            items.append((_unit_vector(lat, lng), station, len(items)))
+        self.size = len(items)
+        self._root = _build(items)
+
+    def nearest(self, lat: float, lng: float, n: int = NEAREST_STATIONS) -> List[Dict[str, Any]]:
+        """Up to `n` stations closest to (lat, lng), nearest first, with `distance_km`."""
+        if self._root is None or n <= 0:
+            return []
+        tx, ty, tz = target = _unit_vector(lat, lng)
+        best: List[Tuple[float, int, Dict[str, Any]]] = []  # max-heap on distance via negation
+        # (node, squared distance from the target to the node's side of its parent's split)
+        stack: List[Tuple[_Node, float]] = [(self._root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            full = len(best) == n
+            if full and bound >= -best[0][0]:
+                continue
+            px, py, pz = node.point
+            d2 = (px - tx) ** 2 + (py - ty) ** 2 + (pz - tz) ** 2
+            if not full:
+                heapq.heappush(best, (-d2, node.order, node.station))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, node.order, node.station))
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            # Push the far side first so the near side is searched first.
+            if far is not None:
+                stack.append((far, diff * diff))
+            if near is not None:
+                stack.append((near, 0.0))
+        out = []
+        for _, _, station in sorted(best, key=lambda item: -item[0]):
+            distance = haversine_km(lat, lng, station["latitude"], station["longitude"])
+            out.append({**station, "distance_km": round(distance, 3)})
+        return out
+
+
+_index = StationIndex()
+_loaded_at: Optional[float] = None
+_last_attempt: Optional[float] = None
+_load_lock = threading.Lock()
+
+
+def load(conn) -> int:
+    """Rebuild the index from `police_station`; returns the number of stations indexed."""
+    global _index, _loaded_at, _last_attempt
+    with _load_lock:
+        _last_attempt = time.monotonic()
+        rows = conn.execute(text(STATION_SQL)).mappings().fetchall()
+        _index = StationIndex(rows)
+        _loaded_at = time.monotonic()
+        return _index.size
+
+
+def reload(conn) -> None:
+    """Write-path hook: rebuild after a station insert/update, never failing the write."""
+    try:
+        load(conn)
+    except Exception:
+        logger.exception("Failed to reload the police station index")
+
+
+def needs_load() -> bool:
+    if _loaded_at is not None:
+        return False
+    return _last_attempt is None or time.monotonic() - _last_attempt >= RETRY_SECONDS
+
+
+def ensure_loaded(conn) -> None:
+    """Load once if startup could not (rate-limited to one try per RETRY_SECONDS)."""
+    if needs_load():
+        reload(conn)
+
+
+def nearest(lat: Optional[float], lng: Optional[float], n: int = NEAREST_STATIONS) -> List[Dict[str, Any]]:
+    if lat is None or lng is None:
+        return []
+    return _index.nearest(lat, lng, n)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "stations": _index.size,
+        "loaded": _loaded_at is not None,
+        "age_seconds": None if _loaded_at is None else round(time.monotonic() - _loaded_at, 1),
+    }
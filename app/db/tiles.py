@@ -0,0 +1,144 @@
+"""Crime density tiles and marker clusters for the safety map.
+
+The map asks for standard web-mercator tiles (z/x/y, 256px). Each tile is
+split into a GRID x GRID lattice and crimes are counted per cell in SQL,
+using the stored `lat`/`lng` columns (migration 006) and the
+(created_at, lat, lng) index from migration 013:
+
+    SELECT FLOOR((lng - :west) / :cell_lng) AS col, FLOOR((lat - :south) / :cell_lat) AS row,
+           COUNT(*), AVG(lat), AVG(lng), MIN(crime_id)
+    FROM crime WHERE lat/lng inside the tile AND created_at inside the window
+    GROUP BY col, row
+
+A cell's centre and count make a heat-map point. Its centroid makes a
+cluster marker, which carries the `crime_id` when the cell holds one crime.
+Within a tile, lat is split linearly. At 16px cells the mercator skew is
+below a pixel.
+
+Windows are whole Asia/Dhaka days, so a tile's cache key stays stable for
+the day. Tiles are cached in `cache` for `CRIME_TILE_TTL` seconds (default
+120). Crime writes do not flush the cache, so a new report shows up on the
+map within one TTL.
+"""
+from __future__ import annotations
+
+import math
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.db import rollups
+from app.db.cache import SnapshotCache
+
+GRID = 16
+MAX_ZOOM = 20
+MAX_LAT = 85.05112878  # web-mercator limit
+MAX_TILES = 36  # per bounding-box request
+
+cache = SnapshotCache(float(os.getenv("CRIME_TILE_TTL", "120")))
+
+CELL_SQL = """
+    SELECT FLOOR((lng - :west) / :cell_lng) AS col,
+           FLOOR((lat - :south) / :cell_lat) AS row_,
+           COUNT(*) AS count, AVG(lat) AS lat, AVG(lng) AS lng, MIN(crime_id) AS crime_id
+    FROM crime
+    WHERE created_at >= :start AND created_at < :end
+      AND lat >= :south AND lat < :north AND lng >= :west AND lng < :east
+      {type_filter}
+    GROUP BY col, row_
+"""
+
+
+# ---------------------------------------------------------------------------
+# tile math
+# ---------------------------------------------------------------------------
+
+def tile_for(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """(x, y) of the tile containing a point."""
+    n = 2 ** zoom
+    lat = max(min(lat, MAX_LAT), -MAX_LAT)
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a tile in degrees."""
+    n = 2 ** zoom
+
+    def lat_at(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat_at(y + 1), (x + 1) / n * 360.0 - 180.0, lat_at(y)
+
+
+def tiles_covering(west: float, south: float, east: float, north: float, zoom: int) -> List[Tuple[int, int]]:
+    x0, y0 = tile_for(north, west, zoom)
+    x1, y1 = tile_for(south, east, zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def valid_tile(zoom: int, x: int, y: int) -> bool:
+    return 0 <= zoom <= MAX_ZOOM and 0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom
+
+
+# ---------------------------------------------------------------------------
+# aggregation
+# ---------------------------------------------------------------------------
+
+def compute_tile(conn, zoom: int, x: int, y: int, first: date, last: date,
+                 crime_type: Optional[str] = None) -> Dict[str, Any]:
+    west, south, east, north = tile_bounds(zoom, x, y)
+    cell_lng, cell_lat = (east - west) / GRID, (north - south) / GRID
+    params: Dict[str, Any] = {
+        "west": west, "south": south, "east": east, "north": north,
+        "cell_lng": cell_lng, "cell_lat": cell_lat,
+        "start": rollups.day_start_utc(first), "end": rollups.day_start_utc(last + timedelta(days=1)),
+    }
+    type_filter = ""
+    if crime_type:
+        type_filter = "AND crime_type = :crime_type"
+        params["crime_type"] = crime_type
+    rows = conn.execute(text(CELL_SQL.format(type_filter=type_filter)), params).mappings().fetchall()
+
+    cells, clusters, total = [], [], 0
+    for row in rows:
+        count = int(row["count"])
+        col, row_index = min(int(row["col"]), GRID - 1), min(int(row["row_"]), GRID - 1)
+        total += count
+        cells.append({
+            "lat": round(south + (row_index + 0.5) * cell_lat, 6),
+            "lng": round(west + (col + 0.5) * cell_lng, 6),
+            "count": count,
+        })
+        cluster = {"lat": round(float(row["lat"]), 6), "lng": round(float(row["lng"]), 6), "count": count}
+        if count == 1:
+            cluster["crime_id"] = int(row["crime_id"])
+        clusters.append(cluster)
+    return {
+        "z": zoom, "x": x, "y": y,
+        "bounds": [round(v, 6) for v in (west, south, east, north)],
+        "total": total,
+        "cells": cells,
+        "clusters": clusters,
+    }
+
+
+def tile(conn, zoom: int, x: int, y: int, first: date, last: date,
+         crime_type: Optional[str] = None) -> Dict[str, Any]:
+    """`compute_tile` through the per-tile cache."""
+    key = (zoom, x, y, first, last, crime_type)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0]
+    generation = cache.generation
+    value = compute_tile(conn, zoom, x, y, first, last, crime_type)
+    cache.put(key, value, generation)
+    return value
+
+
+def tiles(conn, zoom: int, coords: Sequence[Tuple[int, int]], first: date, last: date,
+          crime_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    return [tile(conn, zoom, x, y, first, last, crime_type) for x, y in coords]
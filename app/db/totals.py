@@ -0,0 +1,223 @@
+"""Cached row totals for paginated list endpoints.
+
+`SELECT COUNT(*)` over a filtered InnoDB table walks every matching index
+entry, which costs more than the page itself. Instead, per-filter counts
+live in the small `list_totals` table (migration 009):
+
+    scope              filter_key                  total
+    crime              ""                          all crimes
+    crime              "status:pending"            crimes with that status
+    case_assignments   ""                          all assignments
+
+Write paths adjust the counters inside their own transaction
+(`crime_inserted`, `crime_status_changed`, ...); a failed adjustment
+raises and rolls the write back with it. A counter row only
+exists once something has counted it exactly, so a bump never invents a
+total. Drift from writers that bypass these hooks (manual SQL, FK
+cascades) is corrected by `reconcile()`, which
+`scripts/db/reconcile_totals.py` runs periodically.
+
+Callers choose how much a total is worth through `mode`:
+
+    exact     live COUNT(*); also refreshes the stored counter
+    estimate  stored counter, falling back to `exact` on a miss
+    none      skip the total entirely (returns None)
+
+Every function takes a sync SQLAlchemy `Connection`. Async handlers run
+them in one thread hop with `await conn.run_sync(totals.crime_total, ...)`.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+TOTAL_MODES = ("exact", "estimate", "none")
+# Query pattern for FastAPI `total=` params.
+TOTAL_MODE_PATTERN = "^(exact|estimate|none)$"
+
+CRIMES = "crime"
+ASSIGNMENTS = "case_assignments"
+ALL = ""
+
+
+def status_key(status: Optional[str]) -> str:
+    # Status columns use a case-insensitive collation, so fold case here too.
+    return "status:" + (status or "").strip().lower()
+
+
+# ---------------------------------------------------------------------------
+# counter storage
+# ---------------------------------------------------------------------------
+
+def read_counters(conn, scope: str, keys: Sequence[str]) -> Dict[str, int]:
+    if not keys:
+        return {}
+    rows = conn.execute(
+        text(
+            "SELECT filter_key, total FROM list_totals"
+            " WHERE scope = :scope AND filter_key IN :keys"
+        ).bindparams(bindparam("keys", expanding=True)),
+        {"scope": scope, "keys": list(keys)},
+    ).fetchall()
+    return {row[0]: int(row[1]) for row in rows}
+
+
+def store_counters(conn, scope: str, values: Mapping[str, int]) -> None:
+    """Overwrite counters with freshly counted values (insert if missing)."""
+    now = datetime.utcnow()
+    for key, total in values.items():
+        params = {"scope": scope, "key": key, "total": int(total), "now": now}
+        updated = conn.execute(
+            text(
+                "UPDATE list_totals SET total = :total, refreshed_at = :now"
+                " WHERE scope = :scope AND filter_key = :key"
+            ),
+            params,
+        ).rowcount
+        if updated:
+            continue
+        try:
+            conn.execute(
+                text(
+                    "INSERT INTO list_totals (scope, filter_key, total, refreshed_at)"
+                    " VALUES (:scope, :key, :total, :now)"
+                ),
+                params,
+            )
+        except IntegrityError:
+            # Another request seeded it first; its value is just as fresh.
+            pass
+
+
+def bump(conn, scope: str, deltas: Mapping[str, int]) -> None:
+    """Apply deltas to counters that exist, in the caller's transaction."""
+    for key, delta in deltas.items():
+        if delta:
+            conn.execute(
+                text(
+                    "UPDATE list_totals SET total = total + :delta"
+                    " WHERE scope = :scope AND filter_key = :key"
+                ),
+                {"scope": scope, "key": key, "delta": int(delta)},
+            )
+
+
+# ---------------------------------------------------------------------------
+# write-path hooks
+# ---------------------------------------------------------------------------
+
+def crime_inserted(conn, status: Optional[str]) -> None:
+    bump(conn, CRIMES, {ALL: 1, status_key(status): 1})
+
+
+def crime_deleted(conn, status: Optional[str]) -> None:
+    bump(conn, CRIMES, {ALL: -1, status_key(status): -1})
+
+
+def crime_status_changed(conn, old_status: Optional[str], new_status: Optional[str]) -> None:
+    old_key, new_key = status_key(old_status), status_key(new_status)
+    if old_key != new_key:
+        bump(conn, CRIMES, {old_key: -1, new_key: 1})
+
+
+def assignments_changed(conn, delta: int) -> None:
+    bump(conn, ASSIGNMENTS, {ALL: delta})
+
+
+# ---------------------------------------------------------------------------
+# reads
+# ---------------------------------------------------------------------------
+
+def _count_crimes(conn, statuses: Optional[Sequence[str]]) -> Dict[str, int]:
+    if statuses is None:
+        total = conn.execute(text("SELECT COUNT(*) FROM crime")).scalar() or 0
+        return {ALL: int(total)}
+    counts = {status_key(s): 0 for s in statuses}
+    rows = conn.execute(
+        text(
+            "SELECT status, COUNT(*) FROM crime WHERE status IN :statuses GROUP BY status"
+        ).bindparams(bindparam("statuses", expanding=True)),
+        {"statuses": list(statuses)},
+    ).fetchall()
+    for status, count in rows:
+        key = status_key(status)
+        if key in counts:
+            counts[key] += int(count)
+    return counts
+
+
+def _resolve(conn, mode: str, scope: str, keys: Sequence[str], count) -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        try:
+            cached = read_counters(conn, scope, keys)
+        except Exception:
+            logger.exception("list_totals unavailable; counting %s live", scope)
+            return sum(count().values())
+        if len(cached) == len(set(keys)):
+            return sum(cached.values())
+    fresh = count()
+    try:
+        store_counters(conn, scope, fresh)
+    except Exception:
+        logger.exception("Failed to refresh list_totals for %s", scope)
+    return sum(fresh.values())
+
+
+def crime_total(conn, mode: str = "estimate", statuses: Optional[Iterable[str]] = None) -> Optional[int]:
+    """Crimes overall, or with any of `statuses`."""
+    statuses = None if statuses is None else list(dict.fromkeys(statuses))
+    keys = [ALL] if statuses is None else [status_key(s) for s in statuses]
+    return _resolve(conn, mode, CRIMES, keys, lambda: _count_crimes(conn, statuses))
+
+
+def assignment_total(conn, mode: str = "estimate") -> Optional[int]:
+    def count():
+        return {ALL: int(conn.execute(text("SELECT COUNT(*) FROM case_assignments")).scalar() or 0)}
+
+    return _resolve(conn, mode, ASSIGNMENTS, [ALL], count)
+
+
+# ---------------------------------------------------------------------------
+# reconcile
+# ---------------------------------------------------------------------------
+
+def reconcile(conn) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Recount every scope from the base tables and overwrite the counters.
+
+    Returns the counters that had drifted as
+    `{scope: {filter_key: {"stored": old, "actual": new}}}`.
+    """
+    fresh: Dict[str, Dict[str, int]] = {CRIMES: {}, ASSIGNMENTS: {}}
+
+    crime_counts = fresh[CRIMES]
+    crime_counts[ALL] = int(conn.execute(text("SELECT COUNT(*) FROM crime")).scalar() or 0)
+    for status, count in conn.execute(text("SELECT status, COUNT(*) FROM crime GROUP BY status")).fetchall():
+        key = status_key(status)
+        crime_counts[key] = crime_counts.get(key, 0) + int(count)
+    fresh[ASSIGNMENTS][ALL] = int(conn.execute(text("SELECT COUNT(*) FROM case_assignments")).scalar() or 0)
+
+    drift: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for scope, counts in fresh.items():
+        stored = {
+            row[0]: int(row[1])
+            for row in conn.execute(
+                text("SELECT filter_key, total FROM list_totals WHERE scope = :scope"),
+                {"scope": scope},
+            ).fetchall()
+        }
+        # Statuses that no longer occur still have counters; zero them.
+        for key in stored:
+            counts.setdefault(key, 0)
+        for key, actual in counts.items():
+            if stored.get(key) != actual:
+                drift.setdefault(scope, {})[key] = {"stored": stored.get(key), "actual": actual}
+        store_counters(conn, scope, counts)
+    return drift
@@ -0,0 +1,100 @@
+"""Per-resource version stamps for conditional GETs (migration 018).
+
+`resource_version` holds one counter per resource (a table, or a family of
+tables that one set of endpoints serves):
+
+    resource          version  changed_at
+    wanted_criminal   412      2025-03-10 09:14:02     wanted list/detail/sightings
+    missing_person    97       2025-03-10 08:55:40
+    police_station    6        2025-02-27 16:03:11
+
+Write routes declare `Depends(versions.after_write(versions.WANTED))`, which
+bumps the counter once the handler has returned, the same way
+`invalidate_after_write` drops the in-process caches. The counter lives in
+MySQL, so every worker sees the same version.
+
+Read routes take the stamp *before* they read the data. If a write lands
+in between, the response is labelled with the older version. The next
+revalidation then gets a 200 instead of a stale 304. `app.core.conditional`
+turns the stamp into ETag / Last-Modified headers and 304 replies.
+
+Writes that bypass the routes (manual SQL, scripts) do not bump anything.
+Run `versions.bump` by hand, or `scripts/db/bump_versions.py`, after them.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.engine import engine
+
+logger = logging.getLogger(__name__)
+
+WANTED = "wanted_criminal"
+MISSING = "missing_person"
+STATIONS = "police_station"
+REFERENCE = "reference"  # crime types, districts, thanas, areas (app.db.reference)
+RESOURCES = (WANTED, MISSING, STATIONS, REFERENCE)
+
+# (version token, last change); the token is "<resource>.<version>[+...]"
+Stamp = Tuple[str, Optional[datetime]]
+
+
+def bump(conn, *resources: str) -> None:
+    """Advance the counters in the caller's transaction; errors propagate and roll it back."""
+    now = datetime.utcnow()
+    for resource in resources:
+        params = {"resource": resource, "now": now}
+        update = text(
+            "UPDATE resource_version SET version = version + 1, changed_at = :now WHERE resource = :resource"
+        )
+        if conn.execute(update, params).rowcount:
+            continue
+        try:
+            conn.execute(
+                text("INSERT INTO resource_version (resource, version, changed_at) VALUES (:resource, 1, :now)"),
+                params,
+            )
+        except IntegrityError:
+            conn.execute(update, params)
+
+
+def after_write(*resources: str) -> Callable[[], Iterator[None]]:
+    """Route dependency factory: bump `resources` after the handler succeeds."""
+
+    def dependency() -> Iterator[None]:
+        yield
+        try:
+            with engine.begin() as conn:
+                bump(conn, *resources)
+        except Exception:
+            logger.exception("Failed to bump resource_version for %s", resources)
+
+    dependency.resources = resources
+    return dependency
+
+
+def stamp(conn, *resources: str) -> Optional[Stamp]:
+    """Current stamp over `resources`, or None if it cannot be read.
+
+    A resource that has never been bumped counts as version 0 with no
+    modification time.
+    """
+    try:
+        rows = conn.execute(
+            text(
+                "SELECT resource, version, changed_at FROM resource_version WHERE resource IN :resources"
+            ).bindparams(bindparam("resources", expanding=True)),
+            {"resources": list(resources)},
+        ).mappings().fetchall()
+        found = {row["resource"]: (int(row["version"]), row["changed_at"]) for row in rows}
+    except Exception:
+        logger.exception("resource_version unavailable; serving %s without validators", resources)
+        return None
+    token = "+".join(f"{resource}.{found.get(resource, (0, None))[0]}" for resource in resources)
+    changed = [found[resource][1] for resource in resources if resource in found and found[resource][1]]
+    return token, max(changed) if changed else None
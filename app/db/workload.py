@@ -0,0 +1,221 @@
+"""Live `active_cases` and `officer_workload` projections (migrations 005, 017).
+
+`active_cases` holds one row per open crime: the crime's list fields, its
+reporter's name and the officer it is assigned to. `officer_workload` holds
+one row per officer with the number of open crimes they are actively
+assigned. The admin views read them with a plain indexed scan instead of
+joining crime, case_assignments, appuser and police_station per request.
+
+A crime is open unless its status is in `CLOSED_STATUSES`. It counts
+towards an officer while it is open and its `case_assignments` row is
+not in `FINISHED_ASSIGNMENTS`. Write paths keep both tables current inside
+their own transaction, the same way as `rollups`:
+
+    before = workload.officer_for(conn, crime_id)      # before an UPDATE/DELETE
+    ... write crime / case_assignments ...
+    workload.crime_changed(conn, crime_id, before)      # after INSERT/UPDATE
+    workload.crime_removed(conn, crime_id, before)      # after DELETE
+
+A hook that fails raises, which rolls back the caller's write with it, so
+the projections never silently diverge from crime. `reconcile()` rebuilds
+both tables from crime and case_assignments for drift from writers that
+bypass the hooks; `scripts/db/reconcile_workload.py` runs it.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+
+# Compared case-insensitively, like the status columns' collation.
+CLOSED_STATUSES = ("resolved", "case closed", "closed", "dismissed", "rejected")
+FINISHED_ASSIGNMENTS = ("completed", "closed", "cancelled")
+OFFICER_ROLES = ("officer", "detective")
+
+CASE_COLUMNS = (
+    "crime_id", "reporter_id", "reporter_name", "crime_type", "city", "area", "status",
+    "priority_level", "incident_date", "created_at", "assigned_to", "updated_at",
+)
+
+CASE_SELECT = """
+    SELECT c.crime_id, c.reporter_id, COALESCE(r.full_name, r.username) AS reporter_name,
+           c.crime_type, c.city, c.area_name AS area, c.status, c.priority_level,
+           c.incident_date, c.created_at,
+           CASE WHEN a.user_id IS NOT NULL AND LOWER(COALESCE(a.status, '')) NOT IN :finished
+                THEN a.user_id END AS assigned_to,
+           :now AS updated_at
+    FROM crime c
+    LEFT JOIN appuser r ON r.user_id = c.reporter_id
+    LEFT JOIN case_assignments a ON a.crime_id = c.crime_id
+"""
+
+OFFICER_SELECT = """
+    SELECT u.user_id, COALESCE(u.full_name, u.username) AS full_name, u.role_hint, s.station_name
+    FROM appuser u
+    LEFT JOIN police_station s ON s.station_id = u.station_id
+"""
+
+_CASE_BINDS = (bindparam("finished", expanding=True),)
+
+
+def is_open(status: Optional[str]) -> bool:
+    return (status or "").strip().lower() not in CLOSED_STATUSES
+
+
+def _case_row(conn, crime_id: int) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        text(CASE_SELECT + " WHERE c.crime_id = :crime_id").bindparams(*_CASE_BINDS),
+        {"crime_id": crime_id, "finished": list(FINISHED_ASSIGNMENTS), "now": datetime.utcnow()},
+    ).mappings().fetchone()
+    return dict(row) if row else None
+
+
+# ---------------------------------------------------------------------------
+# projection storage
+# ---------------------------------------------------------------------------
+
+def _store_case(conn, row: Mapping[str, Any]) -> None:
+    assignments = ", ".join(f"{col} = :{col}" for col in CASE_COLUMNS if col != "crime_id")
+    update = text(f"UPDATE active_cases SET {assignments} WHERE crime_id = :crime_id")
+    if conn.execute(update, dict(row)).rowcount:
+        return
+    try:
+        conn.execute(
+            text(f"INSERT INTO active_cases ({', '.join(CASE_COLUMNS)})"
+                 f" VALUES ({', '.join(':' + col for col in CASE_COLUMNS)})"),
+            dict(row),
+        )
+    except IntegrityError:
+        # A concurrent writer inserted it between our UPDATE and INSERT.
+        conn.execute(update, dict(row))
+
+
+def _drop_case(conn, crime_id: int) -> None:
+    conn.execute(text("DELETE FROM active_cases WHERE crime_id = :crime_id"), {"crime_id": crime_id})
+
+
+def _bump_officer(conn, user_id: Optional[int], delta: int) -> None:
+    if user_id is None or not delta:
+        return
+    params = {"user_id": user_id, "delta": delta, "now": datetime.utcnow()}
+    update = text(
+        "UPDATE officer_workload SET active_assignments = active_assignments + :delta, updated_at = :now"
+        " WHERE user_id = :user_id"
+    )
+    if conn.execute(update, params).rowcount or delta < 0:
+        return
+    try:
+        conn.execute(
+            text(
+                "INSERT INTO officer_workload (user_id, full_name, role_hint, station_name,"
+                " active_assignments, updated_at)"
+                " SELECT o.user_id, o.full_name, o.role_hint, o.station_name, :delta, :now"
+                f" FROM ({OFFICER_SELECT} WHERE u.user_id = :user_id) o"
+            ),
+            params,
+        )
+    except IntegrityError:
+        conn.execute(update, params)
+
+
+# ---------------------------------------------------------------------------
+# write-path hooks
+# ---------------------------------------------------------------------------
+
+def officer_for(conn, crime_id: Optional[int]) -> Optional[int]:
+    """Officer the crime currently counts towards; None if it counts for no one."""
+    if crime_id is None:
+        return None
+    row = _case_row(conn, crime_id)
+    if not row or not is_open(row["status"]):
+        return None
+    return row["assigned_to"]
+
+
+def crime_changed(conn, crime_id: Optional[int], before: Optional[int] = None) -> None:
+    """Project the crime as it is now; `before` is what `officer_for` returned before the write."""
+    if crime_id is None:
+        return
+    row = _case_row(conn, crime_id)
+    after = None
+    if row and is_open(row["status"]):
+        _store_case(conn, row)
+        after = row["assigned_to"]
+    else:
+        _drop_case(conn, crime_id)
+    if after != before:
+        _bump_officer(conn, before, -1)
+        _bump_officer(conn, after, 1)
+
+
+def crime_removed(conn, crime_id: Optional[int], before: Optional[int] = None) -> None:
+    if crime_id is None:
+        return
+    _drop_case(conn, crime_id)
+    _bump_officer(conn, before, -1)
+
+
+# ---------------------------------------------------------------------------
+# reconcile
+# ---------------------------------------------------------------------------
+
+def reconcile(conn) -> Dict[str, Any]:
+    """Rebuild both projections from crime and case_assignments.
+
+    Every officer (and anyone else holding an open assignment) gets a row,
+    idle ones with 0. Returns the number of open cases and the officers
+    whose stored count had drifted, as `{user_id: {"stored": old, "actual": new}}`.
+    """
+    now = datetime.utcnow()
+    conn.execute(text("DELETE FROM active_cases"))
+    conn.execute(
+        text(
+            f"INSERT INTO active_cases ({', '.join(CASE_COLUMNS)})"
+            f" {CASE_SELECT} WHERE LOWER(COALESCE(c.status, '')) NOT IN :closed"
+        ).bindparams(*_CASE_BINDS, bindparam("closed", expanding=True)),
+        {"finished": list(FINISHED_ASSIGNMENTS), "closed": list(CLOSED_STATUSES), "now": now},
+    )
+    open_cases = int(conn.execute(text("SELECT COUNT(*) FROM active_cases")).scalar() or 0)
+
+    actual = {
+        int(user_id): int(count)
+        for user_id, count in conn.execute(
+            text("SELECT assigned_to, COUNT(*) FROM active_cases WHERE assigned_to IS NOT NULL"
+                 " GROUP BY assigned_to")
+        ).fetchall()
+    }
+    stored = {
+        int(user_id): int(count or 0)
+        for user_id, count in conn.execute(
+            text("SELECT user_id, active_assignments FROM officer_workload")
+        ).fetchall()
+    }
+    officers = conn.execute(
+        text(OFFICER_SELECT + " WHERE LOWER(COALESCE(u.role_hint, '')) IN :roles"
+             " OR u.user_id IN (SELECT assigned_to FROM active_cases)").bindparams(
+            bindparam("roles", expanding=True)),
+        {"roles": list(OFFICER_ROLES)},
+    ).mappings().fetchall()
+
+    drift: Dict[int, Dict[str, Optional[int]]] = {}
+    for user_id in set(stored) | set(actual):
+        if stored.get(user_id) != actual.get(user_id, 0):
+            drift[user_id] = {"stored": stored.get(user_id), "actual": actual.get(user_id, 0)}
+
+    conn.execute(text("DELETE FROM officer_workload"))
+    rows = [
+        {**dict(officer), "active_assignments": actual.get(int(officer["user_id"]), 0), "now": now}
+        for officer in officers
+    ]
+    if rows:
+        conn.execute(
+            text(
+                "INSERT INTO officer_workload (user_id, full_name, role_hint, station_name,"
+                " active_assignments, updated_at)"
+                " VALUES (:user_id, :full_name, :role_hint, :station_name, :active_assignments, :now)"
+            ),
+            rows,
+        )
+    return {"active_cases": open_cases, "officers": len(rows), "drift": drift}
@@ -1,32 +1,88 @@
-from fastapi import FastAPI, HTTPException, Query, File, UploadFile, Form, Body, Depends
+from fastapi import FastAPI, HTTPException, Query, File, UploadFile, Form, Body, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 import os
 import logging
 from pydantic import BaseModel, validator
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any, Mapping
 import json
 import uuid
 import asyncio
-from pathlib import Path
+from contextlib import asynccontextmanager
 
+from app.core import pages
+from app.core import passwords
+from app.core.throttle import login_throttle
+from app.core.conditional import drop_validators, not_modified
 from app.core.config import BASE_DIR, CONTENTS_DIR, STATIC_DIR, UPLOADS_DIR
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
+    forget_user,
     get_current_user,
     require_user,
     require_admin,
+    user_cache,
 )
-from app.db import fetch_one, fetch_all, execute, insert_and_get_id, parse_json_field as parse_json_value
+from app.db import fetch_one, fetch_all, execute, insert_and_get_id, parse_json_field as parse_json_value, pool_stats
+from app.db.aio import AsyncEngine, limiter_stats
 from app.db.engine import engine
+from app.db.pagination import InvalidCursor, decode_cursor, keyset_predicate, page_rows
+from app.db import activity
+from app.db import analytics
+from app.db import chat
+from app.db import metrics
+from app.db.cache import invalidate_after_write
+from app.db import totals
+from app.db import names as name_index
+from app.db import nearby
+from app.db import reference
+from app.db import rollups
+from app.db import search as search_index
+from app.db import stations
+from app.db import tiles
+from app.db import versions
+from app.db import workload
+from app.db.totals import TOTAL_MODE_PATTERN
+
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # The panic path reads nearby stations from memory; build that index
+    # before taking traffic. If the database is not reachable yet, the
+    # first alert retries (see app.db.stations).
+    try:
+        async with async_engine.connect() as conn:
+            count = await conn.run_sync(stations.load)
+        logging.info("Police station index loaded: %d stations", count)
+    except Exception as exc:
+        logging.warning("Police station index not loaded at startup: %s", exc)
+    # Read and compress the page templates once, off the event loop.
+    try:
+        count = await asyncio.to_thread(pages.store.preload)
+        logging.info("Page templates loaded: %d", count)
+    except Exception as exc:
+        logging.warning("Page templates not preloaded: %s", exc)
+    activity.writer.start(lambda: async_engine)
+    chat.broker.start(lambda: async_engine)
+    yield
+    await chat.broker.stop()
+    await activity.writer.stop(lambda: async_engine)
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Handlers are `async def`; every blocking DB call goes through this wrapper
+# so it runs in a bounded worker thread instead of on the event loop.
+async_engine = AsyncEngine(engine)
 
-app = FastAPI()
+# Activity events land in batches after the write that caused them; drop the
+# cached analytics payload (which embeds the feed) once they are visible.
+activity.writer.after_flush(analytics.cache.invalidate)
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
@@ -61,18 +117,41 @@ app.mount("/contents", StaticFiles(directory=str(CONTENTS_DIR)), name="contents"
 os.makedirs(str(UPLOADS_DIR), exist_ok=True)
 
 
-def _read_html(path: str) -> str:
-    """Read an HTML file with utf-8 and replace undecodable bytes to avoid crashes.
+def _parse_cursor(cursor: Optional[str]):
+    """Decode a `cursor` query param into a keyset position (400 if malformed)."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    Returns the file content as a string. Raises FileNotFoundError if missing.
 
-    `path` may be absolute or relative to the project root.
-    """
-    p = Path(path)
-    if not p.is_absolute():
-        p = BASE_DIR / p
-    with open(p, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()
+GENDER_CODES = {"m": "M", "male": "M", "f": "F", "female": "F", "o": "O", "other": "O"}
+
+
+def _gender_code(value: Optional[str]) -> Optional[str]:
+    """Stored rows hold M/F/O; accept those or the spelled-out labels."""
+    if not value:
+        return value
+    return GENDER_CODES.get(value.strip().lower(), value)
+
+
+def _where(conditions: List[str]) -> str:
+    return (" WHERE " + " AND ".join(conditions)) if conditions else ""
+
+
+def _local_day_window(date_from: Optional[date], date_to: Optional[date], max_days: int,
+                      default_days: int = 30) -> tuple:
+    """(first, last) Asia/Dhaka days for `from`/`to` params (400 if out of range)."""
+    last = date_to or rollups.today()
+    first = date_from or last - timedelta(days=default_days - 1)
+    if first > last:
+        raise HTTPException(status_code=400, detail="`from` must not be after `to`")
+    if (last - first).days >= max_days:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {max_days} days")
+    return first, last
+
 
 # ==================== PYDANTIC MODELS ====================
 # All request/response schemas live under app.schemas (split by domain) and
@@ -89,6 +168,8 @@ from app.schemas import (  # noqa: F401  (re-exports for in-module use)
     EmergencyAssignment,
     MissingPersonFinderUpdate,
     PoliceStationCreate,
+    ReferenceItemCreate,
+    ReferenceItemUpdate,
     StatusUpdate,
     UserCreate,
     UserLogin,
@@ -99,75 +180,75 @@ from app.schemas import (  # noqa: F401  (re-exports for in-module use)
 # ==================== ROOT ENDPOINT (LANDING PAGE) ====================
 
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """Serve the main landing page (home.html)"""
     try:
-        return HTMLResponse(content=_read_html("static/templates/home.html"))
+        return pages.store.respond(request, "static/templates/home.html")
     except FileNotFoundError:
         # Fallback to index.html if home.html doesn't exist
-        return HTMLResponse(content=_read_html("static/templates/index.html"))
+        return pages.store.respond(request, "static/templates/index.html")
 
 # ==================== STATIC PAGE ENDPOINTS ====================
 
 @app.get("/dashboard")
-async def get_dashboard_page():
+async def get_dashboard_page(request: Request):
     """Serve the main dashboard page (index.html)"""
-    return HTMLResponse(content=_read_html("static/templates/index.html"))
+    return pages.store.respond(request, "static/templates/index.html")
 
 @app.get("/home")
-async def get_home_page():
+async def get_home_page(request: Request):
     """Alternative route to home page"""
-    return HTMLResponse(content=_read_html("static/templates/home.html"))
+    return pages.store.respond(request, "static/templates/home.html")
 
 @app.get("/report-crime")
-async def get_report_crime_page():
+async def get_report_crime_page(request: Request):
     """Serve the crime reporting page"""
-    return HTMLResponse(content=_read_html("static/templates/report_crime.html"))
+    return pages.store.respond(request, "static/templates/report_crime.html")
 
 @app.get("/missing-person")
-async def get_missing_person_page():
+async def get_missing_person_page(request: Request):
     """Serve the missing persons page"""
-    return HTMLResponse(content=_read_html("static/templates/missing_person.html"))
+    return pages.store.respond(request, "static/templates/missing_person.html")
 
 @app.get("/wanted-criminals")
-async def get_wanted_criminals_page():
+async def get_wanted_criminals_page(request: Request):
     """Serve the wanted criminals page"""
-    return HTMLResponse(content=_read_html("static/templates/wanted_criminal.html"))
+    return pages.store.respond(request, "static/templates/wanted_criminal.html")
 
 @app.get("/chatbox")
-async def get_chatbox_page():
+async def get_chatbox_page(request: Request):
     """Serve the community chatbox page"""
-    return HTMLResponse(content=_read_html("static/templates/user_chatbox.html"))
+    return pages.store.respond(request, "static/templates/user_chatbox.html")
 
 @app.get("/report-missing")
-async def get_report_missing_page():
+async def get_report_missing_page(request: Request):
     """Serve the missing person report form"""
-    return HTMLResponse(content=_read_html("static/templates/report_missing_person.html"))
+    return pages.store.respond(request, "static/templates/report_missing_person.html")
 
 @app.get("/login")
-async def get_login_page():
+async def get_login_page(request: Request):
     """Serve the login page"""
-    return HTMLResponse(content=_read_html("static/templates/login.html"))
+    return pages.store.respond(request, "static/templates/login.html")
 
 @app.get("/signup")
-async def get_signup_page():
+async def get_signup_page(request: Request):
     """Serve the signup page"""
-    return HTMLResponse(content=_read_html("static/templates/signup.html"))
+    return pages.store.respond(request, "static/templates/signup.html")
 
 @app.get("/admin")
-async def get_admin_dashboard_page():
+async def get_admin_dashboard_page(request: Request):
     """Serve the admin dashboard page.
 
     NOTE: `static/admin_dashboard.html` is a redirect stub pointing at
     `/admin-dashboard`. The real dashboard lives in
     `static/admin_dashboard21.html`; serving the stub here would loop.
     """
-    return HTMLResponse(content=_read_html("static/templates/admin_dashboard21.html"))
+    return pages.store.respond(request, "static/templates/admin_dashboard21.html")
 
 @app.get("/admin-dashboard")
-async def get_admin_dashboard_alt():
+async def get_admin_dashboard_alt(request: Request):
     """Alternative route to admin dashboard (same target as /admin)."""
-    return HTMLResponse(content=_read_html("static/templates/admin_dashboard21.html"))
+    return pages.store.respond(request, "static/templates/admin_dashboard21.html")
 
 # ---- Compatibility redirects -------------------------------------------------
 # Several templates still link to underscore filenames like
@@ -210,24 +291,26 @@ async def _redir_home_html():        return RedirectResponse("/home", status_cod
 
 # ==================== USER AUTHENTICATION ENDPOINTS ====================
 
-@app.post("/register")
+@app.post("/register", dependencies=[Depends(invalidate_after_write)])
 async def register_user(user: UserCreate):
     try:
-        hashed_password = hash_password(user.password)
+        hashed_password = await passwords.hash(user.password)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc))
-    with engine.connect() as conn:
+    except passwords.PoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    async with async_engine.connect() as conn:
         try:
             # Check if email exists
-            result = conn.execute(
+            result = (await conn.execute(
                 text("SELECT user_id FROM appuser WHERE email = :email"),
                 {"email": user.email}
-            ).fetchone()
+            )).fetchone()
             if result:
                 raise HTTPException(status_code=400, detail="Email already registered")
 
             # Insert new user
-            result = conn.execute(
+            result = await conn.execute(
                 text("""
                     INSERT INTO appuser (email, username, password_hash, role_hint, status, created_at)
                     VALUES (:email, :username, :password_hash, :role_hint, :status, :created_at)
@@ -242,7 +325,8 @@ async def register_user(user: UserCreate):
                 }
             )
             user_id = result.lastrowid
-            conn.commit()
+            await conn.run_sync(rollups.changed, rollups.USERS, user_id)
+            await conn.commit()
             logging.info("Registered new user: %s", user.email)
             token = create_access_token(user_id=user_id, role="User")
             return {
@@ -259,64 +343,89 @@ async def register_user(user: UserCreate):
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             logging.exception("Registration failed for %s", user.email)
             raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @app.post("/login")
-async def login_user(user: UserLogin):
-    with engine.connect() as conn:
-        try:
-            result = conn.execute(
+async def login_user(user: UserLogin, request: Request):
+    # Budget check before any DB or bcrypt work; see app.core.throttle.
+    retry_after = await login_throttle.attempt(request.client.host if request.client else None, user.email)
+    if retry_after is not None:
+        raise HTTPException(status_code=429, detail="Too many login attempts, please retry later",
+                            headers={"Retry-After": str(max(int(retry_after + 0.999), 1))})
+    try:
+        # Only the lookup holds a pooled connection. It is returned before
+        # the bcrypt queue, so a login burst cannot drain the pool.
+        async with async_engine.connect() as conn:
+            result = (await conn.execute(
                 text("SELECT * FROM appuser WHERE email = :email"),
                 {"email": user.email}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
 
-            if not result:
-                raise HTTPException(status_code=400, detail="Email not registered")
+        if not result:
+            raise HTTPException(status_code=400, detail="Email not registered")
 
-            if not verify_password(user.password, result["password_hash"]):
-                raise HTTPException(status_code=400, detail="Incorrect password")
-            if (result.get("status") or "").lower() in {"inactive", "disabled", "banned"}:
-                raise HTTPException(status_code=403, detail="Account is not active")
+        try:
+            matches, new_hash = await passwords.verify(user.password, result["password_hash"])
+        except passwords.PoolBusy:
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+        if not matches:
+            raise HTTPException(status_code=400, detail="Incorrect password")
+        if (result.get("status") or "").lower() in {"inactive", "disabled", "banned"}:
+            raise HTTPException(status_code=403, detail="Account is not active")
+        if new_hash is not None:
+            # Stored with another bcrypt cost; swap in the current one on a
+            # fresh short connection. The compare on the old hash skips it
+            # if the password changed in the meantime.
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.execute(
+                        text("UPDATE appuser SET password_hash = :new WHERE user_id = :user_id"
+                             " AND password_hash = :old"),
+                        {"new": new_hash, "old": result["password_hash"], "user_id": result["user_id"]},
+                    )
+            except Exception:
+                logging.exception("Password rehash failed for user %s", result["user_id"])
 
-            role = result.get("role_hint") or "User"
-            token = create_access_token(user_id=result["user_id"], role=role)
-            logging.info("Login success for %s", user.email)
-            return {
-                "message": "Login successful",
-                "token": token,
-                "user": {
-                    "user_id": result["user_id"],
-                    "email": result["email"],
-                    "username": result["username"],
-                    "role_hint": result["role_hint"],
-                    "station_id": result["station_id"],
-                    "status": result["status"],
-                    "created_at": result["created_at"],
-                },
-            }
-        except HTTPException:
-            raise
-        except Exception as e:
-            logging.exception("Login failed for %s", user.email)
-            raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
+        await login_throttle.succeeded(user.email)
+        role = result.get("role_hint") or "User"
+        token = create_access_token(user_id=result["user_id"], role=role)
+        logging.info("Login success for %s", user.email)
+        return {
+            "message": "Login successful",
+            "token": token,
+            "user": {
+                "user_id": result["user_id"],
+                "email": result["email"],
+                "username": result["username"],
+                "role_hint": result["role_hint"],
+                "station_id": result["station_id"],
+                "status": result["status"],
+                "created_at": result["created_at"],
+            },
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.exception("Login failed for %s", user.email)
+        raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 @app.get("/api/users")
 async def get_all_users():
-    with engine.connect() as conn:
-        result = conn.execute(
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(
             text("SELECT user_id, email, username, role_hint, status, created_at FROM appuser ORDER BY created_at DESC")
-        ).mappings().fetchall()
+        )).mappings().fetchall()
         return {"users": [dict(row) for row in result]}
 
 @app.get("/api/users/{user_id}")
 async def get_user_by_id(user_id: int):
-    with engine.connect() as conn:
-        result = conn.execute(
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(
             text("SELECT user_id, email, username, role_hint, status, created_at FROM appuser WHERE user_id = :user_id"),
             {"user_id": user_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
         if not result:
             raise HTTPException(status_code=404, detail="User not found")
         return {"user": dict(result)}
@@ -345,9 +454,9 @@ async def upload_file(file: UploadFile = File(...)):
 
 # ==================== CRIME DATA ENDPOINTS ====================
 
-@app.post("/api/crimes")
+@app.post("/api/crimes", dependencies=[Depends(invalidate_after_write)])
 async def submit_crime_report(crime_data: CrimeData):
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
             # Validate reporter_id: if provided, ensure it exists in appuser; if not, null it
             reporter_id_val = None
@@ -359,10 +468,10 @@ async def submit_crime_report(crime_data: CrimeData):
                     maybe_id = None
 
                 if maybe_id is not None:
-                    user_row = conn.execute(
+                    user_row = (await conn.execute(
                         text("SELECT user_id FROM appuser WHERE user_id = :uid"),
                         {"uid": maybe_id}
-                    ).fetchone()
+                    )).fetchone()
                     if user_row:
                         reporter_id_val = maybe_id
                     else:
@@ -370,7 +479,7 @@ async def submit_crime_report(crime_data: CrimeData):
                         reporter_id_val = None
 
             # Insert into crime table
-            result = conn.execute(
+            result = await conn.execute(
                 text("""
                     INSERT INTO crime (reporter_id, incident_date, location_data, crime_data, victim_data, criminal_data, 
                                      weapon_data, witness_data, evidence_files, status, created_at)
@@ -391,19 +500,30 @@ async def submit_crime_report(crime_data: CrimeData):
                     "created_at": datetime.utcnow()
                 }
             )
-            conn.commit()
+            await conn.run_sync(totals.crime_inserted, "Pending")
+            await conn.run_sync(search_index.index_crime, result.lastrowid, crime_data.crime, crime_data.location)
+            await conn.run_sync(rollups.changed, rollups.CRIMES, result.lastrowid)
+            await conn.run_sync(workload.crime_changed, result.lastrowid)
+            await conn.commit()
             crime_id = result.lastrowid
+            crime_fields, location_fields = crime_data.crime or {}, crime_data.location or {}
+            activity.record(
+                activity.CRIME, crime_id, activity.CREATED, status="Pending", actor_id=reporter_id_val,
+                title=activity.crime_title(crime_id),
+                summary=activity.crime_summary(crime_fields.get("type"), crime_fields.get("description"),
+                                               location_fields.get("area_name")),
+            )
             print(f"Crime report submitted with ID: {crime_id}")
             return {"message": "Crime report submitted successfully", "crime_id": crime_id}
         except IntegrityError as ie:
-            conn.rollback()
+            await conn.rollback()
             # Return a 400 with a clear message about referential integrity
             raise HTTPException(status_code=400, detail=f"Failed to submit crime report due to integrity error: {str(ie)}")
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to submit crime report: {str(e)}")
 
-@app.post("/api/admin/crimes")
+@app.post("/api/admin/crimes", dependencies=[Depends(invalidate_after_write)])
 async def create_admin_crime(payload: AdminCrimeCreate, _user: dict = Depends(require_admin)):
     """Allow administrators to log a new crime directly from the dashboard."""
 
@@ -520,18 +640,18 @@ async def create_admin_crime(payload: AdminCrimeCreate, _user: dict = Depends(re
 
     created_at = datetime.utcnow()
 
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         reporter_id_val: Optional[int] = None
         if payload.reporter_id is not None:
-            reporter_row = conn.execute(
+            reporter_row = (await conn.execute(
                 text("SELECT user_id FROM appuser WHERE user_id = :uid"),
                 {"uid": payload.reporter_id}
-            ).fetchone()
+            )).fetchone()
             if reporter_row:
                 reporter_id_val = payload.reporter_id
 
         try:
-            result = conn.execute(
+            result = await conn.execute(
                 text(
                     """
                     INSERT INTO crime (
@@ -585,14 +705,24 @@ async def create_admin_crime(payload: AdminCrimeCreate, _user: dict = Depends(re
                     "updated_at": created_at,
                 }
             )
-            conn.commit()
+            await conn.run_sync(totals.crime_inserted, status_value)
+            await conn.run_sync(search_index.index_crime, result.lastrowid, crime_payload, location_payload)
+            await conn.run_sync(rollups.changed, rollups.CRIMES, result.lastrowid)
+            await conn.run_sync(workload.crime_changed, result.lastrowid)
+            await conn.commit()
             crime_id = result.lastrowid
+            activity.record(
+                activity.CRIME, crime_id, activity.CREATED, status=status_value, actor_id=_user.get("user_id"),
+                title=activity.crime_title(crime_id),
+                summary=activity.crime_summary(crime_payload["type"], crime_payload["description"],
+                                               location_payload["area_name"]),
+            )
             return {"message": "Crime report created", "crime_id": crime_id}
         except IntegrityError as ie:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=400, detail=f"Failed to create crime record: {ie}") from ie
         except Exception as exc:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to create crime record: {exc}") from exc
 
 @app.get("/api/crimes")
@@ -600,23 +730,31 @@ async def get_all_crimes(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=200, description="Limit number of results"),
     offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
+    total: str = Query("estimate", pattern=TOTAL_MODE_PATTERN, description="exact | estimate (cached counter) | none"),
 ):
-    with engine.connect() as conn:
-        base_query = "SELECT * FROM crime"
-        count_query = "SELECT COUNT(*) AS total FROM crime"
-        params: Dict[str, Any] = {}
+    position = _parse_cursor(cursor)
+    async with async_engine.connect() as conn:
+        conditions: List[str] = []
+        filter_params: Dict[str, Any] = {}
         if status:
-            base_query += " WHERE status = :status"
-            count_query += " WHERE status = :status"
-            params["status"] = status
-
-        base_query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
-        params["limit"] = limit
-        params["offset"] = offset
+            conditions.append("status = :status")
+            filter_params["status"] = status
+
+        keyset_sql, keyset_params = keyset_predicate("created_at", "crime_id", position)
+        if keyset_sql:
+            conditions.append(keyset_sql)
+        base_query = "SELECT * FROM crime" + _where(conditions)
+        base_query += " ORDER BY created_at DESC, crime_id DESC LIMIT :limit"
+        params: Dict[str, Any] = {**filter_params, **keyset_params, "limit": limit + 1}
+        if position is None:
+            base_query += " OFFSET :offset"
+            params["offset"] = offset
 
-        result = conn.execute(text(base_query), params).mappings().fetchall()
-        total_row = conn.execute(text(count_query), params if not params.get("offset") else {k: v for k, v in params.items() if k not in ("limit", "offset")}).mappings().fetchone()
-        total = int(total_row["total"]) if total_row else 0
+        rows = (await conn.execute(text(base_query), params)).mappings().fetchall()
+        result, next_cursor = page_rows(rows, limit, "created_at", "crime_id")
+        total_count = await conn.run_sync(totals.crime_total, total, [status] if status else None)
+        await conn.commit()
 
         crimes = []
         for row in result:
@@ -636,15 +774,94 @@ async def get_all_crimes(
                 crime["witness_data"] = json.loads(crime["witness_data"])
             crimes.append(crime)
 
-        return {"crimes": crimes, "total": total, "limit": limit, "offset": offset}
+        return {"crimes": crimes, "total": total_count, "total_mode": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
+
+MAX_MAP_WINDOW_DAYS = 366
+
+
+@app.get("/api/crimes/heatmap")
+async def get_crime_heatmap(
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    zoom: int = Query(..., ge=0, le=tiles.MAX_ZOOM, description="Map zoom level"),
+    date_from: Optional[date] = Query(None, alias="from", description="First local (Asia/Dhaka) day, default 29 days before `to`"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last local day, default today"),
+    crime_type: Optional[str] = Query(None, description="Only this crime type"),
+):
+    """Density cells and cluster markers for every tile covering `bbox`."""
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be west,south,east,north")
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    first, last = _local_day_window(date_from, date_to, MAX_MAP_WINDOW_DAYS)
+    coords = tiles.tiles_covering(west, south, east, north, zoom)
+    if len(coords) > tiles.MAX_TILES:
+        raise HTTPException(status_code=400, detail=f"bbox spans {len(coords)} tiles at this zoom; the limit is {tiles.MAX_TILES}")
+
+    async with async_engine.connect() as conn:
+        tile_data = await conn.run_sync(tiles.tiles, zoom, coords, first, last, crime_type)
+    return {
+        "zoom": zoom,
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "tiles": len(tile_data),
+        "total": sum(t["total"] for t in tile_data),
+        "cells": [cell for t in tile_data for cell in t["cells"]],
+        "clusters": [cluster for t in tile_data for cluster in t["clusters"]],
+    }
+
+
+@app.get("/api/crimes/tiles/{z}/{x}/{y}")
+async def get_crime_tile(
+    z: int,
+    x: int,
+    y: int,
+    date_from: Optional[date] = Query(None, alias="from", description="First local (Asia/Dhaka) day, default 29 days before `to`"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last local day, default today"),
+    crime_type: Optional[str] = Query(None, description="Only this crime type"),
+):
+    """One web-mercator tile of density cells and cluster markers."""
+    if not tiles.valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="No such tile")
+    first, last = _local_day_window(date_from, date_to, MAX_MAP_WINDOW_DAYS)
+    async with async_engine.connect() as conn:
+        return await conn.run_sync(tiles.tile, z, x, y, first, last, crime_type)
+
+
+MAX_NEARBY_HOURS = 24 * 30
+
+
+@app.get("/api/crimes/nearby")
+async def get_crimes_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(2.0, gt=0, le=nearby.MAX_RADIUS_KM),
+    hours: int = Query(24, ge=1, le=MAX_NEARBY_HOURS, description="Only crimes reported in the last N hours"),
+    crime_type: Optional[List[str]] = Query(None, description="Repeat to allow several types"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Crimes within `radius_km` of a point in the last `hours`, nearest first."""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    async with async_engine.connect() as conn:
+        crimes = await conn.run_sync(nearby.search, lat, lng, radius_km, since, crime_type, limit)
+    return {
+        "lat": lat,
+        "lng": lng,
+        "radius_km": radius_km,
+        "hours": hours,
+        "count": len(crimes),
+        "crimes": crimes,
+    }
+
 
 @app.get("/api/crimes/{crime_id}")
 async def get_crime_by_id(crime_id: int):
-    with engine.connect() as conn:
-        result = conn.execute(
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(
             text("SELECT * FROM crime WHERE crime_id = :crime_id"),
             {"crime_id": crime_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Crime not found")
@@ -667,27 +884,40 @@ async def get_crime_by_id(crime_id: int):
         return {"crime": crime}
 
 
-@app.delete("/api/crimes/{crime_id}")
+@app.delete("/api/crimes/{crime_id}", dependencies=[Depends(invalidate_after_write)])
 async def delete_crime_record(crime_id: int, _user: dict = Depends(require_admin)):
-    with engine.begin() as conn:
-        conn.execute(
+    async with async_engine.begin() as conn:
+        current = (await conn.execute(
+            text("SELECT status FROM crime WHERE crime_id = :crime_id FOR UPDATE"),
+            {"crime_id": crime_id}
+        )).mappings().fetchone()
+        if not current:
+            raise HTTPException(status_code=404, detail="Crime not found")
+        counted = await conn.run_sync(rollups.keys_for, rollups.CRIMES, crime_id)
+        officer = await conn.run_sync(workload.officer_for, crime_id)
+
+        assignments = await conn.execute(
             text("DELETE FROM case_assignments WHERE crime_id = :crime_id"),
             {"crime_id": crime_id}
         )
-        result = conn.execute(
+        result = await conn.execute(
             text("DELETE FROM crime WHERE crime_id = :crime_id"),
             {"crime_id": crime_id}
         )
 
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Crime not found")
+        await conn.run_sync(totals.crime_deleted, current["status"])
+        await conn.run_sync(totals.assignments_changed, -assignments.rowcount)
+        await conn.run_sync(rollups.removed, counted)
+        await conn.run_sync(workload.crime_removed, crime_id, officer)
 
     return {"message": "Crime report deleted"}
 
 # ==================== MISSING PERSON ENDPOINTS ====================
 
 
-@app.post("/api/missing-persons")
+@app.post("/api/missing-persons", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 async def submit_missing_person(payload: Dict[str, Any] = Body(...)):
     # map and validate
     name = payload.get("full_name") or payload.get("name")
@@ -753,10 +983,14 @@ async def submit_missing_person(payload: Dict[str, Any] = Body(...)):
     """)
 
     try:
-      with engine.begin() as conn:
-        conn.execute(insert_sql, params)
-        last = conn.execute(text("SELECT LAST_INSERT_ID() AS id")).first()
+      async with async_engine.begin() as conn:
+        await conn.execute(insert_sql, params)
+        last = (await conn.execute(text("SELECT LAST_INSERT_ID() AS id"))).first()
         new_id = last.id if last is not None else None
+        await conn.run_sync(name_index.index_person, name_index.MISSING, new_id, name)
+        await conn.run_sync(rollups.changed, rollups.MISSING, new_id)
+      activity.record(activity.MISSING, new_id, activity.CREATED, status="Missing", title=name,
+                      summary=activity.missing_summary(params["last_seen_location"]))
       return {"message":"Missing person report created", "id": new_id}
     except Exception:
       logging.exception("Failed to insert missing person")
@@ -781,7 +1015,44 @@ async def submit_missing_person(payload: Dict[str, Any] = Body(...)):
 #         return {"missing_persons": [dict(row) for row in result]}
 
 @app.get("/api/missing-persons")
-async def get_missing_persons():
+async def get_missing_persons(
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, description="Filter by status (e.g. Missing, Found)"),
+    gender: Optional[str] = Query(None, description="Filter by gender"),
+    age_min: Optional[int] = Query(None, ge=0, le=150, description="Minimum age"),
+    age_max: Optional[int] = Query(None, ge=0, le=150, description="Maximum age"),
+    sort: str = Query("recent", pattern="^(recent|oldest)$", description="Order by last activity"),
+    limit: int = Query(24, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
+):
+    position = _parse_cursor(cursor)
+    descending = sort == "recent"
+    conditions: List[str] = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    if status:
+        conditions.append("status = :status")
+        params["status"] = status
+    if gender:
+        conditions.append("gender = :gender")
+        params["gender"] = _gender_code(gender)
+    if age_min is not None:
+        conditions.append("age >= :age_min")
+        params["age_min"] = age_min
+    if age_max is not None:
+        conditions.append("age <= :age_max")
+        params["age_max"] = age_max
+    keyset_sql, keyset_params = keyset_predicate("last_activity_at", "missing_id", position, descending)
+    if keyset_sql:
+        conditions.append(keyset_sql)
+        params.update(keyset_params)
+    direction = "DESC" if descending else "ASC"
+    page_clause = "LIMIT :limit"
+    if position is None:
+        page_clause += " OFFSET :offset"
+        params["offset"] = offset
+
     query = text("""
      SELECT missing_id, reporter_id, name, age, gender, description,
          last_seen_location, last_seen_date, last_seen_time, height,
@@ -789,25 +1060,38 @@ async def get_missing_persons():
          clothing_description, contact_person, contact_phone,
                photo_url, status, police_case_number,
                finding_location, finder_name, finder_phone, finder_email,
-         still_with_finder, created_at, updated_at
+         still_with_finder, created_at, updated_at, last_activity_at
         FROM missing_person
-        ORDER BY COALESCE(updated_at, created_at) DESC
-    """)
+    """ + _where(conditions) + f" ORDER BY last_activity_at {direction}, missing_id {direction} " + page_clause)
     try:
-        with engine.connect() as conn:
-            rows = [dict(row) for row in conn.execute(query).mappings()]
-        return {"missing_persons": rows}
+        async with async_engine.connect() as conn:
+            stamp = await conn.run_sync(versions.stamp, versions.MISSING)
+            cached = not_modified(request, response, stamp)
+            if cached is not None:
+                return cached
+            rows = (await conn.execute(query, params)).mappings().fetchall()
+        page, next_cursor = page_rows(rows, limit, "last_activity_at", "missing_id")
+        return {
+            "missing_persons": [dict(row) for row in page],
+            "count": len(page),
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
     except Exception:
         logging.exception("Failed to fetch missing persons")
         raise HTTPException(status_code=500, detail="Failed to fetch missing persons")
 
 @app.get("/api/missing-persons/{missing_id}")
-async def get_missing_person_by_id(missing_id: int):
-    with engine.connect() as conn:
-        result = conn.execute(
+async def get_missing_person_by_id(missing_id: int, request: Request, response: Response):
+    async with async_engine.connect() as conn:
+        stamp = await conn.run_sync(versions.stamp, versions.MISSING)
+        cached = not_modified(request, response, stamp)
+        if cached is not None:
+            return cached
+        result = (await conn.execute(
             text("SELECT * FROM missing_person WHERE missing_id = :missing_id"),
             {"missing_id": missing_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Missing person not found")
@@ -815,7 +1099,7 @@ async def get_missing_person_by_id(missing_id: int):
         return {"missing_person": dict(result)}
 
 
-@app.put("/api/missing-persons/{missing_id}/found")
+@app.put("/api/missing-persons/{missing_id}/found", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 async def update_missing_person_finder(missing_id: int, payload: MissingPersonFinderUpdate):
     normalized_status = "Found" if payload.still_with_finder else "Missing"
     still_with_value = "Yes" if payload.still_with_finder else "No"
@@ -835,8 +1119,8 @@ async def update_missing_person_finder(missing_id: int, payload: MissingPersonFi
         """
     )
 
-    with engine.begin() as conn:
-        result = conn.execute(update_sql, {
+    async with async_engine.begin() as conn:
+        result = await conn.execute(update_sql, {
             "finding_location": payload.finding_location,
             "finder_name": payload.finder_name,
             "finder_phone": payload.finder_phone,
@@ -850,7 +1134,7 @@ async def update_missing_person_finder(missing_id: int, payload: MissingPersonFi
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Missing person not found")
 
-        refreshed = conn.execute(
+        refreshed = (await conn.execute(
             text(
                 """
                 SELECT missing_id, reporter_id, name, age, gender, description,
@@ -865,20 +1149,29 @@ async def update_missing_person_finder(missing_id: int, payload: MissingPersonFi
                 """
             ),
             {"missing_id": missing_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
 
+    activity.record(
+        activity.MISSING, missing_id, activity.STATUS_CHANGED, status=normalized_status,
+        title=refreshed["name"],
+        summary=f"Reported found at {payload.finding_location}" if payload.finding_location
+        else activity.missing_summary(refreshed["last_seen_location"]),
+    )
     return {"missing_person": dict(refreshed)}
 
 
-@app.delete("/api/missing-persons/{missing_id}")
+@app.delete("/api/missing-persons/{missing_id}", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 async def delete_missing_person_record(missing_id: int, _user: dict = Depends(require_admin)):
     delete_sql = text("DELETE FROM missing_person WHERE missing_id = :missing_id")
 
-    with engine.begin() as conn:
-        result = conn.execute(delete_sql, {"missing_id": missing_id})
+    async with async_engine.begin() as conn:
+        counted = await conn.run_sync(rollups.keys_for, rollups.MISSING, missing_id)
+        result = await conn.execute(delete_sql, {"missing_id": missing_id})
 
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Missing person not found")
+        await conn.run_sync(name_index.unindex_person, name_index.MISSING, missing_id)
+        await conn.run_sync(rollups.removed, counted)
 
     return {"message": "Missing person report deleted"}
 
@@ -955,32 +1248,78 @@ async def delete_missing_person_record(missing_id: int, _user: dict = Depends(re
 
 
 @app.get("/api/wanted-criminals")
-async def get_wanted_criminals():
+async def get_wanted_criminals(
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, description="Filter by status (e.g. Active, Captured)"),
+    gender: Optional[str] = Query(None, description="Filter by gender"),
+    age_range: Optional[str] = Query(None, description="Filter by age range label (e.g. 25-30)"),
+    danger_level: Optional[str] = Query(None, description="Filter by danger level"),
+    sort: str = Query("recent", pattern="^(recent|oldest)$", description="Order by last activity"),
+    limit: int = Query(24, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
+):
+    position = _parse_cursor(cursor)
+    descending = sort == "recent"
+    conditions: List[str] = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    for column, value in (("status", status), ("gender", _gender_code(gender)), ("age_range", age_range),
+                          ("danger_level", danger_level)):
+        if value:
+            conditions.append(f"{column} = :{column}")
+            params[column] = value
+    keyset_sql, keyset_params = keyset_predicate("last_activity_at", "criminal_id", position, descending)
+    if keyset_sql:
+        conditions.append(keyset_sql)
+        params.update(keyset_params)
+    direction = "DESC" if descending else "ASC"
+    page_clause = "LIMIT :limit"
+    if position is None:
+        page_clause += " OFFSET :offset"
+        params["offset"] = offset
+
     query = text(
         """
         SELECT criminal_id, name, alias, age_range, gender, description, height, weight,
                hair_color, eye_color, distinguishing_marks, crimes_committed, reward_amount,
                danger_level, last_known_location, photo_url, wanted_since, added_by, status,
-               capture_date, created_at, updated_at
+               capture_date, created_at, updated_at, last_activity_at
         FROM wanted_criminal
-        ORDER BY COALESCE(updated_at, created_at) DESC
         """
+        + _where(conditions)
+        + f" ORDER BY last_activity_at {direction}, criminal_id {direction} "
+        + page_clause
     )
     try:
-        with engine.connect() as conn:
-            rows = [dict(row) for row in conn.execute(query).mappings()]
-        return {"wanted_criminals": rows}
+        async with async_engine.connect() as conn:
+            stamp = await conn.run_sync(versions.stamp, versions.WANTED)
+            cached = not_modified(request, response, stamp)
+            if cached is not None:
+                return cached
+            rows = (await conn.execute(query, params)).mappings().fetchall()
+        page, next_cursor = page_rows(rows, limit, "last_activity_at", "criminal_id")
+        return {
+            "wanted_criminals": [dict(row) for row in page],
+            "count": len(page),
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
     except Exception:
         logging.exception("Failed to fetch wanted criminals")
         raise HTTPException(status_code=500, detail="Failed to fetch wanted criminals")
 
 @app.get("/api/wanted-criminals/{criminal_id}")
-async def get_wanted_criminal_by_id(criminal_id: int):
-    with engine.connect() as conn:
-        result = conn.execute(
+async def get_wanted_criminal_by_id(criminal_id: int, request: Request, response: Response):
+    async with async_engine.connect() as conn:
+        stamp = await conn.run_sync(versions.stamp, versions.WANTED)
+        cached = not_modified(request, response, stamp)
+        if cached is not None:
+            return cached
+        result = (await conn.execute(
             text("SELECT * FROM wanted_criminal WHERE criminal_id = :criminal_id"),
             {"criminal_id": criminal_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Wanted criminal not found")
@@ -988,9 +1327,13 @@ async def get_wanted_criminal_by_id(criminal_id: int):
         return {"wanted_criminal": dict(result)}
 
 @app.get("/api/wanted-criminals/{criminal_id}/sightings")
-async def list_wanted_criminal_sightings(criminal_id: int):
-    with engine.connect() as conn:
-        rows = conn.execute(
+async def list_wanted_criminal_sightings(criminal_id: int, request: Request, response: Response):
+    async with async_engine.connect() as conn:
+        stamp = await conn.run_sync(versions.stamp, versions.WANTED)
+        cached = not_modified(request, response, stamp)
+        if cached is not None:
+            return cached
+        rows = (await conn.execute(
             text(
                 """
                 SELECT sighting_id,
@@ -1006,7 +1349,7 @@ async def list_wanted_criminal_sightings(criminal_id: int):
                 """
             ),
             {"criminal_id": criminal_id}
-        ).mappings().fetchall()
+        )).mappings().fetchall()
 
     def _serialize(row: Mapping[str, Any]) -> Dict[str, Any]:
         last_seen_time = row.get("last_seen_time")
@@ -1029,7 +1372,7 @@ async def list_wanted_criminal_sightings(criminal_id: int):
 
     return {"sightings": [_serialize(row) for row in rows]}
 
-@app.post("/api/wanted-criminals/{criminal_id}/sighting")
+@app.post("/api/wanted-criminals/{criminal_id}/sighting", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.WANTED))])
 async def report_criminal_sighting(criminal_id: int, sighting: CriminalSighting, _user: dict = Depends(require_user)):
     """Report a sighting of a wanted criminal"""
 
@@ -1052,9 +1395,9 @@ async def report_criminal_sighting(criminal_id: int, sighting: CriminalSighting,
     location_text = (sighting.last_seen_location or "").strip()
     with_finder_flag = "Yes" if sighting.still_with_finder else "No"
 
-    with engine.begin() as conn:
+    async with async_engine.begin() as conn:
         # Insert detailed sighting log (auditing/history)
-        conn.execute(
+        await conn.execute(
             text(
                 """
                 INSERT INTO criminal_sightings (
@@ -1086,7 +1429,7 @@ async def report_criminal_sighting(criminal_id: int, sighting: CriminalSighting,
         )
 
         # Update the live wanted-criminal record
-        update_result = conn.execute(
+        update_result = await conn.execute(
             text(
                 """
                 UPDATE wanted_criminal
@@ -1112,10 +1455,17 @@ async def report_criminal_sighting(criminal_id: int, sighting: CriminalSighting,
         if update_result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Wanted criminal not found")
 
-        updated_record = conn.execute(
+        updated_record = (await conn.execute(
             text("SELECT * FROM wanted_criminal WHERE criminal_id = :criminal_id"),
             {"criminal_id": criminal_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
+
+    activity.record(
+        activity.WANTED, criminal_id, activity.SIGHTED, status="Seen", actor_id=_user.get("user_id"),
+        title=updated_record["name"] if updated_record else None,
+        summary=f"Seen at {location_text or 'unspecified location'}",
+        details={"last_seen_time": last_seen_dt},
+    )
 
     # In production, this would trigger alerts to police task forces
     print(
@@ -1134,8 +1484,9 @@ async def report_criminal_sighting(criminal_id: int, sighting: CriminalSighting,
 @app.post("/api/chat/messages")
 async def send_message(message: ChatMessage, user: dict = Depends(require_user)):
     """Send a chat message. `user_id` is taken from the authenticated token, not the body."""
-    with engine.begin() as conn:
-        result = conn.execute(
+    created_at = datetime.utcnow()
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
             text("""
                 INSERT INTO chat_messages (user_id, message, report_id, is_admin, created_at)
                 VALUES (:user_id, :message, :report_id, :is_admin, :created_at)
@@ -1145,10 +1496,14 @@ async def send_message(message: ChatMessage, user: dict = Depends(require_user))
                 "message": message.message,
                 "report_id": message.report_id,
                 "is_admin": False,
-                "created_at": datetime.utcnow(),
+                "created_at": created_at,
             },
         )
-        return {"message": "Message sent successfully", "message_id": result.lastrowid}
+    chat.broker.publish(chat.event({
+        "message_id": result.lastrowid, "user_id": user["user_id"], "username": user.get("username"),
+        "message": message.message, "is_admin": False, "created_at": created_at, "report_id": message.report_id,
+    }))
+    return {"message": "Message sent successfully", "message_id": result.lastrowid}
 
 @app.get("/api/chat/messages")
 async def get_chat_messages(
@@ -1156,7 +1511,7 @@ async def get_chat_messages(
     limit: Optional[int] = Query(50, description="Limit number of messages")
 ):
     """Get chat messages"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
             query = "SELECT cm.*, u.username FROM chat_messages cm LEFT JOIN appuser u ON cm.user_id = u.user_id"
             params = {}
@@ -1168,7 +1523,7 @@ async def get_chat_messages(
             query += " ORDER BY cm.created_at DESC LIMIT :limit"
             params["limit"] = limit
             
-            result = conn.execute(text(query), params).mappings().fetchall()
+            result = (await conn.execute(text(query), params)).mappings().fetchall()
             return {"messages": [dict(row) for row in result]}
         except Exception as e:
             print(f"Error fetching messages: {e}")
@@ -1195,10 +1550,10 @@ async def get_chat_messages(
 @app.get("/api/chat/conversations")
 async def get_admin_conversations():
     """Get all active conversations for admin dashboard"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
             # Get conversations with latest message
-            result = conn.execute(
+            result = (await conn.execute(
                 text("""
                     SELECT DISTINCT 
                         cm.user_id,
@@ -1212,7 +1567,7 @@ async def get_admin_conversations():
                     GROUP BY cm.user_id, cm.report_id
                     ORDER BY last_message_time DESC
                 """)
-            ).mappings().fetchall()
+            )).mappings().fetchall()
             
             conversations = []
             for row in result:
@@ -1249,108 +1604,135 @@ async def get_admin_conversations():
             ]}
 
 @app.get("/api/chat/conversation/{user_id}")
-async def get_conversation_messages(user_id: int, report_id: Optional[str] = None):
-    """Get messages for a specific conversation"""
-    with engine.connect() as conn:
+async def get_conversation_messages(
+    user_id: int,
+    report_id: Optional[str] = None,
+    after_id: Optional[int] = Query(None, ge=0, description="Only messages newer than this message_id"),
+    before_id: Optional[int] = Query(None, ge=1, description="The page of messages just older than this message_id"),
+    limit: int = Query(chat.HISTORY_LIMIT, ge=1, le=chat.HISTORY_MAX),
+):
+    """Messages for a conversation, oldest first, at most `limit` of them.
+
+    Without `after_id`/`before_id` this is the newest page. A client that
+    already holds the tail passes its last `message_id` as `after_id` and
+    gets only what is new. `before_id` pages back through older messages.
+    `has_more` says whether another page lies in that direction.
+    """
+    async with async_engine.connect() as conn:
         try:
-            query = """
-                SELECT cm.*, u.username, u.email
-                FROM chat_messages cm
-                LEFT JOIN appuser u ON cm.user_id = u.user_id
-                WHERE cm.user_id = :user_id
-            """
-            params = {"user_id": user_id}
-            
-            if report_id and report_id != "General":
-                query += " AND cm.report_id = :report_id"
-                params["report_id"] = report_id
-                
-            query += " ORDER BY cm.created_at ASC"
-            
-            result = conn.execute(text(query), params).mappings().fetchall()
-            
-            # Mark admin messages as read
-            conn.execute(
-                text("UPDATE chat_messages SET read_by_admin = 1 WHERE user_id = :user_id AND is_admin = 0"),
-                {"user_id": user_id}
+            rows, has_more = await conn.run_sync(
+                chat.history, user_id, report_id if report_id and report_id != "General" else None,
+                after_id, before_id, limit,
             )
-            conn.commit()
-            
+
+            # Mark the user's messages read by staff, only if this page shows unread ones.
+            if any(not row["is_admin"] and not row["read_by_admin"] for row in rows):
+                await conn.execute(
+                    text("UPDATE chat_messages SET read_by_admin = 1 WHERE user_id = :user_id AND is_admin = 0"),
+                    {"user_id": user_id}
+                )
+                await conn.commit()
+
             messages = []
-            for row in result:
-                messages.append({
-                    "message_id": row["message_id"],
-                    "user_id": row["user_id"],
-                    "username": row["username"] or f"User-{row['user_id']}",
-                    "message": row["message"],
-                    "is_admin": row["is_admin"],
-                    "created_at": row["created_at"],
-                    "report_id": row["report_id"]
-                })
-            
-            return {"messages": messages}
-        except Exception as e:
-            print(f"Error fetching conversation messages: {e}")
-            # Return mock data for demo
-            return {"messages": [
-                {
-                    "message_id": 1,
-                    "user_id": user_id,
-                    "username": f"User-{user_id}",
-                    "message": "Hello, I need help with my report",
-                    "is_admin": False,
-                    "created_at": datetime.utcnow(),
-                    "report_id": "CR-001"
-                },
-                {
-                    "message_id": 2,
-                    "user_id": 999,  # Admin user ID
-                    "username": "Admin",
-                    "message": "Hello! I'm here to help. What specific assistance do you need?",
-                    "is_admin": True,
-                    "created_at": datetime.utcnow(),
-                    "report_id": "CR-001"
-                }
-            ]}
+            for row in rows:
+                message = chat.event(row)
+                message["username"] = row["username"] or f"User-{row['user_id']}"
+                message["email"] = row["email"]
+                message["read_by_user"] = bool(row["read_by_user"])
+                messages.append(message)
+
+            return {"messages": messages, "has_more": has_more}
+        except Exception as exc:
+            logging.exception("Error fetching conversation messages: %s", exc)
+            raise HTTPException(status_code=500, detail="Failed to load conversation messages")
+
+CHAT_STAFF_ROLES = {"admin", "officer", "detective", "staff"}
+
+
+def _is_chat_staff(user: dict) -> bool:
+    return (user.get("role_hint") or "").lower() in CHAT_STAFF_ROLES
+
 
 @app.post("/api/chat/send")
 async def send_chat_message(message_data: ChatMessage, user: dict = Depends(require_user)):
     """Send a message in chat. `user_id` is taken from the authenticated token.
 
-    Authenticated admins may set `is_admin=True` to send as staff; non-admins
-    always send as user messages.
+    Authenticated admins may set `is_admin=True` to send as staff; the reply
+    is filed under the conversation of the body's `user_id`. Non-admins
+    always send as user messages in their own conversation.
     """
-    role = (user.get("role_hint") or "").lower()
-    is_admin = bool(message_data.is_admin) and role in {"admin", "officer", "detective", "staff"}
-    with engine.begin() as conn:
-        result = conn.execute(
+    is_admin = bool(message_data.is_admin) and _is_chat_staff(user)
+    conversation_user_id = message_data.user_id if is_admin else user["user_id"]
+    created_at = datetime.utcnow()
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
             text("""
                 INSERT INTO chat_messages (user_id, message, report_id, is_admin, created_at, read_by_admin, read_by_user)
                 VALUES (:user_id, :message, :report_id, :is_admin, :created_at, :read_by_admin, :read_by_user)
             """),
             {
-                "user_id": user["user_id"],
+                "user_id": conversation_user_id,
                 "message": message_data.message,
                 "report_id": message_data.report_id,
                 "is_admin": is_admin,
-                "created_at": datetime.utcnow(),
+                "created_at": created_at,
                 "read_by_admin": 1 if is_admin else 0,
                 "read_by_user": 0 if is_admin else 1,
             },
         )
         message_id = result.lastrowid
-        return {
-            "message": "Message sent successfully",
-            "message_id": message_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+    chat.broker.publish(chat.event({
+        "message_id": message_id, "user_id": conversation_user_id,
+        "username": None if is_admin else user.get("username"), "message": message_data.message,
+        "is_admin": is_admin, "created_at": created_at, "report_id": message_data.report_id,
+    }))
+    return {
+        "message": "Message sent successfully",
+        "message_id": message_id,
+        "timestamp": created_at.isoformat(),
+    }
+
+@app.get("/api/chat/stream")
+async def stream_chat(
+    request: Request,
+    user_id: Optional[int] = Query(None, description="Conversation to follow; staff may omit it to follow all"),
+    report_id: Optional[str] = Query(None, description="Only this report's thread"),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this message_id"),
+    user: dict = Depends(require_user),
+):
+    """Server-Sent Events feed of new chat messages (see app.db.chat).
+
+    Users may only follow their own conversation. Each event's `id` is its
+    message_id. A reconnect that sends it back, as `Last-Event-ID` or as
+    `after_id`, first receives everything committed after it.
+    """
+    if not _is_chat_staff(user):
+        if user_id is not None and user_id != user["user_id"]:
+            raise HTTPException(status_code=403, detail="Cannot follow another user's conversation")
+        user_id = user["user_id"]
+    if after_id is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        after_id = int(last_event_id) if last_event_id.isdigit() else None
+    if report_id in ("", "General"):
+        report_id = None
+
+    async def load_backlog(cursor: int):
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(chat.backlog, cursor, user_id, report_id)
+
+    topics = [chat.topic(user_id) if user_id is not None else chat.ALL]
+    return StreamingResponse(
+        chat.stream(chat.broker, topics, load_backlog, report_id=report_id, after_id=after_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/api/chat/user-conversations/{user_id}")
 async def get_user_conversations(user_id: int):
     """Get conversations for a specific user (for user_chatbox.html)"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            result = (await conn.execute(
                 text("""
                     SELECT DISTINCT 
                         report_id,
@@ -1362,7 +1744,7 @@ async def get_user_conversations(user_id: int):
                     ORDER BY last_message_time DESC
                 """),
                 {"user_id": user_id}
-            ).mappings().fetchall()
+            )).mappings().fetchall()
             
             conversations = []
             for row in result:
@@ -1389,7 +1771,7 @@ async def get_user_conversations(user_id: int):
 # JSON parsing is unified on `parse_json_value` (alias of `parse_json_field`
 # imported from db.py at the top of this module).
 
-@app.post("/api/emergency-alert")
+@app.post("/api/emergency-alert", dependencies=[Depends(invalidate_after_write)])
 async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(require_user)):
     """Handle panic button and emergency alerts."""
 
@@ -1402,18 +1784,18 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
             return None
 
     try:
-        with engine.begin() as conn:
+        async with async_engine.begin() as conn:
 
             user_snapshot = None
             if alert.user_id:
-                user_row = conn.execute(
+                user_row = (await conn.execute(
                     text("""
                         SELECT user_id, username, email, role_hint, status
                         FROM appuser
                         WHERE user_id = :user_id
                     """),
                     {"user_id": alert.user_id}
-                ).mappings().fetchone()
+                )).mappings().fetchone()
 
                 if not user_row:
                     raise HTTPException(status_code=404, detail="User not found for panic alert")
@@ -1445,7 +1827,7 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
                 "alert_type": alert.alert_type
             }
 
-            crime_result = conn.execute(
+            crime_result = await conn.execute(
                 text(
                     """
                     INSERT INTO crime (location_data, crime_data, status, reporter_id, created_at)
@@ -1461,9 +1843,17 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
                 }
             )
             linked_crime_id = crime_result.lastrowid
+            await conn.run_sync(totals.crime_inserted, "Emergency")
+            await conn.run_sync(search_index.index_crime, linked_crime_id, emergency_crime_payload, location_payload)
+            await conn.run_sync(rollups.changed, rollups.CRIMES, linked_crime_id)
+            await conn.run_sync(workload.crime_changed, linked_crime_id)
+
+            if stations.needs_load():
+                await conn.run_sync(stations.ensure_loaded)
+            nearest_stations = stations.nearest(latitude, longitude)
 
             metadata_payload = alert.metadata or {}
-            alert_result = conn.execute(
+            alert_result = await conn.execute(
                 text(
                     """
                     INSERT INTO emergency_alerts (
@@ -1477,6 +1867,7 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
                         severity,
                         description,
                         metadata,
+                        nearest_stations,
                         status,
                         created_at
                     )
@@ -1491,6 +1882,7 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
                         :severity,
                         :description,
                         :metadata,
+                        :nearest_stations,
                         :status,
                         :created_at
                     )
@@ -1507,6 +1899,7 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
                     "severity": alert.severity,
                     "description": alert.description,
                     "metadata": json.dumps(metadata_payload) if metadata_payload else None,
+                    "nearest_stations": json.dumps(nearest_stations) if nearest_stations else None,
                     "status": "New",
                     "created_at": datetime.utcnow()
                 }
@@ -1514,10 +1907,22 @@ async def submit_emergency_alert(alert: EmergencyAlert, _user: dict = Depends(re
 
             alert_id = alert_result.lastrowid
 
+        activity.record(
+            activity.CRIME, linked_crime_id, activity.CREATED, status="Emergency", actor_id=alert.user_id,
+            title=activity.crime_title(linked_crime_id),
+            summary=activity.crime_summary("Emergency", emergency_crime_payload["description"], location_label),
+        )
+        activity.record(
+            activity.EMERGENCY, alert_id, activity.ESCALATED, status="New", actor_id=alert.user_id,
+            title=f"{alert.alert_type} alert ({alert.severity})",
+            summary=location_label or alert.description,
+            details={"crime_id": linked_crime_id},
+        )
         return {
             "message": "Emergency alert sent successfully",
             "alert_id": alert_id,
             "crime_id": linked_crime_id,
+            "nearest_stations": nearest_stations,
             "status": "Emergency services notified"
         }
     except HTTPException:
@@ -1533,28 +1938,42 @@ async def get_admin_emergencies(
     status: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
 ):
     """Retrieve recent emergency alerts with enrichment for the admin dashboard."""
-    with engine.connect() as conn:
+    position = _parse_cursor(cursor)
+    async with async_engine.connect() as conn:
 
-        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        params: Dict[str, Any] = {"limit": limit + 1}
+        conditions: List[str] = []
         base_query = (
             """
             SELECT alert_id, user_id, user_snapshot, linked_crime_id, location_label,
                    latitude, longitude, alert_type, severity, description, metadata,
-                   status, assigned_officer_id, assigned_officer_snapshot, assigned_at,
-                   created_at, resolved_at
+                   nearest_stations, status, assigned_officer_id, assigned_officer_snapshot,
+                   assigned_at, created_at, resolved_at
             FROM emergency_alerts
             """
         )
 
         if status:
-            base_query += " WHERE LOWER(status) = :status"
-            params["status"] = status.lower()
+            # Column collation is case-insensitive; no LOWER() so the
+            # (status, created_at) index applies.
+            conditions.append("status = :status")
+            params["status"] = status
+
+        keyset_sql, keyset_params = keyset_predicate("created_at", "alert_id", position)
+        if keyset_sql:
+            conditions.append(keyset_sql)
+            params.update(keyset_params)
 
-        base_query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        base_query += _where(conditions) + " ORDER BY created_at DESC, alert_id DESC LIMIT :limit"
+        if position is None:
+            base_query += " OFFSET :offset"
+            params["offset"] = offset
 
-        rows = conn.execute(text(base_query), params).mappings().fetchall()
+        rows = (await conn.execute(text(base_query), params)).mappings().fetchall()
+        rows, next_cursor = page_rows(rows, limit, "created_at", "alert_id")
 
     emergencies = []
     for row in rows:
@@ -1570,6 +1989,7 @@ async def get_admin_emergencies(
             "severity": row.get("severity"),
             "description": row.get("description"),
             "metadata": parse_json_value(row.get("metadata")) or {},
+            "nearest_stations": parse_json_value(row.get("nearest_stations")) or [],
             "status": row.get("status"),
             "assigned_officer_id": row.get("assigned_officer_id"),
             "assigned_officer_snapshot": parse_json_value(row.get("assigned_officer_snapshot")),
@@ -1580,16 +2000,16 @@ async def get_admin_emergencies(
 
         emergencies.append(emergency)
 
-    return {"emergencies": emergencies}
+    return {"emergencies": emergencies, "next_cursor": next_cursor}
 
 
-@app.put("/api/admin/emergencies/{alert_id}/assign")
+@app.put("/api/admin/emergencies/{alert_id}/assign", dependencies=[Depends(invalidate_after_write)])
 async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user: dict = Depends(require_admin)):
     """Assign an officer to a specific emergency alert."""
     try:
-        with engine.begin() as conn:
+        async with async_engine.begin() as conn:
 
-            alert_row = conn.execute(
+            alert_row = (await conn.execute(
                 text(
                     """
                     SELECT alert_id, status, linked_crime_id
@@ -1599,12 +2019,12 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
                     """
                 ),
                 {"alert_id": alert_id}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
 
             if not alert_row:
                 raise HTTPException(status_code=404, detail="Emergency alert not found")
 
-            officer = conn.execute(
+            officer = (await conn.execute(
                 text(
                     """
                     SELECT user_id, username, email, role_hint, status
@@ -1613,7 +2033,7 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
                 """
                 ),
                 {"user_id": assignment.officer_id}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
 
             if not officer:
                 raise HTTPException(status_code=404, detail="Officer not found")
@@ -1630,7 +2050,7 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
                 "status": officer.get("status")
             }
 
-            conn.execute(
+            await conn.execute(
                 text(
                     """
                     UPDATE emergency_alerts
@@ -1651,8 +2071,45 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
             )
 
             linked_crime_id = alert_row.get("linked_crime_id")
+            case_assigned = False
+            if linked_crime_id:
+                crime_row = (await conn.execute(
+                    text("SELECT status FROM crime WHERE crime_id = :crime_id FOR UPDATE"),
+                    {"crime_id": linked_crime_id}
+                )).mappings().fetchone()
+                linked_crime_id = linked_crime_id if crime_row else None
             if linked_crime_id:
-                conn.execute(
+                counted = await conn.run_sync(rollups.keys_for, rollups.CRIMES, linked_crime_id)
+                previous_officer = await conn.run_sync(workload.officer_for, linked_crime_id)
+                # An unassigned linked crime gets the dispatched officer as its
+                # case assignment, so it shows up in their workload. An existing
+                # assignment is left alone; reassigning is /api/admin/assign-case.
+                existing = (await conn.execute(
+                    text("SELECT assignment_id FROM case_assignments WHERE crime_id = :crime_id FOR UPDATE"),
+                    {"crime_id": linked_crime_id}
+                )).fetchone()
+                if existing is None:
+                    try:
+                        await conn.execute(
+                            text(
+                                """
+                                INSERT INTO case_assignments (user_id, crime_id, duty_role, assigned_at, status)
+                                VALUES (:user_id, :crime_id, :duty_role, :assigned_at, :status)
+                                """
+                            ),
+                            {
+                                "user_id": officer["user_id"],
+                                "crime_id": linked_crime_id,
+                                "duty_role": "Emergency Response",
+                                "assigned_at": datetime.utcnow(),
+                                "status": "Active"
+                            }
+                        )
+                        case_assigned = True
+                        await conn.run_sync(totals.assignments_changed, 1)
+                    except IntegrityError:
+                        pass  # assigned concurrently; that assignment stands
+                await conn.execute(
                     text(
                         """
                         UPDATE crime
@@ -1665,11 +2122,27 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
                         "crime_id": linked_crime_id
                     }
                 )
-
+                await conn.run_sync(totals.crime_status_changed, crime_row["status"], "Under Investigation")
+                await conn.run_sync(rollups.changed, rollups.CRIMES, linked_crime_id, counted)
+                await conn.run_sync(workload.crime_changed, linked_crime_id, previous_officer)
+
+        officer_name = officer.get("username") or f"user {officer['user_id']}"
+        activity.record(
+            activity.EMERGENCY, alert_id, activity.ASSIGNED, status="Dispatched", actor_id=_user.get("user_id"),
+            title=f"Emergency alert #{alert_id}", summary=f"Dispatched to {officer_name}",
+            details={"officer_id": officer["user_id"], "crime_id": linked_crime_id},
+        )
+        if linked_crime_id:
+            activity.record(
+                activity.CRIME, linked_crime_id, activity.STATUS_CHANGED, status="Under Investigation",
+                actor_id=_user.get("user_id"), title=activity.crime_title(linked_crime_id),
+                summary=f"Emergency alert #{alert_id} dispatched to {officer_name}",
+            )
         return {
             "message": "Emergency alert assigned successfully",
             "alert_id": alert_id,
-            "officer_id": assignment.officer_id
+            "officer_id": assignment.officer_id,
+            "case_assigned": case_assigned,
         }
     except HTTPException:
         raise
@@ -1679,147 +2152,198 @@ async def assign_emergency(alert_id: int, assignment: EmergencyAssignment, _user
 
 # ==================== FORM DATA ENDPOINTS ====================
 
+# Forms may reuse /api/reference this long before revalidating; a new area
+# reaches browsers that already have the bundle within this window.
+REFERENCE_MAX_AGE = int(os.getenv("REFERENCE_MAX_AGE", "3600"))
+
+
+async def _reference_data():
+    """(bundle, stamp) from app.db.reference; DB access only when a recheck is due."""
+    cached = reference.cache.peek()
+    if cached is not None:
+        return cached
+    try:
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(reference.current)
+    except Exception as exc:
+        logging.warning("Reference data unavailable, serving last known lists: %s", exc)
+        return reference.cache.unavailable()
+
+
+@app.get("/api/reference")
+async def get_reference_data(request: Request, response: Response):
+    """Crime types, districts, thanas and areas in one cacheable response."""
+    bundle, stamp = await _reference_data()
+    cached = not_modified(request, response, stamp, max_age=REFERENCE_MAX_AGE)
+    if cached is not None:
+        return cached
+    return {**reference.public(bundle), "version": stamp[0] if stamp else None}
+
 @app.get("/api/crime-types")
 async def get_crime_types():
     """Get available crime types for the form dropdown"""
-    crime_types = [
-        "Theft", "Burglary", "Robbery", "Assault", "Murder", "Kidnapping",
-        "Fraud", "Cybercrime", "Drug Offense", "Vandalism", "Domestic Violence",
-        "Sexual Assault", "Hit and Run", "Arson", "Blackmail", "Emergency", "Other"
-    ]
-    return {"crime_types": crime_types}
+    bundle, _stamp = await _reference_data()
+    return {"crime_types": bundle["crime_types"]}
 
 @app.get("/api/districts")
 async def get_districts():
     """Get available districts for location dropdown"""
-    districts = [
-        "Dhaka", "Chittagong", "Sylhet", "Rajshahi", "Khulna", "Barisal",
-        "Rangpur", "Mymensingh", "Comilla", "Gazipur", "Narayanganj"
-    ]
-    return {"districts": districts}
+    bundle, _stamp = await _reference_data()
+    return {"districts": [district["name"] for district in bundle["districts"]]}
 
 @app.get("/api/areas/{district}")
 async def get_areas_by_district(district: str):
     """Get areas within a specific district"""
-    areas_map = {
-        "Dhaka": [
-            "Dhanmondi", "Gulshan", "Banani", "Uttara", "Mirpur", "Mohammadpur",
-            "Old Dhaka", "Wari", "Ramna", "Tejgaon", "Motijheel", "Shahbagh"
-        ],
-        "Chittagong": [
-            "Agrabad", "Nasirabad", "Panchlaish", "Khulshi", "Halishahar", "Bayazid"
-        ],
-        "Sylhet": [
-            "Zindabazar", "Amberkhana", "Shahporan", "Bandar Bazar", "Chowhatta"
-        ]
-    }
-    return {"areas": areas_map.get(district, [])}
+    bundle, _stamp = await _reference_data()
+    return {"areas": reference.areas(bundle, district)}
+
+@app.post("/api/admin/reference/{kind}")
+async def add_reference_item(kind: str, item: ReferenceItemCreate, _user: dict = Depends(require_admin)):
+    """Add a crime type, district, thana or area (kind: crime-types, districts, thanas, areas)."""
+    if kind not in reference.KINDS:
+        raise HTTPException(status_code=404, detail="Unknown reference list")
+    async with async_engine.connect() as conn:
+        try:
+            item_id = await conn.run_sync(reference.add, kind, item.name, item.district, item.thana,
+                                          item.sort_order)
+            await conn.commit()
+        except ValueError as exc:
+            await conn.rollback()
+            raise HTTPException(status_code=422, detail=str(exc))
+        except LookupError as exc:
+            await conn.rollback()
+            raise HTTPException(status_code=404, detail=str(exc))
+        except IntegrityError:
+            await conn.rollback()
+            raise HTTPException(status_code=409, detail=f"{item.name} already exists")
+        except Exception as e:
+            await conn.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to add reference item: {str(e)}")
+    reference.cache.expire()
+    return {"message": "Reference item added", "id": item_id}
+
+@app.put("/api/admin/reference/{kind}/{item_id}")
+async def update_reference_item(kind: str, item_id: int, item: ReferenceItemUpdate,
+                                _user: dict = Depends(require_admin)):
+    """Rename, reorder or (de)activate a reference item."""
+    if kind not in reference.KINDS:
+        raise HTTPException(status_code=404, detail="Unknown reference list")
+    fields = item.dict(exclude_none=True)
+    if "is_active" in fields:
+        fields["is_active"] = int(fields["is_active"])
+    async with async_engine.connect() as conn:
+        try:
+            found = await conn.run_sync(reference.update, kind, item_id, fields)
+            if not found:
+                raise HTTPException(status_code=404, detail="Reference item not found")
+            await conn.commit()
+        except HTTPException:
+            await conn.rollback()
+            raise
+        except IntegrityError:
+            await conn.rollback()
+            raise HTTPException(status_code=409, detail=f"{item.name} already exists")
+        except Exception as e:
+            await conn.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to update reference item: {str(e)}")
+    reference.cache.expire()
+    return {"message": "Reference item updated"}
 
 # ==================== STATISTICS ENDPOINTS ====================
 
 @app.get("/api/statistics/crimes")
 async def get_crime_statistics():
-    with engine.connect() as conn:
-        try:
-            # Total crimes
-            total_crimes = conn.execute(
-                text("SELECT COUNT(*) as count FROM crime")
-            ).scalar() or 0
-            
-            # Crimes by status
-            status_stats = conn.execute(
-                text("SELECT status, COUNT(*) as count FROM crime GROUP BY status")
-            ).mappings().fetchall()
-            
-            # Recent crimes (last 30 days)
-            recent_crimes = conn.execute(
-                text("""
-                    SELECT COUNT(*) as count FROM crime 
-                    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                """)
-            ).scalar() or 0
-            
-            # Crimes by type (extract from crime_data JSON)
-            crime_types = conn.execute(
-                text("""
-                    SELECT 
-                        JSON_EXTRACT(crime_data, '$.type') as crime_type,
-                        COUNT(*) as count 
-                    FROM crime 
-                    WHERE crime_data IS NOT NULL 
-                    GROUP BY JSON_EXTRACT(crime_data, '$.type')
-                """)
-            ).mappings().fetchall()
-            
-            return {
-                "total_crimes": total_crimes,
-                "status_distribution": [dict(row) for row in status_stats],
-                "recent_crimes": recent_crimes,
-                "crime_types": [dict(row) for row in crime_types]
-            }
-        except Exception as e:
-            print(f"Error fetching crime statistics: {e}")
-            return {
-                "total_crimes": 0,
-                "status_distribution": [],
-                "recent_crimes": 0,
-                "crime_types": []
-            }
+    try:
+        snapshot, age = await metrics.snapshot(async_engine)
+        crimes = snapshot["crimes"]
+        return {
+            "total_crimes": crimes["total"],
+            "status_distribution": crimes["by_status"],
+            "recent_crimes": crimes["last_30d"],
+            "crime_types": crimes["by_type"],
+            "snapshot_age_seconds": round(age, 1),
+        }
+    except Exception as e:
+        print(f"Error fetching crime statistics: {e}")
+        return {
+            "total_crimes": 0,
+            "status_distribution": [],
+            "recent_crimes": 0,
+            "crime_types": []
+        }
 
 @app.get("/api/statistics/missing-persons")
 async def get_missing_person_statistics():
-    with engine.connect() as conn:
-        try:
-            # Total missing persons
-            total_missing = conn.execute(
-                text("SELECT COUNT(*) as count FROM missing_person")
-            ).scalar() or 0
-            
-            # Missing persons by status
-            status_stats = conn.execute(
-                text("SELECT status, COUNT(*) as count FROM missing_person GROUP BY status")
-            ).mappings().fetchall()
-            
-            # Recent reports (last 30 days)
-            recent_missing = conn.execute(
-                text("""
-                    SELECT COUNT(*) as count FROM missing_person 
-                    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                """)
-            ).scalar() or 0
-            
-            return {
-                "total_missing": total_missing,
-                "status_distribution": [dict(row) for row in status_stats],
-                "recent_missing": recent_missing
-            }
-        except Exception as e:
-            print(f"Error fetching missing person statistics: {e}")
-            return {
-                "total_missing": 0,
-                "status_distribution": [],
-                "recent_missing": 0
-            }
+    try:
+        snapshot, age = await metrics.snapshot(async_engine)
+        missing = snapshot["missing"]
+        return {
+            "total_missing": missing["total"],
+            "status_distribution": missing["by_status"],
+            "recent_missing": missing["last_30d"],
+            "snapshot_age_seconds": round(age, 1),
+        }
+    except Exception as e:
+        print(f"Error fetching missing person statistics: {e}")
+        return {
+            "total_missing": 0,
+            "status_distribution": [],
+            "recent_missing": 0
+        }
+
+MAX_TIMESERIES_DAYS = 3660
+
+
+@app.get("/api/statistics/timeseries")
+async def get_statistics_timeseries(
+    metric: str = Query(rollups.CRIMES, pattern=rollups.METRIC_PATTERN, description="crimes | missing | wanted | users"),
+    dimension: Optional[str] = Query(None, pattern=rollups.DIMENSION_PATTERN, description="Split crimes by type | area | status | priority"),
+    value: Optional[List[str]] = Query(None, description="Only these values of the dimension (repeatable)"),
+    date_from: Optional[date] = Query(None, alias="from", description="First local (Asia/Dhaka) day, default 29 days before `to`"),
+    date_to: Optional[date] = Query(None, alias="to", description="Last local day, default today"),
+    granularity: str = Query("day", pattern=rollups.GRANULARITY_PATTERN, description="day | week | month"),
+    top: int = Query(10, ge=1, le=50, description="Series kept when split; the rest are summed as 'other'"),
+):
+    """Daily counts from the rollup tables, bucketed by day, ISO week or month."""
+    first, last = _local_day_window(date_from, date_to, MAX_TIMESERIES_DAYS)
+    if dimension and metric != rollups.CRIMES:
+        raise HTTPException(status_code=400, detail="Only crimes can be split by a dimension")
+
+    async with async_engine.connect() as conn:
+        data = await conn.run_sync(
+            rollups.series, metric, first, last, granularity, dimension or rollups.TOTAL, value, top
+        )
+    return {
+        "metric": metric,
+        "dimension": dimension,
+        "granularity": granularity,
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "timezone": rollups.TIMEZONE,
+        **data,
+    }
 
 # ==================== UPDATE STATUS ENDPOINTS ====================
 
-@app.put("/api/crimes/{crime_id}/status")
+@app.put("/api/crimes/{crime_id}/status", dependencies=[Depends(invalidate_after_write)])
 async def update_crime_status(crime_id: int, status_update: StatusUpdate):
     try:
-        with engine.begin() as conn:
-            current = conn.execute(
+        async with async_engine.begin() as conn:
+            current = (await conn.execute(
                 text("SELECT crime_id, status FROM crime WHERE crime_id = :crime_id FOR UPDATE"),
                 {"crime_id": crime_id}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
 
             if not current:
                 raise HTTPException(status_code=404, detail="Crime not found")
 
+            counted = await conn.run_sync(rollups.keys_for, rollups.CRIMES, crime_id)
+            officer = await conn.run_sync(workload.officer_for, crime_id)
             new_status_value = status_update.new_status.strip()
             notes_value = (status_update.notes or "").strip() or None
             changed_by_value = status_update.changed_by if status_update.changed_by is not None else None
 
-            conn.execute(
+            await conn.execute(
                 text(
                     """
                     UPDATE crime
@@ -1833,9 +2357,12 @@ async def update_crime_status(crime_id: int, status_update: StatusUpdate):
                     "crime_id": crime_id
                 }
             )
+            await conn.run_sync(totals.crime_status_changed, current["status"], new_status_value)
+            await conn.run_sync(rollups.changed, rollups.CRIMES, crime_id, counted)
+            await conn.run_sync(workload.crime_changed, crime_id, officer)
 
             try:
-                conn.execute(
+                await conn.execute(
                     text(
                         """
                         INSERT INTO status_history (crime_id, new_status, notes, changed_by, changed_at)
@@ -1853,6 +2380,12 @@ async def update_crime_status(crime_id: int, status_update: StatusUpdate):
             except Exception:
                 logging.exception("Failed to write status_history row; primary update succeeded")
 
+        activity.record(
+            activity.CRIME, crime_id, activity.STATUS_CHANGED, status=new_status_value, actor_id=changed_by_value,
+            title=activity.crime_title(crime_id),
+            summary=notes_value or f"{current['status'] or 'Unknown'} -> {new_status_value}",
+            details={"from": current["status"]},
+        )
         return {
             "message": "Crime status updated successfully",
             "crime_id": crime_id,
@@ -1873,121 +2406,195 @@ async def search_crimes(
     location: Optional[str] = Query(None, description="Location filter"),
     crime_type: Optional[str] = Query(None, description="Crime type filter"),
     date_from: Optional[str] = Query(None, description="Date from (YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(None, description="Date to (YYYY-MM-DD)")
+    date_to: Optional[str] = Query(None, description="Date to (YYYY-MM-DD)"),
+    sort: Optional[str] = Query(None, pattern="^(relevance|recent)$", description="relevance (default with a keyword) or recent"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (sort=recent only)"),
 ):
-    with engine.connect() as conn:
-        try:
-            query = "SELECT * FROM crime WHERE 1=1"
-            params = {}
-            
-            if keyword:
-                query += " AND (crime_data LIKE :keyword OR location_data LIKE :keyword)"
-                params["keyword"] = f"%{keyword}%"
-                
-            if location:
-                query += " AND location_data LIKE :location"
-                params["location"] = f"%{location}%"
-                
-            if crime_type:
-                query += " AND JSON_EXTRACT(crime_data, '$.type') = :crime_type"
-                params["crime_type"] = crime_type
-                
-            if date_from:
-                query += " AND DATE(created_at) >= :date_from"
-                params["date_from"] = date_from
-                
-            if date_to:
-                query += " AND DATE(created_at) <= :date_to"
-                params["date_to"] = date_to
-                
-            query += " ORDER BY created_at DESC LIMIT 50"
-            
-            result = conn.execute(text(query), params).mappings().fetchall()
-            
-            crimes = []
-            for row in result:
-                crime = dict(row)
-                # Parse JSON fields
-                if crime["location_data"]:
-                    crime["location_data"] = json.loads(crime["location_data"])
-                if crime["crime_data"]:
-                    crime["crime_data"] = json.loads(crime["crime_data"])
-                crimes.append(crime)
-                
-            return {"crimes": crimes}
-        except Exception as e:
-            print(f"Error searching crimes: {e}")
-            return {"crimes": []}
+    terms = search_index.parse_terms(keyword)
+    fts_query = search_index.fulltext_query(terms)
+    sort = sort or ("relevance" if fts_query else "recent")
+    if sort == "relevance" and not fts_query:
+        sort = "recent"
+    position = _parse_cursor(cursor) if sort == "recent" else None
+
+    conditions: List[str] = []
+    params: Dict[str, Any] = {"limit": limit + 1}
+    select = "SELECT c.*"
+    source = " FROM crime c"
+    if fts_query:
+        select += ", s.description AS search_description, " + search_index.RANK_SQL + " AS score"
+        source = " FROM crime_search s JOIN crime c ON c.crime_id = s.crime_id"
+        conditions.append(search_index.MATCH_SQL)
+        params["fts_query"] = fts_query
+    elif terms:
+        short_sql, short_params = search_index.short_prefix_sql(terms)
+        conditions.append(short_sql)
+        params.update(short_params)
+
+    if location:
+        # Prefix match on the indexed city / area_name columns.
+        conditions.append("(c.city LIKE :location OR c.area_name LIKE :location)")
+        params["location"] = f"{location}%"
+    if crime_type:
+        conditions.append("c.crime_type = :crime_type")
+        params["crime_type"] = crime_type
+    # Range predicates on the raw column so idx_crime_created_at applies.
+    if date_from:
+        conditions.append("c.created_at >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        conditions.append("c.created_at < DATE_ADD(:date_to, INTERVAL 1 DAY)")
+        params["date_to"] = date_to
+
+    if sort == "relevance":
+        order = " ORDER BY score DESC, c.crime_id DESC LIMIT :limit OFFSET :offset"
+        params["offset"] = offset
+    else:
+        keyset_sql, keyset_params = keyset_predicate("c.created_at", "c.crime_id", position)
+        if keyset_sql:
+            conditions.append(keyset_sql)
+            params.update(keyset_params)
+        order = " ORDER BY c.created_at DESC, c.crime_id DESC LIMIT :limit"
+        if position is None:
+            order += " OFFSET :offset"
+            params["offset"] = offset
+
+    query = select + source + _where(conditions) + order
+    try:
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(text(query), params)).mappings().fetchall()
+    except Exception:
+        logging.exception("Error searching crimes")
+        return {"crimes": [], "count": 0, "limit": limit, "offset": offset, "next_offset": None, "next_cursor": None}
+
+    page, next_cursor = page_rows(rows, limit, "created_at", "crime_id")
+    has_more = len(rows) > limit
+    crimes = []
+    for row in page:
+        crime = dict(row)
+        full_description = crime.pop("search_description", None)
+        crime["location_data"] = parse_json_value(crime.get("location_data"))
+        crime["crime_data"] = parse_json_value(crime.get("crime_data"))
+        if terms:
+            doc = {
+                "crime_type": crime.get("crime_type"),
+                "area_name": crime.get("area_name"),
+                "city": crime.get("city"),
+                "description": full_description or crime.get("description_prefix"),
+            }
+            crime["highlights"] = search_index.highlights_for(doc, terms)
+        crimes.append(crime)
+
+    return {
+        "crimes": crimes,
+        "count": len(crimes),
+        "sort": sort,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if has_more and sort == "relevance" else None,
+        "next_cursor": next_cursor if sort == "recent" else None,
+    }
+
+@app.get("/api/search/names")
+async def search_person_names(
+    q: str = Query(..., min_length=1, max_length=100, description="Name or alias in any spelling, Latin or Bangla script"),
+    kind: str = Query("all", alias="type", pattern="^(all|missing|wanted)$", description="Restrict to missing persons or wanted criminals"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum candidates returned"),
+):
+    """Ranked fuzzy matches on missing-person names and wanted-criminal names/aliases."""
+    query_tokens = name_index.tokens(q)[:name_index.MAX_QUERY_TOKENS]
+    if not query_tokens:
+        return {"query": q, "results": [], "count": 0}
+    entities = name_index.ENTITIES if kind == "all" else (kind,)
+
+    async with async_engine.connect() as conn:
+        pairs = await conn.run_sync(name_index.candidates, query_tokens, entities)
+        ids = {entity: [entity_id for e, entity_id in pairs if e == entity] for entity in entities}
+        rows: List[Dict[str, Any]] = []
+        if ids.get(name_index.MISSING):
+            rows += [{"type": name_index.MISSING, **row} for row in (await conn.execute(
+                text("""
+                    SELECT missing_id AS id, name, NULL AS alias, age, gender, status, photo_url,
+                           last_seen_location AS location
+                    FROM missing_person WHERE missing_id IN :ids
+                """).bindparams(bindparam("ids", expanding=True)),
+                {"ids": ids[name_index.MISSING]},
+            )).mappings().fetchall()]
+        if ids.get(name_index.WANTED):
+            rows += [{"type": name_index.WANTED, **row} for row in (await conn.execute(
+                text("""
+                    SELECT criminal_id AS id, name, alias, age_range, gender, status, photo_url,
+                           danger_level, last_known_location AS location
+                    FROM wanted_criminal WHERE criminal_id IN :ids
+                """).bindparams(bindparam("ids", expanding=True)),
+                {"ids": ids[name_index.WANTED]},
+            )).mappings().fetchall()]
+
+    results = []
+    for row in rows:
+        name_score = name_index.score(query_tokens, row.get("name"))
+        # An alias hit ranks just below the same hit on the real name.
+        alias_score = name_index.score(query_tokens, row.get("alias")) * 0.95
+        best = max(name_score, alias_score)
+        if best >= name_index.MIN_SCORE:
+            results.append({**row, "score": round(best, 3), "matched": "alias" if alias_score > name_score else "name"})
+    results.sort(key=lambda r: (-r["score"], r["type"], -r["id"]))
+    results = results[:limit]
+    return {"query": q, "results": results, "count": len(results)}
 
 # ==================== DASHBOARD DATA ENDPOINT ====================
 
 @app.get("/api/dashboard")
 async def get_dashboard_data():
-    with engine.connect() as conn:
-        try:
-            # Get crime statistics
-            total_crimes = conn.execute(
-                text("SELECT COUNT(*) as count FROM crime")
-            ).scalar() or 0
-            
-            pending_crimes = conn.execute(
-                text("SELECT COUNT(*) as count FROM crime WHERE status = 'Pending'")
-            ).scalar() or 0
-            
-            solved_crimes = conn.execute(
-                text("SELECT COUNT(*) as count FROM crime WHERE status = 'Solved'")
-            ).scalar() or 0
-            
-            # Get missing person statistics
-            total_missing = conn.execute(
-                text("SELECT COUNT(*) as count FROM missing_person")
-            ).scalar() or 0
-            
-            active_missing = conn.execute(
-                text("SELECT COUNT(*) as count FROM missing_person WHERE status = 'Missing'")
-            ).scalar() or 0
-            
+    try:
+        snapshot, age = await metrics.snapshot(async_engine)
+        crimes, missing = snapshot["crimes"], snapshot["missing"]
+
+        async with async_engine.connect() as conn:
             # Get recent activities
-            recent_crimes = conn.execute(
+            recent_crimes = (await conn.execute(
                 text("""
                     SELECT crime_id, crime_data, location_data, created_at 
                     FROM crime 
                     ORDER BY created_at DESC 
                     LIMIT 5
                 """)
-            ).mappings().fetchall()
+            )).mappings().fetchall()
             
-            recent_missing = conn.execute(
+            recent_missing = (await conn.execute(
                 text("""
                     SELECT missing_id, name, last_seen_location, created_at 
                     FROM missing_person 
                     ORDER BY created_at DESC 
                     LIMIT 5
                 """)
-            ).mappings().fetchall()
-            
-            return {
-                "crime_stats": {
-                    "total": total_crimes,
-                    "pending": pending_crimes,
-                    "solved": solved_crimes
-                },
-                "missing_person_stats": {
-                    "total": total_missing,
-                    "active": active_missing
-                },
-                "recent_activities": {
-                    "crimes": [dict(row) for row in recent_crimes],
-                    "missing_persons": [dict(row) for row in recent_missing]
-                }
-            }
-        except Exception as e:
-            print(f"Error fetching dashboard data: {e}")
-            return {
-                "crime_stats": {"total": 0, "pending": 0, "solved": 0},
-                "missing_person_stats": {"total": 0, "active": 0},
-                "recent_activities": {"crimes": [], "missing_persons": []}
-            }
+            )).mappings().fetchall()
+
+        return {
+            "crime_stats": {
+                "total": crimes["total"],
+                "pending": crimes["pending"],
+                "solved": crimes["solved"]
+            },
+            "missing_person_stats": {
+                "total": missing["total"],
+                "active": missing["active"]
+            },
+            "recent_activities": {
+                "crimes": [dict(row) for row in recent_crimes],
+                "missing_persons": [dict(row) for row in recent_missing]
+            },
+            "snapshot_age_seconds": round(age, 1),
+        }
+    except Exception as e:
+        print(f"Error fetching dashboard data: {e}")
+        return {
+            "crime_stats": {"total": 0, "pending": 0, "solved": 0},
+            "missing_person_stats": {"total": 0, "active": 0},
+            "recent_activities": {"crimes": [], "missing_persons": []}
+        }
 
 # ==================== ADMIN ENDPOINTS ====================
 
@@ -1999,9 +2606,11 @@ async def get_users_for_admin(
     search: Optional[str] = Query(None, description="Search by username, email, or full name"),
     limit: int = Query(50, ge=1, le=200, description="Maximum number of users to return"),
     offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
 ):
     """Return a filtered list of application users for the admin dashboard."""
-    with engine.connect() as conn:
+    position = _parse_cursor(cursor)
+    async with async_engine.connect() as conn:
         try:
             base_query = [
                 "SELECT user_id, username, email, full_name, phone, role_hint, status, station_id,",
@@ -2009,7 +2618,7 @@ async def get_users_for_admin(
                 "  FROM appuser"
             ]
             conditions = []
-            params: Dict[str, Any] = {"limit": limit}
+            params: Dict[str, Any] = {"limit": limit + 1}
 
             if status:
                 conditions.append("status = :status")
@@ -2025,14 +2634,20 @@ async def get_users_for_admin(
                 )
                 params["search"] = f"%{search}%"
 
-            if conditions:
-                base_query.append(" WHERE " + " AND ".join(conditions))
+            keyset_sql, keyset_params = keyset_predicate("created_at", "user_id", position)
+            if keyset_sql:
+                conditions.append(keyset_sql)
+                params.update(keyset_params)
 
-            base_query.append(" ORDER BY created_at DESC LIMIT :limit OFFSET :offset")
-            params["offset"] = offset
+            base_query.append(_where(conditions))
+            base_query.append(" ORDER BY created_at DESC, user_id DESC LIMIT :limit")
+            if position is None:
+                base_query.append(" OFFSET :offset")
+                params["offset"] = offset
             query = "".join(base_query)
 
-            result = conn.execute(text(query), params).mappings().fetchall()
+            rows = (await conn.execute(text(query), params)).mappings().fetchall()
+            result, next_cursor = page_rows(rows, limit, "created_at", "user_id")
 
             users: List[Dict[str, Any]] = []
             for row in result:
@@ -2043,21 +2658,21 @@ async def get_users_for_admin(
                         user[dt_field] = value.isoformat()
                 users.append(user)
 
-            return {"success": True, "users": users, "count": len(users)}
+            return {"success": True, "users": users, "count": len(users), "next_cursor": next_cursor}
         except Exception as exc:
             print(f"Error fetching users for admin: {exc}")
             return {"success": False, "error": "Failed to load users", "users": []}
 
-@app.put("/api/admin/users/{user_id}")
+@app.put("/api/admin/users/{user_id}", dependencies=[Depends(invalidate_after_write)])
 async def update_user_by_admin(user_id: int, user_update: UserUpdate, _user: dict = Depends(require_admin)):
     """Admin endpoint to update user details"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
             # Check if user exists
-            user_exists = conn.execute(
+            user_exists = (await conn.execute(
                 text("SELECT user_id FROM appuser WHERE user_id = :user_id"),
                 {"user_id": user_id}
-            ).fetchone()
+            )).fetchone()
             
             if not user_exists:
                 raise HTTPException(status_code=404, detail="User not found")
@@ -2080,23 +2695,24 @@ async def update_user_by_admin(user_id: int, user_update: UserUpdate, _user: dic
             
             if update_fields:
                 query = f"UPDATE appuser SET {', '.join(update_fields)}, updated_at = :updated_at WHERE user_id = :user_id"
-                conn.execute(text(query), params)
-                conn.commit()
+                await conn.execute(text(query), params)
+                await conn.commit()
+                forget_user(user_id)
                 
             return {"message": "User updated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
 
-@app.delete("/api/admin/users/{user_id}")
+@app.delete("/api/admin/users/{user_id}", dependencies=[Depends(invalidate_after_write)])
 async def delete_user_by_admin(user_id: int, _user: dict = Depends(require_admin)):
     """Admin endpoint to delete/deactivate user"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
             # Soft delete - set status to inactive
-            result = conn.execute(
+            result = await conn.execute(
                 text("UPDATE appuser SET status = 'Inactive', updated_at = :updated_at WHERE user_id = :user_id"),
                 {"user_id": user_id, "updated_at": datetime.utcnow()}
             )
@@ -2104,63 +2720,43 @@ async def delete_user_by_admin(user_id: int, _user: dict = Depends(require_admin
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="User not found")
                 
-            conn.commit()
+            await conn.commit()
+            forget_user(user_id)
             return {"message": "User deactivated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to deactivate user: {str(e)}")
 
 @app.get("/api/admin/user-stats")
 async def get_user_statistics(_user: dict = Depends(require_admin)):
     """Get user statistics for admin dashboard"""
-    with engine.connect() as conn:
-        try:
-            # Total users
-            total_users = conn.execute(
-                text("SELECT COUNT(*) as count FROM appuser")
-            ).scalar() or 0
-            
-            # Users by role
-            role_stats = conn.execute(
-                text("SELECT role_hint, COUNT(*) as count FROM appuser GROUP BY role_hint")
-            ).mappings().fetchall()
-            
-            # Users by status
-            status_stats = conn.execute(
-                text("SELECT status, COUNT(*) as count FROM appuser GROUP BY status")
-            ).mappings().fetchall()
-            
-            # Recent registrations (last 30 days)
-            recent_users = conn.execute(
-                text("""
-                    SELECT COUNT(*) as count FROM appuser 
-                    WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                """)
-            ).scalar() or 0
-            
-            return {
-                "total_users": total_users,
-                "role_distribution": [dict(row) for row in role_stats],
-                "status_distribution": [dict(row) for row in status_stats],
-                "recent_registrations": recent_users
-            }
-        except Exception as e:
-            print(f"Error fetching user statistics: {e}")
-            return {
-                "total_users": 0,
-                "role_distribution": [],
-                "status_distribution": [],
-                "recent_registrations": 0
-            }
+    try:
+        snapshot, age = await metrics.snapshot(async_engine)
+        users = snapshot["users"]
+        return {
+            "total_users": users["total"],
+            "role_distribution": users["by_role"],
+            "status_distribution": users["by_status"],
+            "recent_registrations": users["last_30d"],
+            "snapshot_age_seconds": round(age, 1),
+        }
+    except Exception as e:
+        print(f"Error fetching user statistics: {e}")
+        return {
+            "total_users": 0,
+            "role_distribution": [],
+            "status_distribution": [],
+            "recent_registrations": 0
+        }
 
-@app.post("/api/admin/wanted-criminals")
+@app.post("/api/admin/wanted-criminals", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.WANTED))])
 async def create_wanted_criminal(criminal: WantedCriminalCreate, _user: dict = Depends(require_admin)):
     """Admin endpoint to add new wanted criminal"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            result = await conn.execute(
                 text("""
             INSERT INTO wanted_criminal (name, alias, age_range, gender, description, height, 
                            weight, hair_color, eye_color, distinguishing_marks, 
@@ -2199,19 +2795,26 @@ async def create_wanted_criminal(criminal: WantedCriminalCreate, _user: dict = D
                     "created_at": datetime.utcnow()
                 }
             )
-            conn.commit()
+            await conn.run_sync(name_index.index_person, name_index.WANTED, result.lastrowid, criminal.name, criminal.alias)
+            await conn.run_sync(rollups.changed, rollups.WANTED, result.lastrowid)
+            await conn.commit()
             criminal_id = result.lastrowid
+            activity.record(
+                activity.WANTED, criminal_id, activity.CREATED, status="Unseen", actor_id=_user.get("user_id"),
+                title=criminal.name,
+                summary=activity.wanted_summary(criminal.last_known_location, criminal.danger_level),
+            )
             return {"message": "Wanted criminal added successfully", "criminal_id": criminal_id}
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to add wanted criminal: {str(e)}")
 
-@app.put("/api/admin/wanted-criminals/{criminal_id}")
+@app.put("/api/admin/wanted-criminals/{criminal_id}", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.WANTED))])
 async def update_wanted_criminal(criminal_id: int, criminal: WantedCriminalCreate, _user: dict = Depends(require_admin)):
     """Admin endpoint to update wanted criminal"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            result = await conn.execute(
                 text("""
                     UPDATE wanted_criminal SET 
                     name = :name, alias = :alias, age_range = :age_range, gender = :gender,
@@ -2246,33 +2849,41 @@ async def update_wanted_criminal(criminal_id: int, criminal: WantedCriminalCreat
             
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Wanted criminal not found")
-                
-            conn.commit()
+
+            await conn.run_sync(name_index.index_person, name_index.WANTED, criminal_id, criminal.name, criminal.alias)
+            await conn.commit()
+            activity.record(
+                activity.WANTED, criminal_id, activity.UPDATED, actor_id=_user.get("user_id"), title=criminal.name,
+                summary=activity.wanted_summary(criminal.last_known_location, criminal.danger_level),
+            )
             return {"message": "Wanted criminal updated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to update wanted criminal: {str(e)}")
 
-@app.delete("/api/admin/wanted-criminals/{criminal_id}")
+@app.delete("/api/admin/wanted-criminals/{criminal_id}", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.WANTED))])
 async def delete_wanted_criminal(criminal_id: int, _user: dict = Depends(require_admin)):
     """Admin endpoint to remove wanted criminal"""
     try:
-        with engine.begin() as conn:
+        async with async_engine.begin() as conn:
             # Clear dependent sighting history so FK constraints allow removal
-            conn.execute(
+            await conn.execute(
                 text("DELETE FROM criminal_sightings WHERE criminal_id = :criminal_id"),
                 {"criminal_id": criminal_id}
             )
 
-            result = conn.execute(
+            counted = await conn.run_sync(rollups.keys_for, rollups.WANTED, criminal_id)
+            result = await conn.execute(
                 text("DELETE FROM wanted_criminal WHERE criminal_id = :criminal_id"),
                 {"criminal_id": criminal_id}
             )
 
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Wanted criminal not found")
+            await conn.run_sync(name_index.unindex_person, name_index.WANTED, criminal_id)
+            await conn.run_sync(rollups.removed, counted)
 
         return {"message": "Wanted criminal removed"}
     except HTTPException:
@@ -2283,19 +2894,25 @@ async def delete_wanted_criminal(criminal_id: int, _user: dict = Depends(require
 # Add these endpoints for police station management
 
 @app.get("/api/admin/police-stations")
-async def get_all_police_stations(_user: dict = Depends(require_admin)):
+async def get_all_police_stations(request: Request, response: Response, _user: dict = Depends(require_admin)):
     """Get all police stations"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
+        stamp = await conn.run_sync(versions.stamp, versions.STATIONS)
+        cached = not_modified(request, response, stamp, private=True)
+        if cached is not None:
+            return cached
         try:
-            result = conn.execute(
+            result = (await conn.execute(
                 text("SELECT * FROM police_station ORDER BY station_name")
-            ).mappings().fetchall()
+            )).mappings().fetchall()
             return {"police_stations": [dict(row) for row in result]}
         except Exception as e:
             print(f"Error fetching police stations: {e}")
+            # Don't let the client revalidate this fallback as if it were the real list.
+            drop_validators(response)
             return {"police_stations": []}
 
-@app.post("/api/admin/police-stations")
+@app.post("/api/admin/police-stations", dependencies=[Depends(versions.after_write(versions.STATIONS))])
 async def create_police_station(station: PoliceStationCreate, _user: dict = Depends(require_admin)):
     """Admin endpoint to add new police station"""
 
@@ -2326,15 +2943,15 @@ async def create_police_station(station: PoliceStationCreate, _user: dict = Depe
         raise HTTPException(status_code=422, detail="Station code is required")
 
     try:
-        with engine.begin() as conn:
-            existing = conn.execute(
+        async with async_engine.begin() as conn:
+            existing = (await conn.execute(
                 text("SELECT station_id FROM police_station WHERE station_code = :station_code LIMIT 1"),
                 {"station_code": payload["station_code"]}
-            ).fetchone()
+            )).fetchone()
             if existing:
                 raise HTTPException(status_code=409, detail="Station code already exists. Please use a unique code.")
 
-            result = conn.execute(
+            result = await conn.execute(
                 text(
                     """
                     INSERT INTO police_station (
@@ -2371,6 +2988,8 @@ async def create_police_station(station: PoliceStationCreate, _user: dict = Depe
 
             station_id = result.lastrowid
 
+        async with async_engine.connect() as conn:
+            await conn.run_sync(stations.reload)
         return {"message": "Police station added successfully", "station_id": station_id}
     except HTTPException:
         raise
@@ -2382,12 +3001,12 @@ async def create_police_station(station: PoliceStationCreate, _user: dict = Depe
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add police station: {str(e)}")
 
-@app.put("/api/admin/police-stations/{station_id}")
+@app.put("/api/admin/police-stations/{station_id}", dependencies=[Depends(versions.after_write(versions.STATIONS))])
 async def update_police_station(station_id: int, station: PoliceStationCreate, _user: dict = Depends(require_admin)):
     """Admin endpoint to update police station"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            result = await conn.execute(
                 text("""
                     UPDATE police_station SET 
                     station_name = :station_name, station_code = :station_code, address = :address,
@@ -2412,70 +3031,67 @@ async def update_police_station(station_id: int, station: PoliceStationCreate, _
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Police station not found")
                 
-            conn.commit()
+            await conn.commit()
+            await conn.run_sync(stations.reload)
             return {"message": "Police station updated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to update police station: {str(e)}")
 
 # Add comprehensive admin analytics endpoints
 
+@app.get("/api/admin/metrics")
+async def get_admin_metrics(_user: dict = Depends(require_admin)):
+    """Runtime counters for operators (connection pool usage, ...)."""
+    return {
+        "db_pool": pool_stats(),
+        "db_threads": limiter_stats(),
+        "db_connection_slots": async_engine.slot_stats(),
+        "read_models": {"analytics": analytics.cache.stats(), "metrics_snapshot": metrics.cache.stats()},
+        "police_station_index": stations.stats(),
+        "activity_writer": activity.writer.stats(),
+        "page_templates": pages.store.stats(),
+        "user_cache": user_cache.stats(),
+        "password_pool": passwords.stats(),
+        "login_throttle": login_throttle.stats(),
+        "reference_data": reference.cache.stats(),
+        "chat_stream": chat.broker.stats(),
+    }
+
+
 @app.get("/api/admin/overview")
 async def get_admin_overview(_user: dict = Depends(require_admin)):
     """Get comprehensive overview for admin dashboard"""
-    with engine.connect() as conn:
-        try:
-            # Crime statistics
-            total_crimes = conn.execute(text("SELECT COUNT(*) FROM crime")).scalar() or 0
-            pending_crimes = conn.execute(text("SELECT COUNT(*) FROM crime WHERE status = 'Pending'")).scalar() or 0
-            emergency_crimes = conn.execute(text("SELECT COUNT(*) FROM crime WHERE status = 'Emergency'")).scalar() or 0
-            
-            # Missing person statistics
-            total_missing = conn.execute(text("SELECT COUNT(*) FROM missing_person")).scalar() or 0
-            active_missing = conn.execute(text("SELECT COUNT(*) FROM missing_person WHERE status = 'Missing'")).scalar() or 0
-            
-            # User statistics
-            total_users = conn.execute(text("SELECT COUNT(*) FROM appuser")).scalar() or 0
-            active_users = conn.execute(text("SELECT COUNT(*) FROM appuser WHERE status = 'Active'")).scalar() or 0
-            
-            # Wanted criminals
-            active_wanted = conn.execute(text("SELECT COUNT(*) FROM wanted_criminal WHERE status = 'Active'")).scalar() or 0
-            
-            # Recent activity (last 24 hours)
-            recent_crimes = conn.execute(
-                text("SELECT COUNT(*) FROM crime WHERE created_at >= DATE_SUB(NOW(), INTERVAL 24 HOUR)")
-            ).scalar() or 0
-            
-            recent_missing = conn.execute(
-                text("SELECT COUNT(*) FROM missing_person WHERE created_at >= DATE_SUB(NOW(), INTERVAL 24 HOUR)")
-            ).scalar() or 0
-            
-            return {
-                "overview": {
-                    "total_crimes": total_crimes,
-                    "pending_crimes": pending_crimes,
-                    "emergency_crimes": emergency_crimes,
-                    "total_missing": total_missing,
-                    "active_missing": active_missing,
-                    "total_users": total_users,
-                    "active_users": active_users,
-                    "active_wanted": active_wanted,
-                    "recent_crimes_24h": recent_crimes,
-                    "recent_missing_24h": recent_missing
-                }
-            }
-        except Exception as e:
-            print(f"Error fetching admin overview: {e}")
-            return {
-                "overview": {
-                    "total_crimes": 0, "pending_crimes": 0, "emergency_crimes": 0,
-                    "total_missing": 0, "active_missing": 0, "total_users": 0,
-                    "active_users": 0, "active_wanted": 0, "recent_crimes_24h": 0,
-                    "recent_missing_24h": 0
-                }
+    try:
+        snapshot, age = await metrics.snapshot(async_engine)
+        crimes, missing, users = snapshot["crimes"], snapshot["missing"], snapshot["users"]
+        return {
+            "overview": {
+                "total_crimes": crimes["total"],
+                "pending_crimes": crimes["pending"],
+                "emergency_crimes": crimes["emergency"],
+                "total_missing": missing["total"],
+                "active_missing": missing["active"],
+                "total_users": users["total"],
+                "active_users": users["active"],
+                "active_wanted": snapshot["wanted"]["active"],
+                "recent_crimes_24h": crimes["last_24h"],
+                "recent_missing_24h": missing["last_24h"]
+            },
+            "snapshot_age_seconds": round(age, 1),
+        }
+    except Exception as e:
+        print(f"Error fetching admin overview: {e}")
+        return {
+            "overview": {
+                "total_crimes": 0, "pending_crimes": 0, "emergency_crimes": 0,
+                "total_missing": 0, "active_missing": 0, "total_users": 0,
+                "active_users": 0, "active_wanted": 0, "recent_crimes_24h": 0,
+                "recent_missing_24h": 0
             }
+        }
 
 @app.get("/api/admin/analytics")
 async def get_admin_analytics(limit: int = Query(15, ge=1, le=100), _user: dict = Depends(require_admin)):
@@ -2513,118 +3129,21 @@ async def get_admin_analytics(limit: int = Query(15, ge=1, le=100), _user: dict
                 dt_value = datetime.utcnow()
         return dt_value, dt_value.isoformat()
 
-    with engine.connect() as conn:
-        try:
-            # Crime metrics
-            total_crimes = conn.execute(text("SELECT COUNT(*) FROM crime")).scalar() or 0
-            crimes_recent_30 = conn.execute(
-                text("SELECT COUNT(*) FROM crime WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)")
-            ).scalar() or 0
-            crimes_previous_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM crime
-                    WHERE created_at < DATE_SUB(NOW(), INTERVAL 30 DAY)
-                      AND created_at >= DATE_SUB(NOW(), INTERVAL 60 DAY)
-                    """
-                )
-            ).scalar() or 0
+    cache_key = ("analytics", limit)
+    cached = analytics.cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+    generation = analytics.cache.generation
 
-            open_cases = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM crime
-                    WHERE LOWER(status) IN ('pending', 'under investigation')
-                    """
-                )
-            ).scalar() or 0
-            open_recent_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM crime
-                    WHERE LOWER(status) IN ('pending', 'under investigation')
-                      AND COALESCE(updated_at, created_at) >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                    """
-                )
-            ).scalar() or 0
-            open_previous_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM crime
-                    WHERE LOWER(status) IN ('pending', 'under investigation')
-                      AND COALESCE(updated_at, created_at) < DATE_SUB(NOW(), INTERVAL 30 DAY)
-                      AND COALESCE(updated_at, created_at) >= DATE_SUB(NOW(), INTERVAL 60 DAY)
-                    """
-                )
-            ).scalar() or 0
-
-            # Missing persons
-            active_missing = conn.execute(
-                text("SELECT COUNT(*) FROM missing_person WHERE LOWER(status) = 'missing'")
-            ).scalar() or 0
-            missing_recent_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM missing_person
-                    WHERE LOWER(status) = 'missing'
-                      AND created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                    """
-                )
-            ).scalar() or 0
-            missing_previous_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM missing_person
-                    WHERE LOWER(status) = 'missing'
-                      AND created_at < DATE_SUB(NOW(), INTERVAL 30 DAY)
-                      AND created_at >= DATE_SUB(NOW(), INTERVAL 60 DAY)
-                    """
-                )
-            ).scalar() or 0
-
-            # Users
-            total_users = conn.execute(text("SELECT COUNT(*) FROM appuser")).scalar() or 0
-            users_recent_30 = conn.execute(
-                text("SELECT COUNT(*) FROM appuser WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)")
-            ).scalar() or 0
-            users_previous_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM appuser
-                    WHERE created_at < DATE_SUB(NOW(), INTERVAL 30 DAY)
-                      AND created_at >= DATE_SUB(NOW(), INTERVAL 60 DAY)
-                    """
-                )
-            ).scalar() or 0
-
-            # Wanted criminals
-            active_wanted = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM wanted_criminal
-                    WHERE COALESCE(LOWER(status), '') NOT IN ('captured', 'inactive')
-                    """
-                )
-            ).scalar() or 0
-            wanted_recent_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM wanted_criminal
-                    WHERE COALESCE(LOWER(status), '') NOT IN ('captured', 'inactive')
-                      AND COALESCE(updated_at, created_at) >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                    """
-                )
-            ).scalar() or 0
-            wanted_previous_30 = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) FROM wanted_criminal
-                    WHERE COALESCE(LOWER(status), '') NOT IN ('captured', 'inactive')
-                      AND COALESCE(updated_at, created_at) < DATE_SUB(NOW(), INTERVAL 30 DAY)
-                      AND COALESCE(updated_at, created_at) >= DATE_SUB(NOW(), INTERVAL 60 DAY)
-                    """
-                )
-            ).scalar() or 0
+    async with async_engine.connect() as conn:
+        try:
+            counts = await conn.run_sync(analytics.summary_counts)
+            crimes, missing, users, wanted = counts["crimes"], counts["missing"], counts["users"], counts["wanted"]
+            total_crimes, crimes_recent_30, crimes_previous_30 = crimes["total"], crimes["recent"], crimes["previous"]
+            open_cases, open_recent_30, open_previous_30 = crimes["open_total"], crimes["open_recent"], crimes["open_previous"]
+            active_missing, missing_recent_30, missing_previous_30 = missing["active"], missing["recent"], missing["previous"]
+            total_users, users_recent_30, users_previous_30 = users["total"], users["recent"], users["previous"]
+            active_wanted, wanted_recent_30, wanted_previous_30 = wanted["active"], wanted["recent"], wanted["previous"]
 
             summary_cards = []
 
@@ -2678,164 +3197,68 @@ async def get_admin_analytics(limit: int = Query(15, ge=1, le=100), _user: dict
                 "icon": "🎯"
             })
 
-            per_category = limit // 3
-            if per_category < 3:
-                per_category = min(limit, 3)
-            if per_category < 1:
-                per_category = 1
-            activity_entries = []
-
-            crime_rows = conn.execute(
-                text(
-                    """
-                    SELECT crime_id, status, created_at, updated_at,
-                           JSON_UNQUOTE(JSON_EXTRACT(crime_data, '$.type')) AS crime_type,
-                           JSON_UNQUOTE(JSON_EXTRACT(crime_data, '$.description')) AS description,
-                           JSON_UNQUOTE(JSON_EXTRACT(location_data, '$.area_name')) AS area_name
-                    FROM crime
-                    ORDER BY created_at DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"limit": per_category}
-            ).mappings().fetchall()
-
-            for row in crime_rows:
-                timestamp_obj, timestamp_iso = serialize_timestamp(row.get("updated_at") or row.get("created_at"))
-                reference_id = row.get("crime_id")
-                ref_int = int(reference_id) if reference_id is not None else None
-                base_title = f"Case CR-{ref_int:03d}" if ref_int is not None else "Crime Report"
-                description = row.get("description") or row.get("crime_type") or "Crime report"
-                area_name = row.get("area_name")
-                if area_name:
-                    description = f"{description} in {area_name}"
-                activity_entries.append((
-                    timestamp_obj,
-                    {
-                        "type": "Crime Report",
-                        "title": base_title,
-                        "description": description,
-                        "reference_id": ref_int,
-                        "status": row.get("status") or "Pending",
-                        "timestamp": timestamp_iso
-                    }
-                ))
-
-            missing_rows = conn.execute(
-                text(
-                    """
-                    SELECT missing_id, name, status, created_at, updated_at, last_seen_location
-                    FROM missing_person
-                    ORDER BY created_at DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"limit": per_category}
-            ).mappings().fetchall()
-
-            for row in missing_rows:
-                timestamp_obj, timestamp_iso = serialize_timestamp(row.get("updated_at") or row.get("created_at"))
-                reference_id = row.get("missing_id")
-                ref_int = int(reference_id) if reference_id is not None else None
-                location_hint = row.get("last_seen_location") or "Location unknown"
-                activity_entries.append((
-                    timestamp_obj,
-                    {
-                        "type": "Missing Person",
-                        "title": row.get("name") or "Missing report",
-                        "description": f"Last seen at {location_hint}",
-                        "reference_id": ref_int,
-                        "status": row.get("status") or "Missing",
-                        "timestamp": timestamp_iso
-                    }
-                ))
-
-            wanted_rows = conn.execute(
-                text(
-                    """
-                    SELECT criminal_id, name, status, created_at, updated_at, last_known_location, danger_level
-                    FROM wanted_criminal
-                    ORDER BY COALESCE(updated_at, created_at) DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"limit": per_category}
-            ).mappings().fetchall()
-
-            for row in wanted_rows:
-                timestamp_obj, timestamp_iso = serialize_timestamp(row.get("updated_at") or row.get("created_at"))
-                reference_id = row.get("criminal_id")
-                ref_int = int(reference_id) if reference_id is not None else None
-                location_hint = row.get("last_known_location") or "Unknown location"
-                danger = row.get("danger_level")
-                description = f"Last known at {location_hint}" if location_hint else "Location unknown"
-                if danger:
-                    description = f"{description} - Danger: {danger}"
-                activity_entries.append((
-                    timestamp_obj,
-                    {
-                        "type": "Wanted Criminal",
-                        "title": row.get("name") or "Wanted individual",
-                        "description": description,
-                        "reference_id": ref_int,
-                        "status": row.get("status") or "Active",
-                        "timestamp": timestamp_iso
-                    }
-                ))
-
-            activity_entries.sort(key=lambda item: item[0], reverse=True)
-            activity_payload = [entry for _, entry in activity_entries[:limit]]
+            events, _ = await conn.run_sync(activity.feed, limit)
+            activity_payload = [
+                {
+                    "type": activity.TYPE_LABELS.get(event["entity"], event["entity"]),
+                    "title": event["title"] or activity.TYPE_LABELS.get(event["entity"], event["entity"]),
+                    "description": event["summary"] or event["action"].replace("_", " ").capitalize(),
+                    "reference_id": event["entity_id"],
+                    "status": event["status"],
+                    "action": event["action"],
+                    "timestamp": serialize_timestamp(event["occurred_at"])[1],
+                }
+                for event in events
+            ]
 
-            return {"summary_cards": summary_cards, "activity": activity_payload}
+            payload = {"summary_cards": summary_cards, "activity": activity_payload}
+            analytics.cache.put(cache_key, payload, generation)
+            return payload
         except Exception as exc:
             logging.exception("Error building admin analytics: %s", exc)
             return {"summary_cards": [], "activity": []}
 
 @app.get("/api/admin/activity-log")
-async def get_admin_activity_log(limit: Optional[int] = Query(50), _user: dict = Depends(require_admin)):
-    """Get recent system activity for admin monitoring"""
-    with engine.connect() as conn:
-        try:
-            # Get recent crimes
-            recent_crimes = conn.execute(
-                text("""
-                    SELECT 'Crime Report' as activity_type, crime_id as item_id, 
-                           JSON_EXTRACT(crime_data, '$.type') as details, 
-                           created_at, status
-                    FROM crime 
-                    ORDER BY created_at DESC 
-                    LIMIT :limit
-                """),
-                {"limit": limit // 2}
-            ).mappings().fetchall()
-            
-            # Get recent missing persons
-            recent_missing = conn.execute(
-                text("""
-                    SELECT 'Missing Person' as activity_type, missing_id as item_id,
-                           name as details, created_at, status
-                    FROM missing_person 
-                    ORDER BY created_at DESC 
-                    LIMIT :limit
-                """),
-                {"limit": limit // 2}
-            ).mappings().fetchall()
-            
-            # Combine and sort by date
-            all_activities = list(recent_crimes) + list(recent_missing)
-            all_activities.sort(key=lambda x: x['created_at'], reverse=True)
-            
-            return {"activities": [dict(activity) for activity in all_activities[:limit]]}
-        except Exception as e:
-            print(f"Error fetching activity log: {e}")
-            return {"activities": []}
+async def get_admin_activity_log(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    entity: Optional[List[str]] = Query(None, description="Only these entities (repeatable)"),
+    entity_id: Optional[int] = Query(None, description="Only events for this id (use with one entity)"),
+    _user: dict = Depends(require_admin),
+):
+    """Recent system activity, newest first, from the append-only activity_event table."""
+    position = _parse_cursor(cursor)
+    for name in entity or ():
+        if name not in activity.TYPE_LABELS:
+            raise HTTPException(status_code=400, detail=f"Unknown entity: {name}")
+    async with async_engine.connect() as conn:
+        events, next_cursor = await conn.run_sync(activity.feed, limit, position, entity, entity_id)
+    return {
+        "activities": [
+            {
+                "event_id": event["event_id"],
+                "activity_type": activity.TYPE_LABELS.get(event["entity"], event["entity"]),
+                "entity": event["entity"],
+                "item_id": event["entity_id"],
+                "action": event["action"],
+                "details": event["summary"] or event["title"],
+                "title": event["title"],
+                "status": event["status"],
+                "actor_id": event["actor_id"],
+                "created_at": event["occurred_at"],
+                "metadata": parse_json_value(event["details"]) or {},
+            }
+            for event in events
+        ],
+        "next_cursor": next_cursor,
+    }
 
-@app.put("/api/admin/missing-persons/{missing_id}/status")
+@app.put("/api/admin/missing-persons/{missing_id}/status", dependencies=[Depends(invalidate_after_write), Depends(versions.after_write(versions.MISSING))])
 async def update_missing_person_status_admin(missing_id: int, status_update: dict, _user: dict = Depends(require_admin)):
     """Admin endpoint to update missing person status"""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            result = await conn.execute(
                 text("UPDATE missing_person SET status = :status, updated_at = :updated_at WHERE missing_id = :missing_id"),
                 {
                     "missing_id": missing_id,
@@ -2847,35 +3270,37 @@ async def update_missing_person_status_admin(missing_id: int, status_update: dic
             if result.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Missing person not found")
                 
-            conn.commit()
+            await conn.commit()
+            activity.record(activity.MISSING, missing_id, activity.STATUS_CHANGED,
+                            status=status_update.get("status"), actor_id=_user.get("user_id"))
             return {"message": "Missing person status updated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            conn.rollback()
+            await conn.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to update status: {str(e)}")
 
 # Add case assignment functionality
 
-@app.post("/api/admin/assign-case")
+@app.post("/api/admin/assign-case", dependencies=[Depends(invalidate_after_write)])
 async def assign_case_to_officer(assignment: CaseAssignment, _user: dict = Depends(require_admin)):
     """Assign crime case to police officer"""
-    with engine.connect() as conn:
-        try:
+    try:
+        async with async_engine.begin() as conn:
             # Check if crime exists
-            crime_exists = conn.execute(
-                text("SELECT crime_id FROM crime WHERE crime_id = :crime_id"),
+            crime_exists = (await conn.execute(
+                text("SELECT crime_id, status FROM crime WHERE crime_id = :crime_id FOR UPDATE"),
                 {"crime_id": assignment.crime_id}
-            ).fetchone()
+            )).mappings().fetchone()
             
             if not crime_exists:
                 raise HTTPException(status_code=404, detail="Crime case not found")
             
             # Check if user exists and is an officer
-            officer = conn.execute(
+            officer = (await conn.execute(
                 text("SELECT user_id, role_hint FROM appuser WHERE user_id = :user_id"),
                 {"user_id": assignment.user_id}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
             
             if not officer:
                 raise HTTPException(status_code=404, detail="Officer not found")
@@ -2883,13 +3308,16 @@ async def assign_case_to_officer(assignment: CaseAssignment, _user: dict = Depen
             if officer["role_hint"] not in ["Officer", "Detective", "Admin"]:
                 raise HTTPException(status_code=400, detail="User is not authorized to handle cases")
             
-            # Create assignment record
-            conn.execute(
+            counted = await conn.run_sync(rollups.keys_for, rollups.CRIMES, assignment.crime_id)
+            previous_officer = await conn.run_sync(workload.officer_for, assignment.crime_id)
+
+            # Create assignment record (a crime has one assignment; reassigning replaces the officer)
+            upsert = await conn.execute(
                 text("""
                     INSERT INTO case_assignments (user_id, crime_id, duty_role, assigned_at, status)
                     VALUES (:user_id, :crime_id, :duty_role, :assigned_at, :status)
                     ON DUPLICATE KEY UPDATE 
-                    duty_role = :duty_role, assigned_at = :assigned_at, status = :status
+                    user_id = :user_id, duty_role = :duty_role, assigned_at = :assigned_at, status = :status
                 """),
                 {
                     "user_id": assignment.user_id,
@@ -2901,25 +3329,38 @@ async def assign_case_to_officer(assignment: CaseAssignment, _user: dict = Depen
             )
             
             # Update crime status
-            conn.execute(
+            await conn.execute(
                 text("UPDATE crime SET status = 'Under Investigation', updated_at = :updated_at WHERE crime_id = :crime_id"),
                 {"crime_id": assignment.crime_id, "updated_at": datetime.utcnow()}
             )
-            
-            return {"message": "Case assigned successfully"}
-        except HTTPException:
-            raise
-        except Exception as e:
-            logging.exception("Error assigning case")
-            raise HTTPException(status_code=500, detail=f"Failed to assign case: {str(e)}")
+            # ON DUPLICATE KEY UPDATE reports 1 for an insert, 2 for an update.
+            if upsert.rowcount == 1:
+                await conn.run_sync(totals.assignments_changed, 1)
+            await conn.run_sync(totals.crime_status_changed, crime_exists["status"], "Under Investigation")
+            await conn.run_sync(rollups.changed, rollups.CRIMES, assignment.crime_id, counted)
+            await conn.run_sync(workload.crime_changed, assignment.crime_id, previous_officer)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.exception("Error assigning case")
+        raise HTTPException(status_code=500, detail=f"Failed to assign case: {str(e)}")
+
+    activity.record(
+        activity.CRIME, assignment.crime_id, activity.ASSIGNED, status="Under Investigation",
+        actor_id=_user.get("user_id"), title=activity.crime_title(assignment.crime_id),
+        summary=f"Assigned to user {assignment.user_id} as {assignment.duty_role or 'officer'}",
+        details={"officer_id": assignment.user_id, "duty_role": assignment.duty_role},
+    )
+    return {"message": "Case assigned successfully"}
 
 @app.get("/api/admin/cases/{crime_id}/history")
 async def get_case_status_history(crime_id: int, _user: dict = Depends(require_admin)):
     """Return status history and assignment timeline for a given crime case."""
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         try:
-
-            crime_row = conn.execute(
+            # Full description for the single-case view (PK lookup); list
+            # views use the generated description_prefix column instead.
+            crime_row = (await conn.execute(
                 text(
                     """
                     SELECT
@@ -2927,20 +3368,20 @@ async def get_case_status_history(crime_id: int, _user: dict = Depends(require_a
                         c.status,
                         c.created_at,
                         c.updated_at,
-                        JSON_UNQUOTE(JSON_EXTRACT(c.crime_data, '$.type')) AS crime_type,
+                        c.crime_type,
                         JSON_UNQUOTE(JSON_EXTRACT(c.crime_data, '$.description')) AS crime_description,
-                        JSON_UNQUOTE(JSON_EXTRACT(c.location_data, '$.area_name')) AS area_name
+                        c.area_name
                     FROM crime c
                     WHERE c.crime_id = :crime_id
                     """
                 ),
                 {"crime_id": crime_id}
-            ).mappings().fetchone()
+            )).mappings().fetchone()
 
             if not crime_row:
                 raise HTTPException(status_code=404, detail="Crime case not found")
 
-            status_rows = conn.execute(
+            status_rows = (await conn.execute(
                 text(
                     """
                     SELECT
@@ -2958,9 +3399,9 @@ async def get_case_status_history(crime_id: int, _user: dict = Depends(require_a
                     """
                 ),
                 {"crime_id": crime_id}
-            ).mappings().fetchall()
+            )).mappings().fetchall()
 
-            assignment_rows = conn.execute(
+            assignment_rows = (await conn.execute(
                 text(
                     """
                     SELECT
@@ -2980,7 +3421,7 @@ async def get_case_status_history(crime_id: int, _user: dict = Depends(require_a
                     """
                 ),
                 {"crime_id": crime_id}
-            ).mappings().fetchall()
+            )).mappings().fetchall()
 
             def isoformat(value):
                 if value is None:
@@ -3083,10 +3524,18 @@ async def get_admin_complaints(
     _user: dict = Depends(require_admin),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
 ):
     """Fetch recent user complaints for verification workflow."""
-    with engine.connect() as conn:
-        rows = conn.execute(
+    position = _parse_cursor(cursor)
+    keyset_sql, params = keyset_predicate("created_at", "complaint_id", position)
+    params["limit"] = limit + 1
+    page_clause = "LIMIT :limit"
+    if position is None:
+        page_clause += " OFFSET :offset"
+        params["offset"] = offset
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(
             text(
                 """
                 SELECT
@@ -3101,12 +3550,14 @@ async def get_admin_complaints(
                     created_at,
                     updated_at
                 FROM user_complaints
-                ORDER BY created_at DESC
-                LIMIT :limit OFFSET :offset
                 """
+                + _where([keyset_sql] if keyset_sql else [])
+                + " ORDER BY created_at DESC, complaint_id DESC "
+                + page_clause
             ),
-            {"limit": limit, "offset": offset}
-        ).mappings().fetchall()
+            params
+        )).mappings().fetchall()
+    rows, next_cursor = page_rows(rows, limit, "created_at", "complaint_id")
 
     complaints = []
     for row in rows:
@@ -3132,7 +3583,7 @@ async def get_admin_complaints(
             item["location_data"] = {"area_name": location_hint}
         complaints.append(item)
 
-    return {"complaints": complaints}
+    return {"complaints": complaints, "next_cursor": next_cursor}
 
 @app.post("/api/admin/complaints/{complaint_id}/verify")
 async def verify_user_complaint(complaint_id: int, payload: Optional[Dict[str, Any]] = Body(default=None), _user: dict = Depends(require_admin)):
@@ -3141,8 +3592,8 @@ async def verify_user_complaint(complaint_id: int, payload: Optional[Dict[str, A
     if payload:
         notes = payload.get("notes") or payload.get("verification_notes")
 
-    with engine.begin() as conn:
-        result = conn.execute(
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
             text(
                 """
                 UPDATE user_complaints
@@ -3171,8 +3622,8 @@ async def reject_user_complaint(complaint_id: int, payload: Optional[Dict[str, A
     if payload:
         notes = payload.get("notes") or payload.get("verification_notes") or payload.get("reason")
 
-    with engine.begin() as conn:
-        result = conn.execute(
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
             text(
                 """
                 UPDATE user_complaints
@@ -3194,11 +3645,11 @@ async def reject_user_complaint(complaint_id: int, payload: Optional[Dict[str, A
 
     return {"message": "Complaint rejected"}
 
-@app.post("/api/admin/complaints/{complaint_id}/escalate")
+@app.post("/api/admin/complaints/{complaint_id}/escalate", dependencies=[Depends(invalidate_after_write)])
 async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[str, Any]] = Body(default=None), _user: dict = Depends(require_admin)):
     """Create a crime record from a verified complaint and mark it escalated."""
-    with engine.begin() as conn:
-        complaint = conn.execute(
+    async with async_engine.begin() as conn:
+        complaint = (await conn.execute(
             text(
                 """
                 SELECT complaint_id, reporter_contact, complaint_data, status, priority
@@ -3208,7 +3659,7 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
                 """
             ),
             {"complaint_id": complaint_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
 
         if not complaint:
             raise HTTPException(status_code=404, detail="Complaint not found")
@@ -3236,7 +3687,15 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
             priority_value = "Medium"
 
         now = datetime.utcnow()
-        crime_insert = conn.execute(
+        crime_payload = {
+            "type": subject,
+            "description": description,
+            "source": "user-complaint",
+            "source_complaint_id": complaint_id,
+            "reporter_contact": complaint.get("reporter_contact") or complaint_payload.get("reporter_contact"),
+        }
+        location_payload = {"area_name": location_hint} if location_hint else {}
+        crime_insert = await conn.execute(
             text(
                 """
                 INSERT INTO crime (reporter_id, crime_data, location_data, status, priority_level, incident_date, created_at, updated_at)
@@ -3245,14 +3704,8 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
             ),
             {
                 "reporter_id": None,
-                "crime_data": json.dumps({
-                    "type": subject,
-                    "description": description,
-                    "source": "user-complaint",
-                    "source_complaint_id": complaint_id,
-                    "reporter_contact": complaint.get("reporter_contact") or complaint_payload.get("reporter_contact"),
-                }),
-                "location_data": json.dumps({"area_name": location_hint} if location_hint else {}),
+                "crime_data": json.dumps(crime_payload),
+                "location_data": json.dumps(location_payload),
                 "status": "Escalated",
                 "priority_level": priority_value,
                 "incident_date": None,
@@ -3262,9 +3715,13 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
         )
 
         new_crime_id = crime_insert.lastrowid
+        await conn.run_sync(totals.crime_inserted, "Escalated")
+        await conn.run_sync(search_index.index_crime, new_crime_id, crime_payload, location_payload)
+        await conn.run_sync(rollups.changed, rollups.CRIMES, new_crime_id)
+        await conn.run_sync(workload.crime_changed, new_crime_id)
 
         try:
-            conn.execute(
+            await conn.execute(
                 text(
                     """
                     INSERT INTO status_history (crime_id, new_status, notes, changed_by, changed_at)
@@ -3282,7 +3739,7 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
         except Exception:
             logging.exception("Failed to write status_history for escalated complaint; primary insert succeeded")
 
-        conn.execute(
+        await conn.execute(
             text(
                 """
                 UPDATE user_complaints
@@ -3297,6 +3754,16 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
             }
         )
 
+    activity.record(
+        activity.COMPLAINT, complaint_id, activity.ESCALATED, status="Escalated", actor_id=_user.get("user_id"),
+        title=subject, summary=f"Escalated to {activity.crime_title(new_crime_id)}",
+        details={"crime_id": new_crime_id},
+    )
+    activity.record(
+        activity.CRIME, new_crime_id, activity.CREATED, status="Escalated", actor_id=_user.get("user_id"),
+        title=activity.crime_title(new_crime_id),
+        summary=activity.crime_summary(subject, description, location_hint),
+    )
     return {
         "message": "Complaint escalated to case management",
         "crime_id": new_crime_id
@@ -3306,13 +3773,13 @@ async def escalate_complaint_to_case(complaint_id: int, payload: Optional[Dict[s
 @app.post("/api/admin/complaints/from-crime/{crime_id}")
 async def convert_crime_to_complaint(crime_id: int, _user: dict = Depends(require_admin)):
     """Create a user_complaints row from an existing crime so it can be verified/rejected via the complaints workflow."""
-    with engine.begin() as conn:
-        crime_row = conn.execute(
+    async with async_engine.begin() as conn:
+        crime_row = (await conn.execute(
             text(
                 "SELECT crime_id, reporter_id, crime_data, location_data, status, priority_level, created_at FROM crime WHERE crime_id = :crime_id FOR UPDATE"
             ),
             {"crime_id": crime_id}
-        ).mappings().fetchone()
+        )).mappings().fetchone()
 
         if not crime_row:
             raise HTTPException(status_code=404, detail="Crime not found")
@@ -3330,7 +3797,7 @@ async def convert_crime_to_complaint(crime_id: int, _user: dict = Depends(requir
         now = datetime.utcnow()
 
         # Insert into user_complaints
-        insert = conn.execute(
+        insert = await conn.execute(
             text(
                 "INSERT INTO user_complaints (reporter_contact, channel, status, priority, complaint_data, created_at, updated_at) VALUES (:reporter_contact, :channel, :status, :priority, :complaint_data, :created_at, :updated_at)"
             ),
@@ -3352,16 +3819,29 @@ async def convert_crime_to_complaint(crime_id: int, _user: dict = Depends(requir
             "complaint_id": new_complaint_id
         }
 
+CASE_MANAGEMENT_STATUSES = ("under investigation", "investigating", "in progress", "assigned", "escalated")
+
+
 @app.get("/api/admin/case-management")
 async def get_case_management_cases(
     _user: dict = Depends(require_admin),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
+    total: str = Query("estimate", pattern=TOTAL_MODE_PATTERN, description="exact | estimate (cached counter) | none"),
 ):
     """Return crimes under investigation along with assignment details."""
-    with engine.connect() as conn:
+    position = _parse_cursor(cursor)
+    keyset_sql, params = keyset_predicate("c.activity_at", "c.crime_id", position)
+    params["limit"] = limit + 1
+    params["case_statuses"] = list(CASE_MANAGEMENT_STATUSES)
+    page_clause = "LIMIT :limit"
+    if position is None:
+        page_clause += " OFFSET :offset"
+        params["offset"] = offset
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            rows = (await conn.execute(
                 text(
                     """
                     SELECT
@@ -3369,9 +3849,10 @@ async def get_case_management_cases(
                         c.status AS crime_status,
                         c.created_at,
                         c.updated_at,
-                        JSON_UNQUOTE(JSON_EXTRACT(c.crime_data, '$.type')) AS crime_type,
-                        JSON_UNQUOTE(JSON_EXTRACT(c.crime_data, '$.description')) AS crime_description,
-                        JSON_UNQUOTE(JSON_EXTRACT(c.location_data, '$.area_name')) AS area_name,
+                        c.activity_at,
+                        c.crime_type,
+                        c.description_prefix AS crime_description,
+                        c.area_name,
                         ca.assignment_id,
                         ca.user_id,
                         ca.duty_role,
@@ -3383,18 +3864,22 @@ async def get_case_management_cases(
                     FROM crime c
                     LEFT JOIN case_assignments ca ON ca.crime_id = c.crime_id
                     LEFT JOIN appuser u ON ca.user_id = u.user_id
-                    WHERE LOWER(c.status) IN ('under investigation', 'investigating', 'in progress', 'assigned', 'escalated')
-                    ORDER BY COALESCE(ca.assigned_at, c.updated_at, c.created_at) DESC
-                    LIMIT :limit OFFSET :offset
+                    WHERE c.status IN :case_statuses
                     """
-                ),
-                {"limit": limit, "offset": offset},
-            ).mappings().fetchall()
-
-            total_row = conn.execute(text(
-                "SELECT COUNT(*) AS total FROM crime WHERE LOWER(status) IN ('under investigation', 'investigating', 'in progress', 'assigned', 'escalated')"
-            )).mappings().fetchone()
-            return {"cases": [dict(row) for row in result], "total": int(total_row["total"]) if total_row else 0, "limit": limit, "offset": offset}
+                    + (f" AND {keyset_sql}" if keyset_sql else "")
+                    # Latest activity first: activity_at is COALESCE(assigned_at,
+                    # updated_at, created_at), stored and indexed (migration 021)
+                    # so the (activity_at, crime_id) cursor is well defined.
+                    + " ORDER BY c.activity_at DESC, c.crime_id DESC "
+                    + page_clause
+                ).bindparams(bindparam("case_statuses", expanding=True)),
+                params,
+            )).mappings().fetchall()
+            result, next_cursor = page_rows(rows, limit, "activity_at", "crime_id")
+
+            total_count = await conn.run_sync(totals.crime_total, total, CASE_MANAGEMENT_STATUSES)
+            await conn.commit()
+            return {"cases": [dict(row) for row in result], "total": total_count, "total_mode": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
         except Exception as exc:
             logging.exception("Error fetching case management cases: %s", exc)
             return {"cases": []}
@@ -3404,24 +3889,37 @@ async def get_case_assignments(
     _user: dict = Depends(require_admin),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (overrides offset)"),
+    total: str = Query("estimate", pattern=TOTAL_MODE_PATTERN, description="exact | estimate (cached counter) | none"),
 ):
     """Get all case assignments"""
-    with engine.connect() as conn:
+    position = _parse_cursor(cursor)
+    keyset_sql, params = keyset_predicate("ca.assigned_at", "ca.assignment_id", position)
+    params["limit"] = limit + 1
+    page_clause = "LIMIT :limit"
+    if position is None:
+        page_clause += " OFFSET :offset"
+        params["offset"] = offset
+    async with async_engine.connect() as conn:
         try:
-            result = conn.execute(
+            rows = (await conn.execute(
                 text("""
                     SELECT ca.*, u.username, u.email, c.status as crime_status,
-                           JSON_EXTRACT(c.crime_data, '$.type') as crime_type
+                           c.crime_type
                     FROM case_assignments ca
                     LEFT JOIN appuser u ON ca.user_id = u.user_id
                     LEFT JOIN crime c ON ca.crime_id = c.crime_id
-                    ORDER BY ca.assigned_at DESC
-                    LIMIT :limit OFFSET :offset
-                """),
-                {"limit": limit, "offset": offset},
-            ).mappings().fetchall()
-            total_row = conn.execute(text("SELECT COUNT(*) AS total FROM case_assignments")).mappings().fetchone()
-            return {"assignments": [dict(row) for row in result], "total": int(total_row["total"]) if total_row else 0, "limit": limit, "offset": offset}
+                """
+                    + _where([keyset_sql] if keyset_sql else [])
+                    + " ORDER BY ca.assigned_at DESC, ca.assignment_id DESC "
+                    + page_clause
+                ),
+                params,
+            )).mappings().fetchall()
+            result, next_cursor = page_rows(rows, limit, "assigned_at", "assignment_id")
+            total_count = await conn.run_sync(totals.assignment_total, total)
+            await conn.commit()
+            return {"assignments": [dict(row) for row in result], "total": total_count, "total_mode": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
         except Exception as e:
             logging.exception("Error fetching case assignments")
             raise HTTPException(status_code=500, detail=f"Failed to fetch case assignments: {e}")
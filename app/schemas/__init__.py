@@ -25,6 +25,10 @@ from app.schemas.missing import (  # noqa: F401
     MissingPersonFinderUpdate,
     PoliceStationCreate,
 )
+from app.schemas.reference import (  # noqa: F401
+    ReferenceItemCreate,
+    ReferenceItemUpdate,
+)
 from app.schemas.wanted import (  # noqa: F401
     CriminalSighting,
     WantedCriminalCreate,
@@ -0,0 +1,35 @@
+"""Reference-data (crime types, districts, thanas, areas) Pydantic models."""
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel, validator
+
+
+class ReferenceItemCreate(BaseModel):
+    name: str
+    district: Optional[str] = None  # required for thanas and areas
+    thana: Optional[str] = None  # areas only
+    sort_order: int = 0
+
+    @validator("name")
+    def validate_name(cls, value: str) -> str:
+        if not value or not value.strip():
+            raise ValueError("Field cannot be empty")
+        if len(value.strip()) > 100:
+            raise ValueError("Name must be at most 100 characters")
+        return value.strip()
+
+
+class ReferenceItemUpdate(BaseModel):
+    name: Optional[str] = None
+    sort_order: Optional[int] = None
+    is_active: Optional[bool] = None
+
+    @validator("name")
+    def validate_name(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        if not value.strip():
+            raise ValueError("Field cannot be empty")
+        return value.strip()
@@ -6,4 +6,5 @@ from app.db import (  # noqa: F401
     insert_and_get_id,
     parse_json_field,
     get_conn,
+    pool_stats,
 )
\ No newline at end of file
@@ -0,0 +1,35 @@
+-- Migration 006: Stored generated columns for hot JSON keys on crime.
+--
+-- crime.crime_data / crime.location_data are TEXT holding JSON. Analytics,
+-- search and admin list queries used to call JSON_EXTRACT per row, which
+-- forces a full scan plus a JSON parse of every row. These STORED columns
+-- are computed once on write and can be indexed.
+--
+-- Every expression is guarded with JSON_VALID so legacy rows holding
+-- non-JSON text still insert/update (they simply get NULL), and values are
+-- clipped to the column width so strict mode never rejects a write.
+-- lat/lng accept either `latitude`/`longitude` or `lat`/`lng` keys and only
+-- cast values that look numeric.
+--
+-- priority_level is already a physical column (migration 003), so it is
+-- indexed below rather than duplicated.
+--
+-- Bare ADD COLUMN / CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The
+-- migration runner treats 1060/1061 duplicate errors as already applied.
+
+ALTER TABLE crime ADD COLUMN crime_type VARCHAR(100) AS (IF(JSON_VALID(crime_data), NULLIF(LEFT(JSON_UNQUOTE(JSON_EXTRACT(crime_data, '$.type')), 100), 'null'), NULL)) STORED;
+ALTER TABLE crime ADD COLUMN description_prefix VARCHAR(255) AS (IF(JSON_VALID(crime_data), NULLIF(LEFT(JSON_UNQUOTE(JSON_EXTRACT(crime_data, '$.description')), 255), 'null'), NULL)) STORED;
+ALTER TABLE crime ADD COLUMN city VARCHAR(100) AS (IF(JSON_VALID(location_data), NULLIF(LEFT(JSON_UNQUOTE(JSON_EXTRACT(location_data, '$.city')), 100), 'null'), NULL)) STORED;
+ALTER TABLE crime ADD COLUMN area_name VARCHAR(150) AS (IF(JSON_VALID(location_data), NULLIF(LEFT(JSON_UNQUOTE(JSON_EXTRACT(location_data, '$.area_name')), 150), 'null'), NULL)) STORED;
+ALTER TABLE crime ADD COLUMN lat DECIMAL(10,7) AS (IF(JSON_VALID(location_data), IF(JSON_UNQUOTE(COALESCE(JSON_EXTRACT(location_data, '$.latitude'), JSON_EXTRACT(location_data, '$.lat'))) REGEXP '^-?[0-9]{1,2}([.][0-9]+)?$', CAST(JSON_UNQUOTE(COALESCE(JSON_EXTRACT(location_data, '$.latitude'), JSON_EXTRACT(location_data, '$.lat'))) AS DECIMAL(10,7)), NULL), NULL)) STORED;
+ALTER TABLE crime ADD COLUMN lng DECIMAL(10,7) AS (IF(JSON_VALID(location_data), IF(JSON_UNQUOTE(COALESCE(JSON_EXTRACT(location_data, '$.longitude'), JSON_EXTRACT(location_data, '$.lng'))) REGEXP '^-?[0-9]{1,3}([.][0-9]+)?$', CAST(JSON_UNQUOTE(COALESCE(JSON_EXTRACT(location_data, '$.longitude'), JSON_EXTRACT(location_data, '$.lng'))) AS DECIMAL(10,7)), NULL), NULL)) STORED;
+
+-- Type breakdowns / type filter sorted by recency.
+CREATE INDEX idx_crime_type_created ON crime (crime_type, created_at);
+-- Location filters (city, then area) sorted by recency.
+CREATE INDEX idx_crime_city_area_created ON crime (city, area_name, created_at);
+CREATE INDEX idx_crime_area_created ON crime (area_name, created_at);
+-- Status + priority triage lists.
+CREATE INDEX idx_crime_status_priority_created ON crime (status, priority_level, created_at);
+-- Bounding-box lookups.
+CREATE INDEX idx_crime_lat_lng ON crime (lat, lng);
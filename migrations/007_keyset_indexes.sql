@@ -0,0 +1,29 @@
+-- Migration 007: Composite indexes backing keyset (cursor) pagination.
+--
+-- List endpoints page newest-first on (created_at, id) and accept an opaque
+-- `cursor` encoding the last row's pair (see app/db/pagination.py). Each
+-- index below matches one ORDER BY + filter so the next page is a range scan
+-- instead of an OFFSET walk. The primary key is listed explicitly even
+-- though InnoDB appends it to every secondary index, to document the sort.
+--
+-- Bare CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The migration runner
+-- treats 1061 duplicate-key errors as already applied.
+
+-- /api/crimes (optionally ?status=) and /api/admin/case-management
+CREATE INDEX idx_crime_created_id ON crime (created_at, crime_id);
+CREATE INDEX idx_crime_status_created_id ON crime (status, created_at, crime_id);
+
+-- /api/admin/users (optionally ?status= / ?role=)
+CREATE INDEX idx_appuser_created_id ON appuser (created_at, user_id);
+CREATE INDEX idx_appuser_status_created_id ON appuser (status, created_at, user_id);
+CREATE INDEX idx_appuser_role_created_id ON appuser (role_hint, created_at, user_id);
+
+-- /api/admin/emergencies (optionally ?status=)
+CREATE INDEX idx_emergency_created_id ON emergency_alerts (created_at, alert_id);
+CREATE INDEX idx_emergency_status_created_id ON emergency_alerts (status, created_at, alert_id);
+
+-- /api/admin/complaints
+CREATE INDEX idx_user_complaints_created_id ON user_complaints (created_at, complaint_id);
+
+-- /api/admin/case-assignments
+CREATE INDEX idx_case_assignments_assigned_id ON case_assignments (assigned_at, assignment_id);
@@ -0,0 +1,26 @@
+-- Migration 008: Indexed last_activity_at for the public missing-person and
+-- wanted-criminal registers.
+--
+-- Both lists sorted on COALESCE(updated_at, created_at), which no index can
+-- serve, and returned the whole table. last_activity_at is a STORED
+-- generated column holding that same value. MySQL maintains it on every
+-- INSERT/UPDATE, so no write path can forget it. The indexes back
+-- newest/oldest-first keyset pagination plus the public filters.
+--
+-- Bare ADD COLUMN / CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The
+-- migration runner treats 1060/1061 duplicate errors as already applied.
+
+ALTER TABLE missing_person ADD COLUMN last_activity_at DATETIME AS (COALESCE(updated_at, created_at)) STORED;
+ALTER TABLE wanted_criminal ADD COLUMN last_activity_at DATETIME AS (COALESCE(updated_at, created_at)) STORED;
+
+-- missing_person: sort, ?status=, ?gender=, ?age_min/age_max=
+CREATE INDEX idx_missing_person_activity ON missing_person (last_activity_at, missing_id);
+CREATE INDEX idx_missing_person_status_activity ON missing_person (status, last_activity_at, missing_id);
+CREATE INDEX idx_missing_person_gender_activity ON missing_person (gender, last_activity_at, missing_id);
+CREATE INDEX idx_missing_person_age ON missing_person (age);
+
+-- wanted_criminal: sort, ?status=, ?danger_level=, ?gender=
+CREATE INDEX idx_wanted_criminal_activity ON wanted_criminal (last_activity_at, criminal_id);
+CREATE INDEX idx_wanted_criminal_status_activity ON wanted_criminal (status, last_activity_at, criminal_id);
+CREATE INDEX idx_wanted_criminal_danger_activity ON wanted_criminal (danger_level, last_activity_at, criminal_id);
+CREATE INDEX idx_wanted_criminal_gender_activity ON wanted_criminal (gender, last_activity_at, criminal_id);
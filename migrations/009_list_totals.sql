@@ -0,0 +1,15 @@
+-- Migration 009: Counter table behind app.db.totals.
+--
+-- Paginated list endpoints used to run SELECT COUNT(*) over the filtered
+-- table on every call. list_totals holds one row per (scope, filter_key),
+-- e.g. ('crime', 'status:pending'). Write paths adjust it in the same
+-- transaction as the row change. scripts/db/reconcile_totals.py recounts
+-- periodically. Rows are created on the first exact count, not here.
+
+CREATE TABLE IF NOT EXISTS list_totals (
+    scope VARCHAR(64) NOT NULL,
+    filter_key VARCHAR(191) NOT NULL,
+    total BIGINT NOT NULL DEFAULT 0,
+    refreshed_at DATETIME NULL,
+    PRIMARY KEY (scope, filter_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
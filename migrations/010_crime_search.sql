@@ -0,0 +1,27 @@
+-- Migration 010: Full-text search index for /api/search/crimes.
+--
+-- Search used to run LIKE '%kw%' over the raw crime_data/location_data
+-- JSON. That is a full scan, and it also matched JSON keys. crime_search
+-- holds one document per crime with just the searchable values: type,
+-- area, city and the full description. Two InnoDB FULLTEXT indexes sit on
+-- it. ft_crime_search_all answers the match. ft_crime_search_meta lets
+-- the ranking weight hits in type/area/city above hits in the free text.
+--
+-- app.db.search writes documents when a crime is created or escalated.
+-- The FK cascade drops them when a crime is deleted by any path.
+-- The final statement backfills existing crimes. Rerunning it is a
+-- no-op (INSERT IGNORE).
+
+CREATE TABLE IF NOT EXISTS crime_search (
+    crime_id INT NOT NULL PRIMARY KEY,
+    crime_type VARCHAR(100) NULL,
+    area_name VARCHAR(150) NULL,
+    city VARCHAR(100) NULL,
+    description TEXT NULL,
+    indexed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FULLTEXT KEY ft_crime_search_all (crime_type, area_name, city, description),
+    FULLTEXT KEY ft_crime_search_meta (crime_type, area_name, city),
+    CONSTRAINT fk_crime_search_crime FOREIGN KEY (crime_id) REFERENCES crime (crime_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO crime_search (crime_id, crime_type, area_name, city, description) SELECT crime_id, crime_type, area_name, city, IF(JSON_VALID(crime_data), NULLIF(JSON_UNQUOTE(JSON_EXTRACT(crime_data, '$.description')), 'null'), NULL) FROM crime;
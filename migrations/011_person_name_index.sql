@@ -0,0 +1,21 @@
+-- Migration 011: Fuzzy name index for /api/search/names.
+--
+-- Missing-person and wanted-criminal names are spelled many ways
+-- (Mohammad / Muhammad / Md., Rashida / Rasheda, Bangla script). A LIKE
+-- over the name column misses those and scans the table. person_name_index
+-- holds one row per name key: the normalised token ('tok'), its phonetic
+-- skeleton ('ph') and its trigrams ('tri'). Lookups are range scans on the
+-- primary key. app.db.names computes the keys, so they cannot be filled in
+-- SQL. Run scripts/db/rebuild_name_index.py once after applying this.
+--
+-- The index covers two parent tables, so there is no FK. The write paths
+-- delete a person's rows together with the person.
+
+CREATE TABLE IF NOT EXISTS person_name_index (
+    entity VARCHAR(16) NOT NULL,
+    entity_id INT NOT NULL,
+    kind CHAR(3) NOT NULL,
+    gram VARCHAR(64) NOT NULL,
+    PRIMARY KEY (kind, gram, entity, entity_id),
+    KEY idx_person_name_index_entity (entity, entity_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
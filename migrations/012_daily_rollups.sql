@@ -0,0 +1,21 @@
+-- Migration 012: Daily rollups for /api/statistics/timeseries.
+--
+-- Trend figures were recomputed from raw rows with DATE_SUB(NOW(), ...) on
+-- every request, and no history could be charted. daily_rollup keeps one
+-- counter per Asia/Dhaka calendar day and series: all crimes, crimes by
+-- type / area / status / priority, missing-person reports, wanted-criminal
+-- entries and user registrations. app.db.rollups documents the layout.
+--
+-- Write paths update the counters in their own transaction. Existing rows
+-- are counted by scripts/db/backfill_rollups.py; run it once after
+-- applying this, and again for any range that needs repair.
+
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day DATE NOT NULL,
+    metric VARCHAR(16) NOT NULL,
+    dimension VARCHAR(16) NOT NULL DEFAULT '',
+    value VARCHAR(150) NOT NULL DEFAULT '',
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, dimension, value, day),
+    KEY idx_daily_rollup_metric_day (metric, day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
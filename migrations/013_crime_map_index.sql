@@ -0,0 +1,13 @@
+-- Migration 013: Covering index for crime map tiles.
+--
+-- /api/crimes/heatmap and /api/crimes/tiles/{z}/{x}/{y} count crimes per
+-- grid cell inside a tile and a time window. With (created_at, lat, lng,
+-- crime_type) the window is a range scan. The point and type filters, and
+-- the grouping, are then read from the index alone, without touching the
+-- JSON-heavy crime rows. idx_crime_lat_lng (migration 006) still serves
+-- purely spatial lookups.
+--
+-- Bare CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The migration runner
+-- treats 1061 duplicate errors as already applied.
+
+CREATE INDEX idx_crime_created_lat_lng ON crime (created_at, lat, lng, crime_type);
@@ -0,0 +1,12 @@
+-- Migration 014: Nearest police stations on each emergency alert.
+--
+-- /api/emergency-alert looks up the closest stations to the panic location
+-- in an in-memory index (app/db/stations.py) and stores them with the
+-- alert as a JSON list of {station_id, station_name, station_code, phone,
+-- latitude, longitude, distance_km}, nearest first. Like user_snapshot and
+-- assigned_officer_snapshot, this is a snapshot of when the alert was raised.
+--
+-- Bare ADD COLUMN (no IF NOT EXISTS, MariaDB-only). The migration runner
+-- treats 1060 duplicate errors as already applied.
+
+ALTER TABLE emergency_alerts ADD COLUMN nearest_stations LONGTEXT NULL;
@@ -0,0 +1,15 @@
+-- Migration 015: Grid-cell column for "incidents near me" radius queries.
+--
+-- geocell numbers the 0.01-degree cell (about 1.1 km) that a crime's
+-- lat/lng (migration 006) falls in: row-major, 36000 cells per row of
+-- latitude. It is a STORED generated column, so every write path keeps it
+-- current. /api/crimes/nearby lists the cells that overlap the search
+-- circle and seeks (geocell = cell, created_at >= since) for each one
+-- (app/db/nearby.py).
+--
+-- Bare ADD COLUMN / CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The
+-- migration runner treats 1060/1061 duplicate errors as already applied.
+
+ALTER TABLE crime ADD COLUMN geocell INT AS (IF(lat IS NULL OR lng IS NULL, NULL, LEAST(FLOOR((lat + 90) * 100), 17999) * 36000 + LEAST(FLOOR((lng + 180) * 100), 35999))) STORED;
+
+CREATE INDEX idx_crime_geocell_created ON crime (geocell, created_at);
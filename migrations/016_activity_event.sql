@@ -0,0 +1,29 @@
+-- Migration 016: Append-only activity feed.
+--
+-- The admin activity feeds queried crime, missing_person and
+-- wanted_criminal separately and merge-sorted in Python. activity_log and
+-- admin_activity_log (migration 005) were never written by the main app,
+-- and the /admin-api CRUD routes can edit and delete their rows.
+-- activity_event is written only by app.db.activity: one row per create,
+-- status change, assignment, sighting or escalation, appended in batches.
+-- Rows are never updated. title/summary are copied from the source row at
+-- write time, so feeds read this table alone.
+--
+-- Existing rows get `created` events from scripts/db/backfill_activity.py;
+-- run it once after applying this.
+
+CREATE TABLE IF NOT EXISTS activity_event (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    occurred_at DATETIME NOT NULL,
+    entity VARCHAR(32) NOT NULL,
+    entity_id INT NULL,
+    action VARCHAR(32) NOT NULL,
+    status VARCHAR(50) NULL,
+    actor_id INT NULL,
+    title VARCHAR(255) NULL,
+    summary VARCHAR(500) NULL,
+    details TEXT NULL,
+    KEY idx_activity_event_occurred (occurred_at, event_id),
+    KEY idx_activity_event_entity_occurred (entity, occurred_at, event_id),
+    KEY idx_activity_event_entity_id (entity, entity_id, event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
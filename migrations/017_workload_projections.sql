@@ -0,0 +1,33 @@
+-- Migration 017: Fill active_cases and officer_workload as live projections.
+--
+-- Migration 005 created both tables, but nothing wrote to them, so the
+-- /admin-api active-cases and officer-workload views were always empty.
+-- They are now maintained by app.db.workload inside the transaction of
+-- every crime / case assignment write:
+--   active_cases      one row per open crime (status not resolved/closed),
+--                     with the list fields the admin view selects and the
+--                     officer it is actively assigned to
+--   officer_workload  one row per officer with the number of open crimes
+--                     actively assigned to them
+-- The 005 columns priority and notes are left in place and unused.
+--
+-- Existing data is projected by scripts/db/reconcile_workload.py; run it
+-- once after applying this, and periodically to correct drift.
+--
+-- Bare ADD COLUMN / CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The
+-- migration runner treats 1060/1061 duplicate errors as already applied.
+
+ALTER TABLE active_cases ADD COLUMN reporter_id VARCHAR(255) NULL;
+ALTER TABLE active_cases ADD COLUMN reporter_name VARCHAR(255) NULL;
+ALTER TABLE active_cases ADD COLUMN crime_type VARCHAR(100) NULL;
+ALTER TABLE active_cases ADD COLUMN city VARCHAR(100) NULL;
+ALTER TABLE active_cases ADD COLUMN area VARCHAR(150) NULL;
+ALTER TABLE active_cases ADD COLUMN priority_level VARCHAR(32) NULL;
+ALTER TABLE active_cases ADD COLUMN incident_date DATETIME NULL;
+CREATE UNIQUE INDEX uq_active_cases_crime ON active_cases (crime_id);
+CREATE INDEX idx_active_cases_created ON active_cases (created_at);
+CREATE INDEX idx_active_cases_assigned ON active_cases (assigned_to);
+
+ALTER TABLE officer_workload ADD COLUMN role_hint VARCHAR(50) NULL;
+ALTER TABLE officer_workload ADD COLUMN updated_at DATETIME NULL;
+CREATE INDEX idx_officer_workload_load ON officer_workload (active_assignments, full_name);
@@ -0,0 +1,23 @@
+-- Migration 018: Version stamps for conditional GETs.
+--
+-- The wanted-criminal, missing-person and police-station endpoints were
+-- fetched with cache: 'no-store' and re-sent in full on every page load.
+-- resource_version holds one counter per resource. Write routes bump it
+-- after they commit (app.db.versions), and read routes derive ETag and
+-- Last-Modified from it, answering 304 Not Modified when the client's copy
+-- is current. It is a single primary-key lookup, and it skips the list
+-- query entirely on a 304.
+--
+-- Rows are seeded at version 1 so that Last-Modified is available from the
+-- start; INSERT IGNORE keeps re-runs from resetting live counters.
+
+CREATE TABLE IF NOT EXISTS resource_version (
+    resource VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at DATETIME NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO resource_version (resource, version, changed_at) VALUES
+    ('wanted_criminal', 1, UTC_TIMESTAMP()),
+    ('missing_person', 1, UTC_TIMESTAMP()),
+    ('police_station', 1, UTC_TIMESTAMP());
@@ -0,0 +1,95 @@
+-- Migration 019: Reference data for the report forms.
+--
+-- Crime types, districts and areas were hard-coded lists in app/main.py, and
+-- areas only existed for Dhaka, Chittagong and Sylhet, so adding one needed a
+-- deploy. They now live in ref_* tables that admins edit through
+-- /api/admin/reference/*. app.db.reference serves them from an in-process
+-- cache that reloads when the 'reference' row in resource_version (migration
+-- 018) is bumped.
+--
+-- Areas may name their thana (police station jurisdiction); thana_id stays
+-- NULL until one is assigned. Rows are deactivated, not deleted, so old
+-- reports keep pointing at a known name. The seeds reproduce the lists that
+-- were previously hard-coded; INSERT IGNORE keeps re-runs from duplicating them.
+
+CREATE TABLE IF NOT EXISTS ref_crime_type (
+    crime_type_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    is_active TINYINT(1) NOT NULL DEFAULT 1,
+    UNIQUE KEY uq_ref_crime_type_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS ref_district (
+    district_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    is_active TINYINT(1) NOT NULL DEFAULT 1,
+    UNIQUE KEY uq_ref_district_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS ref_thana (
+    thana_id INT AUTO_INCREMENT PRIMARY KEY,
+    district_id INT NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    is_active TINYINT(1) NOT NULL DEFAULT 1,
+    UNIQUE KEY uq_ref_thana_district_name (district_id, name),
+    CONSTRAINT fk_ref_thana_district FOREIGN KEY (district_id) REFERENCES ref_district (district_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS ref_area (
+    area_id INT AUTO_INCREMENT PRIMARY KEY,
+    district_id INT NOT NULL,
+    thana_id INT NULL,
+    name VARCHAR(100) NOT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    is_active TINYINT(1) NOT NULL DEFAULT 1,
+    UNIQUE KEY uq_ref_area_district_name (district_id, name),
+    KEY idx_ref_area_thana (thana_id),
+    CONSTRAINT fk_ref_area_district FOREIGN KEY (district_id) REFERENCES ref_district (district_id),
+    CONSTRAINT fk_ref_area_thana FOREIGN KEY (thana_id) REFERENCES ref_thana (thana_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO ref_crime_type (name, sort_order) VALUES
+    ('Theft', 1), ('Burglary', 2), ('Robbery', 3), ('Assault', 4), ('Murder', 5),
+    ('Kidnapping', 6), ('Fraud', 7), ('Cybercrime', 8), ('Drug Offense', 9),
+    ('Vandalism', 10), ('Domestic Violence', 11), ('Sexual Assault', 12),
+    ('Hit and Run', 13), ('Arson', 14), ('Blackmail', 15), ('Emergency', 16), ('Other', 17);
+
+INSERT IGNORE INTO ref_district (name, sort_order) VALUES
+    ('Dhaka', 1), ('Chittagong', 2), ('Sylhet', 3), ('Rajshahi', 4), ('Khulna', 5),
+    ('Barisal', 6), ('Rangpur', 7), ('Mymensingh', 8), ('Comilla', 9), ('Gazipur', 10),
+    ('Narayanganj', 11);
+
+INSERT IGNORE INTO ref_area (district_id, name, sort_order)
+SELECT d.district_id, a.name, a.sort_order
+FROM ref_district d
+JOIN (
+    SELECT 'Dhaka' AS district, 'Dhanmondi' AS name, 1 AS sort_order
+    UNION ALL SELECT 'Dhaka', 'Gulshan', 2
+    UNION ALL SELECT 'Dhaka', 'Banani', 3
+    UNION ALL SELECT 'Dhaka', 'Uttara', 4
+    UNION ALL SELECT 'Dhaka', 'Mirpur', 5
+    UNION ALL SELECT 'Dhaka', 'Mohammadpur', 6
+    UNION ALL SELECT 'Dhaka', 'Old Dhaka', 7
+    UNION ALL SELECT 'Dhaka', 'Wari', 8
+    UNION ALL SELECT 'Dhaka', 'Ramna', 9
+    UNION ALL SELECT 'Dhaka', 'Tejgaon', 10
+    UNION ALL SELECT 'Dhaka', 'Motijheel', 11
+    UNION ALL SELECT 'Dhaka', 'Shahbagh', 12
+    UNION ALL SELECT 'Chittagong', 'Agrabad', 1
+    UNION ALL SELECT 'Chittagong', 'Nasirabad', 2
+    UNION ALL SELECT 'Chittagong', 'Panchlaish', 3
+    UNION ALL SELECT 'Chittagong', 'Khulshi', 4
+    UNION ALL SELECT 'Chittagong', 'Halishahar', 5
+    UNION ALL SELECT 'Chittagong', 'Bayazid', 6
+    UNION ALL SELECT 'Sylhet', 'Zindabazar', 1
+    UNION ALL SELECT 'Sylhet', 'Amberkhana', 2
+    UNION ALL SELECT 'Sylhet', 'Shahporan', 3
+    UNION ALL SELECT 'Sylhet', 'Bandar Bazar', 4
+    UNION ALL SELECT 'Sylhet', 'Chowhatta', 5
+) a ON a.district = d.name;
+
+INSERT IGNORE INTO resource_version (resource, version, changed_at) VALUES
+    ('reference', 1, UTC_TIMESTAMP());
@@ -0,0 +1,17 @@
+-- Migration 020: Index for incremental and paged chat history.
+--
+-- /api/chat/conversation/{user_id} used to return a conversation's whole
+-- history on every call. It now returns one page, oldest first, chosen by
+-- message id: `after_id` for only the messages a client does not have yet,
+-- `before_id` for the page before the oldest one it shows, or neither for
+-- the newest page (see app.db.chat.history). The resume read behind
+-- /api/chat/stream is the same `message_id > :after_id` range.
+--
+-- With this index each page is a range scan within one conversation. The
+-- old (user_id, created_at) index had to read every row of the user and
+-- sort them.
+--
+-- Bare CREATE INDEX (no IF NOT EXISTS, MariaDB-only). The migration runner
+-- treats 1061 duplicate-key errors as already applied.
+
+CREATE INDEX idx_chat_messages_conversation ON chat_messages (user_id, report_id, message_id);
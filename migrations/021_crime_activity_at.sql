@@ -0,0 +1,31 @@
+-- Migration 021: Indexed activity_at for the admin case-management list.
+--
+-- The list sorts newest activity first: COALESCE(case_assignments.assigned_at,
+-- crime.updated_at, crime.created_at). That expression spans two tables, so
+-- no index could serve it, and migration 007's keyset paged on created_at
+-- instead, which changed the order admins see.
+--
+-- A generated column can only read its own row, so crime gets a copy of its
+-- assignment's assigned_at (case_assigned_at). Triggers on case_assignments
+-- keep the copy current on every INSERT/UPDATE/DELETE, whichever route or
+-- script wrote it. activity_at is a STORED generated column over the copy,
+-- so MySQL maintains the sort key itself. The index backs the
+-- (activity_at, crime_id) keyset within the status filter.
+--
+-- CREATE TRIGGER needs the TRIGGER privilege (and SUPER, or
+-- log_bin_trust_function_creators, when binary logging is on).
+--
+-- Bare ADD COLUMN / CREATE INDEX / CREATE TRIGGER (no IF NOT EXISTS,
+-- MariaDB-only). The migration runner treats 1060/1061 duplicate errors and
+-- "already exists" as already applied. The backfill UPDATE is idempotent.
+
+ALTER TABLE crime ADD COLUMN case_assigned_at DATETIME NULL;
+ALTER TABLE crime ADD COLUMN activity_at DATETIME AS (COALESCE(case_assigned_at, updated_at, created_at)) STORED;
+
+UPDATE crime c JOIN case_assignments ca ON ca.crime_id = c.crime_id SET c.case_assigned_at = ca.assigned_at;
+
+CREATE TRIGGER trg_case_assignments_ai AFTER INSERT ON case_assignments FOR EACH ROW UPDATE crime SET case_assigned_at = NEW.assigned_at WHERE crime_id = NEW.crime_id;
+CREATE TRIGGER trg_case_assignments_au AFTER UPDATE ON case_assignments FOR EACH ROW UPDATE crime SET case_assigned_at = NEW.assigned_at WHERE crime_id = NEW.crime_id;
+CREATE TRIGGER trg_case_assignments_ad AFTER DELETE ON case_assignments FOR EACH ROW UPDATE crime SET case_assigned_at = NULL WHERE crime_id = OLD.crime_id;
+
+CREATE INDEX idx_crime_status_activity_id ON crime (status, activity_at, crime_id);
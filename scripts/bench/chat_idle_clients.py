@@ -0,0 +1,218 @@
+"""Benchmark: database queries per second vs. connected chat clients.
+
+Drives the app in-process against a simulated engine that counts every
+`execute` and blocks for --db-ms like a MySQL round trip. For each client
+count the script measures --seconds of steady state while one sender posts
+a message per second, in three modes:
+
+  * polling  — every client GETs /api/chat/conversation/{id} every
+               --poll-s seconds (the old pages)
+  * stream   — every client holds /api/chat/stream open; CHAT_FANOUT=local
+  * tail     — the same, with the database fan-out backend tailing
+               chat_messages once per CHAT_FANOUT_INTERVAL (multi-worker)
+
+Streams are opened with a bare ASGI harness rather than httpx, whose ASGI
+transport waits for the response to finish. The "delivered" column counts
+the message events the stream clients received (the sender cycles through
+their conversations), to show the push path works.
+
+Usage:
+    python scripts/bench/chat_idle_clients.py [--clients 10 100 1000] [--seconds 6]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+os.environ.setdefault("JWT_SECRET", "bench-secret-not-for-production-32b")
+
+import httpx  # noqa: E402
+
+import app.core.security as security  # noqa: E402
+import app.main as app_main  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db import chat  # noqa: E402
+from app.db.aio import AsyncEngine  # noqa: E402
+
+HISTORY = [{"message_id": i, "user_id": 1, "username": "rina", "email": "r@x", "message": f"message {i}",
+            "is_admin": i % 2 == 0, "read_by_admin": 1, "read_by_user": 1, "created_at": datetime(2026, 1, 1), "report_id": None}
+           for i in range(1, 21)]
+
+
+class _SimResult:
+    rowcount = 1
+
+    def __init__(self, rows=(), lastrowid=None):
+        self.rows, self.lastrowid = list(rows), lastrowid
+
+    def mappings(self):
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return 0
+
+
+class _SimEngine:
+    """Counts statements; the conversation read returns a 20-message history."""
+
+    def __init__(self, db_s: float):
+        self.db_s = db_s
+        self.queries = 0
+        self._ids = itertools.count(1000)
+        self._lock = threading.Lock()
+
+    def connect(self):
+        return _SimConn(self)
+
+    begin = connect
+
+
+class _SimConn:
+    def __init__(self, engine: _SimEngine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        with self.engine._lock:
+            self.engine.queries += 1
+        time.sleep(self.engine.db_s)
+        sql = str(statement)
+        if sql.lstrip().startswith("INSERT"):
+            return _SimResult(lastrowid=next(self.engine._ids))
+        if "WHERE cm.user_id = :user_id" in sql and "message_id >" not in sql:
+            return _SimResult(HISTORY)
+        return _SimResult()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+async def _open_stream(path: str, headers: dict, received: list, closed: asyncio.Event) -> None:
+    """One long-lived GET against the ASGI app; appends body chunks to `received`."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.partition("?")[2].encode(), "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            received.append(message["body"].decode())
+
+    await app_main.app(scope, receive, send)
+
+
+async def _run(mode: str, clients: int, args) -> dict:
+    engine = _SimEngine(args.db_ms / 1000)
+    app_main.async_engine = AsyncEngine(engine)
+    fanout = chat.DatabaseFanout(interval=args.fanout_interval) if mode == "tail" else chat.LocalFanout()
+    chat.broker = chat.Broker(fanout)
+    chat.broker.start(lambda: app_main.async_engine)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=1, role='admin')}"}
+    transport = httpx.ASGITransport(app=app_main.app)
+    closed = asyncio.Event()
+    received: list = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def poll_loop(user_id: int):
+            await asyncio.sleep(args.poll_s * user_id / clients)  # spread the tabs out
+            while not stop.is_set():
+                await client.get(f"/api/chat/conversation/{user_id}")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=args.poll_s)
+                except asyncio.TimeoutError:
+                    pass
+
+        async def sender():
+            for user_id in itertools.cycle(range(clients)):
+                if stop.is_set():
+                    return
+                await client.post("/api/chat/send", headers=headers,
+                                  json={"user_id": user_id, "message": "ping", "is_admin": True})
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    pass
+
+        if mode == "polling":
+            tasks = [asyncio.create_task(poll_loop(i)) for i in range(clients)]
+        else:
+            tasks = [asyncio.create_task(_open_stream(f"/api/chat/stream?user_id={i}", headers, received, closed))
+                     for i in range(clients)]
+        await asyncio.sleep(args.poll_s if mode == "polling" else 0.5)  # connect / settle
+        start_queries, started = engine.queries, time.perf_counter()
+        received.clear()
+        send_task = asyncio.create_task(sender())
+        await asyncio.sleep(args.seconds)
+        queries, elapsed = engine.queries - start_queries, time.perf_counter() - started
+        stop.set()
+        closed.set()
+        await asyncio.gather(send_task, *tasks)
+
+    await chat.broker.stop()
+    delivered = sum(chunk.count("event: message") for chunk in received)
+    return {"qps": queries / elapsed, "delivered": None if mode == "polling" else delivered}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=6.0, help="measurement window per run")
+    parser.add_argument("--poll-s", type=float, default=3.0, help="polling interval of the old pages")
+    parser.add_argument("--fanout-interval", type=float, default=1.0)
+    parser.add_argument("--db-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    admin = {"user_id": 1, "username": "bench", "email": "bench@example.com",
+             "role_hint": "admin", "status": "active"}
+    security.fetch_one = lambda sql, params=None: admin
+
+    print(f"{args.seconds:.0f} s window, one message/s; DB queries per second (messages delivered)")
+    print(f"{'clients':>8} {'polling':>16} {'stream':>16} {'tail':>16}")
+    for clients in args.clients:
+        cells = []
+        for mode in ("polling", "stream", "tail"):
+            res = asyncio.run(_run(mode, clients, args))
+            delivered = "-" if res["delivered"] is None else res["delivered"]
+            cells.append(f"{res['qps']:.1f} ({delivered})")
+        print(f"{clients:>8} " + " ".join(f"{cell:>16}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
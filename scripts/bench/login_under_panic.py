@@ -0,0 +1,171 @@
+"""Benchmark: login throughput and panic-button latency during a login burst.
+
+Drives the app in-process (httpx ASGI transport) against a simulated engine
+whose `execute` blocks the calling thread for --db-ms, like a MySQL round
+trip. --logins concurrent clients log in over and over while panic alerts
+are posted one after another; the script prints logins/s and panic
+p50/p99 for
+
+  * inline — bcrypt runs on the event loop (the old behaviour)
+  * pooled — bcrypt runs through `app.core.passwords` (current behaviour)
+
+The stored hash uses BCRYPT_ROUNDS (default 12), so the numbers reflect the
+production cost. PASSWORD_MAX_CONCURRENCY sizes the pool as usual.
+
+Usage:
+    python scripts/bench/login_under_panic.py [--logins 8] [--panics 30]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+os.environ.setdefault("JWT_SECRET", "bench-secret-not-for-production-32b")
+
+import httpx  # noqa: E402
+
+import app.core.security as security  # noqa: E402
+import app.main as app_main  # noqa: E402
+from app.core import passwords  # noqa: E402
+from app.core.security import create_access_token, hash_password  # noqa: E402
+from app.db.aio import AsyncEngine  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+_pooled = passwords._run
+
+
+class _SimResult:
+    lastrowid = 1
+    rowcount = 1
+
+    def __init__(self, row=None):
+        self.row = row
+
+    def mappings(self):
+        return self
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return self.row
+
+    def scalar(self):
+        return 0
+
+
+class _SimConn:
+    def __init__(self, db_s: float, user: dict):
+        self.db_s, self.user = db_s, user
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        time.sleep(self.db_s)
+        if "FROM appuser WHERE email" in str(statement):
+            return _SimResult(self.user)
+        return _SimResult()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _SimEngine:
+    def __init__(self, db_s: float, user: dict):
+        self.db_s, self.user = db_s, user
+
+    def connect(self):
+        return _SimConn(self.db_s, self.user)
+
+    begin = connect
+
+
+async def _inline(func, *args):
+    return func(*args)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[k]
+
+
+async def _run(mode: str, args, user: dict) -> dict:
+    app_main.async_engine = AsyncEngine(_SimEngine(args.db_ms / 1000, user))
+    passwords._run = _inline if mode == "inline" else _pooled
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=1, role='admin')}"}
+    transport = httpx.ASGITransport(app=app_main.app)
+    stop = asyncio.Event()
+    logins = 0
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def login_loop():
+            nonlocal logins
+            while not stop.is_set():
+                r = await client.post("/login", json={"email": user["email"], "password": PASSWORD})
+                if r.status_code != 200:
+                    raise SystemExit(f"login failed: {r.status_code} {r.text}")
+                logins += 1
+
+        started_all = time.perf_counter()
+        workers = [asyncio.create_task(login_loop()) for _ in range(args.logins)]
+        await asyncio.sleep(0.05)
+        payload = {"description": "bench", "alert_type": "panic", "severity": "high",
+                   "location": {"latitude": 23.81, "longitude": 90.41}}
+        for _ in range(args.panics):
+            started = time.perf_counter()
+            r = await client.post("/api/emergency-alert", json=payload, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if r.status_code != 200:
+                raise SystemExit(f"panic request failed: {r.status_code} {r.text}")
+        stop.set()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started_all
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": _percentile(latencies, 99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--panics", type=int, default=30)
+    parser.add_argument("--db-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    admin = {"user_id": 1, "username": "bench", "email": "bench@example.com",
+             "role_hint": "admin", "status": "active"}
+    security.fetch_one = lambda sql, params=None: admin
+    user = {"user_id": 2, "email": "rina@example.com", "username": "rina", "role_hint": "User",
+            "station_id": None, "status": "Active", "created_at": None,
+            "password_hash": hash_password(PASSWORD)}
+
+    print(f"bcrypt cost {security.BCRYPT_ROUNDS}, pool size {passwords.PASSWORD_MAX_CONCURRENCY}")
+    print(f"{'mode':<8} {'logins/s':>9} {'panic p50 ms':>13} {'panic p99 ms':>13}")
+    for mode in ("inline", "pooled"):
+        res = asyncio.run(_run(mode, args, user))
+        print(f"{mode:<8} {res['logins_per_s']:>9.1f} {res['p50_ms']:>13.1f} {res['p99_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
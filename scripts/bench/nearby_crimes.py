@@ -0,0 +1,142 @@
+"""Benchmark: /api/crimes/nearby radius queries at a million reports.
+
+Times `app.db.nearby.search` (one (geocell, created_at) index seek per
+cell overlapping the circle) for a few radius/window combinations around central
+Dhaka. As a baseline it also times the same circle found with a bounding box
+on the (lat, lng) index from migration 006.
+
+By default it seeds an in-memory SQLite DB with --rows synthetic reports
+(1,000,000 unless told otherwise). About 70% are spread over Dhaka and the
+rest over Bangladesh, across the last two years. Pass --mysql to time
+against the configured DB instead (DB_* env vars; migration 015 applied;
+nothing is written).
+
+Usage:
+    python scripts/bench/nearby_crimes.py [--rows 1000000] [--repeat 5] [--mysql]
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+
+from app.db import nearby  # noqa: E402
+
+CENTRE = (23.7806, 90.4070)
+CASES = [(1.0, 24), (2.0, 24), (5.0, 24 * 7), (10.0, 24 * 30), (20.0, 24), (20.0, 24 * 30)]
+TYPES = ["Theft", "Robbery", "Assault", "Fraud", "Harassment", "Burglary", "Vandalism", "Kidnapping"]
+
+
+def _synthetic_rows(rows: int, now: datetime, seed: int = 15):
+    rng = random.Random(seed)
+    span = 2 * 365 * 24 * 3600
+    for i in range(1, rows + 1):
+        if rng.random() < 0.7:
+            lat, lng = rng.uniform(23.70, 23.90), rng.uniform(90.33, 90.50)
+        else:
+            lat, lng = rng.uniform(20.6, 26.6), rng.uniform(88.0, 92.7)
+        lat, lng = round(lat, 7), round(lng, 7)
+        yield {
+            "id": i,
+            "ts": now - timedelta(seconds=rng.randrange(span)),
+            "type": rng.choice(TYPES),
+            "lat": lat,
+            "lng": lng,
+            "cell": nearby.cell_id(lat, lng),
+        }
+
+
+def _seed_sqlite(rows: int, now: datetime):
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode = OFF")
+        dbapi_conn.execute("PRAGMA synchronous = OFF")
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, created_at TIMESTAMP NOT NULL,"
+            " crime_type TEXT, area_name TEXT, city TEXT, status TEXT, priority_level TEXT,"
+            " lat REAL, lng REAL, geocell INTEGER)"
+        ))
+        batch = []
+        for row in _synthetic_rows(rows, now):
+            batch.append(row)
+            if len(batch) == 20_000:
+                _insert(conn, batch)
+                batch = []
+        if batch:
+            _insert(conn, batch)
+        conn.execute(text("CREATE INDEX idx_crime_geocell_created ON crime (geocell, created_at)"))
+        conn.execute(text("CREATE INDEX idx_crime_lat_lng ON crime (lat, lng)"))
+        conn.execute(text("ANALYZE"))
+    print(f"seeded {rows:,} reports in {time.perf_counter() - started:.1f}s")
+    return engine
+
+
+def _insert(conn, batch):
+    conn.execute(
+        text("INSERT INTO crime (crime_id, created_at, crime_type, status, lat, lng, geocell)"
+             " VALUES (:id, :ts, :type, 'Pending', :lat, :lng, :cell)"),
+        batch,
+    )
+
+
+def _bbox_search(conn, lat, lng, radius_km, since):
+    dlat = radius_km / nearby.KM_PER_DEGREE
+    dlng = dlat / math.cos(math.radians(lat))
+    return conn.execute(
+        text("SELECT crime_id, lat, lng FROM crime INDEXED BY idx_crime_lat_lng"
+             " WHERE lat BETWEEN :s AND :n AND lng BETWEEN :w AND :e AND created_at >= :since")
+        if conn.dialect.name == "sqlite" else
+        text("SELECT crime_id, lat, lng FROM crime FORCE INDEX (idx_crime_lat_lng)"
+             " WHERE lat BETWEEN :s AND :n AND lng BETWEEN :w AND :e AND created_at >= :since"),
+        {"s": lat - dlat, "n": lat + dlat, "w": lng - dlng, "e": lng + dlng, "since": since},
+    ).fetchall()
+
+
+def _time(func, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mysql", action="store_true", help="time the real queries on the configured DB")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    if args.mysql:
+        from app.db.engine import engine
+    else:
+        engine = _seed_sqlite(args.rows, now)
+
+    print(f"median of {args.repeat}, 50 nearest returned:")
+    print(f"  {'radius':>7} {'window':>7} {'geocell ms':>11} {'found':>6} {'lat/lng bbox ms':>16}")
+    with engine.connect() as conn:
+        for radius_km, hours in CASES:
+            since = now - timedelta(hours=hours)
+            geocell_ms, found = _time(lambda: nearby.search(conn, *CENTRE, radius_km, since), args.repeat)
+            bbox_ms, _ = _time(lambda: _bbox_search(conn, *CENTRE, radius_km, since), args.repeat)
+            print(f"  {radius_km:>5.0f}km {hours:>6}h {geocell_ms:>11.2f} {len(found):>6} {bbox_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: nearest-station lookup on the panic path.
+
+Builds `app.db.stations.StationIndex` over N random stations around Dhaka
+and times `nearest()` for random alert locations, against a brute-force
+haversine scan of the same stations for comparison.
+
+Usage:
+    python scripts/bench/nearest_station.py [--stations 700] [--lookups 20000] [--n 3]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.db.stations import StationIndex, haversine_km  # noqa: E402
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return (statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99) - 1] * 1e6)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=700)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--n", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    rows = [
+        {"station_id": i, "latitude": rng.uniform(20.6, 26.6), "longitude": rng.uniform(88.0, 92.7)}
+        for i in range(args.stations)
+    ]
+    started = time.perf_counter()
+    index = StationIndex(rows)
+    print(f"built index over {index.size} stations in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    points = [(rng.uniform(20.6, 26.6), rng.uniform(88.0, 92.7)) for _ in range(args.lookups)]
+    for label, lookup in (
+        ("k-d tree", lambda lat, lng: index.nearest(lat, lng, args.n)),
+        ("scan", lambda lat, lng: sorted(
+            rows, key=lambda r: haversine_km(lat, lng, r["latitude"], r["longitude"]))[:args.n]),
+    ):
+        samples = []
+        for lat, lng in points[: args.lookups if label == "k-d tree" else min(args.lookups, 2000)]:
+            t0 = time.perf_counter()
+            lookup(lat, lng)
+            samples.append(time.perf_counter() - t0)
+        p50, p99 = _percentiles(samples)
+        print(f"{label:9s} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
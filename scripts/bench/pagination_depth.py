@@ -0,0 +1,112 @@
+"""Benchmark: OFFSET vs keyset (cursor) pagination at deep pages.
+
+Walks to page N (default 1000, 50 rows/page) of a newest-first listing
+ordered by (created_at, id) and reports the latency of fetching that page:
+
+  * offset — `ORDER BY created_at DESC, id DESC LIMIT 50 OFFSET 49950`
+  * keyset — `WHERE (created_at, id) < cursor ... LIMIT 50`, using the same
+             predicate app.db.pagination builds for the API
+
+By default it runs against an in-memory SQLite table seeded with --rows rows
+and an index on (created_at, id), so it needs no server. Pass --mysql to run
+against the `crime` table of the configured DB instead (DB_* env vars;
+migration 007 applied).
+
+Usage:
+    python scripts/bench/pagination_depth.py [--rows 200000] [--page 1000] [--mysql]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.db.pagination import decode_cursor, encode_cursor, keyset_predicate  # noqa: E402
+
+
+def _seed_sqlite(rows: int):
+    engine = create_engine("sqlite://")
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, created_at TIMESTAMP NOT NULL, status TEXT)"
+        ))
+        conn.execute(
+            text("INSERT INTO crime (crime_id, created_at, status) VALUES (:id, :ts, 'Pending')"),
+            # Several rows share a timestamp so the id tiebreaker matters.
+            [{"id": i, "ts": base + timedelta(seconds=i // 3)} for i in range(1, rows + 1)],
+        )
+        conn.execute(text("CREATE INDEX idx_crime_created_id ON crime (created_at, crime_id)"))
+    return engine
+
+
+def _time(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mysql", action="store_true", help="use the configured MySQL crime table")
+    args = parser.parse_args()
+
+    if args.mysql:
+        from app.db.engine import engine
+    else:
+        engine = _seed_sqlite(args.rows)
+
+    offset = (args.page - 1) * args.page_size
+    order = " ORDER BY created_at DESC, crime_id DESC LIMIT :limit"
+
+    with engine.connect() as conn:
+        # The cursor a client would hold after reading page N-1.
+        boundary = conn.execute(
+            text("SELECT created_at, crime_id FROM crime" + order + " OFFSET :offset"),
+            {"limit": 1, "offset": offset - 1},
+        ).mappings().fetchone()
+        if boundary is None:
+            raise SystemExit(f"table has fewer than {offset} rows")
+        created_at = boundary["created_at"]
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        token = encode_cursor(created_at, boundary["crime_id"])
+        keyset_sql, keyset_params = keyset_predicate("created_at", "crime_id", decode_cursor(token))
+
+        def by_offset():
+            return conn.execute(
+                text("SELECT crime_id FROM crime" + order + " OFFSET :offset"),
+                {"limit": args.page_size, "offset": offset},
+            ).fetchall()
+
+        def by_keyset():
+            return conn.execute(
+                text(f"SELECT crime_id FROM crime WHERE {keyset_sql}" + order),
+                {**keyset_params, "limit": args.page_size},
+            ).fetchall()
+
+        assert [r[0] for r in by_offset()] == [r[0] for r in by_keyset()], "modes disagree"
+        offset_ms = _time(by_offset, args.repeat)
+        keyset_ms = _time(by_keyset, args.repeat)
+
+    print(f"page {args.page} ({args.page_size} rows/page), median of {args.repeat}:")
+    print(f"  offset  {offset_ms:8.2f} ms")
+    print(f"  keyset  {keyset_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Benchmark: panic-button latency while /api/admin/analytics is running.
+
+Drives the app in-process (httpx ASGI transport) against a simulated engine
+whose `execute` blocks the calling thread like a real MySQL round trip:
+aggregate/COUNT queries take --slow-ms, everything else --fast-ms. Several
+analytics requests run in a loop while panic alerts are posted one after
+another; the script prints panic p50/p99 for
+
+  * inline    — DB calls executed on the event loop (the old behaviour)
+  * offloaded — DB calls routed through `app.db.aio` (current behaviour)
+
+Usage:
+    python scripts/bench/panic_under_analytics.py [--panics 50] [--analytics 4]
+
+Against a live server + MySQL instead, point BASE at it and use
+scripts/e2e tooling; this script only needs the project on PYTHONPATH.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+os.environ.setdefault("JWT_SECRET", "bench-secret-not-for-production-32b")
+
+import httpx  # noqa: E402
+
+import app.core.security as security  # noqa: E402
+import app.main as app_main  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.aio import AsyncConnection, AsyncEngine  # noqa: E402
+
+
+class _SimResult:
+    lastrowid = 1
+    rowcount = 1
+
+    def mappings(self):
+        return self
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def scalar(self):
+        return 0
+
+
+class _SimConn:
+    def __init__(self, slow_s: float, fast_s: float):
+        self.slow_s, self.fast_s = slow_s, fast_s
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement).upper()
+        time.sleep(self.slow_s if ("COUNT(" in sql or "GROUP BY" in sql) else self.fast_s)
+        return _SimResult()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _SimEngine:
+    def __init__(self, slow_s: float, fast_s: float):
+        self.slow_s, self.fast_s = slow_s, fast_s
+
+    def connect(self):
+        return _SimConn(self.slow_s, self.fast_s)
+
+    begin = connect
+
+
+class _InlineEngine:
+    """Runs the sync engine directly on the loop — what handlers used to do."""
+
+    def __init__(self, sync_engine):
+        self.sync_engine = sync_engine
+
+    @asynccontextmanager
+    async def _enter(self, factory):
+        with factory() as conn:
+            yield _InlineConnection(conn)
+
+    def connect(self):
+        return self._enter(self.sync_engine.connect)
+
+    def begin(self):
+        return self._enter(self.sync_engine.begin)
+
+
+class _InlineConnection(AsyncConnection):
+    async def execute(self, *args, **kwargs):
+        return self.sync_connection.execute(*args, **kwargs)
+
+    async def commit(self):
+        self.sync_connection.commit()
+
+    async def rollback(self):
+        self.sync_connection.rollback()
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[k]
+
+
+async def _run(mode: str, args) -> dict:
+    sim = _SimEngine(args.slow_ms / 1000, args.fast_ms / 1000)
+    app_main.async_engine = AsyncEngine(sim) if mode == "offloaded" else _InlineEngine(sim)
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=1, role='admin')}"}
+    transport = httpx.ASGITransport(app=app_main.app)
+    stop = asyncio.Event()
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def analytics_loop():
+            while not stop.is_set():
+                await client.get("/api/admin/analytics", headers=headers)
+
+        workers = [asyncio.create_task(analytics_loop()) for _ in range(args.analytics)]
+        await asyncio.sleep(0.05)
+        payload = {"description": "bench", "alert_type": "panic", "severity": "high",
+                   "location": {"latitude": 23.81, "longitude": 90.41}}
+        for _ in range(args.panics):
+            started = time.perf_counter()
+            r = await client.post("/api/emergency-alert", json=payload, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if r.status_code != 200:
+                raise SystemExit(f"panic request failed: {r.status_code} {r.text}")
+        stop.set()
+        await asyncio.gather(*workers)
+
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": max(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--panics", type=int, default=50)
+    parser.add_argument("--analytics", type=int, default=4, help="concurrent analytics loops")
+    parser.add_argument("--slow-ms", type=float, default=20.0)
+    parser.add_argument("--fast-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    admin = {"user_id": 1, "username": "bench", "email": "bench@example.com",
+             "role_hint": "admin", "status": "active"}
+    security.fetch_one = lambda sql, params=None: admin
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in ("inline", "offloaded"):
+        res = asyncio.run(_run(mode, args))
+        print(f"{mode:<10} {res['p50_ms']:>8.1f} {res['p99_ms']:>8.1f} {res['max_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmark: LIKE scan over raw JSON vs the full-text crime_search index.
+
+Runs a handful of keyword searches two ways and reports the median latency
+of fetching the first page (20 rows):
+
+  * like     — the old query: `crime_data LIKE '%kw%' OR location_data
+               LIKE '%kw%'`, newest first, over the raw JSON text
+  * fulltext — the crime_search document table, every term required as a
+               prefix, ranked with type/area/city hits weighted above
+               description hits
+
+By default it seeds an in-memory SQLite DB with --rows synthetic reports
+(1,000,000 unless told otherwise) and uses an FTS5 table standing in for
+InnoDB FULLTEXT. The ranking there is bm25 with the same field weights.
+Pass --mysql to time the real
+queries from app.db.search against the configured DB instead (DB_* env
+vars; migration 010 applied; nothing is written).
+
+Usage:
+    python scripts/bench/search_crimes.py [--rows 1000000] [--repeat 5] [--mysql]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+
+from app.db import search as search_index  # noqa: E402
+
+SYLLABLES = ["ra", "ha", "man", "kar", "dul", "sha", "mi", "nur", "bad", "pur", "zam", "tan", "jo", "lee", "sul"]
+# Rare tokens (street names, people, plates): each lands in ~100 reports.
+RARE = sorted({"".join(random.Random(i).choices(SYLLABLES, k=4)) for i in range(30_000)})
+# Selective terms first, then ones that match a large share of the corpus.
+KEYWORDS = [RARE[101], f"{RARE[2024]} {RARE[7]}", "gulshan robbery", "bkash fraud", "missing phone", "knife"]
+
+TYPES = ["Theft", "Robbery", "Assault", "Fraud", "Harassment", "Burglary", "Vandalism", "Kidnapping"]
+AREAS = ["Dhanmondi", "Gulshan", "Mirpur", "Uttara", "Mohammadpur", "Banani", "Motijheel", "Badda",
+         "Agrabad", "Zindabazar", "Shaheb Bazar", "Sonadanga"]
+CITIES = ["Dhaka", "Chattogram", "Sylhet", "Rajshahi", "Khulna"]
+WORDS = ("suspect fled on a motorbike after snatching a phone near the market; witnesses saw a knife "
+         "victim reported bkash fraud call asking for pin; house broken into at night; cash and jewellery "
+         "taken; rickshaw puller assaulted; shop window smashed; bag snatch near bus stand; car mirror "
+         "stolen; harassment on the way home from school; police informed; cctv footage available").split()
+PAGE = 20
+
+
+def _synthetic_rows(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    base = datetime(2023, 1, 1)
+    for i in range(1, rows + 1):
+        crime_type = rng.choice(TYPES)
+        area = rng.choice(AREAS)
+        city = rng.choice(CITIES)
+        words = rng.choices(WORDS, k=rng.randint(8, 30)) + rng.choices(RARE, k=3)
+        rng.shuffle(words)
+        description = " ".join(words)
+        yield {
+            "id": i,
+            "ts": base + timedelta(seconds=i * 30),
+            "crime_data": json.dumps({"type": crime_type, "description": description, "source": "bench"}),
+            "location_data": json.dumps({"city": city, "area_name": area, "details": "synthetic"}),
+            "crime_type": crime_type,
+            "area_name": area,
+            "city": city,
+            "description": description,
+        }
+
+
+def _seed_sqlite(rows: int):
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode = OFF")
+        dbapi_conn.execute("PRAGMA synchronous = OFF")
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, created_at TIMESTAMP NOT NULL,"
+            " crime_data TEXT, location_data TEXT)"
+        ))
+        conn.execute(text("CREATE INDEX idx_crime_created_id ON crime (created_at, crime_id)"))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE crime_search USING fts5("
+            "crime_type, area_name, city, description, tokenize = 'unicode61')"
+        ))
+        batch = []
+        for row in _synthetic_rows(rows):
+            batch.append(row)
+            if len(batch) == 20_000:
+                _insert(conn, batch)
+                batch = []
+        if batch:
+            _insert(conn, batch)
+    print(f"seeded {rows:,} reports in {time.perf_counter() - started:.1f}s")
+    return engine
+
+
+def _insert(conn, batch):
+    conn.execute(
+        text("INSERT INTO crime (crime_id, created_at, crime_data, location_data)"
+             " VALUES (:id, :ts, :crime_data, :location_data)"),
+        batch,
+    )
+    conn.execute(
+        text("INSERT INTO crime_search (rowid, crime_type, area_name, city, description)"
+             " VALUES (:id, :crime_type, :area_name, :city, :description)"),
+        batch,
+    )
+
+
+def _like_query(keyword: str):
+    return (
+        "SELECT crime_id FROM crime WHERE (crime_data LIKE :kw OR location_data LIKE :kw)"
+        " ORDER BY created_at DESC LIMIT :limit",
+        {"kw": f"%{keyword}%", "limit": PAGE},
+    )
+
+
+def _fts5_query(keyword: str):
+    terms = search_index.parse_terms(keyword)
+    match = " AND ".join(f'"{t}"*' for t in terms)
+    weights = ", ".join([str(float(search_index.META_WEIGHT + 1))] * 3 + ["1.0"])
+    return (
+        f"SELECT rowid FROM crime_search WHERE crime_search MATCH :q"
+        f" ORDER BY bm25(crime_search, {weights}), rowid DESC LIMIT :limit",
+        {"q": match, "limit": PAGE},
+    )
+
+
+def _mysql_query(keyword: str):
+    fts_query = search_index.fulltext_query(search_index.parse_terms(keyword))
+    return (
+        f"SELECT c.crime_id, {search_index.RANK_SQL} AS score"
+        " FROM crime_search s JOIN crime c ON c.crime_id = s.crime_id"
+        f" WHERE {search_index.MATCH_SQL}"
+        " ORDER BY score DESC, c.crime_id DESC LIMIT :limit",
+        {"fts_query": fts_query, "limit": PAGE},
+    )
+
+
+def _time(conn, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mysql", action="store_true", help="time the real queries on the configured DB")
+    args = parser.parse_args()
+
+    if args.mysql:
+        from app.db.engine import engine
+        fulltext = _mysql_query
+    else:
+        engine = _seed_sqlite(args.rows)
+        fulltext = _fts5_query
+
+    print(f"first page ({PAGE} rows), median of {args.repeat}:")
+    print(f"  {'keyword':<26} {'like ms':>10} {'fulltext ms':>12}")
+    with engine.connect() as conn:
+        for keyword in KEYWORDS:
+            like_ms = _time(conn, *_like_query(keyword), args.repeat)
+            fts_ms = _time(conn, *fulltext(keyword), args.repeat)
+            print(f"  {keyword:<26} {like_ms:>10.2f} {fts_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Seed `created` events in activity_event (migration 016) for older rows.
+
+The write paths append events from the moment migration 016 is live; rows
+created before that have no history in the feed. This adds one `created`
+event per crime, missing person and wanted criminal that has none yet,
+stamped with the row's own `created_at`, so the feed reads as if it had
+always existed. Rows that already have a `created` event are skipped, so it
+is safe to run again:
+
+    python scripts/db/backfill_activity.py
+    python scripts/db/backfill_activity.py --entity crime --batch 2000
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import activity  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+# entity -> (SELECT over rows without a created event, row -> event fields)
+SOURCES = {
+    activity.CRIME: (
+        """
+        SELECT c.crime_id AS id, c.created_at, c.reporter_id, c.status, c.crime_type,
+               c.description_prefix, c.area_name
+        FROM crime c
+        WHERE c.crime_id > :after
+          AND NOT EXISTS (SELECT 1 FROM activity_event e
+                          WHERE e.entity = 'crime' AND e.entity_id = c.crime_id AND e.action = 'created')
+        ORDER BY c.crime_id LIMIT :batch
+        """,
+        lambda row: {
+            "status": row["status"], "actor_id": row["reporter_id"], "title": activity.crime_title(row["id"]),
+            "summary": activity.crime_summary(row["crime_type"], row["description_prefix"], row["area_name"]),
+        },
+    ),
+    activity.MISSING: (
+        """
+        SELECT m.missing_id AS id, m.created_at, m.reporter_id, m.status, m.name, m.last_seen_location
+        FROM missing_person m
+        WHERE m.missing_id > :after
+          AND NOT EXISTS (SELECT 1 FROM activity_event e
+                          WHERE e.entity = 'missing_person' AND e.entity_id = m.missing_id
+                            AND e.action = 'created')
+        ORDER BY m.missing_id LIMIT :batch
+        """,
+        lambda row: {
+            "status": row["status"], "actor_id": row["reporter_id"], "title": row["name"],
+            "summary": activity.missing_summary(row["last_seen_location"]),
+        },
+    ),
+    activity.WANTED: (
+        """
+        SELECT w.criminal_id AS id, w.created_at, w.added_by, w.status, w.name,
+               w.last_known_location, w.danger_level
+        FROM wanted_criminal w
+        WHERE w.criminal_id > :after
+          AND NOT EXISTS (SELECT 1 FROM activity_event e
+                          WHERE e.entity = 'wanted_criminal' AND e.entity_id = w.criminal_id
+                            AND e.action = 'created')
+        ORDER BY w.criminal_id LIMIT :batch
+        """,
+        lambda row: {
+            "status": row["status"], "actor_id": row["added_by"], "title": row["name"],
+            "summary": activity.wanted_summary(row["last_known_location"], row["danger_level"]),
+        },
+    ),
+}
+
+
+def backfill(conn_factory, entity: str, batch: int) -> int:
+    sql, fields = SOURCES[entity]
+    after, written = 0, 0
+    while True:
+        with conn_factory() as conn:
+            rows = conn.execute(text(sql), {"after": after, "batch": batch}).mappings().fetchall()
+            if not rows:
+                return written
+            activity.insert_events(conn, [
+                activity.make_event(entity, row["id"], activity.CREATED, occurred_at=row["created_at"],
+                                    **fields(row))
+                for row in rows
+            ])
+        after = rows[-1]["id"]
+        written += len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entity", choices=sorted(SOURCES), action="append",
+                        help="entity to backfill (repeatable; default all)")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per transaction (default 1000)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for entity in args.entity or sorted(SOURCES):
+        written = backfill(engine.begin, entity, args.batch)
+        print(f"  {entity}: {written} events added")
+    print(f"Backfilled activity_event in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
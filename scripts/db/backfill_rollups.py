@@ -0,0 +1,70 @@
+"""Recount daily_rollup (migration 012) from the source tables.
+
+Write paths keep the daily counters current; run this once after applying
+migration 012, and again for any range that drifted (manual SQL, crashed
+requests). Each metric is rebuilt one month per transaction, so it can run
+against a live DB:
+
+    python scripts/db/backfill_rollups.py                         # everything
+    python scripts/db/backfill_rollups.py --from 2025-01-01 --to 2025-03-31
+    python scripts/db/backfill_rollups.py --metric crimes --days 7
+
+Days are Asia/Dhaka calendar days. Uses the app's engine, so the usual
+DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.db import rollups  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+
+def _month_chunks(first: date, last: date):
+    start = first
+    while start <= last:
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        end = min(last, next_month - timedelta(days=1))
+        yield start, end
+        start = end + timedelta(days=1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--metric", choices=sorted(rollups.SOURCES), action="append",
+                        help="metric to rebuild (repeatable; default all)")
+    parser.add_argument("--from", dest="first", type=date.fromisoformat, help="first local day (default: oldest row)")
+    parser.add_argument("--to", dest="last", type=date.fromisoformat, help="last local day (default: today)")
+    parser.add_argument("--days", type=int, help="shorthand for --from <today - N + 1>")
+    args = parser.parse_args()
+
+    last = args.last or rollups.today()
+    started = time.perf_counter()
+    for metric in args.metric or sorted(rollups.SOURCES):
+        if args.days:
+            first = last - timedelta(days=args.days - 1)
+        elif args.first:
+            first = args.first
+        else:
+            with engine.connect() as conn:
+                first = rollups.earliest_day(conn, metric)
+            if first is None:
+                print(f"  {metric}: no rows")
+                continue
+        scanned = 0
+        for chunk_first, chunk_last in _month_chunks(first, last):
+            with engine.begin() as conn:
+                scanned += rollups.rebuild(conn, metric, chunk_first, chunk_last)
+        print(f"  {metric}: {first} .. {last}, {scanned} rows counted")
+    print(f"Backfilled daily_rollup in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
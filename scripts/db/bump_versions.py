@@ -0,0 +1,43 @@
+"""Bump resource_version (migration 018) after writes that bypassed the API.
+
+Browsers revalidate the wanted-criminal, missing-person and police-station
+endpoints against these counters, and each worker reloads its reference-data
+cache (ref_* tables, migration 019) when `reference` moves. After editing
+those tables by hand (SQL console, imports), bump the affected resources so
+clients refetch:
+
+    python scripts/db/bump_versions.py                      # all resources
+    python scripts/db/bump_versions.py wanted_criminal
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.db import versions  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("resource", nargs="*", help=f"resources to bump: {', '.join(versions.RESOURCES)} (default all)")
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.resource) - set(versions.RESOURCES))
+    if unknown:
+        parser.error(f"unknown resource: {', '.join(unknown)}")
+    resources = args.resource or list(versions.RESOURCES)
+    with engine.begin() as conn:
+        versions.bump(conn, *resources)
+        token, changed_at = versions.stamp(conn, *resources) or ("unavailable", None)
+    print(f"{token} (changed {changed_at})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Rebuild person_name_index (migration 011) from the person tables.
+
+Write paths index missing persons and wanted criminals as they change; run
+this once after applying migration 011, after changing the normalisation
+in app.db.names, or to repair rows that were inserted by hand. Works in id
+batches so it can run against a live DB:
+
+    python scripts/db/rebuild_name_index.py [--batch 1000]
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import names as name_index  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+SOURCES = {
+    name_index.MISSING: "SELECT missing_id, name, NULL FROM missing_person"
+                        " WHERE missing_id > :after ORDER BY missing_id LIMIT :batch",
+    name_index.WANTED: "SELECT criminal_id, name, alias FROM wanted_criminal"
+                       " WHERE criminal_id > :after ORDER BY criminal_id LIMIT :batch",
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000, help="people per transaction (default 1000)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    total = 0
+    for entity, sql in SOURCES.items():
+        after, indexed = 0, 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(text(sql), {"after": after, "batch": args.batch}).fetchall()
+                if not rows:
+                    break
+                for entity_id, name, alias in rows:
+                    name_index.index_person(conn, entity, entity_id, name, alias)
+            after = rows[-1][0]
+            indexed += len(rows)
+            print(f"  {entity}: indexed {indexed} (through id {after})")
+        total += indexed
+    print(f"Rebuilt the name index for {total} people in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Rewrite every crime_search document (migration 010) from the crime table.
+
+Write paths index crimes as they are created; run this after changing
+app.db.search.build_document, or to repair documents for crimes that were
+inserted by hand. Works in crime_id batches so it can run against a live DB:
+
+    python scripts/db/rebuild_search_index.py [--batch 2000]
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import search as search_index  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=2000, help="crimes per transaction (default 2000)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    after, indexed = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT crime_id, crime_data, location_data FROM crime"
+                    " WHERE crime_id > :after ORDER BY crime_id LIMIT :batch"
+                ),
+                {"after": after, "batch": args.batch},
+            ).fetchall()
+            if not rows:
+                break
+            indexed += search_index.index_crimes(conn, rows)
+        after = rows[-1][0]
+        print(f"  indexed {indexed} (through crime_id {after})")
+    print(f"Rebuilt {indexed} documents in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Recount list_totals (migration 009) from the base tables.
+
+Write paths keep the counters current; this corrects whatever drifted
+(manual SQL, FK cascades, crashed requests). Run it from cron, or keep it
+running as a sidecar with --every:
+
+    python scripts/db/reconcile_totals.py              # once
+    python scripts/db/reconcile_totals.py --every 600  # every 10 minutes
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.db import totals  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+
+def run_once() -> int:
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        drift = totals.reconcile(conn)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not drift:
+        print(f"list_totals in sync ({elapsed_ms:.0f} ms)")
+    for scope, keys in drift.items():
+        for key, values in keys.items():
+            print(f"  {scope} {key or '(all)'}: stored={values['stored']} actual={values['actual']}")
+    return sum(len(keys) for keys in drift.values())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (default: run once)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.every <= 0:
+        run_once()
+        return 0
+    while True:
+        try:
+            run_once()
+        except Exception:
+            logging.exception("reconcile failed; retrying in %.0fs", args.every)
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Rebuild active_cases and officer_workload (migration 017) from the base tables.
+
+Write paths keep both projections current; this corrects whatever drifted
+(manual SQL, FK cascades, crashed requests) and refreshes officer names and
+stations. Run it once after applying migration 017, then from cron or as a
+sidecar with --every:
+
+    python scripts/db/reconcile_workload.py              # once
+    python scripts/db/reconcile_workload.py --every 900  # every 15 minutes
+
+Uses the app's engine, so the usual DB_* env vars apply.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.db import workload  # noqa: E402
+from app.db.engine import engine  # noqa: E402
+
+
+def run_once() -> int:
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        result = workload.reconcile(conn)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{result['active_cases']} open cases, {result['officers']} officers ({elapsed_ms:.0f} ms)")
+    for user_id, values in sorted(result["drift"].items()):
+        print(f"  officer {user_id}: stored={values['stored']} actual={values['actual']}")
+    return len(result["drift"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (default: run once)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.every <= 0:
+        run_once()
+        return 0
+    while True:
+        try:
+            run_once()
+        except Exception:
+            logging.exception("reconcile failed; retrying in %.0fs", args.every)
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -98,9 +98,9 @@ def main() -> None:
     assert citizen_msg_id, f"no message_id in response: {body}"
     print(f"   citizen message_id={citizen_msg_id}")
 
-    # 5. Admin replies (is_admin=true; admin role lets this through)
+    # 5. Admin replies in the citizen's conversation (is_admin=true; admin role lets this through)
     r = admin_sess.post(BASE + "/api/chat/send",
-                        json={"user_id": admin_id,
+                        json={"user_id": citizen_id,
                               "message": "Hi citizen, can you share more details?",
                               "is_admin": True},
                         headers={"Authorization": f"Bearer {admin_token}"},
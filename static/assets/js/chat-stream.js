@@ -0,0 +1,109 @@
+/* Live chat messages from /api/chat/stream (Server-Sent Events).
+ *
+ * Reads the stream with fetch() rather than EventSource so the api-base.js
+ * wrapper can attach the bearer token. Usage:
+ *
+ *   var stream = openChatStream({ user_id: 5, report_id: 'CR-1' }, onMessage, {
+ *     afterId: lastRenderedMessageId,   // resume point; null = live only
+ *     onFallback: startPolling          // stream unsupported or refused
+ *   });
+ *   stream.close();
+ *
+ * `onMessage(msg)` gets the same fields as /api/chat/conversation/{id}.
+ * When the connection drops, the stream reconnects with `after_id` set to
+ * the last message id it saw. The server replays anything newer first, so
+ * nothing is missed and nothing is repeated.
+ */
+(function () {
+  function _parse(block) {
+    var evt = { id: null, event: 'message', data: '', retry: null };
+    block.split('\n').forEach(function (line) {
+      if (!line || line.charAt(0) === ':') return;
+      var i = line.indexOf(':');
+      var field = i < 0 ? line : line.slice(0, i);
+      var value = i < 0 ? '' : line.slice(i + 1).replace(/^ /, '');
+      if (field === 'data') evt.data += (evt.data ? '\n' : '') + value;
+      else if (field === 'id') evt.id = value;
+      else if (field === 'event') evt.event = value;
+      else if (field === 'retry') evt.retry = Number(value) || null;
+    });
+    return evt;
+  }
+
+  window.openChatStream = function (query, onMessage, options) {
+    options = options || {};
+    var lastId = options.afterId != null ? Number(options.afterId) : null;
+    var retryMs = 3000;
+    var failures = 0;
+    var closed = false;
+    var controller = null;
+    var timer = null;
+
+    function fallback() {
+      closed = true;
+      if (typeof options.onFallback === 'function') options.onFallback();
+    }
+
+    function url() {
+      var params = [];
+      Object.keys(query || {}).forEach(function (k) {
+        if (query[k] != null && query[k] !== '') params.push(k + '=' + encodeURIComponent(query[k]));
+      });
+      if (lastId != null) params.push('after_id=' + lastId);
+      return resolveApiUrl('/api/chat/stream' + (params.length ? '?' + params.join('&') : ''));
+    }
+
+    function reconnect() {
+      if (closed) return;
+      failures += 1;
+      timer = setTimeout(connect, Math.min(retryMs * failures, 30000));
+    }
+
+    function connect() {
+      if (closed) return;
+      controller = typeof AbortController !== 'undefined' ? new AbortController() : null;
+      fetch(url(), { cache: 'no-store', signal: controller ? controller.signal : undefined })
+        .then(function (resp) {
+          if (resp.status === 401 || resp.status === 403 || resp.status === 404) return fallback();
+          if (!resp.ok) throw new Error('chat stream: ' + resp.status);
+          if (!resp.body || typeof TextDecoder === 'undefined') return fallback();
+          var reader = resp.body.getReader();
+          var decoder = new TextDecoder();
+          var buffer = '';
+          function pump() {
+            return reader.read().then(function (chunk) {
+              if (chunk.done) return reconnect();
+              failures = 0;
+              buffer += decoder.decode(chunk.value, { stream: true }).replace(/\r\n?/g, '\n');
+              var parts = buffer.split('\n\n');
+              buffer = parts.pop();
+              parts.forEach(function (block) {
+                var evt = _parse(block);
+                if (evt.retry) retryMs = evt.retry;
+                if (evt.event !== 'message' || !evt.data) return;
+                if (evt.id) lastId = Number(evt.id);
+                try { onMessage(JSON.parse(evt.data)); } catch (e) { console.error('chat stream message', e); }
+              });
+              return pump();
+            });
+          }
+          return pump();
+        })
+        .catch(function (err) {
+          if (closed) return;
+          console.warn('chat stream disconnected', err);
+          reconnect();
+        });
+    }
+
+    connect();
+    return {
+      close: function () {
+        closed = true;
+        if (timer) clearTimeout(timer);
+        if (controller) controller.abort();
+      },
+      lastId: function () { return lastId; }
+    };
+  };
+})();
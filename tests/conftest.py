@@ -3,6 +3,10 @@
 Sets JWT_SECRET before any module reads it, and provides:
 - client: a FastAPI TestClient bound to main.app
 - admin_client: same client but with a pre-baked admin Authorization header
+- captured_engine: records the SQL app.main sends and returns canned rows
+
+The authenticated-user cache is emptied before every test, since tests patch
+`fetch_one` with different rows for the same user_id.
 """
 from __future__ import annotations
 
@@ -11,11 +15,21 @@ import os
 # Configure env BEFORE any project module reads os.getenv.
 os.environ.setdefault("JWT_SECRET", "pytest-secret-do-not-use-in-prod-32b")
 os.environ.setdefault("JWT_EXPIRES_MINUTES", "60")
+# Minimum bcrypt cost keeps password tests fast.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 import pytest
 from fastapi.testclient import TestClient
 
 
+@pytest.fixture(autouse=True)
+def _empty_user_cache():
+    from app.core.security import user_cache
+
+    user_cache.invalidate()
+    yield
+
+
 @pytest.fixture(scope="session")
 def client():
     """FastAPI TestClient for the main app.
@@ -77,4 +91,52 @@ def mock_db_user(monkeypatch):
         }
 
     monkeypatch.setattr(db_mod, "fetch_one", fake_fetch_one)
-    return captured
\ No newline at end of file
+    return captured
+
+
+@pytest.fixture
+def captured_engine(monkeypatch):
+    """Swap app.main's engine for one that records SQL and returns `rows`."""
+    import app.core.security as security
+    import app.main as app_main
+    from app.db.aio import AsyncEngine
+
+    state = {"sql": [], "rows": []}
+
+    class _Result:
+        rowcount = 1
+
+        def mappings(self):
+            return self
+
+        def fetchall(self):
+            return state["rows"]
+
+        def fetchone(self):
+            return {"total": len(state["rows"])}
+
+    class _Conn:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *a):
+            return False
+
+        def execute(self, statement, params=None):
+            state["sql"].append((str(statement), dict(params or {})))
+            return _Result()
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    class _Engine:
+        def connect(self):
+            return _Conn()
+
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(_Engine()))
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": 1, "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"})
+    return state
@@ -0,0 +1,143 @@
+"""app.db.activity: batched writer, keyset feed and /api/admin/activity-log."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import activity
+from app.db.aio import AsyncEngine
+from app.db.pagination import decode_cursor
+
+NOW = datetime(2025, 3, 10, 12, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'activity.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE activity_event (event_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                          " occurred_at TIMESTAMP, entity TEXT, entity_id INTEGER, action TEXT, status TEXT,"
+                          " actor_id INTEGER, title TEXT, summary TEXT, details TEXT)"))
+    return engine
+
+
+def _event(i, entity=activity.CRIME, minutes=0):
+    return activity.make_event(entity, i, activity.CREATED, title=f"#{i}",
+                               occurred_at=NOW - timedelta(minutes=minutes))
+
+
+def test_make_event_clips_and_serialises():
+    event = activity.make_event(activity.CRIME, "7", activity.STATUS_CHANGED, status="x" * 80,
+                                title="t" * 300, details={"from": "Pending", "at": NOW})
+    assert event["entity_id"] == 7
+    assert len(event["status"]) == 50 and len(event["title"]) == activity.TITLE_CHARS
+    assert '"from": "Pending"' in event["details"] and NOW.isoformat(" ") in event["details"]
+    assert activity.make_event(activity.CRIME, 1, activity.CREATED, title="  ")["title"] is None
+
+
+def test_writer_flushes_in_batches_and_notifies(engine):
+    writer = activity.ActivityWriter(batch_size=3, flush_seconds=1, max_queue=100)
+    flushed = []
+    writer.after_flush(lambda: flushed.append(writer.written))
+    for i in range(7):
+        writer.record(_event(i))
+
+    assert writer.flush_sync(engine) == 7
+    assert flushed == [3, 6, 7]
+    assert writer.stats()["batches"] == 3 and writer.pending() == 0
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM activity_event")).scalar() == 7
+
+
+def test_failed_flush_requeues_in_order(engine):
+    writer = activity.ActivityWriter(batch_size=2, flush_seconds=1, max_queue=100)
+    for i in range(3):
+        writer.record(_event(i))
+
+    class Broken:
+        def begin(self):
+            raise RuntimeError("db down")
+
+    assert asyncio.run(writer.flush(AsyncEngine(Broken()))) is False
+    assert writer.failed_flushes == 1
+    assert [e["entity_id"] for e in writer.take(10)] == [0, 1, 2]
+
+
+def test_queue_cap_drops_oldest():
+    writer = activity.ActivityWriter(batch_size=10, flush_seconds=1, max_queue=3)
+    for i in range(5):
+        writer.record(_event(i))
+    assert writer.dropped == 2
+    assert [e["entity_id"] for e in writer.take(10)] == [2, 3, 4]
+
+
+def test_feed_pages_newest_first_and_filters(engine):
+    with engine.begin() as conn:
+        activity.insert_events(conn, [_event(i, minutes=i) for i in range(5)]
+                               + [_event(99, activity.MISSING, minutes=2)])
+
+    with engine.connect() as conn:
+        first, cursor = activity.feed(conn, 3)
+        assert [e["entity_id"] for e in first] == [0, 1, 99]
+        rest, last_cursor = activity.feed(conn, 3, decode_cursor(cursor))
+        assert [e["entity_id"] for e in rest] == [2, 3, 4] and last_cursor is None
+
+        missing, _ = activity.feed(conn, 10, entities=[activity.MISSING])
+        assert [e["entity_id"] for e in missing] == [99]
+        one, _ = activity.feed(conn, 10, entities=[activity.CRIME], entity_id=3)
+        assert [e["entity_id"] for e in one] == [3]
+
+
+def test_activity_log_endpoint(client, captured_engine, admin_headers):
+    captured_engine["rows"] = [
+        {"event_id": 5, "occurred_at": NOW, "entity": "crime", "entity_id": 12, "action": "status_changed",
+         "status": "Resolved", "actor_id": 1, "title": "Case CR-012", "summary": None,
+         "details": '{"from": "Pending"}'},
+    ]
+    r = client.get("/api/admin/activity-log", params={"limit": 10, "entity": "crime"}, headers=admin_headers)
+    assert r.status_code == 200
+    item = r.json()["activities"][0]
+    assert item["activity_type"] == "Crime Report" and item["item_id"] == 12
+    assert item["details"] == "Case CR-012" and item["metadata"] == {"from": "Pending"}
+    sql, params = captured_engine["sql"][-1]
+    assert "FROM activity_event" in sql and "ORDER BY occurred_at DESC, event_id DESC" in sql
+    assert params["entities"] == ["crime"] and params["limit"] == 11
+
+    bad = client.get("/api/admin/activity-log", params={"entity": "parcel"}, headers=admin_headers)
+    assert bad.status_code == 400
+
+
+def test_admin_app_flushes_crime_events_with_a_summary(engine, admin_headers, monkeypatch):
+    import json
+
+    from fastapi.testclient import TestClient
+
+    import app.admin_main as admin_main
+    import app.core.security as security
+
+    admin_main.Crime.__table__.create(engine)
+    writer = activity.ActivityWriter(batch_size=10, flush_seconds=60, max_queue=100)
+    monkeypatch.setattr(activity, "writer", writer)
+    monkeypatch.setattr(admin_main, "async_engine", AsyncEngine(engine))
+    monkeypatch.setattr(admin_main, "engine", engine)
+    monkeypatch.setattr(admin_main.totals, "crime_inserted", lambda *a: None)
+    monkeypatch.setattr(admin_main.search_index, "index_crime", lambda *a: None)
+    monkeypatch.setattr(admin_main.rollups, "changed", lambda *a: None)
+    monkeypatch.setattr(admin_main.workload, "crime_changed", lambda *a: None)
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": params[0], "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"})
+
+    with TestClient(admin_main.app) as admin_client:
+        assert writer.stats()["running"]
+        r = admin_client.post("/crime/", headers=admin_headers, json={
+            "crime_data": json.dumps({"type": "Theft", "description": "Phone snatched"}),
+            "location_data": json.dumps({"area_name": "Gulshan"}),
+        })
+        assert r.status_code == 200 and r.json()["crime_id"] == 1
+
+    with engine.connect() as conn:  # written by the lifespan's final flush
+        row = conn.execute(text("SELECT entity_id, title, summary FROM activity_event")).one()
+    assert tuple(row) == (1, "Case CR-001", "Phone snatched in Gulshan")
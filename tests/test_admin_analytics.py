@@ -0,0 +1,132 @@
+"""/api/admin/analytics: single-pass summary counts and the snapshot cache."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import analytics
+from app.db.cache import SnapshotCache, invalidate_after_write
+
+NOW = datetime(2025, 6, 30, 12, 0)
+
+
+def _days_ago(days):
+    return NOW - timedelta(days=days)
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, status TEXT,"
+                       " created_at TIMESTAMP, updated_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE missing_person (missing_id INTEGER PRIMARY KEY, status TEXT,"
+                       " created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE wanted_criminal (criminal_id INTEGER PRIMARY KEY, status TEXT,"
+                       " last_activity_at TIMESTAMP)"))
+        c.execute(text("INSERT INTO crime (status, created_at, updated_at) VALUES (:s, :c, :u)"), [
+            {"s": "Pending", "c": _days_ago(1), "u": None},                       # new, open, touched recently
+            {"s": "Under Investigation", "c": _days_ago(45), "u": _days_ago(2)},  # open, touched recently
+            {"s": "Pending", "c": _days_ago(40), "u": None},                      # open, touched previously
+            {"s": "Solved", "c": _days_ago(50), "u": _days_ago(3)},
+            {"s": "Pending", "c": _days_ago(90), "u": None},                      # open, outside both windows
+        ])
+        c.execute(text("INSERT INTO missing_person (status, created_at) VALUES (:s, :c)"), [
+            {"s": "Missing", "c": _days_ago(5)},
+            {"s": "Missing", "c": _days_ago(35)},
+            {"s": "Found", "c": _days_ago(6)},
+        ])
+        c.execute(text("INSERT INTO appuser (created_at) VALUES (:c)"),
+                  [{"c": _days_ago(d)} for d in (1, 2, 31, 100)])
+        c.execute(text("INSERT INTO wanted_criminal (status, last_activity_at) VALUES (:s, :a)"), [
+            {"s": "Active", "a": _days_ago(3)},
+            {"s": None, "a": _days_ago(33)},
+            {"s": "Captured", "a": _days_ago(1)},
+        ])
+    with engine.connect() as c:
+        yield c
+
+
+def test_summary_counts_one_pass_per_table(conn):
+    counts = analytics.summary_counts(conn, now=NOW)
+    assert counts["crimes"] == {"total": 5, "recent": 1, "previous": 3, "open_total": 4,
+                                "open_recent": 2, "open_previous": 1}
+    assert counts["missing"] == {"active": 2, "recent": 1, "previous": 1}
+    assert counts["users"] == {"total": 4, "recent": 2, "previous": 1}
+    assert counts["wanted"] == {"active": 2, "recent": 1, "previous": 1}
+
+
+def test_summary_sql_avoids_function_wrapped_columns():
+    for sql in (analytics.CRIME_SQL, analytics.MISSING_SQL, analytics.USERS_SQL, analytics.WANTED_SQL):
+        assert "LOWER(" not in sql and "COALESCE(" not in sql
+
+
+class TestSnapshotCache:
+    def test_put_get_and_invalidate(self):
+        cache = SnapshotCache(60)
+        assert cache.get("k") is None
+        assert cache.put("k", {"v": 1}, cache.generation)
+        value, age = cache.get("k")
+        assert value == {"v": 1} and age >= 0
+        cache.invalidate()
+        assert cache.get("k") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["invalidations"] == 1
+
+    def test_value_computed_across_an_invalidation_is_not_stored(self):
+        cache = SnapshotCache(60)
+        generation = cache.generation
+        cache.invalidate()  # a write committed while the value was being computed
+        assert not cache.put("k", "stale", generation)
+        assert cache.get("k") is None
+
+    def test_zero_ttl_disables_caching(self):
+        cache = SnapshotCache(0)
+        assert not cache.put("k", 1, cache.generation)
+
+
+def test_endpoint_serves_repeat_requests_from_cache(client, captured_engine, admin_headers, monkeypatch):
+    passes = []
+
+    def fake_counts(conn):
+        passes.append(conn)
+        return {"crimes": {"total": 5, "recent": 2, "previous": 1, "open_total": 3, "open_recent": 1,
+                           "open_previous": 0},
+                "missing": {"active": 1, "recent": 1, "previous": 0},
+                "users": {"total": 9, "recent": 0, "previous": 0},
+                "wanted": {"active": 2, "recent": 0, "previous": 2}}
+
+    monkeypatch.setattr(analytics, "summary_counts", fake_counts)
+    analytics.cache.invalidate()
+    first = client.get("/api/admin/analytics", headers=admin_headers)
+    assert first.status_code == 200
+    cards = {card["title"]: card for card in first.json()["summary_cards"]}
+    assert cards["Crime Reports"]["value"] == 5 and cards["Crime Reports"]["trend"] == "up"
+    assert cards["Wanted Individuals"]["trend"] == "down"
+    statements = len(captured_engine["sql"])
+    assert len(passes) == 1 and statements == 1  # one activity_event range read
+    assert "FROM activity_event" in captured_engine["sql"][-1][0]
+
+    assert client.get("/api/admin/analytics", headers=admin_headers).json() == first.json()
+    assert len(captured_engine["sql"]) == statements and len(passes) == 1
+
+    analytics.cache.invalidate()
+    client.get("/api/admin/analytics", headers=admin_headers)
+    assert len(captured_engine["sql"]) == 2 * statements and len(passes) == 2
+
+
+@pytest.mark.parametrize("method,path", [
+    ("POST", "/api/crimes"),
+    ("PUT", "/api/crimes/{crime_id}/status"),
+    ("POST", "/api/missing-persons"),
+    ("DELETE", "/api/admin/wanted-criminals/{criminal_id}"),
+    ("DELETE", "/api/admin/users/{user_id}"),
+    ("POST", "/register"),
+])
+def test_write_routes_invalidate_analytics(method, path):
+    from app.main import app
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == path and method in r.methods)
+    assert invalidate_after_write in [d.call for d in route.dependant.dependencies]
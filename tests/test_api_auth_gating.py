@@ -134,6 +134,7 @@ GATED_PATHS = [
     ("GET", "/api/admin/case-assignments"),
     ("GET", "/api/admin/case-management"),
     ("GET", "/api/admin/activity-log"),
+    ("GET", "/api/admin/metrics"),
 ]
 
 
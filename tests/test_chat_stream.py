@@ -0,0 +1,194 @@
+"""app.db.chat: the pub/sub broker, resume-by-id streams, database fan-out and paged history."""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.core.security as security
+import app.main as app_main
+from app.core.security import create_access_token
+from app.db import chat
+from app.db.aio import AsyncEngine
+
+SCHEMA = [
+    "CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, username TEXT, email TEXT)",
+    "CREATE TABLE chat_messages (message_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, message TEXT,"
+    " report_id TEXT, is_admin INTEGER DEFAULT 0, created_at TIMESTAMP, read_by_admin INTEGER DEFAULT 0,"
+    " read_by_user INTEGER DEFAULT 0)",
+    "INSERT INTO appuser (user_id, username, email) VALUES (5, 'rina', 'rina@example.com'), (7, 'karim', NULL)",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+    return engine
+
+
+def _insert(engine, user_id, message, report_id=None, is_admin=False):
+    with engine.begin() as conn:
+        return conn.execute(
+            text("INSERT INTO chat_messages (user_id, message, report_id, is_admin, created_at)"
+                 " VALUES (:u, :m, :r, :a, :c)"),
+            {"u": user_id, "m": message, "r": report_id, "a": is_admin, "c": datetime(2026, 1, 1)},
+        ).lastrowid
+
+
+def _msg(message_id, user_id=5, report_id=None):
+    return {"message_id": message_id, "user_id": user_id, "username": None, "message": f"m{message_id}",
+            "is_admin": False, "created_at": None, "report_id": report_id}
+
+
+def _ids(chunks):
+    return [int(c.split("\n")[0][4:]) for c in chunks if c.startswith("id: ")]
+
+
+def test_broker_routes_by_conversation_and_report():
+    broker = chat.Broker(queue_size=4)
+    mine = broker.subscribe([chat.topic(5)], report_id="CR-1")
+    staff = broker.subscribe([chat.ALL])
+    other = broker.subscribe([chat.topic(7)])
+
+    broker.publish(_msg(1, report_id="CR-1"))
+    broker.publish(_msg(2, report_id="CR-2"))
+    broker.publish(_msg(1, report_id="CR-1"))  # repeat: dropped
+    assert mine.queue.qsize() == 1 and staff.queue.qsize() == 2 and other.queue.empty()
+    assert broker.stats()["duplicates"] == 1
+
+    for i in range(3, 10):
+        broker.publish(_msg(i))
+    assert staff.overflowed and broker.stats()["overflows"] == 1
+    for sub in (mine, staff, other):
+        sub.close()
+    assert broker.subscribers() == 0
+
+
+def test_stream_resumes_from_backlog_then_goes_live():
+    broker = chat.Broker()
+    pages = {0: [_msg(i) for i in range(1, chat.BACKLOG_LIMIT + 1)], chat.BACKLOG_LIMIT: [_msg(501), _msg(502)]}
+    reads = []
+
+    async def load_backlog(after_id):
+        reads.append(after_id)
+        # A message committed during the backlog read is published as well.
+        broker.publish(_msg(502))
+        return pages[after_id]
+
+    async def run():
+        gen = chat.stream(broker, [chat.topic(5)], load_backlog, after_id=0, heartbeat=0.01)
+        chunks = [await gen.__anext__() for _ in range(chat.BACKLOG_LIMIT + 3)]
+        broker.publish(_msg(503))
+        chunks.append(await gen.__anext__())
+        chunks.append(await gen.__anext__())  # nothing new: a keepalive
+        await gen.aclose()
+        return chunks
+
+    chunks = asyncio.run(run())
+    assert chunks[0] == f"retry: {chat.RETRY_MS}\n\n"
+    assert _ids(chunks) == list(range(1, 504)) and chunks[-1] == ": keepalive\n\n"
+    assert reads == [0, chat.BACKLOG_LIMIT]
+    assert json.loads(chunks[1].split("data: ", 1)[1])["message"] == "m1"
+    assert broker.subscribers() == 0
+
+
+def test_database_fanout_tails_other_workers(engine):
+    async_engine = AsyncEngine(engine)
+    broker = chat.Broker()
+    fanout = chat.DatabaseFanout(lookback=5)
+    sub = broker.subscribe([chat.topic(5)])
+
+    async def run():
+        _insert(engine, 5, "before anyone listened")
+        assert await fanout.poll(broker, async_engine) == 0  # first poll finds the tip
+        first = _insert(engine, 5, "from another worker", "CR-1")
+        broker.publish(chat.event({**_msg(first), "message": "from another worker"}))  # and locally
+        _insert(engine, 7, "someone else")
+        assert await fanout.poll(broker, async_engine) == 1
+        assert await fanout.poll(broker, async_engine) == 0  # lookback re-reads are dropped
+
+    asyncio.run(run())
+    assert sub.queue.qsize() == 1
+    delivered = sub.queue.get_nowait()
+    assert delivered["message"] == "from another worker" and delivered["message_id"] == 2
+    assert fanout.stats()["cursor"] == 3
+
+
+def test_send_publishes_and_staff_replies_land_in_the_users_conversation(client, engine, monkeypatch):
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+    monkeypatch.setattr(chat, "broker", chat.Broker())
+    sub = chat.broker.subscribe([chat.topic(5)])
+    users = {5: {"user_id": 5, "username": "rina", "email": "r@x", "role_hint": "User", "status": "active"},
+             1: {"user_id": 1, "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"}}
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: users[params[0]])
+
+    citizen = {"Authorization": f"Bearer {create_access_token(5)}"}
+    admin = {"Authorization": f"Bearer {create_access_token(1)}"}
+    assert client.post("/api/chat/send", json={"user_id": 99, "message": "help", "report_id": "CR-1"},
+                       headers=citizen).status_code == 200
+    assert client.post("/api/chat/send", json={"user_id": 5, "message": "on it", "is_admin": True},
+                       headers=admin).status_code == 200
+
+    first, second = sub.queue.get_nowait(), sub.queue.get_nowait()
+    assert (first["user_id"], first["username"], first["is_admin"]) == (5, "rina", False)
+    assert (second["user_id"], second["is_admin"], second["message"]) == (5, True, "on it")
+    with engine.connect() as conn:
+        stored = chat.backlog(conn, 0, user_id=5)
+        assert [(m["message_id"], m["message"], m["is_admin"]) for m in stored] == [
+            (first["message_id"], "help", False), (second["message_id"], "on it", True)]
+        assert chat.backlog(conn, first["message_id"], user_id=5, report_id="CR-1") == []
+
+    assert client.get("/api/chat/stream?user_id=7", headers=citizen).status_code == 403
+    assert client.get("/api/chat/stream").status_code == 401
+
+
+def test_history_pages_back_and_fetches_deltas(engine):
+    ids = [_insert(engine, 5, f"m{i}", "CR-1" if i % 2 else "CR-2") for i in range(1, 8)]
+    _insert(engine, 7, "not this conversation")
+    with engine.connect() as conn:
+        rows, has_more = chat.history(conn, 5, limit=3)
+        assert [r["message_id"] for r in rows] == ids[4:] and has_more  # newest page, oldest first
+        rows, has_more = chat.history(conn, 5, before_id=rows[0]["message_id"], limit=3)
+        assert [r["message_id"] for r in rows] == ids[1:4] and has_more
+        rows, has_more = chat.history(conn, 5, before_id=rows[0]["message_id"], limit=3)
+        assert [r["message_id"] for r in rows] == ids[:1] and not has_more
+
+        rows, has_more = chat.history(conn, 5, after_id=ids[2], limit=3)
+        assert [r["message_id"] for r in rows] == ids[3:6] and has_more  # more newer ones remain
+        assert chat.history(conn, 5, after_id=ids[-1]) == ([], False)  # client already has the tail
+
+        rows, _ = chat.history(conn, 5, report_id="CR-2")
+        assert [r["message"] for r in rows] == ["m2", "m4", "m6"]
+
+
+def test_conversation_endpoint_returns_only_new_messages(client, engine, monkeypatch):
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+    first = _insert(engine, 5, "help", "CR-1")
+    reply = _insert(engine, 5, "on it", "CR-1", is_admin=True)
+
+    page = client.get("/api/chat/conversation/5?report_id=CR-1").json()
+    assert [m["message_id"] for m in page["messages"]] == [first, reply] and page["has_more"] is False
+    assert page["messages"][0]["username"] == "rina" and page["messages"][1]["is_admin"] is True
+    assert page["messages"][0]["email"] == "rina@example.com" and page["messages"][0]["read_by_user"] is False
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT read_by_admin FROM chat_messages WHERE message_id = :id"),
+                            {"id": first}).scalar() == 1
+
+    assert client.get(f"/api/chat/conversation/5?after_id={reply}").json() == {"messages": [], "has_more": False}
+    newer = _insert(engine, 5, "thanks", "CR-1")
+    delta = client.get(f"/api/chat/conversation/5?report_id=CR-1&after_id={reply}").json()
+    assert [m["message"] for m in delta["messages"]] == ["thanks"]
+
+    older = client.get(f"/api/chat/conversation/5?before_id={newer}&limit=1").json()
+    assert [m["message_id"] for m in older["messages"]] == [reply] and older["has_more"] is True
+    assert client.get("/api/chat/conversation/5?limit=0").status_code == 422
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE chat_messages"))
+    assert client.get("/api/chat/conversation/5").status_code == 500  # not demo data
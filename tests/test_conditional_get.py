@@ -0,0 +1,109 @@
+"""Conditional GETs: app.db.versions stamps, app.core.conditional and 304s."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from app.core.conditional import make_etag, not_modified
+from app.db import versions
+
+CHANGED = datetime(2025, 3, 10, 9, 14, 2, 500000)
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE resource_version (resource TEXT PRIMARY KEY, version INTEGER NOT NULL,"
+                       " changed_at TIMESTAMP NOT NULL)"))
+    with engine.connect() as c:
+        yield c
+
+
+def test_bump_and_stamp(conn):
+    assert versions.stamp(conn, versions.WANTED) == ("wanted_criminal.0", None)
+    versions.bump(conn, versions.WANTED)
+    versions.bump(conn, versions.WANTED, versions.STATIONS)
+    token, changed = versions.stamp(conn, versions.WANTED, versions.STATIONS)
+    assert token == "wanted_criminal.2+police_station.1" and changed is not None
+
+
+def test_stamp_degrades_but_bump_raises_without_the_table():
+    with create_engine("sqlite://").connect() as c:
+        assert versions.stamp(c, versions.MISSING) is None
+        with pytest.raises(OperationalError):  # rolls back the write it belongs to
+            versions.bump(c, versions.MISSING)
+
+
+def test_validators_and_304_on_matching_etag():
+    stamp = ("wanted_criminal.7", CHANGED)
+    response = Response()
+    assert not_modified(_request(), response, stamp) is None
+    assert response.headers["etag"] == make_etag("wanted_criminal.7")
+    assert response.headers["last-modified"] == "Mon, 10 Mar 2025 09:14:02 GMT"
+    assert response.headers["cache-control"] == "no-cache"
+
+    cached = not_modified(_request(if_none_match=f'"x", {make_etag("wanted_criminal.7")}'), Response(), stamp)
+    assert cached.status_code == 304 and cached.headers["etag"] == response.headers["etag"]
+    # A newer version no longer matches, even if the date would.
+    assert not_modified(_request(if_none_match=make_etag("wanted_criminal.6"),
+                                 if_modified_since="Mon, 10 Mar 2025 09:14:02 GMT"), Response(), stamp) is None
+
+
+def test_if_modified_since_and_private():
+    stamp = ("police_station.3", CHANGED)
+    response = Response()
+    assert not_modified(_request(if_modified_since="Mon, 10 Mar 2025 09:14:02 GMT"), response, stamp,
+                        private=True).status_code == 304
+    assert not_modified(_request(if_modified_since="Mon, 10 Mar 2025 09:14:01 GMT"), response, stamp) is None
+    assert not_modified(_request(if_modified_since="yesterday"), response, stamp) is None
+
+    response = Response()
+    not_modified(_request(), response, stamp, private=True)
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["vary"] == "Authorization"
+
+
+def test_no_stamp_means_no_validators():
+    response = Response()
+    assert not_modified(_request(if_none_match="*"), response, None) is None
+    assert "etag" not in response.headers
+
+
+def test_wanted_list_revalidates(client, captured_engine):
+    captured_engine["rows"] = [{"resource": "wanted_criminal", "version": 4, "changed_at": CHANGED}]
+    first = client.get("/api/wanted-criminals")
+    assert first.status_code == 200 and first.headers["etag"] == make_etag("wanted_criminal.4")
+    assert len(captured_engine["sql"]) == 2
+    assert "FROM resource_version" in captured_engine["sql"][0][0]
+
+    captured_engine["sql"].clear()
+    again = client.get("/api/wanted-criminals", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304 and again.content == b""
+    # Only the stamp was read; the list query was skipped.
+    assert len(captured_engine["sql"]) == 1
+
+
+@pytest.mark.parametrize("method,path,resource", [
+    ("POST", "/api/missing-persons", versions.MISSING),
+    ("PUT", "/api/admin/missing-persons/{missing_id}/status", versions.MISSING),
+    ("POST", "/api/wanted-criminals/{criminal_id}/sighting", versions.WANTED),
+    ("DELETE", "/api/admin/wanted-criminals/{criminal_id}", versions.WANTED),
+    ("PUT", "/api/admin/police-stations/{station_id}", versions.STATIONS),
+])
+def test_write_routes_bump_versions(method, path, resource):
+    from app.main import app
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == path and method in r.methods)
+    bumps = [d.call.resources for d in route.dependant.dependencies if hasattr(d.call, "resources")]
+    assert bumps == [(resource,)]
@@ -0,0 +1,153 @@
+"""Generated columns for hot crime JSON keys (migration 006).
+
+Offline tests check the migration and that the hot handlers filter, group
+and sort on the generated columns instead of JSON_EXTRACT. The EXPLAIN tests
+need a live MySQL with migration 006 applied. They run the old
+JSON_EXTRACT query and the rewritten one side by side and print both plans
+(`pytest -s`). The expected shape is a full scan before (type=ALL,
+key=None) and an index on a generated column after, e.g.
+key=idx_crime_type_created.
+"""
+from __future__ import annotations
+
+import inspect
+import os
+import socket
+from pathlib import Path
+
+import pytest
+
+MIGRATION = Path(__file__).resolve().parent.parent / "migrations" / "006_crime_generated_columns.sql"
+
+
+def _mysql_reachable() -> bool:
+    host = os.getenv("DB_HOST", "127.0.0.1")
+    port = int(os.getenv("DB_PORT", "3306"))
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+requires_db = pytest.mark.skipif(
+    not _mysql_reachable(),
+    reason="MySQL not reachable; set DB_HOST/DB_PORT and start MySQL to enable",
+)
+
+
+class TestMigration:
+    @pytest.mark.parametrize("column", ["crime_type", "description_prefix", "city", "area_name", "lat", "lng"])
+    def test_adds_stored_generated_column(self, column):
+        sql = MIGRATION.read_text(encoding="utf-8")
+        line = next(ln for ln in sql.splitlines() if f"ADD COLUMN {column} " in ln)
+        assert line.rstrip().endswith("STORED;")
+        assert "JSON_VALID(" in line, "expressions must tolerate non-JSON legacy rows"
+
+    def test_creates_composite_indexes(self):
+        sql = MIGRATION.read_text(encoding="utf-8")
+        for idx in ("idx_crime_type_created", "idx_crime_city_area_created",
+                    "idx_crime_area_created", "idx_crime_status_priority_created",
+                    "idx_crime_lat_lng"):
+            assert f"CREATE INDEX {idx} ON crime" in sql
+
+
+class TestHandlersUseGeneratedColumns:
+    @pytest.mark.parametrize("handler", [
+        "get_crime_statistics",
+        "search_crimes",
+        "get_admin_analytics",
+        "get_case_management_cases",
+        "get_case_assignments",
+    ])
+    def test_no_per_row_json_extract(self, handler):
+        import app.main as app_main
+
+        assert "JSON_EXTRACT" not in inspect.getsource(getattr(app_main, handler))
+
+    def test_search_filters_are_sargable(self, client, monkeypatch):
+        import app.main as app_main
+        from app.db.aio import AsyncEngine
+
+        seen = []
+
+        class _Result:
+            def mappings(self):
+                return self
+
+            def fetchall(self):
+                return []
+
+        class _Conn:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *a):
+                return False
+
+            def execute(self, statement, params=None):
+                seen.append((str(statement), params))
+                return _Result()
+
+        class _Engine:
+            def connect(self):
+                return _Conn()
+
+        monkeypatch.setattr(app_main, "async_engine", AsyncEngine(_Engine()))
+        r = client.get("/api/search/crimes", params={
+            "crime_type": "Theft", "location": "Dhan",
+            "date_from": "2025-01-01", "date_to": "2025-01-31",
+        })
+        assert r.status_code == 200
+        sql, params = seen[0]
+        assert "crime_type = :crime_type" in sql
+        assert "area_name LIKE :location" in sql
+        assert "DATE(created_at)" not in sql
+        assert params["location"] == "Dhan%"
+
+
+EXPLAIN_PAIRS = [
+    (
+        "type breakdown",
+        "SELECT JSON_EXTRACT(crime_data, '$.type') t, COUNT(*) FROM crime "
+        "WHERE crime_data IS NOT NULL GROUP BY JSON_EXTRACT(crime_data, '$.type')",
+        "SELECT crime_type, COUNT(*) FROM crime WHERE crime_type IS NOT NULL GROUP BY crime_type",
+    ),
+    (
+        "type filter",
+        "SELECT crime_id FROM crime WHERE JSON_EXTRACT(crime_data, '$.type') = 'Theft' "
+        "ORDER BY created_at DESC LIMIT 50",
+        "SELECT crime_id FROM crime WHERE crime_type = 'Theft' ORDER BY created_at DESC LIMIT 50",
+    ),
+    (
+        "area filter",
+        "SELECT crime_id FROM crime WHERE location_data LIKE '%Dhanmondi%' "
+        "ORDER BY created_at DESC LIMIT 50",
+        "SELECT crime_id FROM crime WHERE area_name LIKE 'Dhanmondi%' "
+        "ORDER BY created_at DESC LIMIT 50",
+    ),
+]
+
+
+@requires_db
+@pytest.mark.parametrize("label,before,after", EXPLAIN_PAIRS)
+def test_explain_before_after(label, before, after):
+    from sqlalchemy import text
+
+    from app.db.engine import engine
+
+    with engine.connect() as conn:
+        has_column = conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'crime' AND COLUMN_NAME = 'crime_type'"
+        )).scalar()
+        if not has_column:
+            pytest.skip("migration 006 not applied")
+        plan_before = conn.execute(text("EXPLAIN " + before)).mappings().fetchone()
+        plan_after = conn.execute(text("EXPLAIN " + after)).mappings().fetchone()
+
+    print(f"\n[{label}]")
+    for tag, plan in (("before", plan_before), ("after", plan_after)):
+        print(f"  {tag}: type={plan['type']} key={plan['key']} Extra={plan['Extra']}")
+    assert plan_before["key"] is None or plan_before["type"] in ("ALL", "index")
+    assert plan_after["key"] is not None, f"{label}: rewritten query should use an index"
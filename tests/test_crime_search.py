@@ -0,0 +1,120 @@
+"""Full-text crime search: documents, query terms, highlighting and the
+/api/search/crimes SQL (DB mocked; FULLTEXT itself needs MySQL)."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import search
+
+
+class TestDocuments:
+    def test_build_document_from_json_text(self):
+        doc = search.build_document(
+            json.dumps({"type": " Theft ", "description": "Phone snatched", "source": "web"}),
+            json.dumps({"city": "Dhaka", "area_name": "Dhanmondi", "latitude": 23.7}),
+        )
+        assert doc == {"crime_type": "Theft", "area_name": "Dhanmondi", "city": "Dhaka",
+                       "description": "Phone snatched"}
+
+    @pytest.mark.parametrize("crime_data,location_data", [(None, None), ("not json", "[1, 2]"), ({}, {})])
+    def test_build_document_tolerates_missing_or_bad_json(self, crime_data, location_data):
+        assert set(search.build_document(crime_data, location_data).values()) == {None}
+
+    def test_index_crimes_replaces_existing_document(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE crime_search (crime_id INTEGER PRIMARY KEY, crime_type TEXT,"
+                " area_name TEXT, city TEXT, description TEXT)"
+            ))
+            search.index_crime(conn, 7, {"type": "Theft"}, {"area_name": "Mirpur"})
+            search.index_crime(conn, 7, {"type": "Robbery", "description": "at knifepoint"}, {})
+            rows = conn.execute(text("SELECT * FROM crime_search")).mappings().fetchall()
+        assert [dict(r) for r in rows] == [{"crime_id": 7, "crime_type": "Robbery", "area_name": None,
+                                            "city": None, "description": "at knifepoint"}]
+
+    def test_index_crime_never_raises(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            search.index_crime(conn, 1, {"type": "Theft"}, {})  # no crime_search table
+
+
+class TestTerms:
+    def test_terms_are_words_lowercased_and_deduplicated(self):
+        assert search.parse_terms('Knife  "knife" +Gulshan -x*') == ["knife", "gulshan", "x"]
+
+    def test_fulltext_query_requires_every_indexable_term_as_prefix(self):
+        assert search.fulltext_query(["knif", "dhan", "x"]) == "+knif* +dhan*"
+        assert search.fulltext_query(["ab"]) is None
+
+    def test_terms_are_capped(self):
+        assert len(search.parse_terms(" ".join(f"w{i}xx" for i in range(20)))) == search.MAX_TERMS
+
+    def test_bangla_words_survive_tokenising(self):
+        assert search.parse_terms("ছিনতাই মিরপুর") == ["ছিনতাই", "মিরপুর"]
+
+
+class TestHighlight:
+    def test_marks_prefix_matches_and_escapes_html(self):
+        out = search.highlight("<b>Knives</b> and a knife", ["knif", "kniv"])
+        assert out == "&lt;b&gt;<mark>Knives</mark>&lt;/b&gt; and a <mark>knife</mark>"
+
+    def test_bangla_prefix_is_marked_whole_word(self):
+        assert search.highlight("মিরপুরে ছিনতাই", ["মিরপুর"]) == "<mark>মিরপুরে</mark> ছিনতাই"
+
+    def test_only_word_starts_match(self):
+        assert search.highlight("penknife", ["knife"]) == "penknife"
+
+    def test_snippet_window_surrounds_first_match(self):
+        text_value = "lorem " * 100 + "the knife was found " + "ipsum " * 100
+        out = search.highlight(text_value, ["knife"], max_chars=80)
+        assert out.startswith("…") and out.endswith("…")
+        assert "<mark>knife</mark>" in out
+        assert len(out.replace("<mark>", "").replace("</mark>", "")) <= 82
+
+
+def test_keyword_search_uses_fulltext_ranking(client, captured_engine):
+    captured_engine["rows"] = [
+        {"crime_id": 5, "created_at": datetime(2025, 1, 2), "crime_type": "Robbery", "area_name": "Gulshan",
+         "city": "Dhaka", "description_prefix": "short", "score": 3.2,
+         "search_description": "Armed robbery near <Gulshan> circle with a knife",
+         "crime_data": json.dumps({"type": "Robbery"}), "location_data": None},
+    ]
+    r = client.get("/api/search/crimes", params={"keyword": "knife gul", "crime_type": "Robbery", "limit": 10})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["sort"] == "relevance" and body["next_offset"] is None
+    crime = body["crimes"][0]
+    assert "search_description" not in crime
+    assert crime["crime_data"] == {"type": "Robbery"}
+    assert crime["highlights"]["area_name"] == "<mark>Gulshan</mark>"
+    assert "<mark>knife</mark>" in crime["highlights"]["description"]
+    assert "&lt;<mark>Gulshan</mark>&gt;" in crime["highlights"]["description"]
+
+    sql, params = captured_engine["sql"][0]
+    assert "FROM crime_search s JOIN crime c" in sql
+    assert "AGAINST(:fts_query IN BOOLEAN MODE)" in sql
+    assert "ORDER BY score DESC" in sql
+    assert "LIKE :keyword" not in sql
+    assert params["fts_query"] == "+knife* +gul*"
+    assert params["crime_type"] == "Robbery" and params["limit"] == 11
+
+
+def test_relevance_pages_by_offset(client, captured_engine):
+    captured_engine["rows"] = [{"crime_id": i, "created_at": datetime(2025, 1, 1), "crime_data": None,
+                                "location_data": None} for i in range(3)]
+    body = client.get("/api/search/crimes", params={"keyword": "knife", "limit": 2, "offset": 4}).json()
+    assert body["next_offset"] == 6 and body["next_cursor"] is None
+
+
+def test_short_keyword_falls_back_to_indexed_prefix(client, captured_engine):
+    r = client.get("/api/search/crimes", params={"keyword": "ab"})
+    assert r.status_code == 200
+    sql, params = captured_engine["sql"][0]
+    assert "MATCH(" not in sql and "crime_type LIKE :short_0" in sql
+    assert params["short_0"] == "ab%"
+    assert r.json()["sort"] == "recent"
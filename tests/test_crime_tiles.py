@@ -0,0 +1,97 @@
+"""app.db.tiles: tile math, per-cell aggregation and the map endpoints."""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import tiles
+
+DHAKA = (23.8103, 90.4125)
+
+
+def test_tile_math_round_trips():
+    x, y = tiles.tile_for(*DHAKA, 12)
+    west, south, east, north = tiles.tile_bounds(12, x, y)
+    assert west <= DHAKA[1] < east and south <= DHAKA[0] < north
+    assert tiles.tile_for(*DHAKA, 0) == (0, 0)
+    assert not tiles.valid_tile(3, 8, 0)
+
+
+def test_tiles_covering_bbox():
+    coords = tiles.tiles_covering(90.30, 23.70, 90.50, 23.90, 12)
+    assert len(coords) == len(set(coords)) == 12  # 3 columns x 4 rows
+    assert tiles.tile_for(*DHAKA, 12) in coords
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, created_at TIMESTAMP,"
+                       " lat REAL, lng REAL, crime_type TEXT)"))
+        rows = [
+            {"c": datetime(2025, 3, 10, 6), "lat": 23.81030, "lng": 90.41250, "t": "Theft"},
+            {"c": datetime(2025, 3, 11, 6), "lat": 23.81035, "lng": 90.41255, "t": "Robbery"},
+            {"c": datetime(2025, 3, 12, 6), "lat": 23.75000, "lng": 90.38000, "t": "Theft"},
+            {"c": datetime(2024, 1, 1, 6), "lat": 23.81030, "lng": 90.41250, "t": "Theft"},  # outside window
+            {"c": datetime(2025, 3, 10, 6), "lat": None, "lng": None, "t": "Theft"},  # no coordinates
+        ]
+        c.execute(text("INSERT INTO crime (created_at, lat, lng, crime_type) VALUES (:c, :lat, :lng, :t)"), rows)
+    with engine.connect() as c:
+        yield c
+
+
+def test_compute_tile_counts_cells_and_clusters(conn):
+    x, y = tiles.tile_for(*DHAKA, 10)
+    out = tiles.compute_tile(conn, 10, x, y, date(2025, 3, 1), date(2025, 3, 31))
+    assert out["total"] == 3
+    counts = sorted(cell["count"] for cell in out["cells"])
+    assert counts == [1, 2]
+    single = next(c for c in out["clusters"] if c["count"] == 1)
+    assert single["crime_id"] == 3
+    pair = next(c for c in out["clusters"] if c["count"] == 2)
+    assert "crime_id" not in pair and pair["lat"] == pytest.approx(23.810325)
+
+    typed = tiles.compute_tile(conn, 10, x, y, date(2025, 3, 1), date(2025, 3, 31), "Robbery")
+    assert typed["total"] == 1
+
+
+def test_tile_is_cached_per_key(conn):
+    tiles.cache.invalidate()
+    x, y = tiles.tile_for(*DHAKA, 11)
+    first = tiles.tile(conn, 11, x, y, date(2025, 3, 1), date(2025, 3, 31))
+    conn.execute(text("DELETE FROM crime"))
+    assert tiles.tile(conn, 11, x, y, date(2025, 3, 1), date(2025, 3, 31)) == first
+    assert tiles.tile(conn, 11, x, y, date(2025, 3, 2), date(2025, 3, 31))["total"] == 0
+
+
+def test_heatmap_endpoint_merges_covering_tiles(client, captured_engine):
+    tiles.cache.invalidate()
+    captured_engine["rows"] = [{"col": 3, "row_": 4, "count": 5, "lat": 23.8, "lng": 90.4, "crime_id": 1}]
+    r = client.get("/api/crimes/heatmap", params={
+        "bbox": "90.30,23.70,90.50,23.90", "zoom": 12, "from": "2025-03-01", "to": "2025-03-31",
+    })
+    assert r.status_code == 200
+    body = r.json()
+    assert body["tiles"] == 12 and body["total"] == 60 and len(body["clusters"]) == 12
+    assert len(captured_engine["sql"]) == 12
+
+    client.get("/api/crimes/heatmap", params={
+        "bbox": "90.30,23.70,90.50,23.90", "zoom": 12, "from": "2025-03-01", "to": "2025-03-31",
+    })
+    assert len(captured_engine["sql"]) == 12  # served from the tile cache
+
+
+@pytest.mark.parametrize("params,status", [
+    ({"bbox": "90.5,23.7,90.3,23.9", "zoom": 12}, 400),
+    ({"bbox": "nope", "zoom": 12}, 400),
+    ({"bbox": "88,20,93,27", "zoom": 14}, 400),  # too many tiles
+])
+def test_heatmap_rejects_bad_requests(client, params, status):
+    assert client.get("/api/crimes/heatmap", params=params).status_code == status
+
+
+def test_tile_endpoint_404_outside_the_grid(client):
+    assert client.get("/api/crimes/tiles/3/8/0").status_code == 404
@@ -0,0 +1,106 @@
+"""app.db.nearby: geocell ranges, radius search and /api/crimes/nearby."""
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import nearby
+from app.db.stations import haversine_km
+
+NOW = datetime(2025, 3, 10, 12, 0)
+HOME = (23.7806, 90.4070)
+
+
+def test_cell_id_matches_the_generated_column_formula():
+    assert nearby.cell_id(-90, -180) == 0
+    assert nearby.cell_id(23.78, 90.40) == 11378 * nearby.COLUMNS + 27040
+    assert nearby.cell_id(90, 180) == nearby.ROWS * nearby.COLUMNS - 1
+
+
+def test_cells_cover_every_point_in_the_circle():
+    rng = random.Random(15)
+    for lat, lng, radius in ((23.78, 90.41, 3.0), (-33.9, 151.2, 20.0), (0.0, 179.99, 5.0)):
+        cells = set(nearby.cells_covering(lat, lng, radius))
+        for _ in range(500):
+            bearing, dist = rng.uniform(0, 360), rng.uniform(0, radius)
+            plat = lat + dist / nearby.KM_PER_DEGREE * math.cos(math.radians(bearing))
+            plng = lng + dist / (nearby.KM_PER_DEGREE * math.cos(math.radians(lat))) \
+                * math.sin(math.radians(bearing))
+            plng = (plng + 180) % 360 - 180
+            if haversine_km(lat, lng, plat, plng) > radius:
+                continue
+            assert nearby.cell_id(plat, plng) in cells, (lat, lng, plat, plng)
+
+
+def test_cells_skip_the_corners_of_the_box():
+    cells = nearby.cells_covering(23.78, 90.41, 20.0)
+    rows = {c // nearby.COLUMNS for c in cells}
+    cols = {c % nearby.COLUMNS for c in cells}
+    assert len(cells) < 0.85 * len(rows) * len(cols)
+    wrapped = {c % nearby.COLUMNS for c in nearby.cells_covering(0.0, 179.995, 2.0)}
+    assert 0 in wrapped and nearby.COLUMNS - 1 in wrapped
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, crime_type TEXT, area_name TEXT,"
+                       " city TEXT, status TEXT, priority_level TEXT, created_at TIMESTAMP, lat REAL, lng REAL,"
+                       " geocell INTEGER)"))
+        rows = [
+            (1, "Theft", 23.7810, 90.4075, 1),      # ~70 m
+            (2, "Robbery", 23.7900, 90.4070, 2),    # ~1 km
+            (3, "Theft", 23.8100, 90.4070, 3),      # ~3.3 km, outside 2 km
+            (4, "Theft", 23.7807, 90.4071, 50),     # too old for 24h
+            (5, "Assault", 23.7700, 90.4000, 5),    # ~1.4 km
+        ]
+        c.execute(text("INSERT INTO crime (crime_id, crime_type, created_at, lat, lng, geocell, status)"
+                       " VALUES (:id, :t, :c, :lat, :lng, :cell, 'Pending')"),
+                  [{"id": i, "t": t, "c": NOW - timedelta(hours=h), "lat": lat, "lng": lng,
+                    "cell": nearby.cell_id(lat, lng)} for i, t, lat, lng, h in rows])
+    with engine.connect() as c:
+        yield c
+
+
+def test_search_filters_radius_window_and_type(conn):
+    since = NOW - timedelta(hours=24)
+    found = nearby.search(conn, *HOME, 2.0, since)
+    assert [c["crime_id"] for c in found] == [1, 2, 5]
+    assert found[0]["distance_km"] < found[1]["distance_km"] < found[2]["distance_km"]
+
+    assert [c["crime_id"] for c in nearby.search(conn, *HOME, 5.0, since, ["Theft"])] == [1, 3]
+    assert [c["crime_id"] for c in nearby.search(conn, *HOME, 5.0, NOW - timedelta(hours=72))][:1] == [4]
+    assert len(nearby.search(conn, *HOME, 5.0, since, limit=2)) == 2
+
+
+def test_nearby_endpoint(client, captured_engine):
+    captured_engine["rows"] = [
+        {"crime_id": 9, "crime_type": "Theft", "area_name": "Gulshan", "city": "Dhaka", "status": "Pending",
+         "priority_level": None, "created_at": None, "lat": 23.7810, "lng": 90.4075},
+        {"crime_id": 8, "crime_type": "Theft", "area_name": "Gulshan", "city": "Dhaka", "status": "Pending",
+         "priority_level": None, "created_at": None, "lat": 23.9000, "lng": 90.4075},
+    ]
+    r = client.get("/api/crimes/nearby", params={"lat": HOME[0], "lng": HOME[1], "radius_km": 1,
+                                                 "crime_type": ["Theft", "Fraud"]})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["count"] == 1 and body["crimes"][0]["crime_id"] == 9
+    sql, params = captured_engine["sql"][-1]
+    assert "geocell IN" in sql and "created_at >= " in sql
+    assert len(params["cells"]) == len(nearby.cells_covering(HOME[0], HOME[1], 1))
+    assert params["crime_types"] == ["Theft", "Fraud"]
+
+
+@pytest.mark.parametrize("params", [
+    {"lat": 23.78, "lng": 90.4, "radius_km": 0},
+    {"lat": 23.78, "lng": 90.4, "radius_km": 25},
+    {"lat": 95, "lng": 90.4},
+    {"lat": 23.78, "lng": 90.4, "hours": 0},
+])
+def test_nearby_rejects_bad_params(client, params):
+    assert client.get("/api/crimes/nearby", params=params).status_code == 422
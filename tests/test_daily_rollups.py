@@ -0,0 +1,136 @@
+"""app.db.rollups: Dhaka-day bucketing, write hooks, rebuild and the
+/api/statistics/timeseries endpoint (SQLite-backed / DB mocked)."""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import rollups
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, created_at TIMESTAMP, crime_type TEXT,"
+                       " area_name TEXT, status TEXT, priority_level TEXT)"))
+        c.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, created_at TIMESTAMP)"))
+        c.execute(text(
+            "CREATE TABLE daily_rollup (day DATE NOT NULL, metric TEXT NOT NULL, dimension TEXT NOT NULL,"
+            " value TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (metric, dimension, value, day))"
+        ))
+    with engine.connect() as c:
+        yield c
+
+
+def _add_crime(conn, created_at, crime_type="Theft", area="Mirpur", status="Pending", priority="High"):
+    crime_id = conn.execute(
+        text("INSERT INTO crime (created_at, crime_type, area_name, status, priority_level)"
+             " VALUES (:c, :t, :a, :s, :p)"),
+        {"c": created_at, "t": crime_type, "a": area, "s": status, "p": priority},
+    ).lastrowid
+    rollups.changed(conn, rollups.CRIMES, crime_id)
+    return crime_id
+
+
+def _stored(conn):
+    rows = conn.execute(text(
+        "SELECT day, metric, dimension, value, count FROM daily_rollup WHERE count != 0"
+        " ORDER BY metric, dimension, value, day"
+    )).fetchall()
+    return [tuple(str(v) if i == 0 else v for i, v in enumerate(row)) for row in rows]
+
+
+def test_days_are_dhaka_calendar_days():
+    assert rollups.local_day(datetime(2025, 3, 1, 17, 59)) == date(2025, 3, 1)
+    assert rollups.local_day(datetime(2025, 3, 1, 18, 0)) == date(2025, 3, 2)
+    assert rollups.day_start_utc(date(2025, 3, 2)) == datetime(2025, 3, 1, 18, 0)
+
+
+def test_hooks_track_inserts_updates_and_deletes(conn):
+    first = _add_crime(conn, datetime(2025, 3, 1, 20, 0))  # 2 Mar in Dhaka
+    _add_crime(conn, datetime(2025, 3, 1, 9, 0), crime_type="Fraud")
+
+    before = rollups.keys_for(conn, rollups.CRIMES, first)
+    conn.execute(text("UPDATE crime SET status = 'Solved' WHERE crime_id = :id"), {"id": first})
+    rollups.changed(conn, rollups.CRIMES, first, before)
+
+    stored = _stored(conn)
+    assert ("2025-03-02", "crimes", "status", "Solved", 1) in stored
+    assert ("2025-03-02", "crimes", "status", "Pending", 1) not in stored
+    assert ("2025-03-01", "crimes", "type", "Fraud", 1) in stored
+
+    # The hooks and a full rebuild agree.
+    for day in (date(2025, 3, 1), date(2025, 3, 2)):
+        rollups.rebuild(conn, rollups.CRIMES, day, day)
+    assert _stored(conn) == stored
+
+    before = rollups.keys_for(conn, rollups.CRIMES, first)
+    conn.execute(text("DELETE FROM crime WHERE crime_id = :id"), {"id": first})
+    rollups.removed(conn, before)
+    assert all(row[0] == "2025-03-01" for row in _stored(conn))
+
+
+def test_hooks_never_raise():
+    with create_engine("sqlite://").begin() as c:
+        rollups.changed(c, rollups.CRIMES, 1)  # no tables at all
+        rollups.removed(c, [(date(2025, 1, 1), rollups.CRIMES, "", "")])
+
+
+def test_rebuild_folds_case_and_replaces_range(conn):
+    _add_crime(conn, datetime(2025, 3, 1, 1, 0), status="Pending")
+    conn.execute(text("INSERT INTO crime (created_at, status) VALUES (:c, 'pending')"),
+                 {"c": datetime(2025, 3, 1, 2, 0)})
+    assert rollups.rebuild(conn, rollups.CRIMES, date(2025, 3, 1), date(2025, 3, 1)) == 2
+    stored = _stored(conn)
+    assert ("2025-03-01", "crimes", "status", "Pending", 2) in stored
+    assert ("2025-03-01", "crimes", "", "", 2) in stored
+
+
+def test_series_buckets_and_top_values(conn):
+    for day, crime_type in [(3, "Theft"), (4, "Theft"), (10, "Fraud"), (11, "Assault"), (40, "Theft")]:
+        _add_crime(conn, datetime(2025, 3, day, 3, 0) if day <= 31 else datetime(2025, 4, day - 31, 3, 0),
+                   crime_type=crime_type)
+
+    weekly = rollups.series(conn, rollups.CRIMES, date(2025, 3, 3), date(2025, 3, 16), "week")
+    assert weekly["buckets"] == ["2025-03-03", "2025-03-10"]
+    assert weekly["series"] == [{"value": None, "total": 4, "points": [2, 2]}]
+
+    monthly = rollups.series(conn, rollups.CRIMES, date(2025, 3, 1), date(2025, 4, 30), "month", "type", top=1)
+    assert monthly["buckets"] == ["2025-03-01", "2025-04-01"]
+    assert monthly["series"] == [{"value": "Theft", "total": 3, "points": [2, 1]},
+                                 {"value": "other", "total": 2, "points": [2, 0]}]
+
+    only = rollups.series(conn, rollups.CRIMES, date(2025, 3, 1), date(2025, 3, 31), "month", "type",
+                          values=["Fraud"])
+    assert only["series"] == [{"value": "Fraud", "total": 1, "points": [1]}]
+
+
+def test_empty_range_still_has_a_zero_series(conn):
+    out = rollups.series(conn, rollups.USERS, date(2025, 1, 1), date(2025, 1, 3))
+    assert out == {"buckets": ["2025-01-01", "2025-01-02", "2025-01-03"],
+                   "series": [{"value": None, "total": 0, "points": [0, 0, 0]}]}
+
+
+def test_timeseries_endpoint(client, captured_engine):
+    captured_engine["rows"] = [(date(2025, 3, 2), "Theft", 4), (date(2025, 3, 3), "Fraud", 1)]
+    r = client.get("/api/statistics/timeseries", params={
+        "metric": "crimes", "dimension": "type", "from": "2025-03-01", "to": "2025-03-03", "value": ["Theft", "Fraud"],
+    })
+    assert r.status_code == 200
+    body = r.json()
+    assert body["timezone"] == "Asia/Dhaka" and body["granularity"] == "day"
+    assert body["series"][0] == {"value": "Theft", "total": 4, "points": [0, 4, 0]}
+    sql, params = captured_engine["sql"][0]
+    assert "FROM daily_rollup" in sql and params["dimension"] == "type"
+
+
+@pytest.mark.parametrize("params", [
+    {"from": "2025-03-05", "to": "2025-03-01"},
+    {"metric": "users", "dimension": "status"},
+    {"from": "2000-01-01", "to": "2025-01-01"},
+])
+def test_timeseries_rejects_bad_ranges(client, params):
+    assert client.get("/api/statistics/timeseries", params=params).status_code == 400
@@ -0,0 +1,146 @@
+"""Tests for `app.db.aio` — the thread-offload wrapper handlers use instead of
+calling the synchronous engine on the event loop."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import anyio
+import pytest
+
+from app.db import aio
+
+
+class _Conn:
+    def __init__(self, log, delay=0.0):
+        self.log = log
+        self.delay = delay
+
+    def __enter__(self):
+        self.log.append("enter")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.log.append("exit-error" if exc_type else "exit")
+        return False
+
+    def execute(self, sql, params=None):
+        time.sleep(self.delay)
+        self.log.append(("execute", sql, threading.current_thread() is threading.main_thread()))
+        return "result"
+
+    def commit(self):
+        self.log.append("commit")
+
+
+class _Engine:
+    def __init__(self, delay=0.0):
+        self.log = []
+        self.delay = delay
+
+    def connect(self):
+        return _Conn(self.log, self.delay)
+
+    begin = connect
+
+
+def test_execute_runs_off_the_event_loop_thread():
+    engine = _Engine()
+
+    async def go():
+        async with aio.AsyncEngine(engine).connect() as conn:
+            assert await conn.execute("SELECT 1") == "result"
+            await conn.commit()
+
+    asyncio.run(go())
+    assert engine.log[0] == "enter"
+    assert engine.log[1] == ("execute", "SELECT 1", False)
+    assert engine.log[-2:] == ["commit", "exit"]
+
+
+def test_exception_is_propagated_to_context_manager():
+    engine = _Engine()
+
+    async def go():
+        async with aio.AsyncEngine(engine).begin():
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(go())
+    assert engine.log[-1] == "exit-error"
+
+
+def test_slow_query_does_not_block_other_tasks():
+    engine = _Engine(delay=0.3)
+
+    async def slow():
+        async with aio.AsyncEngine(engine).connect() as conn:
+            await conn.execute("SELECT SLEEP(0.3)")
+
+    async def fast():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        return time.perf_counter() - started
+
+    async def go():
+        slow_task = asyncio.create_task(slow())
+        await asyncio.sleep(0.02)
+        elapsed = await fast()
+        await slow_task
+        return elapsed
+
+    assert asyncio.run(go()) < 0.2
+
+
+def test_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(aio, "DB_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(aio, "_limiters", aio.weakref.WeakKeyDictionary())
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+
+    async def go():
+        async with anyio.create_task_group() as tg:
+            for _ in range(6):
+                tg.start_soon(aio.run_db, work)
+
+    asyncio.run(go())
+    assert running["peak"] == 2
+
+
+def test_more_connections_than_tokens_do_not_starve_connection_owners(monkeypatch, tmp_path):
+    # Pool of 2 and 2 execute tokens. Newcomers waiting for a connection
+    # must not hold the tokens the two owners need to query and release.
+    from sqlalchemy import create_engine, text
+
+    monkeypatch.setattr(aio, "DB_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(aio, "_limiters", aio.weakref.WeakKeyDictionary())
+    engine = create_engine(f"sqlite:///{tmp_path / 'slots.db'}", pool_size=2, max_overflow=0, pool_timeout=1)
+    db = aio.AsyncEngine(engine)
+    assert aio.pool_capacity(engine) == 2
+
+    async def request(i):
+        async with db.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await asyncio.sleep(0.02)  # connection held across an await
+            value = (await conn.execute(text("SELECT :i"), {"i": i})).scalar()
+            await conn.commit()
+            return value
+
+    async def go():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(i) for i in range(12)))
+        return results, time.perf_counter() - started, db.slot_stats()
+
+    results, elapsed, stats = asyncio.run(go())
+    assert results == list(range(12))
+    assert elapsed < 1  # no request sat out the pool timeout
+    assert engine.pool.checkedout() == 0 and stats["in_use"] == 0
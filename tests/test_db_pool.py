@@ -0,0 +1,193 @@
+"""Tests for the pool instrumentation behind the shared engine and the
+`app.db` helpers.
+
+Uses a fake DB-API connection so nothing touches MySQL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool import PoolStats, checkout, instrument_pool
+
+
+class _FakeConn:
+    def __init__(self, registry):
+        self.alive = True
+        self.closed = False
+        self.pings = 0
+        registry.append(self)
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise OSError("server has gone away")
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        pass
+
+    def cursor(self, *a, **kw):  # pragma: no cover - not exercised
+        raise NotImplementedError
+
+
+@pytest.fixture
+def made():
+    return []
+
+
+def _build(creator, stats, pool_size=2, max_overflow=1, timeout=1,
+           idle_timeout=300, recycle=1800, pre_ping=True):
+    pool = QueuePool(creator, pool_size=pool_size, max_overflow=max_overflow,
+                     timeout=timeout, reset_on_return=None)
+    return instrument_pool(pool, stats, idle_timeout=idle_timeout,
+                           recycle=recycle, pre_ping=pre_ping)
+
+
+def _pool(made, stats, **overrides):
+    return _build(lambda: _FakeConn(made), stats, **overrides)
+
+
+def test_connections_are_reused(made):
+    stats = PoolStats()
+    pool = _pool(made, stats)
+    for _ in range(5):
+        with checkout(pool, stats):
+            pass
+    assert len(made) == 1
+    snap = stats.snapshot(pool)
+    assert snap["checkouts"] == 5
+    assert snap["connects"] == 1
+    assert snap["in_use"] == 0
+    assert snap["idle"] == 1
+
+
+def test_in_use_and_overflow_are_reported(made):
+    stats = PoolStats()
+    pool = _pool(made, stats)
+    c1, c2, c3 = pool.connect(), pool.connect(), pool.connect()
+    snap = stats.snapshot(pool)
+    assert snap["in_use"] == 3
+    assert snap["overflow"] == 1
+    for c in (c1, c2, c3):
+        c.close()
+    assert stats.snapshot(pool)["in_use"] == 0
+
+
+def test_checkout_timeout_is_counted(made):
+    stats = PoolStats()
+    pool = _pool(made, stats, pool_size=1, max_overflow=0, timeout=0.05)
+    held = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        with checkout(pool, stats):
+            pass
+    held.close()
+    assert stats.snapshot(pool)["checkout_timeouts"] == 1
+
+
+def test_dead_connection_is_replaced_on_checkout(made):
+    stats = PoolStats()
+    pool = _pool(made, stats)
+    with checkout(pool, stats):
+        pass
+    made[0].alive = False
+    with checkout(pool, stats) as conn:
+        assert conn.dbapi_connection is made[1]
+    assert made[0].closed
+    assert stats.snapshot(pool)["ping_failures"] == 1
+
+
+def test_idle_connection_is_reaped(made):
+    stats = PoolStats()
+    pool = _pool(made, stats, idle_timeout=0.01)
+    with checkout(pool, stats):
+        pass
+    time.sleep(0.03)
+    with checkout(pool, stats):
+        pass
+    assert len(made) == 2
+    assert made[0].closed
+    assert stats.snapshot(pool)["idle_reaped"] == 1
+
+
+def test_old_connection_is_recycled(made):
+    stats = PoolStats()
+    pool = _pool(made, stats, recycle=0.01, idle_timeout=0)
+    with checkout(pool, stats):
+        pass
+    time.sleep(0.03)
+    with checkout(pool, stats):
+        pass
+    assert len(made) == 2
+    assert stats.snapshot(pool)["lifetime_recycled"] == 1
+
+
+def test_wait_time_is_recorded_when_pool_is_exhausted(made):
+    stats = PoolStats()
+    pool = _pool(made, stats, pool_size=1, max_overflow=0, timeout=2)
+    held = pool.connect()
+    threading.Timer(0.05, held.close).start()
+    with checkout(pool, stats):
+        pass
+    assert stats.snapshot(pool)["wait_ms_max"] >= 40
+
+
+def test_helpers_go_through_the_pool(monkeypatch):
+    import app.db as db_mod
+
+    made = []
+
+    class _Cursor:
+        def __init__(self):
+            self.rowcount = 1
+            self.lastrowid = 7
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *a):
+            return False
+
+        def execute(self, sql, params):
+            pass
+
+        def fetchone(self):
+            return {"ok": 1}
+
+    class _Conn(_FakeConn):
+        commits = 0
+
+        def cursor(self, *a, **kw):
+            return _Cursor()
+
+        def commit(self):
+            self.commits += 1
+
+    stats = PoolStats()
+    pool = _build(lambda: _Conn(made), stats, pool_size=1)
+    monkeypatch.setattr(db_mod, "POOL_STATS", stats)
+    monkeypatch.setattr(db_mod, "_get_pool", lambda: pool)
+
+    assert db_mod.fetch_one("SELECT 1") == {"ok": 1}
+    assert db_mod.insert_and_get_id("INSERT ...") == 7
+    assert len(made) == 1
+    assert made[0].commits == 2
+    assert db_mod.pool_stats()["checkouts"] == 2
+
+
+def test_engine_and_helpers_share_one_pool():
+    import app.admin_main as admin_main
+    import app.db as db_mod
+    from app.db.engine import SessionLocal, engine
+
+    assert db_mod._get_pool() is engine.pool
+    assert admin_main.engine is engine
+    assert admin_main.SessionLocal is SessionLocal
+    assert SessionLocal.kw["bind"] is engine
+    assert engine.echo is False
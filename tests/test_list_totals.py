@@ -0,0 +1,164 @@
+"""app.db.totals: counter seeding, write-path bumps, modes and reconcile.
+
+Runs against in-memory SQLite with just the columns the service touches.
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.db import totals
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, status TEXT)"))
+        c.execute(text("CREATE TABLE case_assignments (assignment_id INTEGER PRIMARY KEY, crime_id INTEGER)"))
+        c.execute(text(
+            "CREATE TABLE list_totals (scope TEXT NOT NULL, filter_key TEXT NOT NULL,"
+            " total INTEGER NOT NULL DEFAULT 0, refreshed_at TIMESTAMP, PRIMARY KEY (scope, filter_key))"
+        ))
+        c.execute(
+            text("INSERT INTO crime (status) VALUES (:s)"),
+            [{"s": "Pending"}] * 3 + [{"s": "Escalated"}] * 2 + [{"s": "Solved"}],
+        )
+        c.execute(text("INSERT INTO case_assignments (crime_id) VALUES (1), (2)"))
+    with engine.connect() as c:
+        yield c
+
+
+def _insert_crime(conn, status):
+    conn.execute(text("INSERT INTO crime (status) VALUES (:s)"), {"s": status})
+    totals.crime_inserted(conn, status)
+
+
+def _stored(conn, scope, key):
+    return totals.read_counters(conn, scope, [key]).get(key)
+
+
+def test_estimate_seeds_on_miss_then_serves_counter(conn):
+    assert _stored(conn, totals.CRIMES, totals.ALL) is None
+    assert totals.crime_total(conn, "estimate") == 6
+    assert _stored(conn, totals.CRIMES, totals.ALL) == 6
+
+    # A raw insert that skips the hook is invisible to the estimate...
+    conn.execute(text("INSERT INTO crime (status) VALUES ('Pending')"))
+    assert totals.crime_total(conn, "estimate") == 6
+    # ...until someone asks for an exact count, which also heals the counter.
+    assert totals.crime_total(conn, "exact") == 7
+    assert totals.crime_total(conn, "estimate") == 7
+
+
+def test_none_skips_counting(conn):
+    assert totals.crime_total(conn, "none") is None
+    assert totals.assignment_total(conn, "none") is None
+    assert conn.execute(text("SELECT COUNT(*) FROM list_totals")).scalar() == 0
+
+
+def test_status_totals_follow_write_hooks(conn):
+    case_statuses = ["Escalated", "Under Investigation"]
+    assert totals.crime_total(conn, "estimate", case_statuses) == 2
+    assert totals.crime_total(conn, "estimate", ["Pending"]) == 3
+
+    _insert_crime(conn, "Escalated")
+    conn.execute(text("UPDATE crime SET status = 'Under Investigation' WHERE crime_id = 1"))
+    totals.crime_status_changed(conn, "Pending", "Under Investigation")
+
+    assert totals.crime_total(conn, "estimate", case_statuses) == 4
+    assert totals.crime_total(conn, "estimate", ["pending"]) == 2
+    assert totals.crime_total(conn, "exact", case_statuses) == 4
+
+
+def test_bump_never_creates_counters(conn):
+    _insert_crime(conn, "Pending")
+    totals.assignments_changed(conn, 1)
+    assert conn.execute(text("SELECT COUNT(*) FROM list_totals")).scalar() == 0
+    assert totals.assignment_total(conn, "estimate") == 2
+
+
+def test_bump_errors_reach_the_write_path(conn):
+    conn.execute(text("DROP TABLE list_totals"))
+    with pytest.raises(OperationalError):  # the caller's transaction rolls back
+        totals.crime_inserted(conn, "Pending")
+    assert totals.crime_total(conn, "estimate") == 6
+
+
+def test_reconcile_reports_and_fixes_drift(conn):
+    totals.crime_total(conn, "estimate", ["Pending", "Solved"])
+    totals.assignment_total(conn, "estimate")
+    conn.execute(text("DELETE FROM crime WHERE status = 'Solved'"))
+    conn.execute(text("DELETE FROM case_assignments"))
+
+    drift = totals.reconcile(conn)
+    assert drift[totals.CRIMES]["status:solved"] == {"stored": 1, "actual": 0}
+    assert drift[totals.ASSIGNMENTS][totals.ALL] == {"stored": 2, "actual": 0}
+    assert totals.crime_total(conn, "estimate", ["Solved"]) == 0
+    assert totals.crime_total(conn, "estimate") == 5
+    assert totals.reconcile(conn) == {}
+
+
+def test_admin_crime_writes_bump_in_the_same_transaction(tmp_path, admin_headers, monkeypatch):
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    import app.admin_main as admin_main
+    import app.core.security as security
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'admin.db'}")
+    admin_main.Crime.__table__.create(engine)
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE list_totals (scope TEXT, filter_key TEXT, total INTEGER,"
+                       " refreshed_at TIMESTAMP, PRIMARY KEY (scope, filter_key))"))
+        totals.store_counters(c, totals.CRIMES, {totals.ALL: 0, totals.status_key("Pending"): 0})
+    session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(admin_main, "engine", engine)
+    monkeypatch.setitem(admin_main.app.dependency_overrides, admin_main.get_db, get_db)
+    monkeypatch.setattr(admin_main.rollups, "keys_for", lambda *a: [])
+    monkeypatch.setattr(admin_main.rollups, "changed", lambda *a: None)
+    monkeypatch.setattr(admin_main.rollups, "removed", lambda *a: None)
+    monkeypatch.setattr(admin_main.workload, "officer_for", lambda *a: None)
+    monkeypatch.setattr(admin_main.workload, "crime_changed", lambda *a: None)
+    monkeypatch.setattr(admin_main.workload, "crime_removed", lambda *a: None)
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": params[0], "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"})
+    body = {"crime_data": "{}", "location_data": "{}"}
+
+    def crimes():
+        with engine.connect() as c:
+            return (c.execute(text("SELECT COUNT(*) FROM crime")).scalar(),
+                    totals.read_counters(c, totals.CRIMES, [totals.ALL])[totals.ALL])
+
+    client = TestClient(admin_main.app, raise_server_exceptions=False)
+    assert client.post("/crime/", headers=admin_headers, json=body).status_code == 200
+    assert crimes() == (1, 1)
+
+    def broken_index(*args):
+        raise RuntimeError("search index unavailable")
+
+    with monkeypatch.context() as m:  # a failing hook takes the insert with it
+        m.setattr(admin_main.search_index, "index_crime", broken_index)
+        assert client.post("/crime/", headers=admin_headers, json=body).status_code == 500
+    assert crimes() == (1, 1)
+
+    seen = []
+    crime_deleted = totals.crime_deleted
+
+    def recording_crime_deleted(conn, status):
+        seen.append(conn.execute(text("SELECT COUNT(*) FROM crime")).scalar())
+        crime_deleted(conn, status)
+
+    monkeypatch.setattr(admin_main.totals, "crime_deleted", recording_crime_deleted)
+    assert client.delete("/crime/1", headers=admin_headers).status_code == 200
+    assert seen == [0]  # the hook runs after the DELETE, inside its transaction
+    assert crimes() == (0, 0)
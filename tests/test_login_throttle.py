@@ -0,0 +1,119 @@
+"""app.core.throttle: sliding-window login budgets and the /login 429."""
+from __future__ import annotations
+
+import pytest
+from passlib.hash import bcrypt
+
+import app.main as app_main
+from app.core import passwords
+from app.core.throttle import LoginThrottle, MemoryBackend, SQLiteBackend
+from app.db.aio import AsyncEngine
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "throttle.db"))
+
+
+def test_ip_budget_slides(backend):
+    throttle = LoginThrottle(backend, ip_limit=3, ip_window=60, email_limit=0)
+    for i in range(3):
+        assert throttle.check("10.0.0.1", f"u{i}@x", now=100 + i) is None
+    assert throttle.check("10.0.0.1", "u9@x", now=110) == pytest.approx(50)
+    assert throttle.check("10.0.0.2", "u9@x", now=110) is None  # other clients unaffected
+    # Rejections are not recorded: the first hit expires on schedule.
+    assert throttle.check("10.0.0.1", "u9@x", now=160.5) is None
+    stats = throttle.stats()
+    assert stats["rejected_ip"] == 1 and stats["allowed"] == 5
+
+
+def test_email_budget_across_ips_and_reset(backend):
+    throttle = LoginThrottle(backend, ip_limit=0, email_limit=2, email_window=300)
+    assert throttle.check("1.1.1.1", "Rina@X.com", now=0) is None
+    assert throttle.check("2.2.2.2", "rina@x.com ", now=1) is None
+    assert throttle.check("3.3.3.3", "rina@x.com", now=2) == pytest.approx(298)
+    throttle.reset("rina@x.com")
+    assert throttle.check("3.3.3.3", "rina@x.com", now=3) is None
+    assert throttle.stats()["rejected_email"] == 1
+
+
+def test_sqlite_budget_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = LoginThrottle(SQLiteBackend(path), ip_limit=2, email_limit=0)
+    second = LoginThrottle(SQLiteBackend(path), ip_limit=2, email_limit=0)
+    assert first.check("10.0.0.1", "a@x", now=0) is None
+    assert second.check("10.0.0.1", "a@x", now=1) is None
+    assert first.check("10.0.0.1", "a@x", now=2) is not None
+    assert second.stats()["keys"] == 1
+
+
+def test_backend_errors_fail_open():
+    class Broken:
+        blocking = False
+
+        def attempt(self, rules, now):
+            raise OSError("disk full")
+
+    throttle = LoginThrottle(Broken())
+    assert throttle.check("10.0.0.1", "a@x") is None
+    assert throttle.stats()["errors"] == 1
+
+
+def test_memory_backend_bounds_its_keys():
+    backend = MemoryBackend(max_keys=10)
+    throttle = LoginThrottle(backend, ip_limit=5, email_limit=0)
+    for i in range(50):
+        throttle.check(f"10.0.0.{i}", "a@x", now=i)
+    assert backend.size() <= 10
+
+
+class _LoginConn:
+    row = {"user_id": 5, "email": "r@x", "username": "rina", "role_hint": "User", "station_id": None,
+           "status": "Active", "created_at": None, "password_hash": bcrypt.using(rounds=4).hash("hunter2")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        return self
+
+    def mappings(self):
+        return self
+
+    def fetchone(self):
+        return self.row
+
+    def commit(self):
+        pass
+
+
+def test_login_is_rejected_before_bcrypt(client, monkeypatch):
+    class _Engine:
+        def connect(self):
+            return _LoginConn()
+
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(_Engine()))
+    monkeypatch.setattr(app_main, "login_throttle", LoginThrottle(MemoryBackend(), ip_limit=10, email_limit=2))
+    verifies = []
+    real_verify = passwords.verify
+
+    async def counting_verify(*args):
+        verifies.append(args)
+        return await real_verify(*args)
+
+    monkeypatch.setattr(passwords, "verify", counting_verify)
+
+    assert client.post("/login", json={"email": "r@x", "password": "nope"}).status_code == 400
+    assert client.post("/login", json={"email": "r@x", "password": "nope"}).status_code == 400
+    blocked = client.post("/login", json={"email": "R@x", "password": "hunter2"})
+    assert blocked.status_code == 429 and int(blocked.headers["retry-after"]) >= 299
+    assert len(verifies) == 2
+
+    # A successful login clears the account's window.
+    app_main.login_throttle.reset("r@x")
+    assert client.post("/login", json={"email": "r@x", "password": "hunter2"}).status_code == 200
+    assert client.post("/login", json={"email": "r@x", "password": "nope"}).status_code == 400
+    assert client.post("/login", json={"email": "r@x", "password": "nope"}).status_code == 400
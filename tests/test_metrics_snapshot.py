@@ -0,0 +1,78 @@
+"""app.db.metrics: the shared counters snapshot and the endpoints it serves."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import metrics
+from app.db.cache import invalidate_read_models
+
+NOW = datetime(2025, 6, 30, 12, 0)
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, status TEXT, crime_type TEXT,"
+                       " created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE missing_person (missing_id INTEGER PRIMARY KEY, status TEXT,"
+                       " created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, role_hint TEXT, status TEXT,"
+                       " created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE wanted_criminal (criminal_id INTEGER PRIMARY KEY, status TEXT)"))
+        c.execute(text("INSERT INTO crime (status, crime_type, created_at) VALUES (:s, :t, :c)"), [
+            {"s": "Pending", "t": "Theft", "c": NOW - timedelta(hours=2)},
+            {"s": "pending", "t": "Theft", "c": NOW - timedelta(days=3)},
+            {"s": "Solved", "t": None, "c": NOW - timedelta(days=40)},
+            {"s": "Emergency", "t": "Assault", "c": NOW - timedelta(hours=1)},
+        ])
+        c.execute(text("INSERT INTO missing_person (status, created_at) VALUES (:s, :c)"), [
+            {"s": "Missing", "c": NOW - timedelta(hours=5)},
+            {"s": "Found", "c": NOW - timedelta(days=50)},
+        ])
+        c.execute(text("INSERT INTO appuser (role_hint, status, created_at) VALUES (:r, :s, :c)"), [
+            {"r": "user", "s": "Active", "c": NOW - timedelta(days=2)},
+            {"r": "user", "s": "Inactive", "c": NOW - timedelta(days=90)},
+            {"r": "admin", "s": "Active", "c": NOW - timedelta(days=90)},
+        ])
+        c.execute(text("INSERT INTO wanted_criminal (status) VALUES ('Active'), ('Active'), ('Captured')"))
+    with engine.connect() as c:
+        yield c
+
+
+def test_compute_snapshot(conn):
+    snap = metrics.compute_snapshot(conn, now=NOW)
+    crimes = snap["crimes"]
+    assert (crimes["total"], crimes["pending"], crimes["solved"], crimes["emergency"]) == (4, 2, 1, 1)
+    assert (crimes["last_24h"], crimes["last_30d"]) == (2, 3)
+    assert {row["crime_type"]: row["count"] for row in crimes["by_type"]} == {"Theft": 2, "Assault": 1}
+    assert (snap["missing"]["total"], snap["missing"]["active"], snap["missing"]["last_24h"]) == (2, 1, 1)
+    users = snap["users"]
+    assert (users["total"], users["active"], users["last_30d"]) == (3, 2, 1)
+    assert {row["role_hint"]: row["count"] for row in users["by_role"]} == {"user": 2, "admin": 1}
+    assert {row["status"]: row["count"] for row in users["by_status"]} == {"Active": 2, "Inactive": 1}
+    assert snap["wanted"]["active"] == 2
+
+
+def test_endpoints_share_one_snapshot(client, captured_engine, admin_headers):
+    invalidate_read_models()
+    assert client.get("/api/statistics/crimes").status_code == 200
+    computed = len(captured_engine["sql"])
+    assert computed == 5
+
+    for path in ("/api/statistics/missing-persons", "/api/admin/overview", "/api/admin/user-stats"):
+        body = client.get(path, headers=admin_headers).json()
+        assert body["snapshot_age_seconds"] >= 0
+    assert len(captured_engine["sql"]) == computed
+
+    body = client.get("/api/dashboard").json()
+    assert "snapshot_age_seconds" in body
+    assert len(captured_engine["sql"]) == computed + 2  # just the recent-activity lists
+
+    invalidate_read_models()
+    body = client.get("/api/statistics/crimes").json()
+    assert body["snapshot_age_seconds"] == 0.0
+    assert len(captured_engine["sql"]) == 2 * computed + 2
@@ -24,6 +24,22 @@ class TestMigrationsExist:
             "003_add_columns.sql",
             "004_indexes.sql",
             "005_admin_tables.sql",
+            "006_crime_generated_columns.sql",
+            "007_keyset_indexes.sql",
+            "008_last_activity_at.sql",
+            "009_list_totals.sql",
+            "010_crime_search.sql",
+            "011_person_name_index.sql",
+            "012_daily_rollups.sql",
+            "013_crime_map_index.sql",
+            "014_alert_nearest_stations.sql",
+            "015_crime_geocell.sql",
+            "016_activity_event.sql",
+            "017_workload_projections.sql",
+            "018_resource_version.sql",
+            "019_reference_data.sql",
+            "020_chat_history_index.sql",
+            "021_crime_activity_at.sql",
         ):
             f = MIGRATIONS_DIR / fname
             assert f.is_file(), f"missing {fname}"
@@ -56,6 +72,74 @@ class TestMigrationsContent:
                 ["evidence_files", "file_uploads", "activity_log",
                  "admin_activity_log", "complaints", "notifications"],
             ),
+            (
+                "006_crime_generated_columns.sql",
+                ["ALTER TABLE crime", "STORED", "CREATE INDEX"],
+            ),
+            (
+                "007_keyset_indexes.sql",
+                ["idx_crime_created_id", "idx_appuser_created_id", "idx_emergency_created_id",
+                 "idx_user_complaints_created_id", "idx_case_assignments_assigned_id"],
+            ),
+            (
+                "008_last_activity_at.sql",
+                ["last_activity_at", "STORED", "idx_missing_person_activity",
+                 "idx_wanted_criminal_activity"],
+            ),
+            (
+                "009_list_totals.sql",
+                ["CREATE TABLE IF NOT EXISTS list_totals", "PRIMARY KEY (scope, filter_key)"],
+            ),
+            (
+                "010_crime_search.sql",
+                ["CREATE TABLE IF NOT EXISTS crime_search", "FULLTEXT KEY ft_crime_search_all",
+                 "FULLTEXT KEY ft_crime_search_meta", "ON DELETE CASCADE", "INSERT IGNORE INTO crime_search"],
+            ),
+            (
+                "011_person_name_index.sql",
+                ["CREATE TABLE IF NOT EXISTS person_name_index", "PRIMARY KEY (kind, gram, entity, entity_id)",
+                 "idx_person_name_index_entity"],
+            ),
+            (
+                "012_daily_rollups.sql",
+                ["CREATE TABLE IF NOT EXISTS daily_rollup", "PRIMARY KEY (metric, dimension, value, day)"],
+            ),
+            (
+                "013_crime_map_index.sql",
+                ["CREATE INDEX idx_crime_created_lat_lng ON crime (created_at, lat, lng, crime_type)"],
+            ),
+            (
+                "014_alert_nearest_stations.sql",
+                ["ALTER TABLE emergency_alerts ADD COLUMN nearest_stations"],
+            ),
+            (
+                "015_crime_geocell.sql",
+                ["ALTER TABLE crime ADD COLUMN geocell", "STORED", "CREATE INDEX idx_crime_geocell_created ON crime (geocell, created_at)"],
+            ),
+            (
+                "016_activity_event.sql",
+                ["CREATE TABLE IF NOT EXISTS activity_event", "idx_activity_event_occurred (occurred_at, event_id)", "idx_activity_event_entity_occurred"],
+            ),
+            (
+                "017_workload_projections.sql",
+                ["ALTER TABLE active_cases ADD COLUMN reporter_name", "CREATE UNIQUE INDEX uq_active_cases_crime ON active_cases (crime_id)", "ALTER TABLE officer_workload ADD COLUMN role_hint", "idx_officer_workload_load"],
+            ),
+            (
+                "018_resource_version.sql",
+                ["CREATE TABLE IF NOT EXISTS resource_version", "INSERT IGNORE INTO resource_version", "('police_station', 1"],
+            ),
+            (
+                "019_reference_data.sql",
+                ["ref_crime_type", "ref_district", "ref_thana", "ref_area", "resource_version"],
+            ),
+            (
+                "020_chat_history_index.sql",
+                ["CREATE INDEX idx_chat_messages_conversation", "chat_messages (user_id, report_id, message_id)"],
+            ),
+            (
+                "021_crime_activity_at.sql",
+                ["ALTER TABLE crime", "activity_at", "STORED", "CREATE TRIGGER", "idx_crime_status_activity_id"],
+            ),
         ],
     )
     def test_migration_has_expected_statements(self, fname, required_substrings):
@@ -88,6 +172,22 @@ class TestMigrationsMySQLCompatible:
         "003_add_columns.sql",
         "004_indexes.sql",
         "005_admin_tables.sql",
+        "006_crime_generated_columns.sql",
+        "007_keyset_indexes.sql",
+        "008_last_activity_at.sql",
+        "009_list_totals.sql",
+        "010_crime_search.sql",
+        "011_person_name_index.sql",
+        "012_daily_rollups.sql",
+        "013_crime_map_index.sql",
+        "014_alert_nearest_stations.sql",
+        "015_crime_geocell.sql",
+        "016_activity_event.sql",
+        "017_workload_projections.sql",
+        "018_resource_version.sql",
+        "019_reference_data.sql",
+        "020_chat_history_index.sql",
+        "021_crime_activity_at.sql",
     ])
     def test_no_add_column_if_not_exists(self, fname):
         text = self._strip_comments((MIGRATIONS_DIR / fname).read_text(encoding="utf-8"))
@@ -96,7 +196,24 @@ class TestMigrationsMySQLCompatible:
             "MySQL 8.x rejects this with syntax error 1064."
         )
 
-    @pytest.mark.parametrize("fname", ["004_indexes.sql"])
+    @pytest.mark.parametrize("fname", [
+        "004_indexes.sql",
+        "006_crime_generated_columns.sql",
+        "007_keyset_indexes.sql",
+        "008_last_activity_at.sql",
+        "009_list_totals.sql",
+        "010_crime_search.sql",
+        "011_person_name_index.sql",
+        "012_daily_rollups.sql",
+        "013_crime_map_index.sql",
+        "015_crime_geocell.sql",
+        "016_activity_event.sql",
+        "017_workload_projections.sql",
+        "018_resource_version.sql",
+        "019_reference_data.sql",
+        "020_chat_history_index.sql",
+        "021_crime_activity_at.sql",
+    ])
     def test_no_create_index_if_not_exists(self, fname):
         text = self._strip_comments((MIGRATIONS_DIR / fname).read_text(encoding="utf-8"))
         assert "CREATE INDEX IF NOT EXISTS" not in text, (
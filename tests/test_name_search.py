@@ -0,0 +1,103 @@
+"""Fuzzy name search: normalisation, phonetic keys, the person_name_index
+lookup (SQLite-backed) and /api/search/names ranking (DB mocked)."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import names
+
+
+class TestNormalisation:
+    def test_tokens_are_lowercased_ascii_with_abbreviations_expanded(self):
+        assert names.normalize("Md. Abdur-Rahman  Chowdhury") == ["mohammad", "abdur", "rahman", "chowdhury"]
+        assert names.normalize("Mst Ayesha") == ["mosammat", "ayesha"]
+        assert names.normalize(None) == []
+
+    @pytest.mark.parametrize("variants", [
+        ("Mohammad", "Muhammad", "Mohammed", "Md"),
+        ("Rashida", "Rasheda", "রাশিদা"),
+        ("Chowdhury", "Choudhury", "চৌধুরী"),
+        ("Islam", "Eslam"),
+        ("Yasmin", "Jasmin"),
+    ])
+    def test_spelling_variants_share_a_skeleton(self, variants):
+        skeletons = {names.phonetic(names.normalize(v)[0]) for v in variants}
+        assert len(skeletons) == 1, skeletons
+
+    def test_different_names_keep_different_skeletons(self):
+        assert names.phonetic("karim") != names.phonetic("rahim")
+
+    def test_trigrams_are_anchored(self):
+        assert names.trigrams("ali") == ("^al", "ali", "li$")
+
+
+class TestScore:
+    def test_exact_and_variant_matches_rank_above_typos(self):
+        query = names.tokens("Md Rasheda")
+        exact = names.score(query, "Md Rasheda")
+        variant = names.score(query, "Mohammad Rashida")
+        typo = names.score(query, "Mohammad Rashda")
+        other = names.score(query, "Karim Uddin")
+        assert exact == 1.0
+        assert exact > variant >= typo > names.MIN_SCORE > other
+
+    def test_prefix_query_matches(self):
+        assert names.score(names.tokens("rash"), "Rashida Begum") >= 0.85
+
+
+@pytest.fixture
+def index_conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE person_name_index (entity TEXT NOT NULL, entity_id INTEGER NOT NULL,"
+            " kind TEXT NOT NULL, gram TEXT NOT NULL, PRIMARY KEY (kind, gram, entity, entity_id))"
+        ))
+        yield conn
+
+
+class TestIndex:
+    def test_candidates_find_spelling_variants_and_respect_entities(self, index_conn):
+        names.index_person(index_conn, names.MISSING, 1, "Rashida Begum")
+        names.index_person(index_conn, names.MISSING, 2, "Karim Uddin")
+        names.index_person(index_conn, names.WANTED, 3, "Abdul Karim", "Kala Rasheed")
+
+        found = names.candidates(index_conn, names.tokens("Rasheda"))
+        assert set(found) == {(names.MISSING, 1), (names.WANTED, 3)}  # Rashida, alias Rasheed
+        assert names.candidates(index_conn, names.tokens("karim"), (names.WANTED,)) == [(names.WANTED, 3)]
+
+    def test_reindex_replaces_and_unindex_removes(self, index_conn):
+        names.index_person(index_conn, names.WANTED, 9, "Old Name")
+        names.index_person(index_conn, names.WANTED, 9, "Shahin")
+        assert names.candidates(index_conn, names.tokens("old")) == []
+        assert names.candidates(index_conn, names.tokens("shahin")) == [(names.WANTED, 9)]
+
+        names.unindex_person(index_conn, names.WANTED, 9)
+        assert index_conn.execute(text("SELECT COUNT(*) FROM person_name_index")).scalar() == 0
+
+    def test_index_person_never_raises(self):
+        with create_engine("sqlite://").begin() as conn:
+            names.index_person(conn, names.MISSING, 1, "Rashida")  # no person_name_index table
+
+
+def test_endpoint_ranks_name_and_alias_matches(client, captured_engine, monkeypatch):
+    monkeypatch.setattr(names, "candidates", lambda conn, query, entities: [(names.WANTED, 3), (names.WANTED, 4)])
+    captured_engine["rows"] = [
+        {"id": 3, "name": "Abdul Karim", "alias": "Kala Rasheed", "status": "Wanted"},
+        {"id": 4, "name": "Rashida Khatun", "alias": None, "status": "Wanted"},
+    ]
+    r = client.get("/api/search/names", params={"q": "Rasheda", "type": "wanted"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [(x["id"], x["matched"]) for x in body["results"]] == [(4, "name"), (3, "alias")]
+    assert body["results"][0]["score"] > body["results"][1]["score"]
+    assert body["count"] == 2
+
+    sql, params = captured_engine["sql"][0]
+    assert "FROM wanted_criminal WHERE criminal_id IN" in sql
+    assert "missing_person" not in " ".join(s for s, _ in captured_engine["sql"])
+
+
+def test_endpoint_rejects_unknown_type(client):
+    assert client.get("/api/search/names", params={"q": "x", "type": "crime"}).status_code == 422
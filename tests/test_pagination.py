@@ -0,0 +1,178 @@
+"""Keyset (cursor) pagination: cursor codec, SQL predicate and the list
+endpoints' cursor/next_cursor contract (DB mocked)."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
+    page_rows,
+)
+
+
+class TestCursorCodec:
+    def test_round_trip(self):
+        ts = datetime(2025, 3, 1, 12, 30, 5)
+        assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+    def test_token_is_url_safe(self):
+        token = encode_cursor(datetime(2025, 3, 1), 10**9)
+        assert all(ch.isalnum() or ch in "-_" for ch in token)
+
+    @pytest.mark.parametrize("bad", ["", "abc", "!!!", encode_cursor("not-a-date", 1)])
+    def test_garbage_raises(self, bad):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(bad)
+
+
+def test_page_rows_builds_next_cursor_only_when_more_rows():
+    rows = [{"created_at": datetime(2025, 1, d), "id": d} for d in (5, 4, 3)]
+    page, nxt = page_rows(rows, 2, "created_at", "id")
+    assert [r["id"] for r in page] == [5, 4]
+    assert decode_cursor(nxt) == (datetime(2025, 1, 4), 4)
+    assert page_rows(rows, 3, "created_at", "id")[1] is None
+
+
+def test_keyset_walk_matches_offset_walk_with_timestamp_ties():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, created_at TIMESTAMP)"))
+        conn.execute(
+            text("INSERT INTO t (id, created_at) VALUES (:id, :ts)"),
+            [{"id": i, "ts": datetime(2025, 1, 1, 0, 0, i // 4)} for i in range(1, 24)],
+        )
+    order = " ORDER BY created_at DESC, id DESC LIMIT :limit"
+    with engine.connect() as conn:
+        expected = [r[0] for r in conn.execute(text("SELECT id FROM t" + order), {"limit": 100})]
+        seen, token = [], None
+        while True:
+            where, params = keyset_predicate("created_at", "id", decode_cursor(token) if token else None)
+            sql = "SELECT id, created_at FROM t" + (f" WHERE {where}" if where else "") + order
+            rows = conn.execute(text(sql), {**params, "limit": 6}).mappings().fetchall()
+            rows = [{"id": r["id"], "created_at": datetime.fromisoformat(str(r["created_at"]))} for r in rows]
+            page, token = page_rows(rows, 5, "created_at", "id")
+            seen.extend(r["id"] for r in page)
+            if token is None:
+                break
+    assert seen == expected
+
+
+def test_invalid_cursor_is_400(client):
+    r = client.get("/api/crimes", params={"cursor": "definitely-not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_crimes_cursor_replaces_offset(client, captured_engine):
+    ts = datetime(2025, 2, 1, 8, 0, 0)
+    captured_engine["rows"] = [
+        {"crime_id": i, "created_at": ts, "location_data": None, "crime_data": None,
+         "victim_data": None, "criminal_data": None, "weapon_data": None, "witness_data": None}
+        for i in (9, 8, 7)
+    ]
+    r = client.get("/api/crimes", params={"limit": 2, "cursor": encode_cursor(ts, 10), "total": "none"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [c["crime_id"] for c in body["crimes"]] == [9, 8]
+    assert decode_cursor(body["next_cursor"]) == (ts, 8)
+    sql, params = captured_engine["sql"][0]
+    assert "OFFSET" not in sql
+    assert "crime_id < :cursor_id" in sql
+    assert params["limit"] == 3
+
+
+@pytest.mark.parametrize("path,key", [
+    ("/api/admin/users", "users"),
+    ("/api/admin/emergencies", "emergencies"),
+    ("/api/admin/complaints", "complaints"),
+    ("/api/admin/case-management", "cases"),
+    ("/api/admin/case-assignments", "assignments"),
+])
+def test_admin_lists_accept_cursor(client, captured_engine, admin_headers, path, key):
+    token = encode_cursor(datetime(2025, 2, 1), 100)
+    r = client.get(path, params={"cursor": token, "total": "none"}, headers=admin_headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert key in body and body["next_cursor"] is None
+    sql, params = captured_engine["sql"][0]
+    assert "OFFSET" not in sql and ":cursor_created_at" in sql
+    assert params["cursor_id"] == 100
+
+    # Legacy offset paging still works.
+    captured_engine["sql"].clear()
+    r = client.get(path, params={"offset": 100, "total": "none"}, headers=admin_headers)
+    assert r.status_code == 200
+    assert "OFFSET :offset" in captured_engine["sql"][0][0]
+
+
+@pytest.mark.parametrize("path,key,id_col,filters", [
+    ("/api/missing-persons", "missing_persons", "missing_id",
+     {"status": "Missing", "gender": "F", "age_min": 10, "age_max": 20}),
+    ("/api/wanted-criminals", "wanted_criminals", "criminal_id",
+     {"status": "Active", "danger_level": "High", "gender": "M"}),
+])
+def test_public_registers_filter_and_page(client, captured_engine, path, key, id_col, filters):
+    ts = datetime(2025, 2, 1, 8, 0, 0)
+    captured_engine["rows"] = [{id_col: i, "last_activity_at": ts} for i in (9, 8, 7)]
+    r = client.get(path, params={"limit": 2, **filters})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["count"] == 2 and len(body[key]) == 2
+    assert decode_cursor(body["next_cursor"]) == (ts, 8)
+    sql, params = captured_engine["sql"][-1]
+    assert f"ORDER BY last_activity_at DESC, {id_col} DESC" in sql
+    assert params["limit"] == 3
+    for name, value in filters.items():
+        assert params[name] == value
+
+    captured_engine["sql"].clear()
+    r = client.get(path, params={"sort": "oldest", "cursor": body["next_cursor"]})
+    assert r.status_code == 200
+    sql, params = captured_engine["sql"][-1]
+    assert f"ORDER BY last_activity_at ASC, {id_col} ASC" in sql
+    assert f"{id_col} > :cursor_id" in sql and "OFFSET" not in sql
+
+
+@pytest.mark.parametrize("gender", ["F", "Female", "female"])
+def test_gender_filter_matches_stored_codes(client, tmp_path, monkeypatch, gender):
+    import app.main as app_main
+    from app.db.aio import AsyncEngine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing.db'}")
+    columns = ("reporter_id, name, age, gender, description, last_seen_location, last_seen_date, last_seen_time,"
+               " height, weight, hair_color, eye_color, distinguishing_marks, clothing_description,"
+               " contact_person, contact_phone, photo_url, status, police_case_number, finding_location,"
+               " finder_name, finder_phone, finder_email, still_with_finder, created_at, updated_at,"
+               " last_activity_at")
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE missing_person (missing_id INTEGER PRIMARY KEY, {columns})"))
+        # The admin form and the public report store M/F/O.
+        conn.execute(text("INSERT INTO missing_person (missing_id, name, gender, last_activity_at)"
+                          " VALUES (1, 'Rina', 'F', '2025-02-01'), (2, 'Karim', 'M', '2025-02-02')"))
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+
+    r = client.get("/api/missing-persons", params={"gender": gender})
+    assert r.status_code == 200
+    assert [p["name"] for p in r.json()["missing_persons"]] == ["Rina"]
+
+
+def test_case_management_pages_on_latest_activity(client, captured_engine, admin_headers):
+    ts = datetime(2025, 2, 1, 8, 0, 0)
+    captured_engine["rows"] = [{"crime_id": i, "created_at": datetime(2024, 1, i), "activity_at": ts}
+                               for i in (9, 8, 7)]
+    r = client.get("/api/admin/case-management", params={"limit": 2, "total": "none"}, headers=admin_headers)
+    assert r.status_code == 200
+    assert decode_cursor(r.json()["next_cursor"]) == (ts, 8)
+    sql, _ = captured_engine["sql"][0]
+    assert "ORDER BY c.activity_at DESC, c.crime_id DESC" in sql
+
+    captured_engine["sql"].clear()
+    client.get("/api/admin/case-management", params={"cursor": r.json()["next_cursor"], "total": "none"},
+               headers=admin_headers)
+    sql, params = captured_engine["sql"][0]
+    assert "c.activity_at <= :cursor_created_at" in sql and params["cursor_id"] == 8
@@ -0,0 +1,160 @@
+"""app.core.passwords: bcrypt in a bounded thread pool, rehash on login."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+import app.main as app_main
+from app.core import passwords
+from app.core.config import BCRYPT_ROUNDS
+from app.db.aio import AsyncEngine
+
+OLD_COST = bcrypt.using(rounds=BCRYPT_ROUNDS + 1)
+
+
+def test_hash_and_verify_in_pool():
+    async def scenario():
+        stored = await passwords.hash("hunter2")
+        return stored, await passwords.verify("hunter2", stored), await passwords.verify("wrong", stored)
+
+    stored, good, bad = asyncio.run(scenario())
+    assert stored.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert good == (True, None) and bad == (False, None)
+    with pytest.raises(ValueError):
+        asyncio.run(passwords.hash(""))
+
+
+def test_verify_rehashes_other_costs():
+    ok, new_hash = asyncio.run(passwords.verify("hunter2", OLD_COST.hash("hunter2")))
+    assert ok and new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$") and bcrypt.verify("hunter2", new_hash)
+    # A wrong password never produces a new hash.
+    assert asyncio.run(passwords.verify("nope", OLD_COST.hash("hunter2"))) == (False, None)
+
+
+def test_full_queue_is_rejected(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(passwords, "PASSWORD_MAX_QUEUE", 1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(passwords._run(release.wait))
+        queued = asyncio.create_task(passwords._run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        depth = passwords.stats()
+        with pytest.raises(passwords.PoolBusy):
+            await passwords._run(lambda: "rejected")
+        release.set()
+        return depth, await running, await queued
+
+    depth, first, second = asyncio.run(scenario())
+    assert depth["in_flight"] == 1 and depth["waiting"] == 1
+    assert first is True and second == "queued"
+    assert passwords.stats()["rejected"] >= 1
+
+
+class _LoginConn:
+    def __init__(self, row, writes):
+        self.row, self.writes = row, writes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if sql.startswith("UPDATE"):
+            self.writes.append(dict(params))
+        return self
+
+    def mappings(self):
+        return self
+
+    def fetchone(self):
+        return self.row
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def login_row(monkeypatch):
+    row = {"user_id": 5, "email": "r@x", "username": "rina", "role_hint": "User", "station_id": None,
+           "status": "Active", "created_at": None, "password_hash": OLD_COST.hash("hunter2")}
+    writes = []
+
+    class _Engine:
+        def connect(self):
+            return _LoginConn(row, writes)
+
+        begin = connect
+
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(_Engine()))
+    return row, writes
+
+
+def test_login_stores_rehashed_password(client, login_row):
+    row, writes = login_row
+    assert client.post("/login", json={"email": "r@x", "password": "hunter2"}).status_code == 200
+    assert len(writes) == 1 and writes[0]["old"] == row["password_hash"]
+    assert bcrypt.verify("hunter2", writes[0]["new"])
+
+    row["password_hash"] = writes[0]["new"]
+    assert client.post("/login", json={"email": "r@x", "password": "hunter2"}).status_code == 200
+    assert len(writes) == 1
+
+
+def test_login_returns_503_when_pool_is_full(client, login_row, monkeypatch):
+    async def busy(*args):
+        raise passwords.PoolBusy("full")
+
+    monkeypatch.setattr(passwords, "_run", busy)
+    response = client.post("/login", json={"email": "r@x", "password": "hunter2"})
+    assert response.status_code == 503 and response.headers["retry-after"] == "1"
+
+
+def test_login_releases_its_connection_while_waiting_for_bcrypt(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'login.db'}", poolclass=QueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=1)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, email TEXT, username TEXT,"
+                          " role_hint TEXT, station_id INTEGER, status TEXT, created_at TEXT, password_hash TEXT)"))
+        conn.execute(text("INSERT INTO appuser VALUES (5, 'r@x', 'rina', 'User', NULL, 'Active', NULL, :h)"),
+                     {"h": OLD_COST.hash("hunter2")})
+    async_engine = AsyncEngine(engine)
+    monkeypatch.setattr(app_main, "async_engine", async_engine)
+    real_verify = passwords.verify
+
+    async def scenario():
+        entered, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_verify(*args):
+            entered.set()
+            await release.wait()  # stuck in the bcrypt queue
+            return await real_verify(*args)
+
+        monkeypatch.setattr(passwords, "verify", slow_verify)
+        transport = httpx.ASGITransport(app=app_main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            login = asyncio.create_task(http.post("/login", json={"email": "r@x", "password": "hunter2"}))
+            await asyncio.wait_for(entered.wait(), timeout=5)
+            # The only pooled connection is free for everyone else meanwhile.
+            async with async_engine.connect() as conn:
+                other = (await conn.execute(text("SELECT COUNT(*) AS n FROM appuser"))).mappings().fetchone()
+            release.set()
+            return other["n"], (await login).status_code
+
+    assert asyncio.run(scenario()) == (1, 200)
+    with engine.connect() as conn:  # the rehash ran on its own connection
+        stored = conn.execute(text("SELECT password_hash FROM appuser")).scalar()
+    assert stored.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
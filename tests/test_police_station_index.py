@@ -0,0 +1,119 @@
+"""app.db.stations: k-d tree nearest-station lookup and the panic-path hook."""
+from __future__ import annotations
+
+import random
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.db import stations
+
+
+def _station(i, lat, lng):
+    return {"station_id": i, "station_name": f"S{i}", "station_code": f"C{i}", "phone": None,
+            "latitude": lat, "longitude": lng}
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(14)
+    rows = [_station(i, rng.uniform(-80, 80), rng.uniform(-180, 180)) for i in range(500)]
+    index = stations.StationIndex(rows)
+    for _ in range(50):
+        lat, lng = rng.uniform(-80, 80), rng.uniform(-180, 180)
+        expected = sorted(rows, key=lambda r: stations.haversine_km(lat, lng, r["latitude"], r["longitude"]))[:3]
+        got = index.nearest(lat, lng, 3)
+        assert [s["station_id"] for s in got] == [r["station_id"] for r in expected]
+        assert got[0]["distance_km"] <= got[1]["distance_km"] <= got[2]["distance_km"]
+
+
+def test_nearest_across_the_antimeridian_and_bad_rows():
+    index = stations.StationIndex([
+        _station(1, 0.0, 179.9),
+        _station(2, 0.0, 170.0),
+        _station(3, None, None),
+        _station(4, "x", 1.0),
+        _station(5, 95.0, 0.0),
+    ])
+    assert index.size == 2
+    got = index.nearest(0.0, -179.9, 1)
+    assert got[0]["station_id"] == 1
+    assert got[0]["distance_km"] == pytest.approx(22.24, abs=0.01)
+    assert stations.StationIndex().nearest(0.0, 0.0) == []
+
+
+def _sqlite():
+    return create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+
+@pytest.fixture
+def restore_index(monkeypatch):
+    for name in ("_index", "_loaded_at", "_last_attempt"):
+        monkeypatch.setattr(stations, name, getattr(stations, name))
+
+
+def test_load_and_reload_swap_the_index(restore_index):
+    engine = _sqlite()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE police_station (station_id INTEGER PRIMARY KEY, station_name TEXT,"
+                          " station_code TEXT, phone TEXT, latitude REAL, longitude REAL)"))
+        conn.execute(text("INSERT INTO police_station VALUES (1, 'Ramna', 'RMN', '999', 23.7380, 90.3950)"))
+        conn.execute(text("INSERT INTO police_station VALUES (2, 'No location', 'NL', NULL, NULL, NULL)"))
+        assert stations.load(conn) == 1
+        assert stations.nearest(23.74, 90.40)[0]["station_code"] == "RMN"
+        conn.execute(text("INSERT INTO police_station VALUES (3, 'Gulshan', 'GUL', NULL, 23.7925, 90.4078)"))
+        stations.reload(conn)
+        assert stations.nearest(23.79, 90.41, 1)[0]["station_code"] == "GUL"
+        assert stations.stats()["stations"] == 2
+
+    broken = _sqlite()
+    with broken.connect() as conn:
+        stations.reload(conn)  # no table: logged, previous index kept
+    assert stations.stats()["stations"] == 2
+    assert stations.nearest(None, 90.4) == []
+
+
+def test_panic_alert_stores_nearest_stations(client, user_headers, monkeypatch):
+    import json
+
+    import app.core.security as security
+    import app.main as app_main
+    from app.db.aio import AsyncEngine
+
+    engine = _sqlite()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, location_data TEXT, crime_data TEXT,"
+                          " status TEXT, reporter_id INTEGER, created_at TIMESTAMP, crime_type TEXT, city TEXT,"
+                          " area_name TEXT, priority_level TEXT, incident_date TIMESTAMP, updated_at TIMESTAMP)"))
+        # The projections the crime insert keeps current in the same transaction.
+        conn.execute(text("CREATE TABLE list_totals (scope TEXT, filter_key TEXT, total INTEGER,"
+                          " refreshed_at TIMESTAMP, PRIMARY KEY (scope, filter_key))"))
+        conn.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, username TEXT, full_name TEXT,"
+                          " role_hint TEXT, station_id INTEGER)"))
+        conn.execute(text("CREATE TABLE police_station (station_id INTEGER PRIMARY KEY, station_name TEXT)"))
+        conn.execute(text("CREATE TABLE case_assignments (assignment_id INTEGER PRIMARY KEY, user_id INTEGER,"
+                          " crime_id INTEGER UNIQUE, status TEXT)"))
+        conn.execute(text("CREATE TABLE active_cases (case_id INTEGER PRIMARY KEY, crime_id INTEGER UNIQUE,"
+                          " assigned_to INTEGER, status TEXT, reporter_id TEXT, reporter_name TEXT, crime_type TEXT,"
+                          " city TEXT, area TEXT, priority_level TEXT, incident_date TIMESTAMP,"
+                          " created_at TIMESTAMP, updated_at TIMESTAMP)"))
+        conn.execute(text("CREATE TABLE emergency_alerts (alert_id INTEGER PRIMARY KEY, user_id INTEGER,"
+                          " user_snapshot TEXT, linked_crime_id INTEGER, location_label TEXT, latitude REAL,"
+                          " longitude REAL, alert_type TEXT, severity TEXT, description TEXT, metadata TEXT,"
+                          " nearest_stations TEXT, status TEXT, created_at TIMESTAMP)"))
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": 42, "username": "u", "email": "u@x", "role_hint": "user", "status": "active"})
+    monkeypatch.setattr(stations, "_index", stations.StationIndex([
+        _station(1, 23.7380, 90.3950), _station(2, 23.7925, 90.4078), _station(3, 22.3569, 91.7832),
+    ]))
+    monkeypatch.setattr(stations, "_loaded_at", 1.0)
+
+    r = client.post("/api/emergency-alert", headers=user_headers, json={
+        "location": {"lat": 23.7800, "lng": 90.4070}, "alert_type": "panic", "description": "help",
+    })
+    assert r.status_code == 200, r.text
+    assert [s["station_id"] for s in r.json()["nearest_stations"]] == [2, 1, 3]
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT nearest_stations FROM emergency_alerts")).scalar()
+    assert [s["station_id"] for s in json.loads(stored)] == [2, 1, 3]
@@ -0,0 +1,118 @@
+"""app.db.reference: ref_* tables, the versioned in-process cache and /api/reference."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.core.security as security
+import app.main as app_main
+from app.core.security import create_access_token
+from app.db import reference, versions
+from app.db.aio import AsyncEngine
+
+SCHEMA = [
+    "CREATE TABLE resource_version (resource TEXT PRIMARY KEY, version INTEGER NOT NULL, changed_at TIMESTAMP NOT NULL)",
+    "CREATE TABLE ref_crime_type (crime_type_id INTEGER PRIMARY KEY, name TEXT UNIQUE, sort_order INTEGER DEFAULT 0,"
+    " is_active INTEGER DEFAULT 1)",
+    "CREATE TABLE ref_district (district_id INTEGER PRIMARY KEY, name TEXT UNIQUE, sort_order INTEGER DEFAULT 0,"
+    " is_active INTEGER DEFAULT 1)",
+    "CREATE TABLE ref_thana (thana_id INTEGER PRIMARY KEY, district_id INTEGER, name TEXT, sort_order INTEGER DEFAULT 0,"
+    " is_active INTEGER DEFAULT 1, UNIQUE (district_id, name))",
+    "CREATE TABLE ref_area (area_id INTEGER PRIMARY KEY, district_id INTEGER, thana_id INTEGER, name TEXT,"
+    " sort_order INTEGER DEFAULT 0, is_active INTEGER DEFAULT 1, UNIQUE (district_id, name))",
+    "INSERT INTO ref_crime_type (name, sort_order) VALUES ('Theft', 1), ('Arson', 2)",
+    "INSERT INTO ref_district (district_id, name, sort_order) VALUES (1, 'Dhaka', 1), (2, 'Sylhet', 2)",
+    "INSERT INTO ref_thana (thana_id, district_id, name) VALUES (10, 1, 'Dhanmondi Thana')",
+    "INSERT INTO ref_area (district_id, thana_id, name, sort_order) VALUES (1, 10, 'Dhanmondi', 1), (1, NULL, 'Gulshan', 2)",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ref.db'}")
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        versions.bump(conn, versions.REFERENCE)
+    return engine
+
+
+def test_load_and_reload_on_version_bump(engine):
+    cache = reference.ReferenceCache(recheck_seconds=0)
+    with engine.connect() as conn:
+        bundle, stamp = cache.current(conn)
+        assert stamp[0] == "reference.1"
+        assert bundle["crime_types"] == ["Theft", "Arson"]
+        dhaka = bundle["districts"][0]
+        assert dhaka["areas"] == ["Dhanmondi", "Gulshan"] and dhaka["thanas"] == ["Dhanmondi Thana"]
+        assert dhaka["area_thanas"] == {"Dhanmondi": "Dhanmondi Thana"}
+        assert reference.areas(bundle, " dhaka ") == ["Dhanmondi", "Gulshan"]
+
+        cache.current(conn)
+        assert cache.stats()["loads"] == 1  # same version: no reload
+
+        area_id = reference.add(conn, "areas", "Banani", district="Dhaka")
+        reference.update(conn, "areas", area_id, {"sort_order": 0})
+        bundle, stamp = cache.current(conn)
+        assert stamp[0] == "reference.3" and reference.areas(bundle, "Dhaka")[0] == "Banani"
+
+
+def test_recheck_interval_skips_the_database(engine):
+    cache = reference.ReferenceCache(recheck_seconds=60)
+    assert cache.peek() is None
+    with engine.connect() as conn:
+        cache.current(conn)
+        versions.bump(conn, versions.REFERENCE)
+        conn.commit()
+    assert cache.peek()[1][0] == "reference.1"  # still within the interval
+    cache.expire()
+    assert cache.peek() is None
+
+
+def test_add_validates_parents(engine):
+    with engine.connect() as conn:
+        with pytest.raises(ValueError):
+            reference.add(conn, "thanas", "Gulshan Thana")
+        with pytest.raises(LookupError):
+            reference.add(conn, "areas", "Zindabazar", district="Nowhere")
+        with pytest.raises(LookupError):
+            reference.add(conn, "areas", "Zindabazar", district="Sylhet", thana="Kotwali")
+        assert not reference.update(conn, "districts", 99, {"is_active": 0})
+
+
+def test_missing_tables_fall_back_to_builtin_lists():
+    cache = reference.ReferenceCache()
+    with create_engine("sqlite://").connect() as conn:
+        bundle, stamp = cache.current(conn)
+    assert stamp is None and "Dhaka" in [d["name"] for d in bundle["districts"]]
+    assert "Gulshan" in reference.areas(bundle, "Dhaka")
+    assert cache.unavailable() == (bundle, None)
+
+
+def test_reference_endpoint_and_admin_writes(client, engine, monkeypatch):
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+    monkeypatch.setattr(reference, "cache", reference.ReferenceCache(recheck_seconds=60))
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": 1, "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"})
+
+    first = client.get("/api/reference")
+    assert first.status_code == 200 and first.json()["version"] == "reference.1"
+    assert first.headers["cache-control"] == f"max-age={app_main.REFERENCE_MAX_AGE}"
+    assert client.get("/api/reference", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert client.get("/api/districts").json() == {"districts": ["Dhaka", "Sylhet"]}
+
+    admin = {"Authorization": f"Bearer {create_access_token(1)}"}
+    added = client.post("/api/admin/reference/areas", json={"name": "Zindabazar", "district": "Sylhet"},
+                        headers=admin)
+    assert added.status_code == 200
+    assert client.post("/api/admin/reference/areas", json={"name": "Zindabazar", "district": "Sylhet"},
+                       headers=admin).status_code == 409
+    assert client.get("/api/areas/Sylhet").json() == {"areas": ["Zindabazar"]}
+
+    again = client.get("/api/reference", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 200 and again.headers["etag"] != first.headers["etag"]
+
+    assert client.put(f"/api/admin/reference/areas/{added.json()['id']}", json={"is_active": False},
+                      headers=admin).status_code == 200
+    assert client.get("/api/areas/Sylhet").json() == {"areas": []}
+    assert client.post("/api/admin/reference/planets", json={"name": "Mars"}, headers=admin).status_code == 404
@@ -128,4 +128,32 @@ class TestConsoleJs:
     def test_has_sprite_inject(self):
         text = (ASSETS_DIR / "console.js").read_text(encoding="utf-8")
         assert "_injectSprite" in text
-        assert "<symbol" in text
\ No newline at end of file
+        assert "<symbol" in text
+
+class TestChatStreamJs:
+    def test_file_exists(self):
+        assert (ASSETS_DIR / "chat-stream.js").is_file()
+
+    def test_parses_events_and_resumes_after_last_id(self):
+        # One response with two events split across reads, then the stream ends
+        # and the client reconnects with after_id set to the last event's id.
+        result = _run_node(
+            "global.resolveApiUrl = (p) => p; global.window.resolveApiUrl = global.resolveApiUrl;\n"
+            "global.setTimeout = (fn) => { fn(); return 1; };\n"
+            "const urls = []; const got = [];\n"
+            "const chunks = ['retry: 10\\n\\nid: 7\\nevent: message\\ndata: {\"message_id\":7}\\n\\n: keep',"
+            " 'alive\\n\\nid: 8\\ndata: {\"message_id\":8}\\n\\n'];\n"
+            "let handle;\n"
+            "global.fetch = (url) => { urls.push(url); if (urls.length > 1) { handle.close();"
+            " return Promise.reject(new Error('closed')); }\n"
+            "  let i = 0; const enc = new TextEncoder();\n"
+            "  return Promise.resolve({ ok: true, status: 200, body: { getReader: () => ({ read: () =>"
+            "    Promise.resolve(i < chunks.length ? { done: false, value: enc.encode(chunks[i++]) } : { done: true })"
+            "  }) } }); };\n"
+            + _load(ASSETS_DIR / "chat-stream.js")
+            + "handle = global.window.openChatStream({ user_id: 5, report_id: '' }, (m) => got.push(m.message_id),"
+            " { afterId: 3 });\n"
+            "setImmediate(() => setImmediate(() => process.stdout.write(JSON.stringify({ urls, got }))));"
+        )
+        assert result["got"] == [7, 8]
+        assert result["urls"] == ["/api/chat/stream?user_id=5&after_id=3", "/api/chat/stream?user_id=5&after_id=8"]
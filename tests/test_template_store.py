@@ -0,0 +1,112 @@
+"""app.core.pages: template store, encoding negotiation and page ETags."""
+from __future__ import annotations
+
+import gzip
+import os
+
+import pytest
+from starlette.requests import Request
+
+from app.core import pages
+from app.core.pages import TemplateStore, negotiate
+
+BODY = "<html><body>" + "Stay safe. " * 400 + "</body></html>"
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "page.html").write_text(BODY, encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, "identity"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0.5, br", "br"),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+    ("gzip;q=0, identity", "identity"),
+    ("*", "br"),
+    ("identity;q=0, deflate", "identity"),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, {"identity", "gzip", "br"}) == expected
+
+
+def test_negotiate_skips_missing_encodings():
+    assert negotiate("br", {"identity", "gzip"}) == "identity"
+    assert negotiate("br, gzip;q=0.5", {"identity", "gzip"}) == "gzip"
+
+
+def test_gzip_variant_and_304(root):
+    store = TemplateStore(root)
+    plain = store.respond(_request(), "page.html")
+    zipped = store.respond(_request(accept_encoding="gzip"), "page.html")
+
+    assert plain.body == BODY.encode() and "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(zipped.body) == plain.body
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert plain.headers["content-type"] == "text/html; charset=utf-8"
+    # Strong, and distinct per encoding.
+    assert not plain.headers["etag"].startswith("W/")
+    assert plain.headers["etag"] != zipped.headers["etag"]
+
+    again = store.respond(_request(accept_encoding="gzip", if_none_match=zipped.headers["etag"]), "page.html")
+    assert again.status_code == 304 and again.body == b""
+    # The identity ETag does not validate the gzip bytes.
+    assert store.respond(_request(accept_encoding="gzip", if_none_match=plain.headers["etag"]),
+                         "page.html").status_code == 200
+    assert store.stats()["loads"] == 1
+
+
+def test_small_pages_and_bad_bytes_are_served_as_utf8(tmp_path):
+    (tmp_path / "stub.html").write_bytes(b"<p>caf\xe9</p>")
+    response = TemplateStore(tmp_path).respond(_request(accept_encoding="gzip"), "stub.html")
+    assert "content-encoding" not in response.headers
+    assert response.body.decode("utf-8") == "<p>caf�</p>"
+
+
+def test_watch_reloads_on_change(root):
+    store = TemplateStore(root, watch=True)
+    first = store.respond(_request(), "page.html")
+    path = root / "page.html"
+    path.write_text(BODY.replace("safe", "alert"), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = store.respond(_request(), "page.html")
+    assert b"alert" in second.body and second.headers["etag"] != first.headers["etag"]
+    assert store.stats()["reloads"] == 1
+
+
+def test_without_watch_the_first_read_sticks(root):
+    store = TemplateStore(root)
+    store.get("page.html")
+    (root / "page.html").write_text("changed", encoding="utf-8")
+    assert store.respond(_request(), "page.html").body == BODY.encode()
+
+
+def test_missing_page_raises(root):
+    with pytest.raises(FileNotFoundError):
+        TemplateStore(root).get("nope.html")
+
+
+def test_brotli_variant(root):
+    brotli = pytest.importorskip("brotli")
+    response = TemplateStore(root).respond(_request(accept_encoding="gzip, br"), "page.html")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(response.body) == BODY.encode()
+
+
+def test_page_route_revalidates(client):
+    first = client.get("/login")
+    assert first.status_code == 200 and first.headers["content-encoding"] in {"gzip", "br"}
+    assert "<html" in first.text.lower()
+    again = client.get("/login", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert pages.store.stats()["pages"] > 1
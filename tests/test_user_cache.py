@@ -0,0 +1,79 @@
+"""Authenticated-user cache: bounded LRU in SnapshotCache and get_current_user."""
+from __future__ import annotations
+
+import pytest
+
+import app.core.security as security
+from app.core.security import create_access_token, user_cache
+from app.db.cache import SnapshotCache
+
+
+def test_lru_evicts_least_recently_read():
+    cache = SnapshotCache(60, max_entries=2)
+    cache.put(1, "a", cache.generation)
+    cache.put(2, "b", cache.generation)
+    cache.get(1)
+    cache.put(3, "c", cache.generation)
+    assert cache.get(2) is None and cache.get(1)[0] == "a" and cache.get(3)[0] == "c"
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+    assert stats["hit_ratio"] == 0.75
+
+
+def test_discard_drops_one_entry_and_in_flight_reads():
+    cache = SnapshotCache(60)
+    cache.put(1, "a", cache.generation)
+    cache.put(2, "b", cache.generation)
+    generation = cache.generation
+    cache.discard(1)
+    assert cache.get(1) is None and cache.get(2)[0] == "b"
+    assert not cache.put(1, "stale", generation)
+
+
+@pytest.fixture
+def user_rows(monkeypatch):
+    state = {"calls": 0, "row": {"user_id": 7, "username": "kabir", "email": "k@x",
+                                 "role_hint": "admin", "status": "active"}}
+
+    def fake(sql, params=None):
+        state["calls"] += 1
+        return dict(state["row"])
+
+    monkeypatch.setattr(security, "fetch_one", fake)
+    return state
+
+
+def test_current_user_is_cached_until_forgotten(client, user_rows):
+    headers = {"Authorization": f"Bearer {create_access_token(7)}"}
+    for _ in range(3):
+        assert client.get("/api/admin/metrics", headers=headers).status_code == 200
+    assert user_rows["calls"] == 1
+
+    user_rows["row"]["status"] = "Inactive"
+    security.forget_user(7)
+    assert client.get("/api/admin/metrics", headers=headers).status_code == 403
+    assert user_rows["calls"] == 2
+
+
+def test_admin_user_update_takes_effect_immediately(client, captured_engine, monkeypatch):
+    rows = {1: {"user_id": 1, "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"},
+            2: {"user_id": 2, "username": "b", "email": "b@x", "role_hint": "officer", "status": "active"}}
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: dict(rows[params[0]]))
+    admin = {"Authorization": f"Bearer {create_access_token(1)}"}
+    officer = {"Authorization": f"Bearer {create_access_token(2)}"}
+    assert client.get("/api/admin/metrics", headers=officer).status_code == 200
+
+    rows[2]["role_hint"] = "user"
+    assert client.put("/api/admin/users/2", json={"user_id": 2, "role_hint": "user"}, headers=admin).status_code == 200
+    assert client.get("/api/admin/metrics", headers=officer).status_code == 403
+
+    rows[2]["status"] = "Inactive"
+    assert client.delete("/api/admin/users/2", headers=admin).status_code == 200
+    assert user_cache.get(2) is None
+
+
+def test_cached_row_is_not_shared_with_the_caller(user_rows):
+    first = security.load_user(7)
+    first["role_hint"] = "user"
+    assert security.load_user(7)["role_hint"] == "admin"
+    assert user_rows["calls"] == 1
@@ -0,0 +1,200 @@
+"""app.db.workload: active_cases / officer_workload hooks and reconcile.
+
+Runs against in-memory SQLite with just the columns the service touches.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.db import workload
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'workload.db'}")
+    with engine.begin() as c:
+        c.execute(text("CREATE TABLE crime (crime_id INTEGER PRIMARY KEY, reporter_id TEXT, crime_type TEXT,"
+                       " city TEXT, area_name TEXT, status TEXT, priority_level TEXT, incident_date TIMESTAMP,"
+                       " created_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE appuser (user_id INTEGER PRIMARY KEY, username TEXT, full_name TEXT,"
+                       " role_hint TEXT, station_id INTEGER)"))
+        c.execute(text("CREATE TABLE police_station (station_id INTEGER PRIMARY KEY, station_name TEXT)"))
+        c.execute(text("CREATE TABLE case_assignments (assignment_id INTEGER PRIMARY KEY, user_id INTEGER,"
+                       " crime_id INTEGER UNIQUE, status TEXT DEFAULT 'Active')"))
+        c.execute(text("CREATE TABLE active_cases (case_id INTEGER PRIMARY KEY, crime_id INTEGER UNIQUE,"
+                       " assigned_to INTEGER, status TEXT, reporter_id TEXT, reporter_name TEXT, crime_type TEXT,"
+                       " city TEXT, area TEXT, priority_level TEXT, incident_date TIMESTAMP,"
+                       " created_at TIMESTAMP, updated_at TIMESTAMP)"))
+        c.execute(text("CREATE TABLE officer_workload (user_id INTEGER PRIMARY KEY, full_name TEXT,"
+                       " role_hint TEXT, station_name TEXT, active_assignments INTEGER DEFAULT 0,"
+                       " updated_at TIMESTAMP)"))
+        c.execute(text("INSERT INTO police_station VALUES (1, 'Gulshan PS')"))
+        c.execute(text("INSERT INTO appuser VALUES (1, 'rina', 'Rina Das', 'user', NULL),"
+                       " (7, 'kabir', 'Kabir Hossain', 'Officer', 1), (8, 'mita', NULL, 'Detective', NULL),"
+                       " (9, 'idle', 'Idle Officer', 'officer', NULL)"))
+    return engine
+
+
+@pytest.fixture
+def conn(engine):
+    with engine.connect() as c:
+        yield c
+
+
+def _crime(conn, crime_id, status="Pending"):
+    conn.execute(text("INSERT INTO crime (crime_id, reporter_id, crime_type, area_name, status, created_at)"
+                      " VALUES (:id, '1', 'Theft', 'Gulshan', :s, :now)"),
+                 {"id": crime_id, "s": status, "now": datetime(2025, 3, 1)})
+    workload.crime_changed(conn, crime_id)
+
+
+def _assign(conn, crime_id, officer):
+    before = workload.officer_for(conn, crime_id)
+    conn.execute(text("INSERT INTO case_assignments (user_id, crime_id) VALUES (:u, :c)"
+                      " ON CONFLICT (crime_id) DO UPDATE SET user_id = :u, status = 'Active'"),
+                 {"u": officer, "c": crime_id})
+    workload.crime_changed(conn, crime_id, before)
+
+
+def _set_status(conn, crime_id, status):
+    before = workload.officer_for(conn, crime_id)
+    conn.execute(text("UPDATE crime SET status = :s WHERE crime_id = :id"), {"s": status, "id": crime_id})
+    workload.crime_changed(conn, crime_id, before)
+
+
+def _cases(conn):
+    return {row["crime_id"]: dict(row) for row in conn.execute(
+        text("SELECT * FROM active_cases")).mappings()}
+
+
+def _load(conn):
+    return dict(conn.execute(text("SELECT user_id, active_assignments FROM officer_workload")).fetchall())
+
+
+def test_new_crime_is_an_unassigned_active_case(conn):
+    _crime(conn, 1)
+    case = _cases(conn)[1]
+    assert case["reporter_name"] == "Rina Das" and case["area"] == "Gulshan"
+    assert case["assigned_to"] is None and case["status"] == "Pending"
+    assert _load(conn) == {}
+
+
+def test_assign_reassign_and_close_move_the_counters(conn):
+    _crime(conn, 1)
+    _crime(conn, 2)
+    _assign(conn, 1, 7)
+    _assign(conn, 2, 7)
+    assert _load(conn) == {7: 2}
+    row = conn.execute(text("SELECT * FROM officer_workload WHERE user_id = 7")).mappings().one()
+    assert row["full_name"] == "Kabir Hossain" and row["station_name"] == "Gulshan PS"
+
+    _assign(conn, 2, 8)
+    assert _load(conn) == {7: 1, 8: 1}
+    assert _cases(conn)[2]["assigned_to"] == 8
+
+    _set_status(conn, 1, "Under Investigation")
+    assert _load(conn) == {7: 1, 8: 1}
+    _set_status(conn, 1, "Resolved")
+    assert _load(conn) == {7: 0, 8: 1}
+    assert 1 not in _cases(conn)
+    _set_status(conn, 1, "Pending")  # reopened
+    assert _load(conn) == {7: 1, 8: 1}
+
+
+def test_finished_assignment_and_delete(conn):
+    _crime(conn, 1)
+    _assign(conn, 1, 7)
+    before = workload.officer_for(conn, 1)
+    conn.execute(text("UPDATE case_assignments SET status = 'Completed' WHERE crime_id = 1"))
+    workload.crime_changed(conn, 1, before)
+    assert _load(conn) == {7: 0} and _cases(conn)[1]["assigned_to"] is None
+
+    _assign(conn, 1, 7)
+    before = workload.officer_for(conn, 1)
+    conn.execute(text("DELETE FROM case_assignments WHERE crime_id = 1"))
+    conn.execute(text("DELETE FROM crime WHERE crime_id = 1"))
+    workload.crime_removed(conn, 1, before)
+    assert _load(conn) == {7: 0} and _cases(conn) == {}
+
+
+def test_closed_crimes_are_not_projected(conn):
+    _crime(conn, 1, "Case Closed")
+    assert _cases(conn) == {}
+
+
+def test_reconcile_rebuilds_and_reports_drift(conn):
+    _crime(conn, 1)
+    _assign(conn, 1, 7)
+    # Writes that bypassed the hooks.
+    conn.execute(text("INSERT INTO crime (crime_id, status, created_at) VALUES (2, 'Pending', '2025-03-02'),"
+                      " (3, 'resolved', '2025-03-03')"))
+    conn.execute(text("INSERT INTO case_assignments (user_id, crime_id) VALUES (8, 2), (8, 3)"))
+    conn.execute(text("UPDATE officer_workload SET active_assignments = 5 WHERE user_id = 7"))
+
+    result = workload.reconcile(conn)
+    assert result["active_cases"] == 2
+    assert result["drift"] == {7: {"stored": 5, "actual": 1}, 8: {"stored": None, "actual": 1}}
+    assert _load(conn) == {7: 1, 8: 1, 9: 0}
+    assert {k: v["assigned_to"] for k, v in _cases(conn).items()} == {1: 7, 2: 8}
+    assert workload.reconcile(conn)["drift"] == {}
+
+
+def test_hook_errors_reach_the_write_path(conn):
+    conn.execute(text("DROP TABLE active_cases"))
+    with pytest.raises(OperationalError):
+        workload.crime_changed(conn, 1)
+    with pytest.raises(OperationalError):
+        workload.crime_removed(conn, 1, 7)
+
+
+def test_emergency_dispatch_keeps_an_existing_case_assignment(client, engine, admin_headers, monkeypatch):
+    import app.core.security as security
+    import app.main as app_main
+    from app.db.aio import AsyncEngine
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _no_row_locks(conn, cursor, statement, parameters, context, executemany):
+        return statement.replace("FOR UPDATE", ""), parameters  # SQLite has no row locks
+
+    with engine.begin() as c:
+        c.execute(text("ALTER TABLE crime ADD COLUMN updated_at TIMESTAMP"))
+        c.execute(text("ALTER TABLE appuser ADD COLUMN email TEXT"))
+        c.execute(text("ALTER TABLE appuser ADD COLUMN status TEXT"))
+        c.execute(text("ALTER TABLE case_assignments ADD COLUMN duty_role TEXT"))
+        c.execute(text("ALTER TABLE case_assignments ADD COLUMN assigned_at TIMESTAMP"))
+        c.execute(text("CREATE TABLE list_totals (scope TEXT, filter_key TEXT, total INTEGER,"
+                       " refreshed_at TIMESTAMP, PRIMARY KEY (scope, filter_key))"))
+        c.execute(text("CREATE TABLE emergency_alerts (alert_id INTEGER PRIMARY KEY, status TEXT,"
+                       " linked_crime_id INTEGER, assigned_officer_id INTEGER, assigned_officer_snapshot TEXT,"
+                       " assigned_at TIMESTAMP)"))
+        c.execute(text("INSERT INTO emergency_alerts (alert_id, status, linked_crime_id)"
+                       " VALUES (10, 'Active', 1), (11, 'Active', 2), (12, 'Active', 3)"))
+        for crime_id in (1, 2, 3):
+            _crime(c, crime_id)
+        _assign(c, 1, 7)
+    monkeypatch.setattr(app_main, "async_engine", AsyncEngine(engine))
+    monkeypatch.setattr(security, "fetch_one", lambda sql, params=None: {
+        "user_id": params[0], "username": "a", "email": "a@x", "role_hint": "admin", "status": "active"})
+
+    def dispatch(alert_id):
+        return client.put(f"/api/admin/emergencies/{alert_id}/assign", json={"officer_id": 8}, headers=admin_headers)
+
+    assert dispatch(10).json()["case_assigned"] is False  # crime 1 stays with its investigator
+    assert dispatch(11).json()["case_assigned"] is True
+    with engine.connect() as c:
+        owners = dict(c.execute(text("SELECT crime_id, user_id FROM case_assignments")).fetchall())
+        assert owners == {1: 7, 2: 8}
+        assert _load(c) == {7: 1, 8: 1}
+
+    # A projection that cannot be written rolls the dispatch back with it.
+    with engine.begin() as c:
+        c.execute(text("DROP TABLE officer_workload"))
+    assert dispatch(12).status_code == 500
+    with engine.connect() as c:
+        assert c.execute(text("SELECT status FROM emergency_alerts WHERE alert_id = 12")).scalar() == "Active"
+        assert c.execute(text("SELECT COUNT(*) FROM case_assignments WHERE crime_id = 3")).scalar() == 0